@@ -0,0 +1,4 @@
+"""
+Microbenchmarks dos caminhos de agregação e filtragem dos relatórios
+Execute a partir da raiz do projeto: python -m benchmarks.<nome_do_script>
+"""
@@ -0,0 +1,62 @@
+"""
+Microbenchmark: kernel agregar_codificado (bincount denso / hash esparso) x pandas
+
+Uso: python -m benchmarks.bench_agregacao [n_linhas ...]
+"""
+import sys
+import time
+import numpy as np
+
+from benchmarks.dados_sinteticos import gerar_receita_sintetica
+from relatorios.utils.agregacao import agregar_codificado
+
+MEDIDAS = ['PREVISAO INICIAL LIQUIDA', 'RECEITA LIQUIDA']
+
+AGRUPAMENTOS = {
+    'CATEGORIA x ORIGEM x INTIPOADM': ['CATEGORIA', 'ORIGEM', 'INTIPOADM'],
+    'COEXERCICIO x ORIGEM x INMES': ['COEXERCICIO', 'ORIGEM', 'INMES'],
+    'NOUG x ALINEA': ['NOUG', 'ALINEA'],
+    'NOUG x ALINEA x INMES x INTIPOADM': ['NOUG', 'ALINEA', 'INMES', 'INTIPOADM']
+}
+
+def medir(funcao, repeticoes=5):
+    """Retorna o menor tempo (ms) entre as repetições"""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return min(tempos)
+
+def mascaras_por_grupo(df, chaves):
+    """Caminho antigo dos relatórios: uma máscara booleana e um .sum() por grupo"""
+    grupos = df[chaves].drop_duplicates().itertuples(index=False)
+    for grupo in grupos:
+        mascara = np.ones(len(df), dtype=bool)
+        for coluna, valor in zip(chaves, grupo):
+            mascara &= (df[coluna] == valor).to_numpy()
+        df.loc[mascara, MEDIDAS].sum()
+
+def executar(n_linhas):
+    df_cat = gerar_receita_sintetica(n_linhas)
+    df_obj = gerar_receita_sintetica(n_linhas, categoricas=False)
+    print(f"\n=== {n_linhas:,} linhas ===")
+    print(f"{'agrupamento':38s} {'pandas obj':>11s} {'pandas cat':>11s} {'kernel auto':>12s} {'denso':>9s} {'esparso':>9s}")
+
+    for nome, chaves in AGRUPAMENTOS.items():
+        t_obj = medir(lambda: df_obj.groupby(chaves, observed=True)[MEDIDAS].sum())
+        t_cat = medir(lambda: df_cat.groupby(chaves, observed=True)[MEDIDAS].sum())
+        t_auto = medir(lambda: agregar_codificado(df_cat, chaves, MEDIDAS))
+        t_denso = medir(lambda: agregar_codificado(df_cat, chaves, MEDIDAS, modo='denso'))
+        t_esparso = medir(lambda: agregar_codificado(df_cat, chaves, MEDIDAS, modo='esparso'))
+        print(f"{nome:38s} {t_obj:9.1f}ms {t_cat:9.1f}ms {t_auto:10.1f}ms {t_denso:7.1f}ms {t_esparso:7.1f}ms")
+
+    if n_linhas <= 200_000:
+        chaves = AGRUPAMENTOS['CATEGORIA x ORIGEM x INTIPOADM']
+        t_mascaras = medir(lambda: mascaras_por_grupo(df_obj, chaves), repeticoes=1)
+        print(f"{'máscaras por grupo (caminho antigo)':38s} {t_mascaras:9.1f}ms")
+
+if __name__ == '__main__':
+    tamanhos = [int(arg) for arg in sys.argv[1:]] or [100_000, 1_000_000]
+    for n in tamanhos:
+        executar(n)
@@ -0,0 +1,64 @@
+"""
+Benchmark: modo de armazenamento em memória x SQLite (utils/armazem_sqlite.py)
+
+Para cada tamanho mede a ingestão no SQLite, a leitura do resumo agregado no banco, o mesmo
+resumo calculado em memória, a memória ocupada pelo DataFrame completo e pelo resumo, e o
+balanço orçamentário sobre cada um. O resumo cresce com a cardinalidade das dimensões
+(NOUG x alínea x mês x tipo de administração x exercício), não com o número de linhas: com
+N_NOUGS x N_ALINEAS abaixo ele fica limitado a 288.000 combinações.
+
+Uso: python -m benchmarks.bench_armazem [n_linhas ...]   (padrão: 100.000, 1.000.000 e 2.000.000)
+"""
+import os
+import sys
+import tempfile
+
+from benchmarks.bench_agregacao import medir
+from benchmarks.dados_sinteticos import gerar_receita_sintetica
+from relatorios.utils import obter_hierarquia_receitas
+from relatorios.utils.agregacao import agregar_codificado
+from relatorios.receita import gerar_balanco_orcamentario
+from utils.armazem_sqlite import ArmazemSQLite
+from utils.data_loaders import (COLUNAS_CATEGORICAS_RECEITA, DIMENSOES_RESUMO_RECEITA, MEDIDAS_RESUMO_RECEITA,
+                                EXERCICIOS_RESUMO, DIVISOR_CONTA_CORRENTE)
+
+N_NOUGS = 40
+N_ALINEAS = 60
+
+def megabytes(df):
+    return df.memory_usage(deep=True).sum() / 2 ** 20
+
+def executar(n_linhas):
+    df = gerar_receita_sintetica(n_linhas, N_NOUGS, N_ALINEAS).copy()
+    df['RECEITA_CODIGO'] = df['COCONTACORRENTE'] // DIVISOR_CONTA_CORRENTE
+    dimensoes = [c for c in DIMENSOES_RESUMO_RECEITA if c in df.columns]
+    medidas = [c for c in MEDIDAS_RESUMO_RECEITA if c in df.columns]
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        armazem = ArmazemSQLite(os.path.join(diretorio, 'armazem.sqlite'))
+        ingestao_ms = medir(lambda: armazem.gravar(df, 'receita', 'bench'), 1)
+        tamanho_arquivo = os.path.getsize(armazem.caminho) / 2 ** 20
+
+        def resumir():
+            return armazem.resumir('receita', dimensoes, medidas, EXERCICIOS_RESUMO, COLUNAS_CATEGORICAS_RECEITA)
+        sqlite_ms = medir(resumir, 3)
+        resumo = resumir()
+
+    memoria_ms = medir(lambda: agregar_codificado(df, dimensoes, medidas), 3)
+    estrutura = obter_hierarquia_receitas(df)
+    balanco_completo_ms = medir(lambda: gerar_balanco_orcamentario(df, estrutura), 3)
+    balanco_resumo_ms = medir(lambda: gerar_balanco_orcamentario(resumo, estrutura), 3)
+
+    print(f"\n=== {n_linhas:,} linhas -> resumo de {len(resumo):,} linhas ===")
+    print(f"ingestão no SQLite:              {ingestao_ms:10.1f}ms  (arquivo de {tamanho_arquivo:.1f} MB)")
+    print(f"resumo agregado no SQLite:       {sqlite_ms:10.1f}ms")
+    print(f"resumo agregado em memória:      {memoria_ms:10.1f}ms")
+    print(f"DataFrame completo em memória:   {megabytes(df):10.1f} MB")
+    print(f"resumo em memória:               {megabytes(resumo):10.1f} MB")
+    print(f"balanço sobre o DataFrame:       {balanco_completo_ms:10.1f}ms")
+    print(f"balanço sobre o resumo:          {balanco_resumo_ms:10.1f}ms")
+
+if __name__ == '__main__':
+    tamanhos = [int(arg) for arg in sys.argv[1:]] or [100_000, 1_000_000, 2_000_000]
+    for n in tamanhos:
+        executar(n)
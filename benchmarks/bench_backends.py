@@ -0,0 +1,73 @@
+"""
+Benchmark: relatórios de receita nos backends de cálculo pandas x DuckDB
+
+Cada relatório roda sobre uma cópia não versionada do DataFrame sintético (sem memoização),
+de modo que o tempo medido é o do cálculo completo no backend ativo.
+O backend DuckDB é opcional: sem o pacote instalado, a coluna sai como 'n/d'.
+
+Uso: python -m benchmarks.bench_backends [n_linhas ...]   (padrão: 1.000.000 e 10.000.000)
+"""
+import sys
+import pandas as pd
+
+from benchmarks.bench_agregacao import medir
+from benchmarks.dados_sinteticos import gerar_receita_sintetica
+from relatorios.utils import definir_backend, obter_backend, obter_hierarquia_receitas
+from relatorios.utils.cubo_mensal import CuboMensal
+from relatorios.utils.ranking import IndiceRanking
+from relatorios.utils.projecao import ProjecaoAnual
+from relatorios.receita import (gerar_balanco_orcamentario, gerar_relatorio_receita_estimada,
+                                gerar_relatorio_receita_atualizada_vs_inicial, gerar_relatorio_por_adm,
+                                gerar_grafico_receita_liquida, gerar_comparativo_nougs)
+from relatorios.indicadores import (gerar_relatorio_analise_variacoes, gerar_relatorio_indicadores,
+                                    gerar_relatorio_por_noug, gerar_relatorio_anomalias)
+
+BACKENDS_COMPARADOS = ['pandas', 'duckdb']
+
+def relatorios(df, estrutura):
+    """Relatório -> função sem argumentos que o calcula"""
+    sem_despesa = pd.DataFrame()
+    return {
+        'balanço orçamentário': lambda: gerar_balanco_orcamentario(df, estrutura),
+        'receita estimada': lambda: gerar_relatorio_receita_estimada(df, estrutura),
+        'atualizada x inicial': lambda: gerar_relatorio_receita_atualizada_vs_inicial(df, estrutura),
+        'receita por adm': lambda: gerar_relatorio_por_adm(df, estrutura),
+        'gráfico receita líquida': lambda: gerar_grafico_receita_liquida(df, estrutura),
+        'comparativo NOUGs': lambda: gerar_comparativo_nougs(df),
+        'análise de variações': lambda: gerar_relatorio_analise_variacoes(df),
+        'indicadores': lambda: gerar_relatorio_indicadores(df, sem_despesa),
+        'receita x despesa por NOUG': lambda: gerar_relatorio_por_noug(df, sem_despesa),
+        'anomalias': lambda: gerar_relatorio_anomalias(df),
+        'ranking alíneas': lambda: IndiceRanking(df, 'receita', 'alinea').top('realizado', 10),
+        'projeção 12/AAAA': lambda: ProjecaoAnual(df, ['CATEGORIA', 'ORIGEM']),
+        'cubo mensal': lambda: CuboMensal(df)
+    }
+
+def executar(n_linhas):
+    # Cópia sem versão do cache_service: nenhum resultado é memoizado entre repetições
+    df = gerar_receita_sintetica(n_linhas).copy()
+    estrutura = obter_hierarquia_receitas(df)
+    repeticoes = 3 if n_linhas <= 1_000_000 else 1
+
+    tempos = {}
+    for nome_backend in BACKENDS_COMPARADOS:
+        if definir_backend(nome_backend).nome != nome_backend:
+            continue
+        for relatorio, calcular in relatorios(df, estrutura).items():
+            tempos[(relatorio, nome_backend)] = medir(calcular, repeticoes)
+    definir_backend('pandas')
+
+    print(f"\n=== {n_linhas:,} linhas ===")
+    print(f"{'relatório':28s} {'pandas':>10s} {'duckdb':>10s} {'duckdb/pandas':>14s}")
+    for relatorio in relatorios(df, estrutura):
+        pandas_ms = tempos.get((relatorio, 'pandas'))
+        duckdb_ms = tempos.get((relatorio, 'duckdb'))
+        razao = f"{duckdb_ms / pandas_ms:12.2f}x" if duckdb_ms is not None else f"{'n/d':>13s}"
+        duckdb_txt = f"{duckdb_ms:8.1f}ms" if duckdb_ms is not None else f"{'n/d':>10s}"
+        print(f"{relatorio:28s} {pandas_ms:8.1f}ms {duckdb_txt} {razao}")
+
+if __name__ == '__main__':
+    tamanhos = [int(arg) for arg in sys.argv[1:]] or [1_000_000, 10_000_000]
+    for n in tamanhos:
+        executar(n)
+    print(f"\nBackend ativo ao final: {obter_backend().nome}")
@@ -0,0 +1,52 @@
+"""
+Microbenchmark: filtros combinados por índices bitmap x máscaras booleanas do pandas
+
+Uso: python -m benchmarks.bench_bitmap [n_linhas ...]
+"""
+import sys
+import numpy as np
+
+from benchmarks.bench_agregacao import medir
+from benchmarks.dados_sinteticos import gerar_receita_sintetica
+from relatorios.utils.bitmap import IndiceBitmap
+
+def cenarios(df):
+    """Filtros de alta seletividade (poucas linhas) e de baixa seletividade (quase todas)"""
+    nougs = df['NOUG'].cat.categories
+    return {
+        'alta: 2 NOUGs x 1 mês': {'NOUG': list(nougs[:2]), 'INMES': (6, 6)},
+        'alta: NOUG x origem x tipo adm': {'NOUG': [nougs[0]], 'ORIGEM': ['11'], 'INTIPOADM': [1]},
+        'média: 10 NOUGs x trimestre': {'NOUG': list(nougs[:10]), 'INMES': (1, 3)},
+        'baixa: 4 tipos adm x 11 meses': {'INTIPOADM': [1, 3, 4, 5], 'INMES': (1, 11)},
+        'baixa: categoria 1 x 50 NOUGs': {'CATEGORIA': ['1'], 'NOUG': list(nougs[:50])}
+    }
+
+def mascara_pandas(df, filtros):
+    """Caminho sem índice: uma máscara booleana por dimensão, combinadas com &"""
+    mascara = np.ones(len(df), dtype=bool)
+    for dimensao, filtro in filtros.items():
+        if isinstance(filtro, tuple):
+            mascara &= df[dimensao].between(*filtro).to_numpy()
+        else:
+            mascara &= df[dimensao].isin(filtro).to_numpy()
+    return df[mascara]
+
+def executar(n_linhas):
+    df = gerar_receita_sintetica(n_linhas)
+    indice = medir(lambda: IndiceBitmap(df), repeticoes=1)
+    bitmaps = IndiceBitmap(df)
+    print(f"\n=== {n_linhas:,} linhas (construção dos bitmaps: {indice:.1f}ms) ===")
+    print(f"{'filtro':34s} {'linhas':>10s} {'máscaras':>10s} {'bitmaps':>9s} {'+ take':>9s}")
+
+    for nome, filtros in cenarios(df).items():
+        linhas = len(bitmaps.selecionar(filtros))
+        assert linhas == len(mascara_pandas(df, filtros))
+        t_mascara = medir(lambda: mascara_pandas(df, filtros))
+        t_bitmap = medir(lambda: bitmaps.selecionar(filtros))
+        t_take = medir(lambda: df.take(bitmaps.selecionar(filtros)))
+        print(f"{nome:34s} {linhas:10,d} {t_mascara:8.1f}ms {t_bitmap:7.2f}ms {t_take:7.1f}ms")
+
+if __name__ == '__main__':
+    tamanhos = [int(arg) for arg in sys.argv[1:]] or [100_000, 1_000_000]
+    for n in tamanhos:
+        executar(n)
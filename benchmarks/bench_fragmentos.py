@@ -0,0 +1,77 @@
+"""
+Benchmark: relatórios não memoizados com a agregação fragmentada por NOUG (1, 2, 4 e 8 processos)
+
+O DataFrame sintético recebe versão no cache_service (só DataFrames versionados são
+fragmentados); os resultados memoizados são descartados antes de cada repetição, de modo
+que o tempo medido é o do relatório calculado do zero. A primeira consulta de cada
+configuração inclui a distribuição dos fragmentos e é mostrada à parte.
+O ganho depende dos núcleos disponíveis: com menos núcleos que processos, só há custo extra.
+
+Uso: python -m benchmarks.bench_fragmentos [n_linhas ...]   (padrão: 2.000.000)
+"""
+import os
+import sys
+import time
+
+from benchmarks.bench_agregacao import medir
+from benchmarks.dados_sinteticos import gerar_receita_sintetica
+from cache_service import cache_service
+from relatorios.utils import definir_backend, obter_backend, obter_hierarquia_receitas
+from relatorios.utils.backends import BackendFragmentado
+from relatorios.utils.agregacao import definir_backend_ativo
+from relatorios.utils.projecao import ProjecaoAnual
+from relatorios.receita import (gerar_balanco_orcamentario, gerar_relatorio_receita_estimada,
+                                gerar_relatorio_receita_atualizada_vs_inicial, gerar_relatorio_por_adm)
+
+FRAGMENTOS = [1, 2, 4, 8]
+
+def relatorios(df, estrutura):
+    """Relatório -> função sem argumentos que o calcula"""
+    return {
+        'balanço orçamentário': lambda: gerar_balanco_orcamentario(df, estrutura),
+        'receita estimada': lambda: gerar_relatorio_receita_estimada(df, estrutura),
+        'atualizada x inicial': lambda: gerar_relatorio_receita_atualizada_vs_inicial(df, estrutura),
+        'receita por adm': lambda: gerar_relatorio_por_adm(df, estrutura),
+        'projeção 12/AAAA': lambda: ProjecaoAnual(df, ['CATEGORIA', 'ORIGEM'])
+    }
+
+def sem_memoria(calcular):
+    """Descarta os resultados memoizados e calcula"""
+    def executar():
+        cache_service.limpar_resultados()
+        return calcular()
+    return executar
+
+def executar(n_linhas):
+    base = gerar_receita_sintetica(n_linhas)
+    df = cache_service.derivar_dataframe(f"bench_fragmentos|{n_linhas}", lambda: base)
+    estrutura = obter_hierarquia_receitas(df)
+    repeticoes = 3
+
+    configuracoes = ['local'] + FRAGMENTOS
+    tempos, distribuicao = {}, {}
+    for configuracao in configuracoes:
+        if configuracao == 'local':
+            definir_backend('pandas')
+        else:
+            definir_backend('pandas')
+            definir_backend_ativo(BackendFragmentado(configuracao))
+            inicio = time.perf_counter()
+            gerar_balanco_orcamentario(df, estrutura)
+            cache_service.limpar_resultados()
+            distribuicao[configuracao] = (time.perf_counter() - inicio) * 1000
+        for relatorio, calcular in relatorios(df, estrutura).items():
+            tempos[(relatorio, configuracao)] = medir(sem_memoria(calcular), repeticoes)
+    definir_backend('pandas')
+
+    print(f"\n=== {n_linhas:,} linhas, {os.cpu_count()} núcleos ===")
+    print(f"{'relatório':24s}" + ''.join(f"{str(c) + (' proc' if c != 'local' else ''):>11s}" for c in configuracoes))
+    for relatorio in relatorios(df, estrutura):
+        print(f"{relatorio:24s}" + ''.join(f"{tempos[(relatorio, c)]:9.1f}ms" for c in configuracoes))
+    print(f"{'1ª consulta (distribui)':24s}{'':11s}" + ''.join(f"{distribuicao[c]:9.1f}ms" for c in FRAGMENTOS))
+
+if __name__ == '__main__':
+    tamanhos = [int(arg) for arg in sys.argv[1:]] or [2_000_000]
+    for n in tamanhos:
+        executar(n)
+    print(f"\nBackend ativo ao final: {obter_backend().nome}")
@@ -0,0 +1,72 @@
+"""
+Geração de DataFrames sintéticos com o mesmo esquema da planilha de receita
+Usado pelos benchmarks para medir escalas maiores que os dados reais
+"""
+import numpy as np
+import pandas as pd
+
+from utils.data_loaders import COLUNAS_CATEGORICAS_RECEITA
+
+ORIGENS_POR_CATEGORIA = {
+    '1': ['11', '12', '13', '14', '15', '16', '17', '19'],
+    '2': ['21', '22', '23', '24'],
+    '7': ['71', '72', '76', '77', '79']
+}
+TIPOS_ADM = [1, 3, 4, 5, 7]
+
+def gerar_receita_sintetica(n_linhas: int, n_nougs: int = 60, n_alineas: int = 400,
+                            exercicios=(2024, 2025), semente: int = 42,
+                            categoricas: bool = True) -> pd.DataFrame:
+    """
+    Gera um DataFrame de receita sintético
+
+    Args:
+        n_linhas: Número de linhas
+        n_nougs: Número de unidades gestoras distintas
+        n_alineas: Número de alíneas distintas
+        exercicios: Exercícios presentes
+        semente: Semente do gerador aleatório
+        categoricas: Se True, aplica o mesmo dtype categórico da ingestão
+
+    Returns:
+        DataFrame com colunas de dimensão e medidas da receita
+    """
+    rng = np.random.default_rng(semente)
+
+    origens = [(cat, orig) for cat, lista in ORIGENS_POR_CATEGORIA.items() for orig in lista]
+    alineas = []
+    for i in range(n_alineas):
+        cat, orig = origens[i % len(origens)]
+        especie = f"{orig}{i % 9 + 1}"
+        alineas.append((cat, orig, especie, f"{especie}{i % 10}{i % 7:02d}"[:6]))
+    escolha = rng.integers(0, len(alineas), n_linhas)
+    tabela_alineas = np.array(alineas)
+
+    nougs = np.array([f"UNIDADE GESTORA {i:03d}" for i in range(n_nougs)])
+    noug_idx = rng.integers(0, n_nougs, n_linhas)
+    receita_codigo = np.array([int(a[3]) * 100 + 1 for a in alineas])[escolha]
+    fonte_codigo = rng.integers(100000000, 100000050, n_linhas)
+
+    df = pd.DataFrame({
+        'CATEGORIA': tabela_alineas[escolha, 0],
+        'NOCATEGORIARECEITA': np.char.add('Categoria ', tabela_alineas[escolha, 0]),
+        'ORIGEM': tabela_alineas[escolha, 1],
+        'NOFONTERECEITA': np.char.add('Origem ', tabela_alineas[escolha, 1]),
+        'ESPECIE': tabela_alineas[escolha, 2],
+        'NOSUBFONTERECEITA': np.char.add('Espécie ', tabela_alineas[escolha, 2]),
+        'ALINEA': tabela_alineas[escolha, 3],
+        'NOALINEA': np.char.add('Alínea ', tabela_alineas[escolha, 3]),
+        'COEXERCICIO': rng.choice(np.array(exercicios, dtype=np.int64), n_linhas),
+        'INMES': rng.integers(1, 13, n_linhas),
+        'INTIPOADM': rng.choice(np.array(TIPOS_ADM, dtype=np.int64), n_linhas),
+        'NOUG': nougs[noug_idx],
+        'COCONTACORRENTE': receita_codigo * 1_000_000_000 + fonte_codigo,
+        'PREVISAO INICIAL LIQUIDA': rng.integers(0, 10_000_000, n_linhas),
+        'PREVISAO ATUALIZADA LIQUIDA': rng.random(n_linhas) * 1e7,
+        'RECEITA LIQUIDA': rng.random(n_linhas) * 1e6
+    })
+
+    if categoricas:
+        for col in COLUNAS_CATEGORICAS_RECEITA:
+            df[col] = df[col].astype('category')
+    return df
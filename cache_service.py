@@ -1,9 +1,11 @@
 import os
 import pickle
 import hashlib
+import threading
 import pandas as pd
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable, Hashable, Iterable, List, Tuple
 
 class CacheService:
     """Serviço de cache para otimizar carregamento de dados"""
@@ -11,6 +13,22 @@ class CacheService:
     def __init__(self, cache_dir: str = "cache"):
         self.cache_dir = cache_dir
         self.cache_duration = timedelta(hours=2)  # Cache válido por 2 horas
+        self.max_resultados_memoria = 256
+        self.max_derivados_memoria = 32
+        self.max_origens = 256
+        # DataFrames já carregados neste processo (cache_key -> (versão, DataFrame))
+        self._dataframes_memoria: Dict[str, tuple] = {}
+        # id do DataFrame em memória -> versão (hash do arquivo de origem)
+        self._versoes: Dict[int, str] = {}
+        # Resultados calculados por versão de dados (LRU)
+        self._resultados_memoria: "OrderedDict[Hashable, Any]" = OrderedDict()
+        # DataFrames derivados com versão própria (recortes mensais etc.), mantidos vivos
+        # enquanto registrados para que o id nunca seja reaproveitado por outro objeto (LRU)
+        self._derivados_memoria: "OrderedDict[str, pd.DataFrame]" = OrderedDict()
+        # Versão derivada -> (versão de origem, filtros de linhas, chaves que o derivado altera),
+        # para derivados que equivalem a um filtro sobre a origem (LRU)
+        self._origens: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
         self._ensure_cache_dir()
     
     def _ensure_cache_dir(self):
@@ -40,17 +58,165 @@ class CacheService:
         cache_time = datetime.fromtimestamp(os.path.getmtime(cache_path))
         return datetime.now() - cache_time < self.cache_duration
     
+    def _registrar_em_memoria(self, cache_key: str, full_cache_key: str, df: pd.DataFrame):
+        """Mantém o DataFrame em memória e associa sua versão ao objeto"""
+        with self._lock:
+            anterior = self._dataframes_memoria.get(cache_key)
+            if anterior is not None:
+                self._versoes.pop(id(anterior[1]), None)
+            self._dataframes_memoria[cache_key] = (full_cache_key, df)
+            self._versoes[id(df)] = full_cache_key
+    
+    def versao_dataframe(self, df: pd.DataFrame) -> Optional[str]:
+        """
+        Retorna a versão (cache_key + hash do arquivo) de um DataFrame carregado pelo cache
+        
+        Só DataFrames entregues pelo próprio serviço têm versão; recortes e cópias retornam None
+        """
+        return self._versoes.get(id(df))
+    
+    def memoizar(self, chave: Hashable, calcular: Callable[[], Any]) -> Any:
+        """
+        Retorna o resultado em memória para a chave ou calcula e armazena
+        
+        A chave deve incluir a versão dos dados usados no cálculo
+        """
+        with self._lock:
+            if chave in self._resultados_memoria:
+                self._resultados_memoria.move_to_end(chave)
+                return self._resultados_memoria[chave]
+        
+        resultado = calcular()
+        
+        with self._lock:
+            self._resultados_memoria[chave] = resultado
+            self._resultados_memoria.move_to_end(chave)
+            while len(self._resultados_memoria) > self.max_resultados_memoria:
+                self._resultados_memoria.popitem(last=False)
+        return resultado
+    
+    def derivar_dataframe(self, versao: str, calcular: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+        """
+        Retorna um DataFrame derivado com versão própria, calculando-o na primeira vez
+        
+        O resultado passa a ter versao_dataframe() == versao, de modo que os cálculos
+        memoizados sobre ele (motor, índices, planejador) também são reaproveitados.
+        A versão deve incluir a versão do DataFrame de origem.
+        """
+        with self._lock:
+            if versao in self._derivados_memoria:
+                self._derivados_memoria.move_to_end(versao)
+                return self._derivados_memoria[versao]
+        
+        df = calcular()
+        
+        with self._lock:
+            if versao in self._derivados_memoria:
+                return self._derivados_memoria[versao]
+            self._derivados_memoria[versao] = df
+            self._versoes[id(df)] = versao
+            while len(self._derivados_memoria) > self.max_derivados_memoria:
+                _, antigo = self._derivados_memoria.popitem(last=False)
+                self._versoes.pop(id(antigo), None)
+        return df
+    
+    def registrar_origem(self, versao: str, versao_origem: str, filtros: Dict[str, Any],
+                         chaves_alteradas: Iterable[str] = ()):
+        """
+        Registra que o derivado equivale a filtrar as linhas da origem
+
+        Agregações do derivado podem então rodar sobre a origem com os filtros (ex: backend
+        fragmentado, que já tem a origem distribuída), desde que não agrupem por uma das
+        chaves_alteradas (colunas cujo valor o derivado reescreve).
+
+        Args:
+            versao: Versão do derivado
+            versao_origem: Versão do DataFrame de origem
+            filtros: Filtros de mascara_filtros (valores exatos da origem)
+            chaves_alteradas: Colunas que não podem ser chaves da agregação equivalente
+        """
+        with self._lock:
+            self._origens[versao] = (versao_origem, dict(filtros), frozenset(chaves_alteradas))
+            self._origens.move_to_end(versao)
+            while len(self._origens) > self.max_origens:
+                self._origens.popitem(last=False)
+
+    def origem_filtrada(self, versao: str) -> Optional[Tuple[pd.DataFrame, str, List[Dict[str, Any]], frozenset]]:
+        """
+        DataFrame em memória do qual a versão é um filtro de linhas, seguindo a cadeia de derivados
+
+        Returns:
+            Tuple (DataFrame de origem, versão de origem, filtros combinados com E, chaves
+            alteradas) ou None se a versão não tem origem registrada ou a origem saiu da memória
+        """
+        filtros, alteradas = [], set()
+        with self._lock:
+            while versao in self._origens:
+                versao, filtro, chaves = self._origens[versao]
+                filtros.append(filtro)
+                alteradas |= chaves
+            if not filtros:
+                return None
+            df = self._derivados_memoria.get(versao)
+            if df is None:
+                df = next((em_memoria for chave, em_memoria in self._dataframes_memoria.values()
+                           if chave == versao), None)
+        if df is None:
+            return None
+        return df, versao, filtros, frozenset(alteradas)
+
+    def fixar_dataframe(self, cache_key: str, versao: str, calcular: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+        """
+        Retorna um DataFrame mantido em memória por cache_key, fora do LRU dos derivados
+
+        Para DataFrames caros de recalcular (ex: resumo lido do SQLite): ficam em memória como
+        os carregados de arquivo e só são substituídos quando a versão muda.
+        """
+        with self._lock:
+            em_memoria = self._dataframes_memoria.get(cache_key)
+            if em_memoria is not None and em_memoria[0] == versao:
+                return em_memoria[1]
+
+        df = calcular()
+
+        with self._lock:
+            em_memoria = self._dataframes_memoria.get(cache_key)
+            if em_memoria is not None and em_memoria[0] == versao:
+                return em_memoria[1]
+        self._registrar_em_memoria(cache_key, versao, df)
+        return df
+
+    def versao_arquivo(self, file_path: str, cache_key: str) -> str:
+        """Versão (cache_key + hash do arquivo) que o DataFrame carregado do arquivo terá"""
+        return f"{cache_key}_{self._get_file_hash(file_path)}"
+    
+    def liberar_dataframe(self, cache_key: str):
+        """
+        Remove da memória o DataFrame carregado sob cache_key (o pickle em disco continua)
+        
+        Usado quando os dados passam a ser servidos de outro armazenamento (modo SQLite)
+        """
+        with self._lock:
+            em_memoria = self._dataframes_memoria.pop(cache_key, None)
+            if em_memoria is not None:
+                self._versoes.pop(id(em_memoria[1]), None)
+    
     def get_cached_dataframe(self, file_path: str, cache_key: str) -> Optional[pd.DataFrame]:
         """Recupera DataFrame do cache se válido"""
         file_hash = self._get_file_hash(file_path)
         full_cache_key = f"{cache_key}_{file_hash}"
         cache_path = self._get_cache_path(full_cache_key)
         
+        em_memoria = self._dataframes_memoria.get(cache_key)
+        if em_memoria is not None and em_memoria[0] == full_cache_key:
+            return em_memoria[1]
+        
         if self._is_cache_valid(cache_path):
             try:
                 with open(cache_path, 'rb') as f:
                     cached_data = pickle.load(f)
                     print(f"✅ Cache HIT para {cache_key}")
+                    self._registrar_em_memoria(cache_key, full_cache_key, cached_data)
                     return cached_data
             except Exception as e:
                 print(f"⚠️ Erro ao carregar cache: {e}")
@@ -72,9 +238,23 @@ class CacheService:
             print(f"💾 DataFrame cacheado para {cache_key}")
         except Exception as e:
             print(f"⚠️ Erro ao salvar cache: {e}")
+        
+        self._registrar_em_memoria(cache_key, full_cache_key, df)
+    
+    def limpar_resultados(self):
+        """Descarta os resultados memoizados, mantendo os DataFrames e derivados em memória"""
+        with self._lock:
+            self._resultados_memoria.clear()
     
     def clear_cache(self):
         """Limpa todo o cache"""
+        with self._lock:
+            self._dataframes_memoria.clear()
+            self._versoes.clear()
+            self._resultados_memoria.clear()
+            self._derivados_memoria.clear()
+            self._origens.clear()
+        
         if os.path.exists(self.cache_dir):
             for file in os.listdir(self.cache_dir):
                 file_path = os.path.join(self.cache_dir, file)
@@ -101,7 +281,10 @@ class CacheService:
         return {
             "total_files": total_files,
             "total_size": total_size,
-            "total_size_mb": round(total_size / (1024 * 1024), 2)
+            "total_size_mb": round(total_size / (1024 * 1024), 2),
+            "dataframes_em_memoria": len(self._dataframes_memoria),
+            "resultados_em_memoria": len(self._resultados_memoria),
+            "derivados_em_memoria": len(self._derivados_memoria)
         }
 
 # Instância global do cache
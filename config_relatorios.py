@@ -1,9 +1,12 @@
 # Este arquivo armazena as "receitas" ou estruturas de todos os relatórios
 # e também a configuração do menu principal da aplicação.
+import os
 
 # --- ESTRUTURA HIERÁRQUICA DE CÓDIGOS (VERSÃO COMPLETA) ---
 # Esta estrutura define a relação entre Categoria, Origem e Espécie.
 # O nível da Alínea será descoberto dinamicamente pelo sistema.
+# Referência estática: as rotas usam obter_hierarquia_receitas(df), que descobre
+# a mesma estrutura a partir dos códigos presentes nos dados.
 HIERARQUIA_RECEITAS = {
     "1": { # Categoria: RECEITAS CORRENTES
         "11": ["111", "112", "113", "114", "115", "116", "117", "118", "119"],
@@ -47,6 +50,134 @@ COLUNAS_TIPO_ADMINISTRACAO = {
     "FUNDOS": 7
 }
 
+# Chave usada em cada linha do relatório para os tipos de administração
+CHAVES_TIPO_ADMINISTRACAO = {
+    "ADMINISTRAÇÃO DIRETA": "adm_direta",
+    "AUTARQUIAS": "autarquias",
+    "FUNDAÇÕES": "fundacoes",
+    "EMPRESAS": "empresas",
+    "FUNDOS": "fundos"
+}
+
+# --- EXERCÍCIOS RELATIVOS ---
+# Resolvidos pelo motor para o maior COEXERCICIO dos dados e o exercício anterior a ele
+EXERCICIO_ATUAL = "{atual}"
+EXERCICIO_ANTERIOR = "{anterior}"
+
+# --- ESPECIFICAÇÕES DECLARATIVAS DOS RELATÓRIOS ---
+# Cada relatório é descrito por:
+#   dimensoes:   colunas hierárquicas das linhas (1º nível 'principal', 2º nível 'filha')
+#   filtros:     filtros de igualdade aplicados antes da agregação
+#   medidas:     soma de uma coluna (ou contagem de registros) sob filtros próprios
+#   derivadas:   expressões sobre as medidas ou funções nomeadas do motor
+#   manter_se:   condição para a linha aparecer no relatório
+#   total:       'linhas' (soma das linhas principais) ou 'geral' (todo o recorte)
+#   formatos:    formato de exibição de cada campo (padrão: 'moeda')
+#   cabecalho:   cabeçalho do PDF ({mes}, {atual} e {anterior} são substituídos)
+#   colunas_pdf: campos exibidos no PDF, na ordem do cabeçalho
+#   comparativo: série dos N exercícios mais recentes de uma medida; gera valor_<ano>,
+#                perc_<ano> (participação) e delta_<ano> (Δ% sobre o exercício anterior),
+#                acrescentando as colunas ao cabeçalho e ao PDF
+#   projecao:    coluna com a projeção de fechamento do exercício atual de uma medida
+#   simulacao:   medidas que os cenários (what-if) ajustam por multiplicadores
+# Exercícios são relativos ao mais recente presente nos dados (EXERCICIO_ATUAL/ANTERIOR).
+# O motor em relatorios/utils/motor_especificacao.py executa todas elas.
+ESPECIFICACOES_RELATORIOS = {
+    "balanco_orcamentario": {
+        "dimensoes": ["CATEGORIA", "ORIGEM"],
+        "filtros": {},
+        "medidas": {
+            "registros": {"agregacao": "contagem", "filtros": {"COEXERCICIO": EXERCICIO_ATUAL}},
+            "pi_atual": {"coluna": "PREVISAO INICIAL LIQUIDA", "filtros": {"COEXERCICIO": EXERCICIO_ATUAL}},
+            "pa_atual": {"coluna": "PREVISAO ATUALIZADA LIQUIDA", "alternativa": "PREVISAO INICIAL LIQUIDA",
+                         "filtros": {"COEXERCICIO": EXERCICIO_ATUAL}},
+            "rr_atual": {"coluna": "RECEITA LIQUIDA", "filtros": {"COEXERCICIO": EXERCICIO_ATUAL}},
+            "rr_anterior": {"coluna": "RECEITA LIQUIDA", "filtros": {"COEXERCICIO": EXERCICIO_ANTERIOR}}
+        },
+        "derivadas": {
+            "saldo": "rr_atual - rr_anterior"
+        },
+        "projecao": {"nome": "projecao", "coluna": "RECEITA LIQUIDA"},
+        "simulacao": ["pa_atual"],
+        "manter_se": "registros > 0",
+        "total": "linhas",
+        "mes_referencia": {"COEXERCICIO": EXERCICIO_ATUAL},
+        "formatos": {},
+        "cabecalho": ['RECEITAS', 'PREVISÃO INICIAL {atual}', 'PREVISÃO ATUALIZADA {atual}',
+                      'RECEITA REALIZADA {mes}/{atual}', 'RECEITA REALIZADA {mes}/{anterior}',
+                      'VARIAÇÃO {atual} x {anterior}', 'PROJEÇÃO 12/{atual}'],
+        "colunas_pdf": ['pi_atual', 'pa_atual', 'rr_atual', 'rr_anterior', 'saldo', 'projecao']
+    },
+    "receita_estimada": {
+        "dimensoes": ["CATEGORIA", "ORIGEM"],
+        "filtros": {},
+        "comparativo": {
+            "exercicios": 2,
+            "medida": {"coluna": "PREVISAO INICIAL LIQUIDA"},
+            "rotulo": "RECEITA PREVISTA"
+        },
+        "total": "geral",
+        "cabecalho": ['ESPECIFICAÇÃO'],
+        "colunas_pdf": []
+    },
+    "receita_atualizada_vs_inicial": {
+        "dimensoes": ["CATEGORIA", "ORIGEM"],
+        "filtros": {"COEXERCICIO": EXERCICIO_ATUAL},
+        "medidas": {
+            "registros": {"agregacao": "contagem"},
+            "inicial": {"coluna": "PREVISAO INICIAL LIQUIDA"},
+            "atualizada": {"coluna": "PREVISAO ATUALIZADA LIQUIDA", "alternativa": "PREVISAO INICIAL LIQUIDA"}
+        },
+        "derivadas": {
+            "delta": ("variacao_percentual", "inicial", "atualizada")
+        },
+        "simulacao": ["atualizada"],
+        "manter_se": "registros > 0 and (inicial != 0 or atualizada != 0)",
+        "total": "linhas",
+        "formatos": {"delta": "variacao"},
+        "cabecalho": ['ESPECIFICAÇÃO', 'PREVISÃO INICIAL', 'PREVISÃO ATUALIZADA', 'Δ%'],
+        "colunas_pdf": ['inicial', 'atualizada', 'delta']
+    },
+    "receita_por_adm": {
+        "dimensoes": ["CATEGORIA", "ORIGEM"],
+        "filtros": {"COEXERCICIO": EXERCICIO_ATUAL},
+        "medidas": {
+            "registros": {"agregacao": "contagem"},
+            **{
+                CHAVES_TIPO_ADMINISTRACAO[nome_adm]: {"coluna": "PREVISAO INICIAL LIQUIDA",
+                                                      "filtros": {"INTIPOADM": cod_adm}}
+                for nome_adm, cod_adm in COLUNAS_TIPO_ADMINISTRACAO.items()
+            }
+        },
+        "derivadas": {
+            "total": " + ".join(CHAVES_TIPO_ADMINISTRACAO.values())
+        },
+        "manter_se": "registros > 0 and total > 0",
+        "total": "linhas",
+        "formatos": {},
+        "cabecalho": ['ESPECIFICAÇÃO', 'ADMINISTRAÇÃO DIRETA', 'AUTARQUIAS', 'FUNDAÇÕES', 'EMPRESAS', 'FUNDOS', 'TOTAL'],
+        "colunas_pdf": ['adm_direta', 'autarquias', 'fundacoes', 'empresas', 'fundos', 'total']
+    }
+}
+
+# --- BACKEND DE CÁLCULO ---
+# 'pandas' (padrão), 'duckdb' (opcional: pip install duckdb) ou 'fragmentado' (processos de
+# trabalho com os dados particionados por NOUG); ver relatorios/utils/backends.py
+BACKEND_AGREGACAO = os.environ.get('BACKEND_AGREGACAO', 'pandas')
+FRAGMENTOS_AGREGACAO = int(os.environ.get('FRAGMENTOS_AGREGACAO', os.cpu_count() or 1))
+
+# --- SEÇÕES CONCORRENTES (DASHBOARD) ---
+# Threads do pool compartilhado e prazo padrão de cada seção (segundos); ver relatorios/utils/secoes.py
+THREADS_SECOES = int(os.environ.get('THREADS_SECOES', 4))
+TEMPO_LIMITE_SECAO = float(os.environ.get('TEMPO_LIMITE_SECAO', 10.0))
+
+# --- ARMAZENAMENTO DAS TABELAS DE FATOS ---
+# 'memoria' (padrão): receita e despesa completas em cada processo
+# 'sqlite': ingestão grava as tabelas em CAMINHO_ARMAZEM_SQLITE e os relatórios declarativos
+# recebem o resumo agregado no próprio SQLite; ver utils/armazem_sqlite.py
+ARMAZENAMENTO_DADOS = os.environ.get('ARMAZENAMENTO_DADOS', 'memoria')
+CAMINHO_ARMAZEM_SQLITE = os.environ.get('CAMINHO_ARMAZEM_SQLITE', os.path.join('cache', 'armazem.sqlite'))
+
 # --- MENU PRINCIPAL REORGANIZADO E ATUALIZADO ---
 MENU_PRINCIPAL = {
     "Receita": [
@@ -54,6 +185,16 @@ MENU_PRINCIPAL = {
             "nome": "Balanço Orçamentário da Receita",
             "url": "/relatorio/balanco-orcamentario",
             "status": "ativo"
+        },
+        {
+            "nome": "Receita por Fonte de Recursos",
+            "url": "/relatorio/receita-por-fonte",
+            "status": "ativo"
+        },
+        {
+            "nome": "Comparativo entre Unidades Gestoras",
+            "url": "/relatorio/comparativo-nougs",
+            "status": "ativo"
         }
     ],
     "Despesa": [
@@ -114,7 +255,7 @@ MENU_PRINCIPAL = {
         {
             "nome": "Indicadores Orçamentários",
             "url": "/relatorio/indicadores",
-            "status": "desenvolvimento"
+            "status": "ativo"
         },
         {
             "nome": "Dashboard Executivo",
@@ -124,12 +265,17 @@ MENU_PRINCIPAL = {
         {
             "nome": "Relatório por Unidade Gestora",
             "url": "/relatorio/por-noug",
-            "status": "desenvolvimento"
+            "status": "ativo"
         },
         {
             "nome": "Análise de Variações",
             "url": "/relatorio/analise-variacoes",
-            "status": "desenvolvimento"
+            "status": "ativo"
+        },
+        {
+            "nome": "Detecção de Anomalias",
+            "url": "/relatorio/anomalias",
+            "status": "ativo"
         }
     ]
 }
\ No newline at end of file
@@ -51,12 +51,12 @@ def verificar_imports():
         # Testa módulo de indicadores (NOVA ESTRUTURA)
         print("4. Testando módulo relatorios.indicadores...")
         from relatorios.indicadores import (
-            gerar_dashboard_executivo_placeholder,
-            gerar_indicadores_orcamentarios_placeholder,
-            gerar_analise_variacoes_placeholder,
-            gerar_relatorio_por_noug_placeholder
+            gerar_dashboard_executivo,
+            gerar_relatorio_indicadores,
+            gerar_relatorio_analise_variacoes,
+            gerar_relatorio_por_noug
         )
-        print("   ✅ Placeholders de indicadores importados")
+        print("   ✅ Funções de indicadores importadas")
         
     except Exception as e:
         print(f"   ❌ Erro em relatorios.indicadores: {e}")
@@ -138,7 +138,6 @@ def verificar_arquivos():
         'relatorios/despesa/despesa_natureza.py',
         'relatorios/despesa/despesa_modalidade.py',
         'relatorios/indicadores/__init__.py',
-        'relatorios/indicadores/placeholders.py',
         'relatorios/indicadores/dashboard_executivo.py',
         'relatorios/indicadores/indicadores_orcamentarios.py',
         'relatorios/indicadores/analise_variacoes.py'
@@ -4,15 +4,18 @@ Exporta todas as funções de geração de relatórios de despesa
 """
 
 from .balanco_despesa import gerar_balanco_despesa
+from .despesa_unidade import gerar_relatorio_despesa_por_noug, ORDENACOES_DESPESA_NOUG, ORDENACAO_PADRAO_DESPESA_NOUG
 
 # TODO: Quando implementados, adicionar:
 # from .despesa_funcao import gerar_relatorio_despesa_por_funcao
 # from .despesa_natureza import gerar_relatorio_despesa_por_natureza
 # from .despesa_modalidade import gerar_relatorio_despesa_por_modalidade
-# from .despesa_unidade import gerar_relatorio_despesa_por_noug
 # from .execucao_programa import gerar_relatorio_execucao_por_programa
 
 __all__ = [
-    'gerar_balanco_despesa'
+    'gerar_balanco_despesa',
+    'gerar_relatorio_despesa_por_noug',
+    'ORDENACOES_DESPESA_NOUG',
+    'ORDENACAO_PADRAO_DESPESA_NOUG'
     # TODO: Adicionar as outras funções quando implementadas
 ]
\ No newline at end of file
@@ -0,0 +1,197 @@
+"""
+Relatório: Despesa por Unidade Gestora
+Ranking das NOUGs por dotação atualizada, execução e saldo, com ordenação e paginação no servidor
+Uma única agregação pelo código categórico da NOUG (memoizada por versão dos dados); cada
+requisição só reordena os vetores por unidade e formata a página exibida
+"""
+from typing import Dict, Optional
+
+import numpy as np
+
+from cache_service import cache_service
+from ..utils import (agregar, obter_mes_numero, obter_exercicio_atual, formatar_numero, paginar, razao_percentual,
+                     LINHAS_POR_PAGINA)
+from ..utils.formatacao import formatar_percentual_simples
+
+# Componentes da dotação atualizada
+COLUNAS_DOTACAO_ATUALIZADA = [
+    'DOTACAO INICIAL', 'DOTACAO ADICIONAL', 'CANCELAMENTO DE DOTACAO', 'CANCEL-REMANEJA DOTACAO'
+]
+COLUNAS_EXECUCAO = ['DESPESA EMPENHADA', 'DESPESA LIQUIDADA', 'DESPESA PAGA']
+
+ORDENACOES_DESPESA_NOUG = {
+    'dotacao_atualizada': 'Dotação atualizada',
+    'despesa_empenhada': 'Despesa empenhada',
+    'despesa_liquidada': 'Despesa liquidada',
+    'despesa_paga': 'Despesa paga',
+    'saldo_dotacao': 'Saldo da dotação',
+    'execucao': '% de execução',
+    'noug': 'Unidade gestora'
+}
+ORDENACAO_PADRAO_DESPESA_NOUG = 'dotacao_atualizada'
+
+def gerar_relatorio_despesa_por_noug(df_completo, ordenacao: str = ORDENACAO_PADRAO_DESPESA_NOUG,
+                                     decrescente: bool = True, pagina: int = 1, por_pagina: int = LINHAS_POR_PAGINA,
+                                     noug_selecionada: Optional[str] = None):
+    """
+    Gera o ranking da despesa por unidade gestora
+
+    FÓRMULAS APLICADAS:
+    - DOTAÇÃO ATUALIZADA = DOTACAO INICIAL + DOTACAO ADICIONAL + CANCELAMENTO DE DOTACAO + CANCEL-REMANEJA DOTACAO
+    - SALDO DA DOTAÇÃO = DOTAÇÃO ATUALIZADA - DESPESA EMPENHADA
+    - % EXECUÇÃO = DESPESA EMPENHADA / DOTAÇÃO ATUALIZADA * 100
+
+    Args:
+        df_completo: DataFrame de despesa (filtros e recorte mensal já aplicados)
+        ordenacao: Chave de ORDENACOES_DESPESA_NOUG (inválida: ORDENACAO_PADRAO_DESPESA_NOUG)
+        decrescente: True para maiores primeiro ('noug': Z-A)
+        pagina: Página exibida (ajustada ao intervalo válido)
+        por_pagina: Unidades por página
+        noug_selecionada: NOUG selecionada para filtro (opcional)
+
+    Returns:
+        Tuple: (dados_relatorio, mes_referencia, dados_para_ia, dados_pdf)
+        dados_relatorio = {'linhas': [...], 'pagina', 'total_paginas', 'total_unidades', ...};
+        o TOTAL GERAL soma todas as unidades, não só as da página
+    """
+    if ordenacao not in ORDENACOES_DESPESA_NOUG:
+        ordenacao = ORDENACAO_PADRAO_DESPESA_NOUG
+    por_pagina = max(1, int(por_pagina))
+
+    vazio = {'linhas': [], 'pagina': 1, 'total_paginas': 1, 'total_unidades': 0, 'por_pagina': por_pagina,
+             'ordenacao': ordenacao, 'decrescente': decrescente}
+    if df_completo.empty or 'NOUG' not in df_completo.columns:
+        return vazio, obter_mes_numero(df_completo), [], {}
+
+    exercicio = obter_exercicio_atual(df_completo)
+    unidades = _obter_unidades(df_completo, exercicio)
+    if noug_selecionada and noug_selecionada != 'todos':
+        selecionada = unidades['nomes'] == str(noug_selecionada).strip()
+        unidades = {chave: valores[selecionada] for chave, valores in unidades.items()}
+    if len(unidades['nomes']) == 0:
+        return vazio, obter_mes_numero(df_completo), [], {}
+
+    ordem = _ordenar(unidades, ordenacao, decrescente)
+    paginacao = paginar(len(ordem), pagina, por_pagina)
+    inicio = paginacao['inicio']
+
+    linhas = [
+        _linha('level-2', inicio + posicao + 1, unidades, i)
+        for posicao, i in enumerate(ordem[inicio:paginacao['fim']])
+    ]
+    totais = {chave: valores.sum(keepdims=True) for chave, valores in unidades.items()
+              if chave not in ('nomes', 'valores_noug')}
+    totais['nomes'] = totais['valores_noug'] = np.array(['TOTAL GERAL'], dtype=object)
+    total = _linha('total', None, totais, 0)
+
+    dados_para_ia = [
+        {chave: valor for chave, valor in linha.items()
+         if not chave.endswith('_fmt') and chave not in ('tipo', 'noug_valor')}
+        for linha in linhas + [total]
+    ]
+
+    # Dados para PDF: o ranking completo na ordem escolhida
+    dados_pdf = {
+        "head": [['#', 'UNIDADE GESTORA', 'DOTAÇÃO ATUALIZADA', 'EMPENHADA', 'LIQUIDADA', 'PAGA',
+                  'SALDO DA DOTAÇÃO', '% EXECUÇÃO']],
+        "body": [
+            _linha_pdf(_linha('level-2', posicao + 1, unidades, i)) for posicao, i in enumerate(ordem)
+        ] + [_linha_pdf(total)]
+    }
+
+    dados_relatorio = {
+        'linhas': linhas + [total],
+        'pagina': paginacao['pagina'],
+        'total_paginas': paginacao['total_paginas'],
+        'total_unidades': len(ordem),
+        'por_pagina': paginacao['por_pagina'],
+        'ordenacao': ordenacao,
+        'decrescente': decrescente
+    }
+    mes_referencia = obter_mes_numero(df_completo[df_completo['COEXERCICIO'] == exercicio])
+    return dados_relatorio, mes_referencia, dados_para_ia, dados_pdf
+
+def _obter_unidades(df, exercicio) -> Dict[str, np.ndarray]:
+    """
+    Vetores por NOUG (nomes e valores) do exercício, só unidades com dotação ou execução
+
+    Memoizado por versão do DataFrame: as trocas de ordenação e de página reaproveitam o agregado.
+    """
+    versao = cache_service.versao_dataframe(df)
+
+    def calcular():
+        colunas = [coluna for coluna in COLUNAS_DOTACAO_ATUALIZADA + COLUNAS_EXECUCAO if coluna in df.columns]
+        agregado = agregar(df, ['NOUG'], colunas, {'COEXERCICIO': exercicio})
+
+        def coluna(nome):
+            if nome not in agregado.columns:
+                return np.zeros(len(agregado), dtype=np.float64)
+            return agregado[nome].to_numpy(dtype=np.float64)
+
+        dotacao = sum(coluna(nome) for nome in COLUNAS_DOTACAO_ATUALIZADA)
+        empenhada, liquidada, paga = (coluna(nome) for nome in COLUNAS_EXECUCAO)
+        # Valor original da NOUG (com os espaços da planilha) para os links e filtros de outros relatórios
+        valores_noug = np.array([str(noug) for noug in agregado.index], dtype=object)
+        nomes = np.array([valor.strip() for valor in valores_noug], dtype=object)
+        com_movimento = (dotacao != 0) | (empenhada != 0) | (liquidada != 0) | (paga != 0)
+        unidades = {
+            'nomes': nomes,
+            'valores_noug': valores_noug,
+            'dotacao_atualizada': dotacao,
+            'despesa_empenhada': empenhada,
+            'despesa_liquidada': liquidada,
+            'despesa_paga': paga,
+            'saldo_dotacao': dotacao - empenhada
+        }
+        return {chave: valores[com_movimento] for chave, valores in unidades.items()}
+
+    if versao is None:
+        return calcular()
+    return cache_service.memoizar(('despesa_por_noug', versao, exercicio), calcular)
+
+def _ordenar(unidades: Dict[str, np.ndarray], ordenacao: str, decrescente: bool) -> np.ndarray:
+    """Posições das unidades na ordem pedida (empates pelo nome, A-Z)"""
+    por_nome = np.argsort(unidades['nomes'], kind='stable')
+    if ordenacao == 'noug':
+        return por_nome[::-1] if decrescente else por_nome
+
+    if ordenacao == 'execucao':
+        chave = razao_percentual(unidades['despesa_empenhada'], unidades['dotacao_atualizada'], padrao=0.0)
+    else:
+        chave = unidades[ordenacao]
+    chave = chave[por_nome]
+    return por_nome[np.argsort(-chave if decrescente else chave, kind='stable')]
+
+def _linha(tipo: str, posicao: Optional[int], unidades: Dict[str, np.ndarray], i: int) -> Dict:
+    """Monta a linha da unidade i com valores e formatos"""
+    dotacao = float(unidades['dotacao_atualizada'][i])
+    empenhada = float(unidades['despesa_empenhada'][i])
+    liquidada = float(unidades['despesa_liquidada'][i])
+    paga = float(unidades['despesa_paga'][i])
+    saldo = float(unidades['saldo_dotacao'][i])
+    execucao = float(razao_percentual(empenhada, dotacao, padrao=0.0))
+    return {
+        'tipo': tipo,
+        'posicao': posicao,
+        'noug': unidades['nomes'][i],
+        'noug_valor': unidades['valores_noug'][i],
+        'dotacao_atualizada': dotacao,
+        'despesa_empenhada': empenhada,
+        'despesa_liquidada': liquidada,
+        'despesa_paga': paga,
+        'saldo_dotacao': saldo,
+        'execucao': execucao,
+        'dotacao_atualizada_fmt': formatar_numero(dotacao),
+        'despesa_empenhada_fmt': formatar_numero(empenhada),
+        'despesa_liquidada_fmt': formatar_numero(liquidada),
+        'despesa_paga_fmt': formatar_numero(paga),
+        'saldo_dotacao_fmt': formatar_numero(saldo),
+        'execucao_fmt': formatar_percentual_simples(execucao)
+    }
+
+def _linha_pdf(linha: Dict) -> list:
+    """Linha do relatório no formato da tabela do PDF"""
+    return [
+        linha['posicao'] or '', linha['noug'], linha['dotacao_atualizada_fmt'], linha['despesa_empenhada_fmt'],
+        linha['despesa_liquidada_fmt'], linha['despesa_paga_fmt'], linha['saldo_dotacao_fmt'], linha['execucao_fmt']
+    ]
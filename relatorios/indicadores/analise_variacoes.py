@@ -1,46 +1,85 @@
 """
 Relatório: Análise de Variações
 Analisa variações entre períodos e identifica tendências
+Todas as análises partem de uma matriz (exercício x nó da hierarquia x mês) montada por uma
+única agregação codificada; variações, curvas acumuladas e diferenças previsto x realizado
+de todos os nós saem de operações vetorizadas sobre ela
 """
-from ..utils import MotorRelatorios, obter_mes_numero, formatar_percentual
+import numpy as np
+import pandas as pd
+from typing import Dict, List
 
-def gerar_relatorio_analise_variacoes(df_completo, estrutura_hierarquica, noug_selecionada=None, tipo_analise='mensal'):
+from ..utils import (MotorRelatorios, obter_mes_numero, formatar_percentual, agregar,
+                     variacao_percentual, obter_classificacao, detalhe_mensal)
+from ..utils.indice_hierarquico import codigo_receita, DIGITOS_CODIGO
+
+MESES_ANO = 12
+
+TIPOS_ANALISE = {
+    'mensal': 'Variação mês a mês',
+    'anual': 'Exercício atual x anterior (mesmo período)',
+    'previsao': 'Previsão x realizado'
+}
+
+# Nível da hierarquia -> (rótulo, dígitos do código)
+NIVEIS_ANALISE = {
+    'categoria': ('Categoria', 1),
+    'origem': ('Origem', 2),
+    'especie': ('Espécie', 3),
+    'alinea': ('Alínea', 6)
+}
+
+MEDIDA_REALIZADA = 'RECEITA LIQUIDA'
+MEDIDA_PREVISAO = 'PREVISAO INICIAL LIQUIDA'
+
+def gerar_relatorio_analise_variacoes(df_completo, estrutura_hierarquica=None, noug_selecionada=None,
+                                      tipo_analise='mensal', nivel='categoria'):
     """
     Gera análise de variações orçamentárias
-    
+
     TIPOS DE ANÁLISE:
     - Mensal: Variação mês a mês no exercício atual
-    - Anual: Variação entre exercícios
+    - Anual: Variação entre exercícios (acumulado até o mesmo mês)
     - Previsto vs Realizado: Variação entre previsão e execução
-    
+
     Args:
-        df_completo: DataFrame com dados (receita ou despesa)
-        estrutura_hierarquica: Estrutura hierárquica
+        df_completo: DataFrame com dados de receita (um recorte do seletor de mês é analisado
+                     mês a mês até o mês selecionado)
+        estrutura_hierarquica: Não utilizado (os nós vêm dos códigos presentes nos dados)
         noug_selecionada: NOUG selecionada para filtro (opcional)
         tipo_analise: Tipo de análise ('mensal', 'anual', 'previsao')
-        
+        nivel: Granularidade ('categoria', 'origem', 'especie', 'alinea')
+
     Returns:
         Tuple: (dados_numericos, mes_referencia, dados_para_ia, dados_pdf)
     """
+    if tipo_analise not in TIPOS_ANALISE:
+        raise ValueError(f"Tipo de análise inválido: {tipo_analise}")
+    if nivel not in NIVEIS_ANALISE:
+        raise ValueError(f"Nível de análise inválido: {nivel}")
+
+    df_completo = detalhe_mensal(df_completo)
     motor = MotorRelatorios(df_completo, tipo_dados='receita')
-    df_processar = motor.filtrar_por_noug(noug_selecionada)
-    
+    df_processar = motor.filtrar_por_noug(noug_selecionada, copiar=False)
+
     if df_processar.empty:
         return [], "12", [], {}
-    
+
     mes_referencia = obter_mes_numero(df_processar)
-    dados_numericos = []
-    dados_para_ia = []
-    
+    matriz = montar_matriz_mensal(df_processar, NIVEIS_ANALISE[nivel][1])
+
     if tipo_analise == 'mensal':
-        dados_numericos = _analisar_variacao_mensal(df_processar, motor)
+        dados_numericos = _analisar_variacao_mensal(matriz, motor)
     elif tipo_analise == 'anual':
-        dados_numericos = _analisar_variacao_anual(df_processar, motor, estrutura_hierarquica)
-    elif tipo_analise == 'previsao':
-        dados_numericos = _analisar_previsao_vs_realizado(df_processar, motor, estrutura_hierarquica)
-    
-    dados_para_ia = dados_numericos.copy()
-    
+        dados_numericos = _analisar_variacao_anual(matriz, motor)
+    else:
+        dados_numericos = _analisar_previsao_vs_realizado(matriz, motor)
+
+    dados_para_ia = [
+        {chave: valor for chave, valor in linha.items() if not chave.endswith('_fmt') and chave != 'meses'}
+        for linha in dados_numericos
+    ]
+
     # Dados para PDF
     dados_pdf = {
         "head": [['ITEM', 'PERÍODO BASE', 'PERÍODO ATUAL', 'VARIAÇÃO ABSOLUTA', 'VARIAÇÃO %']],
@@ -51,152 +90,184 @@ def gerar_relatorio_analise_variacoes(df_completo, estrutura_hierarquica, noug_s
             for linha in dados_numericos
         ]
     }
-    
+
     return dados_numericos, mes_referencia, dados_para_ia, dados_pdf
 
-def _analisar_variacao_mensal(df_processar, motor):
+def montar_matriz_mensal(df: pd.DataFrame, digitos: int) -> Dict:
+    """
+    Matriz exercício x nó x mês das medidas de realizada e previsão
+
+    Args:
+        df: DataFrame de receita (já filtrado)
+        digitos: Dígitos do código que definem o nó (1, 2, 3 ou 6)
+
+    Returns:
+        Dict com 'exercicios', 'nos' (códigos), 'nomes', 'digitos', 'ultimo_mes'
+        (último mês com dados no exercício mais recente) e 'valores'
+        ({medida: array exercícios x nós x 12})
+    """
+    codigos = codigo_receita(df)
+    nos = pd.Series(np.where(codigos >= 0, codigos // 10 ** (DIGITOS_CODIGO - digitos), -1),
+                    index=df.index, name='NO').where(lambda serie: serie >= 0)
+    medidas = [m for m in (MEDIDA_REALIZADA, MEDIDA_PREVISAO) if m in df.columns]
+    agregado = agregar(df, ['COEXERCICIO', nos, 'INMES'], medidas)
+
+    posicao_exercicio, exercicios = pd.factorize(agregado.index.get_level_values('COEXERCICIO'), sort=True)
+    posicao_no, codigos_nos = pd.factorize(agregado.index.get_level_values('NO'), sort=True)
+    meses = agregado.index.get_level_values('INMES').to_numpy(dtype=np.int64) - 1
+
+    valores = {}
+    for medida in medidas:
+        matriz = np.zeros((len(exercicios), len(codigos_nos), MESES_ANO), dtype=np.float64)
+        matriz[posicao_exercicio, posicao_no, meses] = agregado[medida].to_numpy(dtype=np.float64)
+        valores[medida] = matriz
+
+    codigos_nos = np.asarray(codigos_nos, dtype=np.int64)
+    ultimo = posicao_exercicio == len(exercicios) - 1
+    return {
+        'exercicios': np.asarray(exercicios, dtype=np.int64),
+        'nos': codigos_nos,
+        'nomes': _nomes_nos(codigos_nos, digitos),
+        'digitos': digitos,
+        'ultimo_mes': int(meses[ultimo].max()) + 1 if ultimo.any() else 0,
+        'valores': valores
+    }
+
+def _nomes_nos(codigos: np.ndarray, digitos: int) -> List[str]:
+    """Rótulos 'código - nome' dos nós, com o nome vindo da classificação orçamentária"""
+    textos = [str(codigo).zfill(digitos) for codigo in codigos]
+    classificacao = obter_classificacao()
+    if classificacao is None:
+        return textos
+    nomes = classificacao.nomes(codigos * 10 ** (DIGITOS_CODIGO - digitos))
+    return [f"{texto} - {str(nome).strip()}" for texto, nome in zip(textos, nomes)]
+
+def _analisar_variacao_mensal(matriz, motor):
     """
     Analisa variação mês a mês no exercício atual
-    
+
+    Calcula de uma vez, para todos os nós, a série mensal, a curva acumulada e a
+    variação de cada mês sobre o anterior; a linha compara o último mês com o anterior.
+
     Args:
-        df_processar: DataFrame filtrado
+        matriz: Resultado de montar_matriz_mensal
         motor: Instância do MotorRelatorios
-        
+
     Returns:
         Lista com dados de variação mensal
     """
-    # TODO: Implementar análise mensal
-    # Comparar cada mês com o mês anterior
-    
-    dados = []
-    
-    if 'INMES' in df_processar.columns:
-        meses_disponiveis = sorted(df_processar['INMES'].unique())
-        
-        for i, mes in enumerate(meses_disponiveis[1:], 1):  # Começa do segundo mês
-            mes_anterior = meses_disponiveis[i-1]
-            
-            # TODO: Calcular valores por mês e comparar
-            linha = {
-                'especificacao': f'Mês {mes:02d}/2025',
-                'periodo_base': f'{mes_anterior:02d}/2025',
-                'periodo_atual': f'{mes:02d}/2025',
-                'valor_base': 0,
-                'valor_atual': 0,
-                'variacao_abs': 0,
-                'variacao_perc': 0,
-                'valor_base_fmt': motor.formatar_numero(0),
-                'valor_atual_fmt': motor.formatar_numero(0),
-                'variacao_abs_fmt': motor.formatar_numero(0),
-                'variacao_perc_fmt': formatar_percentual(0)
+    if MEDIDA_REALIZADA not in matriz['valores'] or matriz['ultimo_mes'] < 2:
+        return []
+
+    exercicio = int(matriz['exercicios'][-1])
+    m = matriz['ultimo_mes']
+    serie = matriz['valores'][MEDIDA_REALIZADA][-1, :, :m]
+
+    linhas = _montar_linhas(matriz, motor, serie[:, -2], serie[:, -1],
+                            f'{m - 1:02d}/{exercicio}', f'{m:02d}/{exercicio}')
+
+    # Última linha (total) usa a soma dos nós
+    serie = np.vstack([serie, serie.sum(axis=0)])
+    acumulado = np.cumsum(serie, axis=1)
+    variacao_mensal = variacao_percentual(serie[:, :-1], serie[:, 1:])
+
+    for linha in linhas:
+        i = linha.pop('_posicao')
+        i = len(serie) - 1 if i is None else i
+        linha['meses'] = [
+            {
+                'mes': f'{mes + 1:02d}',
+                'valor': float(serie[i, mes]),
+                'acumulado': float(acumulado[i, mes]),
+                'variacao_perc': float(variacao_mensal[i, mes - 1]) if mes > 0 else None,
+                'valor_fmt': motor.formatar_numero(serie[i, mes]),
+                'variacao_perc_fmt': formatar_percentual(variacao_mensal[i, mes - 1]) if mes > 0 else ''
             }
-            dados.append(linha)
-    
-    return dados
+            for mes in range(m)
+        ]
+    return linhas
 
-def _analisar_variacao_anual(df_processar, motor, estrutura_hierarquica):
+def _analisar_variacao_anual(matriz, motor):
     """
-    Analisa variação entre exercícios (2024 vs 2025)
-    
+    Analisa variação entre exercícios (atual x anterior) no acumulado até o mesmo mês
+
     Args:
-        df_processar: DataFrame filtrado
+        matriz: Resultado de montar_matriz_mensal
         motor: Instância do MotorRelatorios
-        estrutura_hierarquica: Estrutura hierárquica
-        
+
     Returns:
         Lista com dados de variação anual
     """
-    dados = []
-    
-    # Filtra dados por exercício
-    df_2024 = df_processar[df_processar['COEXERCICIO'] == 2024]
-    df_2025 = df_processar[df_processar['COEXERCICIO'] == 2025]
-    
-    if df_2024.empty or df_2025.empty:
-        return dados
-    
-    # Analisa por categoria
-    for cod_cat, origens in estrutura_hierarquica.items():
-        nome_categoria = motor.obter_nome_categoria(cod_cat)
-        if not nome_categoria:
-            continue
-        
-        # TODO: Calcular valores por categoria e ano
-        valor_2024 = float(df_2024[df_2024['CATEGORIA'] == cod_cat]['PREVISAO INICIAL LIQUIDA'].sum())
-        valor_2025 = float(df_2025[df_2025['CATEGORIA'] == cod_cat]['PREVISAO INICIAL LIQUIDA'].sum())
-        
-        if valor_2024 > 0 or valor_2025 > 0:
-            variacao_abs = valor_2025 - valor_2024
-            variacao_perc = ((valor_2025 - valor_2024) / valor_2024 * 100) if valor_2024 > 0 else 0
-            
-            linha = {
-                'especificacao': nome_categoria,
-                'periodo_base': '2024',
-                'periodo_atual': '2025',
-                'valor_base': valor_2024,
-                'valor_atual': valor_2025,
-                'variacao_abs': variacao_abs,
-                'variacao_perc': variacao_perc,
-                'valor_base_fmt': motor.formatar_numero(valor_2024),
-                'valor_atual_fmt': motor.formatar_numero(valor_2025),
-                'variacao_abs_fmt': motor.formatar_numero(variacao_abs),
-                'variacao_perc_fmt': formatar_percentual(variacao_perc)
-            }
-            dados.append(linha)
-    
-    return dados
+    exercicios = matriz['exercicios']
+    if MEDIDA_REALIZADA not in matriz['valores'] or len(exercicios) < 2 or exercicios[-2] != exercicios[-1] - 1:
+        return []
+
+    m = matriz['ultimo_mes']
+    acumulado = np.cumsum(matriz['valores'][MEDIDA_REALIZADA][-2:], axis=2)[:, :, m - 1]
+    return _linhas_sem_posicao(_montar_linhas(matriz, motor, acumulado[0], acumulado[1],
+                                              f'{m:02d}/{exercicios[-2]}', f'{m:02d}/{exercicios[-1]}'))
 
-def _analisar_previsao_vs_realizado(df_processar, motor, estrutura_hierarquica):
+def _analisar_previsao_vs_realizado(matriz, motor):
     """
-    Analisa variação entre previsão e realização
-    
+    Analisa variação entre previsão e realização no exercício atual
+
     Args:
-        df_processar: DataFrame filtrado
+        matriz: Resultado de montar_matriz_mensal
         motor: Instância do MotorRelatorios
-        estrutura_hierarquica: Estrutura hierárquica
-        
+
     Returns:
         Lista com dados de previsão vs realizado
     """
-    dados = []
-    
-    df_2025 = df_processar[df_processar['COEXERCICIO'] == 2025]
-    
-    if df_2025.empty:
-        return dados
-    
-    # Verifica se existem as colunas necessárias
-    if 'PREVISAO INICIAL LIQUIDA' not in df_2025.columns or 'RECEITA LIQUIDA' not in df_2025.columns:
-        return dados
-    
-    # Analisa por categoria
-    for cod_cat, origens in estrutura_hierarquica.items():
-        nome_categoria = motor.obter_nome_categoria(cod_cat)
-        if not nome_categoria:
-            continue
-        
-        df_categoria = df_2025[df_2025['CATEGORIA'] == cod_cat]
-        
-        valor_previsto = float(df_categoria['PREVISAO INICIAL LIQUIDA'].sum())
-        valor_realizado = float(df_categoria['RECEITA LIQUIDA'].sum())
-        
-        if valor_previsto > 0 or valor_realizado > 0:
-            variacao_abs = valor_realizado - valor_previsto
-            variacao_perc = ((valor_realizado - valor_previsto) / valor_previsto * 100) if valor_previsto > 0 else 0
-            
-            linha = {
-                'especificacao': nome_categoria,
-                'periodo_base': 'Previsto',
-                'periodo_atual': 'Realizado',
-                'valor_base': valor_previsto,
-                'valor_atual': valor_realizado,
-                'variacao_abs': variacao_abs,
-                'variacao_perc': variacao_perc,
-                'valor_base_fmt': motor.formatar_numero(valor_previsto),
-                'valor_atual_fmt': motor.formatar_numero(valor_realizado),
-                'variacao_abs_fmt': motor.formatar_numero(variacao_abs),
-                'variacao_perc_fmt': formatar_percentual(variacao_perc)
-            }
-            dados.append(linha)
-    
-    return dados
\ No newline at end of file
+    valores = matriz['valores']
+    if MEDIDA_PREVISAO not in valores or MEDIDA_REALIZADA not in valores:
+        return []
+
+    previsto = valores[MEDIDA_PREVISAO][-1].sum(axis=1)
+    realizado = valores[MEDIDA_REALIZADA][-1].sum(axis=1)
+    return _linhas_sem_posicao(_montar_linhas(matriz, motor, previsto, realizado, 'Previsto', 'Realizado'))
+
+def _montar_linhas(matriz: Dict, motor: MotorRelatorios, base: np.ndarray, atual: np.ndarray,
+                   periodo_base: str, periodo_atual: str) -> List[Dict]:
+    """Linhas dos nós com valor em algum dos períodos, mais o total (variações vetorizadas)"""
+    variacao_abs = atual - base
+    variacao_perc = variacao_percentual(base, atual)
+    linhas = []
+    for i in np.flatnonzero((base != 0) | (atual != 0)):
+        linha = _linha(motor, 'level-1' if matriz['digitos'] == 1 else 'level-2', matriz['nomes'][i],
+                       periodo_base, periodo_atual, base[i], atual[i], variacao_abs[i], variacao_perc[i])
+        linha['_posicao'] = i
+        linhas.append(linha)
+
+    if linhas:
+        total_base, total_atual = float(base.sum()), float(atual.sum())
+        total = _linha(motor, 'total', 'TOTAL', periodo_base, periodo_atual, total_base, total_atual,
+                       total_atual - total_base, float(variacao_percentual(total_base, total_atual)))
+        total['_posicao'] = None
+        linhas.append(total)
+    return linhas
+
+def _linhas_sem_posicao(linhas: List[Dict]) -> List[Dict]:
+    """Remove a posição auxiliar do nó na matriz"""
+    for linha in linhas:
+        linha.pop('_posicao')
+    return linhas
+
+def _linha(motor, tipo, especificacao, periodo_base, periodo_atual, valor_base, valor_atual,
+           variacao_abs, variacao_perc) -> Dict:
+    """Monta uma linha da análise com valores e formatos"""
+    valor_base, valor_atual = float(valor_base), float(valor_atual)
+    variacao_abs, variacao_perc = float(variacao_abs), float(variacao_perc)
+    return {
+        'tipo': tipo,
+        'especificacao': especificacao,
+        'periodo_base': periodo_base,
+        'periodo_atual': periodo_atual,
+        'valor_base': valor_base,
+        'valor_atual': valor_atual,
+        'variacao_abs': variacao_abs,
+        'variacao_perc': variacao_perc,
+        'valor_base_fmt': motor.formatar_numero(valor_base),
+        'valor_atual_fmt': motor.formatar_numero(valor_atual),
+        'variacao_abs_fmt': motor.formatar_numero(variacao_abs),
+        'variacao_perc_fmt': formatar_percentual(variacao_perc)
+    }
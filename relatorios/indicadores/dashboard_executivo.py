@@ -1,13 +1,38 @@
 """
 Relatório: Dashboard Executivo
 Painel com principais indicadores e métricas do orçamento
+As seções (indicadores da receita, indicadores da despesa, rankings e evolução mensal) não
+dependem umas das outras e rodam em paralelo no pool de seções (executar_secoes), cada uma
+com prazo próprio; uma seção lenta ou com erro sai vazia e marcada como indisponível
 """
-from ..utils import MotorRelatorios, obter_mes_numero, calcular_mes_referencia
+import numpy as np
+
+from ..utils import (PlanejadorConsultas, agregar, calcular_mes_referencia, obter_exercicio_atual,
+                     obter_ranking, executar_secoes, formatar_numero, detalhe_mensal, razao_percentual)
+from ..utils.formatacao import formatar_percentual_simples
+from .indicadores_orcamentarios import INDICADORES, avaliar_indicador
+
+# Componentes da dotação atualizada da despesa
+COLUNAS_DOTACAO_ATUALIZADA = [
+    'DOTACAO INICIAL', 'DOTACAO ADICIONAL', 'CANCELAMENTO DE DOTACAO', 'CANCEL-REMANEJA DOTACAO'
+]
+
+# Valor de cada seção quando ela falha ou estoura o prazo
+SUBSTITUTOS_SECOES = {
+    'receita': None,
+    'despesa': None,
+    'top_receitas': [],
+    'top_despesas': [],
+    'evolucao_mensal': {'meses': [], 'receitas': [], 'despesas': []}
+}
+
+# Prazo por seção (segundos); as omitidas usam TEMPO_LIMITE_SECAO
+TEMPOS_LIMITE_SECOES = {}
 
 def gerar_dashboard_executivo(df_receita, df_despesa, estrutura_hierarquica=None, noug_selecionada=None):
     """
     Gera dashboard executivo com principais indicadores orçamentários
-    
+
     INDICADORES INCLUÍDOS:
     - Execução Orçamentária (Receita vs Despesa)
     - Índice de Eficiência na Arrecadação
@@ -15,109 +40,249 @@ def gerar_dashboard_executivo(df_receita, df_despesa, estrutura_hierarquica=None
     - Saldo Orçamentário
     - Principais Fontes de Receita
     - Principais Categorias de Despesa
-    
+    - Evolução Mensal da Receita e da Despesa
+
     Args:
-        df_receita: DataFrame com dados de receita
-        df_despesa: DataFrame com dados de despesa
-        estrutura_hierarquica: Estrutura hierárquica das receitas
-        noug_selecionada: NOUG selecionada para filtro (opcional)
-        
+        df_receita: DataFrame com dados de receita (já filtrado)
+        df_despesa: DataFrame com dados de despesa (já filtrado)
+        estrutura_hierarquica: Não utilizado (mantido para compatibilidade)
+        noug_selecionada: Não utilizado; os filtros chegam aplicados aos DataFrames
+
     Returns:
         Tuple: (dados_dashboard, mes_referencia, dados_para_ia, dados_pdf)
     """
-    # TODO: Implementar quando houver necessidade
-    # Este dashboard precisa de ambos os DataFrames (receita + despesa)
-    
-    # Estrutura básica para implementação futura
+    exercicio = obter_exercicio_atual(df_receita)
+    tem_despesa = df_despesa is not None and not df_despesa.empty
+
+    secoes = {
+        'receita': lambda: _totais_receita(df_receita, exercicio),
+        'despesa': lambda: _totais_despesa(df_despesa, exercicio),
+        'top_receitas': lambda: _gerar_ranking_receitas(df_receita),
+        'top_despesas': lambda: _gerar_ranking_despesas(df_despesa),
+        'evolucao_mensal': lambda: _evolucao_mensal(df_receita, df_despesa, exercicio)
+    }
+    resultados, indisponiveis = executar_secoes(secoes, SUBSTITUTOS_SECOES, TEMPOS_LIMITE_SECOES)
+
+    resumo = _resumo_financeiro(resultados['receita'], resultados['despesa'])
+    indicadores = _indicadores_painel(resumo, tem_despesa)
+
     dados_dashboard = {
-        'resumo_financeiro': {
-            'receita_prevista': 0,
-            'receita_realizada': 0,
-            'despesa_orcada': 0,
-            'despesa_executada': 0,
-            'saldo_orcamentario': 0
-        },
-        'indicadores': {
-            'eficiencia_arrecadacao': 0,  # (Realizada / Prevista) * 100
-            'execucao_despesa': 0,        # (Executada / Orçada) * 100
-            'equilibrio_orcamentario': 0  # Receita - Despesa
-        },
-        'top_receitas': [],  # Top 5 fontes de receita
-        'top_despesas': [],  # Top 5 categorias de despesa
-        'evolucao_mensal': {
-            'meses': [],
-            'receitas': [],
-            'despesas': []
-        }
+        'resumo_financeiro': resumo,
+        'indicadores': indicadores,
+        'top_receitas': resultados['top_receitas'],
+        'top_despesas': resultados['top_despesas'],
+        'evolucao_mensal': resultados['evolucao_mensal'],
+        'tem_despesa': tem_despesa,
+        'secoes_indisponiveis': indisponiveis
     }
-    
-    mes_referencia = "12"
-    dados_para_ia = []
-    
+
+    mes_referencia = calcular_mes_referencia(df_receita)
+    dados_para_ia = [
+        {'indicador': linha['especificacao'], 'valor': linha['valor'], 'meta': linha['meta'],
+         'status': linha['status']}
+        for linha in indicadores
+    ]
+
     # Dados para PDF
     dados_pdf = {
         "head": [['INDICADOR', 'VALOR', 'META', 'STATUS']],
         "body": [
-            ['Eficiência na Arrecadação', '0%', '85%', 'A implementar'],
-            ['Execução da Despesa', '0%', '90%', 'A implementar'],
-            ['Saldo Orçamentário', 'R$ 0,00', 'Positivo', 'A implementar']
+            [linha['especificacao'], linha['valor_fmt'], linha['meta_fmt'], linha['status']]
+            for linha in indicadores
         ]
     }
-    
-    print("⚠️ Dashboard Executivo: Estrutura criada, aguardando implementação completa")
-    
+
     return dados_dashboard, mes_referencia, dados_para_ia, dados_pdf
 
-def _calcular_indicadores_financeiros(df_receita, df_despesa):
+def _totais_receita(df_receita, exercicio):
     """
-    Calcula os principais indicadores financeiros
-    
+    Receita prevista (atualizada) e realizada do exercício, em uma passada do planejador
+
     Args:
         df_receita: DataFrame de receita
-        df_despesa: DataFrame de despesa
-        
+        exercicio: Exercício de referência (o mais recente da receita)
+
+    Returns:
+        Dict com prevista e realizada
+    """
+    planejador = PlanejadorConsultas({'receita': df_receita})
+    planejador.requisitar('receita_total', 'receita', [], {
+        'prevista': {'coluna': 'PREVISAO ATUALIZADA LIQUIDA', 'alternativa': 'PREVISAO INICIAL LIQUIDA'},
+        'realizada': {'coluna': 'RECEITA LIQUIDA'}
+    }, filtros={'COEXERCICIO': exercicio})
+    receita = planejador.executar()['receita_total'].iloc[0]
+    return {'prevista': float(receita['prevista']), 'realizada': float(receita['realizada'])}
+
+def _totais_despesa(df_despesa, exercicio):
+    """
+    Dotação atualizada e despesa empenhada, liquidada e paga do exercício
+
+    Args:
+        df_despesa: DataFrame de despesa (vazio quando a planilha não existe)
+        exercicio: Exercício de referência (o mais recente da receita)
+
     Returns:
-        Dict com indicadores calculados
-    """
-    # TODO: Implementar cálculos dos indicadores
-    # - Taxa de Execução Orçamentária
-    # - Índice de Eficiência na Arrecadação
-    # - Resultado Orçamentário
-    # - Liquidez Orçamentária
-    
-    indicadores = {
-        'taxa_execucao_receita': 0,
-        'taxa_execucao_despesa': 0,
-        'resultado_orcamentario': 0,
-        'indice_liquidez': 0
+        Dict com orcada, empenhada, liquidada e paga
+    """
+    planejador = PlanejadorConsultas({'despesa': df_despesa})
+    planejador.requisitar('despesa_total', 'despesa', [], {
+        **{coluna: {'coluna': coluna} for coluna in COLUNAS_DOTACAO_ATUALIZADA},
+        'empenhada': {'coluna': 'DESPESA EMPENHADA'},
+        'liquidada': {'coluna': 'DESPESA LIQUIDADA'},
+        'paga': {'coluna': 'DESPESA PAGA'}
+    }, filtros={'COEXERCICIO': exercicio})
+    despesa = planejador.executar()['despesa_total'].iloc[0]
+    return {
+        'orcada': float(sum(despesa[coluna] for coluna in COLUNAS_DOTACAO_ATUALIZADA)),
+        'empenhada': float(despesa['empenhada']),
+        'liquidada': float(despesa['liquidada']),
+        'paga': float(despesa['paga'])
     }
-    
-    return indicadores
 
-def _gerar_ranking_receitas(df_receita, top_n=5):
+def _resumo_financeiro(receita, despesa):
+    """
+    Monta o resumo financeiro a partir dos totais das seções
+
+    Args:
+        receita: Resultado de _totais_receita (None se a seção ficou indisponível)
+        despesa: Resultado de _totais_despesa (None se a seção ficou indisponível)
+
+    Returns:
+        Dict com receita prevista/realizada, despesa orçada/executada e saldo
+        (None nos valores de seções indisponíveis) e os respectivos textos formatados
+    """
+    resumo = {
+        'receita_prevista': receita['prevista'] if receita else None,
+        'receita_realizada': receita['realizada'] if receita else None,
+        'despesa_orcada': despesa['orcada'] if despesa else None,
+        'despesa_executada': despesa['empenhada'] if despesa else None,
+        'despesa_paga': despesa['paga'] if despesa else None
+    }
+    resumo['saldo_orcamentario'] = (resumo['receita_realizada'] - resumo['despesa_executada']
+                                    if receita and despesa else None)
+    for chave in list(resumo):
+        resumo[f'{chave}_fmt'] = formatar_numero(resumo[chave]) if resumo[chave] is not None else 'Indisponível'
+    return resumo
+
+def _indicadores_painel(resumo, tem_despesa):
+    """
+    Linhas de indicadores do painel (valor, meta e status)
+
+    Args:
+        resumo: Resultado de _resumo_financeiro
+        tem_despesa: Se há base de despesa
+
+    Returns:
+        Lista de dicts com especificacao, valor, meta, status e textos formatados
+    """
+    def linha(especificacao, valor, meta, meta_fmt, status, valor_fmt):
+        return {'especificacao': especificacao, 'valor': valor, 'meta': meta, 'meta_fmt': meta_fmt,
+                'status': status, 'valor_fmt': valor_fmt}
+
+    def percentual(chave_parte, chave_todo, meta, especificacao, depende_despesa):
+        parte, todo = resumo[chave_parte], resumo[chave_todo]
+        if depende_despesa and not tem_despesa:
+            return linha(especificacao, None, meta, f'{meta}%', 'Sem dados de despesa', '-')
+        if parte is None or todo is None:
+            return linha(especificacao, None, meta, f'{meta}%', 'Indisponível', '-')
+        valor = float(razao_percentual(parte, todo))
+        if np.isnan(valor):
+            return linha(especificacao, None, meta, f'{meta}%', avaliar_indicador(valor, meta), '-')
+        return linha(especificacao, valor, meta, f'{meta}%', avaliar_indicador(valor, meta),
+                     formatar_percentual_simples(valor))
+
+    saldo = resumo['saldo_orcamentario']
+    if not tem_despesa:
+        linha_saldo = linha('Saldo Orçamentário', None, 0, 'Positivo', 'Sem dados de despesa', '-')
+    elif saldo is None:
+        linha_saldo = linha('Saldo Orçamentário', None, 0, 'Positivo', 'Indisponível', '-')
+    else:
+        linha_saldo = linha('Saldo Orçamentário', saldo, 0, 'Positivo',
+                            '✅ Superávit' if saldo >= 0 else '❌ Déficit', formatar_numero(saldo))
+
+    return [
+        percentual('receita_realizada', 'receita_prevista', INDICADORES['execucao_receita'][2],
+                   'Eficiência na Arrecadação', False),
+        percentual('despesa_executada', 'despesa_orcada', INDICADORES['execucao_despesa'][2],
+                   'Execução da Despesa', True),
+        linha_saldo
+    ]
+
+def _evolucao_mensal(df_receita, df_despesa, exercicio):
+    """
+    Receita realizada e despesa empenhada por mês do exercício (valores do mês)
+
+    Args:
+        df_receita: DataFrame de receita (recorte do seletor de mês: meses até o selecionado)
+        df_despesa: DataFrame de despesa (idem)
+        exercicio: Exercício de referência
+
+    Returns:
+        Dict com meses ('MM/AAAA'), receitas e despesas alinhadas por mês
+    """
+    receitas = _serie_mensal(df_receita, 'RECEITA LIQUIDA', exercicio)
+    despesas = _serie_mensal(df_despesa, 'DESPESA EMPENHADA', exercicio)
+    # Só o intervalo com movimentação
+    com_dados = np.flatnonzero((receitas != 0) | (despesas != 0))
+    if len(com_dados) == 0:
+        return {'meses': [], 'receitas': [], 'despesas': []}
+    inicio, fim = int(com_dados[0]), int(com_dados[-1]) + 1
+    return {
+        'meses': [f"{mes:02d}/{exercicio}" for mes in range(inicio + 1, fim + 1)],
+        'receitas': receitas[inicio:fim].tolist(),
+        'despesas': despesas[inicio:fim].tolist()
+    }
+
+def _serie_mensal(df, coluna, exercicio):
+    """Soma da coluna por INMES (1 a 12) no exercício, zeros onde não há dados"""
+    serie = np.zeros(12, dtype=np.float64)
+    if df is None or df.empty or coluna not in df.columns:
+        return serie
+    df = detalhe_mensal(df)
+    agregado = agregar(df, ['INMES'], [coluna], {'COEXERCICIO': exercicio})
+    meses = agregado.index.to_numpy(dtype=np.int64)
+    validos = (meses >= 1) & (meses <= 12)
+    serie[meses[validos] - 1] = agregado[coluna].to_numpy(dtype=np.float64)[validos]
+    return serie
+
+def _gerar_ranking_receitas(df_receita, top_n=5, dimensao='origem', criterio='realizado', maiores=True):
     """
     Gera ranking das principais fontes de receita
-    
+
     Args:
         df_receita: DataFrame de receita
         top_n: Número de itens no ranking
-        
+        dimensao: 'origem', 'alinea' ou 'noug'
+        criterio: 'realizado', 'crescimento' ou 'execucao'
+        maiores: True para os maiores, False para os menores
+
     Returns:
         Lista com top N receitas
     """
-    # TODO: Implementar ranking
-    return []
+    if df_receita is None or df_receita.empty:
+        return []
+    return _formatar_ranking(obter_ranking(df_receita, 'receita', dimensao).top(criterio, top_n, maiores))
 
-def _gerar_ranking_despesas(df_despesa, top_n=5):
+def _gerar_ranking_despesas(df_despesa, top_n=5, dimensao='categoria', criterio='realizado', maiores=True):
     """
     Gera ranking das principais categorias de despesa
-    
+
     Args:
         df_despesa: DataFrame de despesa
         top_n: Número de itens no ranking
-        
+        dimensao: 'categoria', 'elemento' ou 'noug'
+        criterio: 'realizado' (empenhado), 'crescimento' ou 'execucao'
+        maiores: True para os maiores, False para os menores
+
     Returns:
         Lista com top N despesas
     """
-    # TODO: Implementar ranking
-    return []
\ No newline at end of file
+    if df_despesa is None or df_despesa.empty:
+        return []
+    return _formatar_ranking(obter_ranking(df_despesa, 'despesa', dimensao).top(criterio, top_n, maiores))
+
+def _formatar_ranking(itens):
+    """Acrescenta o valor realizado formatado a cada item do ranking"""
+    for item in itens:
+        item['realizado_fmt'] = formatar_numero(item['realizado'])
+    return itens
@@ -0,0 +1,185 @@
+"""
+Relatório: Detecção de Anomalias
+Sinaliza meses atípicos da receita realizada em cada série NOUG x origem
+Uma agregação codificada monta o tensor NOUG x origem x período (exercício/mês); mediana e
+desvio absoluto mediano (MAD) de todas as séries saem de uma única passada vetorizada e o
+z-score robusto de cada célula é comparado ao limiar
+"""
+import warnings
+import numpy as np
+import pandas as pd
+from typing import Dict, List
+
+from cache_service import cache_service
+from ..utils import MotorRelatorios, obter_mes_numero, agregar, formatar_percentual, detalhe_mensal
+from ..receita.receita_por_fonte import rotulos_origem, DIVISOR_ORIGEM
+
+MEDIDA_ANOMALIA = 'RECEITA LIQUIDA'
+
+# Limiar usual do z-score robusto (Iglewicz e Hoaglin) e constante que torna o MAD
+# comparável ao desvio padrão numa distribuição normal
+LIMIAR_Z_ROBUSTO = 3.5
+CONSTANTE_MAD = 0.6745
+
+# Séries com menos meses observados que isso não têm padrão para comparar
+MINIMO_PERIODOS = 4
+
+def montar_tensor_nougs(df: pd.DataFrame) -> Dict:
+    """
+    Tensor NOUG x origem x período da receita realizada
+
+    Args:
+        df: DataFrame de receita
+
+    Returns:
+        Dict com 'nougs', 'origens', 'periodos' (exercício * 100 + mês) e 'valores'
+        (array nougs x origens x períodos; meses sem lançamento valem zero)
+    """
+    origem = pd.Series(df['RECEITA_CODIGO'].to_numpy(dtype=np.int64) // DIVISOR_ORIGEM,
+                       index=df.index, name='ORIGEM_CODIGO')
+    periodo = pd.Series(df['COEXERCICIO'].to_numpy(dtype=np.int64) * 100 + df['INMES'].to_numpy(dtype=np.int64),
+                        index=df.index, name='PERIODO')
+    agregado = agregar(df, ['NOUG', origem, periodo], [MEDIDA_ANOMALIA])
+
+    posicao_noug, nougs = pd.factorize(agregado.index.get_level_values('NOUG'), sort=True)
+    posicao_origem, origens = pd.factorize(agregado.index.get_level_values('ORIGEM_CODIGO'), sort=True)
+    posicao_periodo, periodos = pd.factorize(agregado.index.get_level_values('PERIODO'), sort=True)
+
+    valores = np.zeros((len(nougs), len(origens), len(periodos)), dtype=np.float64)
+    valores[posicao_noug, posicao_origem, posicao_periodo] = agregado[MEDIDA_ANOMALIA].to_numpy(dtype=np.float64)
+    return {
+        'nougs': np.asarray(nougs, dtype=object),
+        'origens': np.asarray(origens, dtype=np.int64),
+        'periodos': np.asarray(periodos, dtype=np.int64),
+        'valores': valores
+    }
+
+def detectar_anomalias(df: pd.DataFrame, limiar: float = LIMIAR_Z_ROBUSTO) -> List[Dict]:
+    """
+    Células (NOUG, origem, período) com z-score robusto acima do limiar
+
+    Cada série é comparada com o próprio padrão: z = 0,6745 * (valor - mediana) / MAD,
+    considerando os meses desde o primeiro com movimento até o último período dos dados,
+    inclusive os de valor zero (uma queda para zero é sinalizada). Séries com MAD zero ou
+    poucos meses ficam de fora.
+
+    Args:
+        df: DataFrame de receita
+        limiar: |z| a partir do qual o mês é sinalizado
+
+    Returns:
+        Lista de dicts (noug, origem, exercicio, mes, valor, mediana, z_robusto),
+        do maior para o menor |z|
+    """
+    if df.empty or MEDIDA_ANOMALIA not in df.columns or 'RECEITA_CODIGO' not in df.columns:
+        return []
+
+    tensor = montar_tensor_nougs(df)
+    valores = tensor['valores']
+    if valores.size == 0:
+        return []
+
+    # Meses anteriores ao primeiro movimento não entram no padrão da série (ela ainda não existia)
+    iniciada = np.cumsum(valores != 0, axis=2) > 0
+    observados = np.where(iniciada, valores, np.nan)
+    n_periodos = np.sum(~np.isnan(observados), axis=2)
+    # Séries sem nenhum mês observado geram "All-NaN slice"; ficam de fora em 'validas'
+    with warnings.catch_warnings(), np.errstate(all='ignore'):
+        warnings.simplefilter('ignore', RuntimeWarning)
+        mediana = np.nanmedian(observados, axis=2)
+        mad = np.nanmedian(np.abs(observados - mediana[:, :, None]), axis=2)
+        z = CONSTANTE_MAD * (observados - mediana[:, :, None]) / mad[:, :, None]
+
+    validas = (n_periodos >= MINIMO_PERIODOS) & (mad > 0)
+    sinalizadas = validas[:, :, None] & (np.abs(np.nan_to_num(z)) > limiar)
+
+    i, j, k = np.nonzero(sinalizadas)
+    ordem = np.argsort(-np.abs(z[i, j, k]), kind='stable')
+    i, j, k = i[ordem], j[ordem], k[ordem]
+    periodos = tensor['periodos'][k]
+    return [
+        {
+            'noug': str(tensor['nougs'][a]).strip(),
+            'origem': int(tensor['origens'][b]),
+            'exercicio': int(periodo // 100),
+            'mes': int(periodo % 100),
+            'valor': float(valores[a, b, c]),
+            'mediana': float(mediana[a, b]),
+            'z_robusto': float(z[a, b, c])
+        }
+        for a, b, c, periodo in zip(i, j, k, periodos)
+    ]
+
+def obter_anomalias(df: pd.DataFrame, limiar: float = LIMIAR_Z_ROBUSTO) -> List[Dict]:
+    """
+    Anomalias do DataFrame, calculadas uma vez por versão dos dados e limiar
+
+    Args:
+        df: DataFrame de receita (carregado pelo cache ou recorte do seletor de mês, que é
+            analisado mês a mês até o mês selecionado)
+        limiar: |z| a partir do qual o mês é sinalizado
+
+    Returns:
+        Lista memoizada de detectar_anomalias
+    """
+    df = detalhe_mensal(df)
+    versao = cache_service.versao_dataframe(df)
+    if versao is None:
+        return detectar_anomalias(df, limiar)
+    return cache_service.memoizar(('anomalias', versao, float(limiar)), lambda: detectar_anomalias(df, limiar))
+
+def gerar_relatorio_anomalias(df_completo, estrutura_hierarquica=None, noug_selecionada=None,
+                              limiar: float = LIMIAR_Z_ROBUSTO):
+    """
+    Gera relatório dos meses atípicos por unidade gestora e origem
+
+    Args:
+        df_completo: DataFrame com dados de receita
+        estrutura_hierarquica: Não utilizado (mantido para compatibilidade)
+        noug_selecionada: NOUG selecionada para filtro (opcional)
+        limiar: |z| a partir do qual o mês é sinalizado
+
+    Returns:
+        Tuple: (dados_numericos, mes_referencia, dados_para_ia, dados_pdf)
+    """
+    motor = MotorRelatorios(df_completo, tipo_dados='receita')
+    if df_completo.empty:
+        return [], "12", [], {}
+
+    # A detecção roda sobre o tensor completo (memoizado); a NOUG só filtra o resultado
+    anomalias = obter_anomalias(df_completo, limiar)
+    if noug_selecionada:
+        noug = str(noug_selecionada).strip()
+        anomalias = [anomalia for anomalia in anomalias if anomalia['noug'] == noug]
+
+    origens = sorted({anomalia['origem'] for anomalia in anomalias})
+    nomes_origem = dict(zip(origens, rotulos_origem(np.array(origens, dtype=np.int64))))
+
+    dados_numericos = []
+    for anomalia in anomalias:
+        desvio = (anomalia['valor'] / anomalia['mediana'] - 1) * 100 if anomalia['mediana'] else 0.0
+        dados_numericos.append({
+            **anomalia,
+            'tipo': 'level-2',
+            'origem_nome': nomes_origem[anomalia['origem']],
+            'periodo': f"{anomalia['mes']:02d}/{anomalia['exercicio']}",
+            'sentido': 'acima' if anomalia['z_robusto'] > 0 else 'abaixo',
+            'desvio_perc': desvio,
+            'valor_fmt': motor.formatar_numero(anomalia['valor']),
+            'mediana_fmt': motor.formatar_numero(anomalia['mediana']),
+            'desvio_perc_fmt': formatar_percentual(desvio),
+            'z_robusto_fmt': f"{anomalia['z_robusto']:+.1f}"
+        })
+
+    dados_para_ia = anomalias
+
+    dados_pdf = {
+        "head": [['UNIDADE GESTORA', 'ORIGEM', 'PERÍODO', 'REALIZADA', 'MEDIANA DA SÉRIE', 'DESVIO %', 'Z ROBUSTO']],
+        "body": [
+            [linha['noug'], linha['origem_nome'], linha['periodo'], linha['valor_fmt'],
+             linha['mediana_fmt'], linha['desvio_perc_fmt'], linha['z_robusto_fmt']]
+            for linha in dados_numericos
+        ]
+    }
+
+    return dados_numericos, obter_mes_numero(df_completo), dados_para_ia, dados_pdf
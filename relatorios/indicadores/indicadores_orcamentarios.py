@@ -1,115 +1,145 @@
 """
 Relatório: Indicadores Orçamentários
 Calcula e exibe indicadores de performance orçamentária
+Os indicadores saem da tabela de receita e despesa alinhada por (NOUG, INTIPOADM, INMES);
+as razões são calculadas de uma vez para todos os grupos (total e por tipo de administração)
 """
-from ..utils import MotorRelatorios, obter_mes_numero
+import numpy as np
+import pandas as pd
+
+from config_relatorios import COLUNAS_TIPO_ADMINISTRACAO
+from ..utils import MotorRelatorios, obter_mes_numero, obter_alinhamento, razao_percentual
+
+# Indicador -> (rótulo, fórmula, meta, unidade)
+INDICADORES = {
+    'execucao_receita': ('Execução Orçamentária da Receita', '(Receita Realizada / Receita Prevista) × 100', 85, '%'),
+    'execucao_despesa': ('Execução Orçamentária da Despesa', '(Despesa Empenhada / Dotação Atualizada) × 100', 90, '%'),
+    'resultado_orcamentario': ('Resultado Orçamentário', 'Receita Realizada - Despesa Empenhada', 0, 'R$'),
+    'liquidez_orcamentaria': ('Índice de Liquidez Orçamentária', '(Receita Realizada / Despesa Empenhada) × 100', 100, '%')
+}
+
+# Indicadores que dependem da base de despesa
+INDICADORES_DESPESA = ['execucao_despesa', 'resultado_orcamentario', 'liquidez_orcamentaria']
+
+NOMES_TIPO_ADMINISTRACAO = {codigo: nome for nome, codigo in COLUNAS_TIPO_ADMINISTRACAO.items()}
 
 def gerar_relatorio_indicadores(df_receita, df_despesa, estrutura_hierarquica=None, noug_selecionada=None):
     """
     Gera relatório com indicadores orçamentários calculados
-    
+
     INDICADORES INCLUÍDOS:
     - Índice de Execução Orçamentária da Receita
-    - Índice de Execução Orçamentária da Despesa  
+    - Índice de Execução Orçamentária da Despesa
     - Resultado Orçamentário (Superávit/Déficit)
     - Índice de Liquidez Orçamentária
-    - Grau de Endividamento
-    - Capacidade de Investimento
-    
+
     Args:
         df_receita: DataFrame com dados de receita
         df_despesa: DataFrame com dados de despesa
-        estrutura_hierarquica: Estrutura hierárquica das receitas
+        estrutura_hierarquica: Não utilizado (mantido para compatibilidade)
         noug_selecionada: NOUG selecionada para filtro (opcional)
-        
+
     Returns:
         Tuple: (dados_numericos, mes_referencia, dados_para_ia, dados_pdf)
+        dados_numericos: {'indicadores': linhas do total, 'por_tipo_adm': linhas por tipo de administração}
     """
-    # TODO: Implementar cálculo completo dos indicadores
-    
-    dados_numericos = []
-    dados_para_ia = []
-    mes_referencia = "12"
-    
-    # Estrutura dos indicadores a serem calculados
-    indicadores_template = [
-        {
-            'indicador': 'Execução Orçamentária da Receita',
-            'formula': '(Receita Realizada / Receita Prevista) × 100',
-            'valor_atual': 0,
-            'valor_meta': 85,
-            'unidade': '%',
-            'status': 'A calcular'
-        },
-        {
-            'indicador': 'Execução Orçamentária da Despesa',
-            'formula': '(Despesa Executada / Despesa Orçada) × 100',
-            'valor_atual': 0,
-            'valor_meta': 90,
-            'unidade': '%',
-            'status': 'A calcular'
-        },
-        {
-            'indicador': 'Resultado Orçamentário',
-            'formula': 'Receita Realizada - Despesa Executada',
-            'valor_atual': 0,
-            'valor_meta': 0,  # Meta: equilíbrio (≥ 0)
-            'unidade': 'R$',
-            'status': 'A calcular'
-        },
-        {
-            'indicador': 'Índice de Liquidez Orçamentária',
-            'formula': '(Receita Arrecadada / Despesa Empenhada) × 100',
-            'valor_atual': 0,
-            'valor_meta': 100,
-            'unidade': '%',
-            'status': 'A calcular'
-        }
-    ]
-    
-    # TODO: Implementar cálculos reais
-    for indicador in indicadores_template:
-        linha_indicador = {
+    motor = MotorRelatorios(df_receita, tipo_dados='receita')
+    alinhado = obter_alinhamento(df_receita, df_despesa)
+    tem_despesa = alinhado.attrs.get('tem_despesa', False)
+
+    if noug_selecionada and noug_selecionada != 'todos' and not alinhado.empty:
+        alinhado = alinhado[alinhado.index.get_level_values('NOUG') == str(noug_selecionada).strip()]
+
+    if alinhado.empty:
+        return {'indicadores': [], 'por_tipo_adm': []}, obter_mes_numero(df_receita), [], {}
+
+    total = calcular_indicadores(alinhado.sum().to_frame().T).iloc[0]
+    por_tipo = calcular_indicadores(alinhado.groupby(level='INTIPOADM').sum())
+
+    indicadores = []
+    for chave, (rotulo, formula, meta, unidade) in INDICADORES.items():
+        valor = float(total[chave])
+        disponivel = tem_despesa or chave not in INDICADORES_DESPESA
+        indicadores.append({
             'tipo': 'indicador',
-            'especificacao': indicador['indicador'],
-            'formula': indicador['formula'],
-            'valor_atual': indicador['valor_atual'],
-            'valor_meta': indicador['valor_meta'],
-            'unidade': indicador['unidade'],
-            'status': indicador['status'],
-            'valor_atual_fmt': f"{indicador['valor_atual']}{indicador['unidade']}",
-            'valor_meta_fmt': f"{indicador['valor_meta']}{indicador['unidade']}",
-            'avaliacao': _avaliar_indicador(indicador['valor_atual'], indicador['valor_meta'])
-        }
-        dados_numericos.append(linha_indicador)
-        dados_para_ia.append(linha_indicador)
-    
+            'chave': chave,
+            'especificacao': rotulo,
+            'formula': formula,
+            'valor_atual': valor,
+            'valor_meta': meta,
+            'unidade': unidade,
+            'valor_atual_fmt': _formatar_indicador(valor, unidade, motor) if disponivel else 'Sem dados de despesa',
+            'valor_meta_fmt': _formatar_indicador(meta, unidade, motor),
+            'avaliacao': avaliar_indicador(valor, meta) if disponivel else 'Sem dados de despesa'
+        })
+
+    linhas_tipo = []
+    for codigo, linha in por_tipo.iterrows():
+        linhas_tipo.append({
+            'tipo': 'level-2',
+            'especificacao': NOMES_TIPO_ADMINISTRACAO.get(int(codigo), f"TIPO {codigo}"),
+            **{chave: float(linha[chave]) for chave in INDICADORES},
+            **{f"{chave}_fmt": _formatar_indicador(float(linha[chave]), unidade, motor)
+               if tem_despesa or chave not in INDICADORES_DESPESA else '-'
+               for chave, (_, _, _, unidade) in INDICADORES.items()}
+        })
+
+    dados_para_ia = [
+        {'indicador': linha['especificacao'], 'valor': linha['valor_atual'], 'meta': linha['valor_meta'],
+         'unidade': linha['unidade'], 'avaliacao': linha['avaliacao']}
+        for linha in indicadores
+    ]
+
     # Dados para PDF
     dados_pdf = {
         "head": [['INDICADOR', 'VALOR ATUAL', 'META', 'AVALIAÇÃO']],
         "body": [
             [linha['especificacao'], linha['valor_atual_fmt'], linha['valor_meta_fmt'], linha['avaliacao']]
-            for linha in dados_numericos
+            for linha in indicadores
         ]
     }
-    
-    print("⚠️ Indicadores Orçamentários: Estrutura criada, cálculos a serem implementados")
-    
-    return dados_numericos, mes_referencia, dados_para_ia, dados_pdf
 
-def _avaliar_indicador(valor_atual, valor_meta):
+    return ({'indicadores': indicadores, 'por_tipo_adm': linhas_tipo}, obter_mes_numero(df_receita),
+            dados_para_ia, dados_pdf)
+
+def calcular_indicadores(tabela: pd.DataFrame) -> pd.DataFrame:
+    """
+    Indicadores de cada linha de uma tabela de medidas alinhadas (vetorizado)
+
+    Args:
+        tabela: DataFrame com as colunas de MEDIDAS_ALINHAMENTO (uma linha por grupo)
+
+    Returns:
+        DataFrame com uma coluna por indicador, no mesmo índice
+    """
+    return pd.DataFrame({
+        'execucao_receita': _calcular_execucao_receita(tabela),
+        'execucao_despesa': _calcular_execucao_despesa(tabela),
+        'resultado_orcamentario': _calcular_resultado_orcamentario(tabela),
+        'liquidez_orcamentaria': razao_percentual(tabela['receita_realizada'], tabela['despesa_empenhada'])
+    }, index=tabela.index)
+
+def _formatar_indicador(valor, unidade, motor):
+    """Formata o valor do indicador conforme a unidade"""
+    if pd.isna(valor):
+        return '-'
+    if unidade == 'R$':
+        return motor.formatar_numero(valor)
+    return f"{valor:.2f}{unidade}"
+
+def avaliar_indicador(valor_atual, valor_meta):
     """
     Avalia se o indicador está dentro da meta
-    
+
     Args:
-        valor_atual: Valor atual do indicador
+        valor_atual: Valor atual do indicador (NaN quando não há base de cálculo)
         valor_meta: Meta do indicador
-        
+
     Returns:
         String com avaliação
     """
-    if valor_atual == 0:
-        return "A calcular"
+    if pd.isna(valor_atual):
+        return "Sem base de cálculo"
     elif valor_atual >= valor_meta:
         return "✅ Dentro da meta"
     elif valor_atual >= valor_meta * 0.8:
@@ -117,45 +147,41 @@ def _avaliar_indicador(valor_atual, valor_meta):
     else:
         return "❌ Abaixo da meta"
 
-def _calcular_execucao_receita(df_receita):
+def _calcular_execucao_receita(tabela):
     """
     Calcula índice de execução orçamentária da receita
-    
+
     Args:
-        df_receita: DataFrame de receita
-        
+        tabela: Medidas alinhadas (uma linha por grupo)
+
     Returns:
-        Float: Percentual de execução
+        Array: Percentual de execução de cada grupo
     """
-    # TODO: Implementar
     # (Receita Realizada / Receita Prevista) × 100
-    return 0.0
+    return razao_percentual(tabela['receita_realizada'], tabela['receita_prevista'])
 
-def _calcular_execucao_despesa(df_despesa):
+def _calcular_execucao_despesa(tabela):
     """
     Calcula índice de execução orçamentária da despesa
-    
+
     Args:
-        df_despesa: DataFrame de despesa
-        
+        tabela: Medidas alinhadas (uma linha por grupo)
+
     Returns:
-        Float: Percentual de execução
+        Array: Percentual de execução de cada grupo
     """
-    # TODO: Implementar
-    # (Despesa Executada / Despesa Orçada) × 100
-    return 0.0
+    # (Despesa Empenhada / Dotação Atualizada) × 100
+    return razao_percentual(tabela['despesa_empenhada'], tabela['dotacao_atualizada'])
 
-def _calcular_resultado_orcamentario(df_receita, df_despesa):
+def _calcular_resultado_orcamentario(tabela):
     """
     Calcula resultado orçamentário (superávit/déficit)
-    
+
     Args:
-        df_receita: DataFrame de receita
-        df_despesa: DataFrame de despesa
-        
+        tabela: Medidas alinhadas (uma linha por grupo)
+
     Returns:
-        Float: Resultado em reais
+        Array: Resultado em reais de cada grupo
     """
-    # TODO: Implementar
-    # Receita Realizada - Despesa Executada
-    return 0.0
\ No newline at end of file
+    # Receita Realizada - Despesa Empenhada
+    return (tabela['receita_realizada'] - tabela['despesa_empenhada']).to_numpy(dtype=np.float64)
@@ -0,0 +1,91 @@
+"""
+Relatório: Receita x Despesa por Unidade Gestora
+Receita arrecadada ao lado da despesa empenhada e paga de cada NOUG, com o resultado orçamentário
+Os totais por NOUG saem do alinhamento receita x despesa (o mesmo do relatório de indicadores),
+somado no nível da NOUG
+"""
+import numpy as np
+
+from ..utils import MotorRelatorios, obter_mes_numero, obter_alinhamento
+
+def gerar_relatorio_por_noug(df_receita, df_despesa, estrutura_hierarquica=None, noug_selecionada=None):
+    """
+    Gera relatório consolidado receita x despesa por unidade gestora
+
+    FÓRMULAS APLICADAS:
+    - RECEITA ARRECADADA = RECEITA LIQUIDA
+    - RESULTADO ORÇAMENTÁRIO = RECEITA ARRECADADA - DESPESA EMPENHADA
+
+    Args:
+        df_receita: DataFrame com dados de receita
+        df_despesa: DataFrame com dados de despesa (pode estar vazio)
+        estrutura_hierarquica: Não utilizado (mantido para compatibilidade)
+        noug_selecionada: NOUG selecionada para filtro (opcional)
+
+    Returns:
+        Tuple: (dados_numericos, mes_referencia, dados_para_ia, dados_pdf)
+    """
+    motor = MotorRelatorios(df_receita, tipo_dados='receita')
+    alinhado = obter_alinhamento(df_receita, df_despesa)
+    tem_despesa = alinhado.attrs.get('tem_despesa', False)
+
+    if noug_selecionada and noug_selecionada != 'todos' and not alinhado.empty:
+        alinhado = alinhado[alinhado.index.get_level_values('NOUG') == str(noug_selecionada).strip()]
+
+    if alinhado.empty:
+        return [], obter_mes_numero(df_receita), [], {}
+
+    # Só NOUGs com algum valor no exercício
+    consolidado = alinhado.groupby(level='NOUG', sort=True).sum()
+    consolidado = consolidado[(consolidado != 0).any(axis=1)]
+
+    receita = consolidado['receita_realizada'].to_numpy(dtype=np.float64)
+    empenhada = consolidado['despesa_empenhada'].to_numpy(dtype=np.float64)
+    paga = consolidado['despesa_paga'].to_numpy(dtype=np.float64)
+    resultado = receita - empenhada
+
+    # Maior movimentação (receita + despesa) primeiro
+    ordem = np.argsort(-(np.abs(receita) + np.abs(empenhada)), kind='stable')
+    nomes = consolidado.index.to_numpy(dtype=object)
+
+    dados_numericos = [
+        _linha(motor, 'level-2', nomes[i], receita[i], empenhada[i], paga[i], resultado[i], tem_despesa)
+        for i in ordem
+    ]
+    dados_numericos.append(_linha(motor, 'total', 'TOTAL GERAL', receita.sum(), empenhada.sum(), paga.sum(),
+                                  resultado.sum(), tem_despesa))
+
+    dados_para_ia = [
+        {chave: valor for chave, valor in linha.items() if not chave.endswith('_fmt') and chave != 'tipo'}
+        for linha in dados_numericos
+    ]
+
+    # Dados para PDF
+    dados_pdf = {
+        "head": [['UNIDADE GESTORA', 'RECEITA ARRECADADA', 'DESPESA EMPENHADA', 'DESPESA PAGA', 'RESULTADO']],
+        "body": [
+            [linha['especificacao'], linha['receita_fmt'], linha['despesa_empenhada_fmt'],
+             linha['despesa_paga_fmt'], linha['resultado_fmt']]
+            for linha in dados_numericos
+        ]
+    }
+
+    return dados_numericos, obter_mes_numero(df_receita), dados_para_ia, dados_pdf
+
+def _linha(motor, tipo, especificacao, receita, empenhada, paga, resultado, tem_despesa):
+    """Monta uma linha do relatório com valores e formatos"""
+    receita, empenhada, paga, resultado = float(receita), float(empenhada), float(paga), float(resultado)
+    sem_despesa = 'Sem dados de despesa'
+    return {
+        'tipo': tipo,
+        'especificacao': especificacao,
+        'receita': receita,
+        'despesa_empenhada': empenhada,
+        'despesa_paga': paga,
+        'resultado': resultado,
+        'situacao': ('Superávit' if resultado >= 0 else 'Déficit') if tem_despesa else '',
+        'receita_fmt': motor.formatar_numero(receita),
+        'despesa_empenhada_fmt': motor.formatar_numero(empenhada) if tem_despesa else sem_despesa,
+        'despesa_paga_fmt': motor.formatar_numero(paga) if tem_despesa else sem_despesa,
+        'resultado_fmt': motor.formatar_numero(resultado) if tem_despesa else '-'
+    }
@@ -8,7 +8,10 @@ from .receita_estimada import gerar_relatorio_receita_estimada
 from .receita_por_adm import gerar_relatorio_por_adm
 from .receita_atualizada import gerar_relatorio_receita_atualizada_vs_inicial
 from .grafico_pizza import gerar_grafico_receita_liquida
-from .receita_conta_corrente import gerar_relatorio_receita_conta_corrente
+from .receita_conta_corrente import gerar_relatorio_receita_conta_corrente, gerar_filhos_conta_corrente
+from .receita_por_fonte import gerar_relatorio_receita_por_fonte
+from .comparativo_nougs import (gerar_comparativo_nougs, ORDENACOES_COMPARATIVO, ORDENACAO_PADRAO_COMPARATIVO,
+                                OPCOES_TOP)
 
 # Aliases para compatibilidade
 from .receita_estimada import gerar_relatorio_receita_estimada as gerar_relatorio_estimada
@@ -20,5 +23,11 @@ __all__ = [
     'gerar_relatorio_receita_atualizada_vs_inicial',
     'gerar_grafico_receita_liquida',
     'gerar_relatorio_receita_conta_corrente',
+    'gerar_filhos_conta_corrente',
+    'gerar_relatorio_receita_por_fonte',
+    'gerar_comparativo_nougs',
+    'ORDENACOES_COMPARATIVO',
+    'ORDENACAO_PADRAO_COMPARATIVO',
+    'OPCOES_TOP',
     'gerar_relatorio_estimada'  # Alias para compatibilidade
 ]
\ No newline at end of file
@@ -0,0 +1,137 @@
+"""
+Relatório: Comparativo entre Unidades Gestoras
+Matriz NOUG x origem de previsão atualizada, receita realizada e % de execução para várias
+unidades de uma vez, calculada por uma única tabulação cruzada codificada, com ordenação
+e top-N feitos no servidor
+"""
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional
+
+from ..utils import MotorRelatorios, obter_mes_numero, obter_exercicio_atual, tabela_cruzada, razao_percentual
+from ..utils.formatacao import formatar_percentual_simples
+from .receita_por_fonte import COLUNA_PREVISAO, COLUNA_REALIZADA, DIVISOR_ORIGEM, rotulos_origem
+
+ORDENACOES_COMPARATIVO = {
+    'realizada': 'Receita realizada',
+    'previsao': 'Previsão atualizada',
+    'execucao': '% de execução',
+    'noug': 'Unidade gestora (A-Z)'
+}
+ORDENACAO_PADRAO_COMPARATIVO = 'realizada'
+OPCOES_TOP = [10, 20, 50]
+
+def gerar_comparativo_nougs(df_completo, ordenacao: str = ORDENACAO_PADRAO_COMPARATIVO, top_n: Optional[int] = None):
+    """
+    Gera o comparativo entre as unidades gestoras presentes no DataFrame
+
+    A seleção de NOUGs (e demais filtros) é aplicada antes, pelos índices bitmap;
+    aqui todas as unidades do DataFrame entram numa só agregação NOUG x origem.
+
+    Args:
+        df_completo: DataFrame de receita já filtrado
+        ordenacao: Chave de ORDENACOES_COMPARATIVO (inválida: ORDENACAO_PADRAO_COMPARATIVO)
+        top_n: Quantidade de unidades exibidas (as demais são somadas numa linha)
+
+    Returns:
+        Tuple: (dados_relatorio, mes_referencia, dados_para_ia, dados_pdf)
+        dados_relatorio = {'origens': [...], 'linhas': [...]}
+    """
+    if ordenacao not in ORDENACOES_COMPARATIVO:
+        ordenacao = ORDENACAO_PADRAO_COMPARATIVO
+
+    motor = MotorRelatorios(df_completo, tipo_dados='receita')
+    vazio = {'origens': [], 'linhas': []}
+    if df_completo.empty or 'RECEITA_CODIGO' not in df_completo.columns:
+        return vazio, obter_mes_numero(df_completo), [], {}
+
+    exercicio = obter_exercicio_atual(df_completo)
+    df_exercicio = df_completo[df_completo['COEXERCICIO'] == exercicio]
+    if df_exercicio.empty:
+        return vazio, obter_mes_numero(df_completo), [], {}
+
+    origem = pd.Series(df_exercicio['RECEITA_CODIGO'].to_numpy(dtype=np.int64) // DIVISOR_ORIGEM,
+                       index=df_exercicio.index, name='ORIGEM_CODIGO')
+    nougs, origens, matrizes = tabela_cruzada(df_exercicio, 'NOUG', origem, [COLUNA_PREVISAO, COLUNA_REALIZADA])
+    previsao, realizada = matrizes[COLUNA_PREVISAO], matrizes[COLUNA_REALIZADA]
+    nomes_nougs = np.array([str(noug).strip() for noug in nougs], dtype=object)
+
+    total_previsao = previsao.sum(axis=1)
+    total_realizada = realizada.sum(axis=1)
+    execucao = razao_percentual(total_realizada, total_previsao, padrao=0.0)
+    selecionadas, demais = _ordenar(nomes_nougs, total_previsao, total_realizada, execucao, ordenacao, top_n)
+
+    # Só as origens com movimento em alguma unidade viram colunas
+    colunas = np.flatnonzero((previsao != 0).any(axis=0) | (realizada != 0).any(axis=0))
+    rotulos = rotulos_origem(origens.to_numpy(dtype=np.int64)[colunas])
+
+    linhas = [
+        _linha(motor, 'principal', nomes_nougs[i], previsao[i, colunas], realizada[i, colunas])
+        for i in selecionadas
+    ]
+    if len(demais):
+        linhas.append(_linha(motor, 'filha', f"DEMAIS UNIDADES ({len(demais)})",
+                             previsao[demais][:, colunas].sum(axis=0), realizada[demais][:, colunas].sum(axis=0)))
+    if linhas:
+        linhas.append(_linha(motor, 'total', 'TOTAL GERAL', previsao[:, colunas].sum(axis=0),
+                             realizada[:, colunas].sum(axis=0)))
+
+    dados_para_ia = [
+        {'unidade': linha['unidade'], 'previsao': linha['previsao'], 'realizada': linha['realizada'],
+         'execucao': linha['execucao']}
+        for linha in linhas
+    ]
+    dados_pdf = {
+        "head": [['UNIDADE GESTORA'] + rotulos + ['PREVISÃO ATUALIZADA', 'RECEITA REALIZADA', '% EXECUÇÃO']],
+        "body": [
+            [linha['unidade']] + [celula['realizada_fmt'] for celula in linha['celulas']]
+            + [linha['previsao_fmt'], linha['realizada_fmt'], linha['execucao_fmt']]
+            for linha in linhas
+        ]
+    }
+
+    return {'origens': rotulos, 'linhas': linhas}, obter_mes_numero(df_exercicio), dados_para_ia, dados_pdf
+
+def _ordenar(nomes: np.ndarray, previsao: np.ndarray, realizada: np.ndarray, execucao: np.ndarray,
+             ordenacao: str, top_n: Optional[int]):
+    """
+    Posições das unidades exibidas (ordenadas) e das demais
+
+    Com top-N, numpy.argpartition separa as N maiores sem ordenar todas as unidades.
+    """
+    com_movimento = np.flatnonzero((previsao != 0) | (realizada != 0))
+    if ordenacao == 'noug':
+        ordem = com_movimento[np.argsort(nomes[com_movimento], kind='stable')]
+        return (ordem, np.empty(0, dtype=np.int64)) if not top_n else (ordem[:top_n], ordem[top_n:])
+
+    chave = {'realizada': realizada, 'previsao': previsao, 'execucao': execucao}[ordenacao][com_movimento]
+    if top_n and top_n < len(com_movimento):
+        maiores = np.argpartition(-chave, top_n - 1)[:top_n]
+        resto = np.setdiff1d(np.arange(len(com_movimento)), maiores, assume_unique=True)
+        maiores = maiores[np.argsort(-chave[maiores], kind='stable')]
+        return com_movimento[maiores], com_movimento[resto]
+    return com_movimento[np.argsort(-chave, kind='stable')], np.empty(0, dtype=np.int64)
+
+def _linha(motor: MotorRelatorios, tipo: str, unidade: str, previsao: np.ndarray, realizada: np.ndarray) -> Dict:
+    """Monta uma linha do comparativo: células por origem e totais da unidade"""
+    execucao = razao_percentual(realizada, previsao, padrao=0.0)
+    total_previsao, total_realizada = float(previsao.sum()), float(realizada.sum())
+    total_execucao = float(razao_percentual(total_realizada, total_previsao, padrao=0.0))
+    celulas: List[Dict] = [
+        {
+            'previsao': float(p), 'realizada': float(r), 'execucao': float(e),
+            'realizada_fmt': motor.formatar_numero(r), 'execucao_fmt': formatar_percentual_simples(e)
+        }
+        for p, r, e in zip(previsao, realizada, execucao)
+    ]
+    return {
+        'tipo': tipo,
+        'unidade': unidade,
+        'celulas': celulas,
+        'previsao': total_previsao,
+        'realizada': total_realizada,
+        'execucao': total_execucao,
+        'previsao_fmt': motor.formatar_numero(total_previsao),
+        'realizada_fmt': motor.formatar_numero(total_realizada),
+        'execucao_fmt': formatar_percentual_simples(total_execucao)
+    }
@@ -2,7 +2,7 @@
 Relatório: Gráfico de Pizza - Receita Líquida (Receita Corrente)
 Gera dados para gráfico de pizza da categoria 1 (Receitas Correntes)
 """
-from ..utils import MotorRelatorios, calcular_mes_referencia
+from ..utils import MotorRelatorios, calcular_mes_referencia, obter_indice_receita, obter_exercicio_atual
 
 def gerar_grafico_receita_liquida(df_completo, estrutura_hierarquica, noug_selecionada=None):
     """
@@ -17,42 +17,42 @@ def gerar_grafico_receita_liquida(df_completo, estrutura_hierarquica, noug_selec
         Tuple: (dados_tabela, mes_referencia, dados_grafico, dados_chart)
     """
     motor = MotorRelatorios(df_completo, tipo_dados='receita')
-    df_processar = motor.filtrar_por_noug(noug_selecionada)
+    df_processar = motor.filtrar_por_noug(noug_selecionada, copiar=False)
     
-    # Filtra apenas categoria 1 (Receitas Correntes) e exercício 2025
-    df_2025 = df_processar[
-        (df_processar['COEXERCICIO'] == 2025) & 
+    # Filtra apenas categoria 1 (Receitas Correntes) e o exercício mais recente
+    exercicio = obter_exercicio_atual(df_completo)
+    df_exercicio = df_processar[
+        (df_processar['COEXERCICIO'] == exercicio) & 
         (df_processar['CATEGORIA'] == '1')
     ]
     
-    if df_2025.empty:
-        return [], "12/2025", [], {}
+    if df_exercicio.empty:
+        return [], f"12/{exercicio}", [], {}
     
     # Calcula mês de referência
-    mes_referencia = calcular_mes_referencia(df_2025)
+    mes_referencia = calcular_mes_referencia(df_exercicio)
     
     dados_grafico = []
     dados_tabela = []
     total_geral = 0
     
     # Verifica se a coluna RECEITA LIQUIDA existe
-    if 'RECEITA LIQUIDA' not in df_2025.columns:
+    if 'RECEITA LIQUIDA' not in df_exercicio.columns:
         print("⚠️ Coluna 'RECEITA LIQUIDA' não encontrada")
         return [], mes_referencia, [], {}
     
-    # Processa cada origem dentro da categoria 1
-    origens_categoria_1 = estrutura_hierarquica.get('1', {})
+    # Totais de todas as origens da categoria 1 numa consulta ao índice hierárquico
+    origens_categoria_1 = list(estrutura_hierarquica.get('1', {}).keys())
+    valores_origens = obter_indice_receita(df_completo).totais(
+        origens_categoria_1, 'RECEITA LIQUIDA', exercicio=exercicio, noug=noug_selecionada
+    )
     
-    for cod_origem in origens_categoria_1.keys():
+    for cod_origem, valor_receita in zip(origens_categoria_1, valores_origens):
         nome_origem = motor.obter_nome_origem(cod_origem)
         if not nome_origem:
             continue
             
-        df_origem = df_2025[df_2025['ORIGEM'] == cod_origem]
-        if df_origem.empty:
-            continue
-            
-        valor_receita = float(df_origem['RECEITA LIQUIDA'].sum())
+        valor_receita = float(valor_receita)
         
         if valor_receita > 0:  # Só inclui valores positivos
             dados_origem = {
@@ -1,187 +1,163 @@
 """
 Relatório: Receita por Conta Corrente
-Analisa receita usando substring do COCONTACORRENTE e busca nomes na classificação orçamentária
+Analisa receita pelo código de receita extraído do COCONTACORRENTE e busca nomes na classificação orçamentária
+Exibido como hierarquia recolhível pelos prefixos do código (categoria, origem, espécie, alínea, código);
+os totais de cada nó saem do índice de somas prefixadas e os filhos são enviados sob demanda
 """
-import os
-import pandas as pd
-from ..utils import MotorRelatorios, obter_mes_numero
+import numpy as np
+from typing import Dict, List, Optional
+from ..utils import MotorRelatorios, obter_mes_numero, obter_exercicio_atual, obter_classificacao, obter_indice_receita
+from ..utils.indice_hierarquico import DIGITOS_CODIGO, DIGITOS_NIVEIS
+
+NOME_SEM_CLASSIFICACAO = 'Nome não encontrado'
+MEDIDA_CONTA_CORRENTE = 'RECEITA LIQUIDA'
 
 def gerar_relatorio_receita_conta_corrente(df_completo, estrutura_hierarquica=None, noug_selecionada=None):
     """
     Gera relatório de receita por conta corrente
-    
+
     REGRAS DE NEGÓCIO:
     - COCONTACORRENTE tem 17 caracteres
-    - Posições 1-8: RECEITA (código da receita)
-    - Posições 9-17: FONTE (código da fonte)
+    - Posições 1-8: RECEITA (código da receita) -> coluna RECEITA_CODIGO gravada na ingestão
+    - Posições 9-17: FONTE (código da fonte) -> coluna FONTE_CODIGO gravada na ingestão
     - Busca nome da receita na planilha CLASSIFICACAO_ORCAMENTARIA
-    
+    - A tabela traz só as categorias; os níveis seguintes vêm de gerar_filhos_conta_corrente
+
     Args:
         df_completo: DataFrame com dados de receita
         estrutura_hierarquica: Não utilizado (mantido para compatibilidade)
         noug_selecionada: NOUG selecionada para filtro (opcional)
-        
+
     Returns:
         Tuple: (dados_numericos, mes_referencia, dados_para_ia, dados_pdf)
+        dados_para_ia e dados_pdf trazem a lista completa dos códigos de 8 dígitos
     """
     motor = MotorRelatorios(df_completo, tipo_dados='receita')
-    df_processar = motor.filtrar_por_noug(noug_selecionada)
-    
-    # Filtra apenas 2025 e verifica se tem dados
-    df_2025 = df_processar[df_processar['COEXERCICIO'] == 2025]
-    
-    if df_2025.empty:
+    df_processar = motor.filtrar_por_noug(noug_selecionada, copiar=False)
+
+    # Filtra o exercício mais recente e verifica se tem dados
+    exercicio = obter_exercicio_atual(df_completo)
+    df_exercicio = df_processar[df_processar['COEXERCICIO'] == exercicio]
+
+    if df_exercicio.empty:
         return [], obter_mes_numero(df_processar), [], {}
-    
-    # Verifica se a coluna COCONTACORRENTE existe
-    if 'COCONTACORRENTE' not in df_2025.columns:
+
+    # Verifica se a coluna RECEITA_CODIGO existe (derivada do COCONTACORRENTE na ingestão)
+    if 'RECEITA_CODIGO' not in df_exercicio.columns:
         print("⚠️ Coluna 'COCONTACORRENTE' não encontrada na planilha")
         return [], obter_mes_numero(df_processar), [], {}
-    
+
     # Verifica se a coluna RECEITA LIQUIDA existe
-    if 'RECEITA LIQUIDA' not in df_2025.columns:
+    if MEDIDA_CONTA_CORRENTE not in df_exercicio.columns:
         print("⚠️ Coluna 'RECEITA LIQUIDA' não encontrada na planilha")
         return [], obter_mes_numero(df_processar), [], {}
-    
-    print("🔍 Processando substrings do COCONTACORRENTE...")
-    
-    # Cria cópias para não modificar o DataFrame original
-    df_trabalho = df_2025.copy()
-    
-    # Aplica substring no COCONTACORRENTE
-    # Posições 1-8 = RECEITA, Posições 9-17 = FONTE
-    df_trabalho['RECEITA_CODIGO'] = df_trabalho['COCONTACORRENTE'].astype(str).str[:8]
-    df_trabalho['FONTE_CODIGO'] = df_trabalho['COCONTACORRENTE'].astype(str).str[8:]
-    
-    print(f"✅ Substrings aplicados. Encontrados {df_trabalho['RECEITA_CODIGO'].nunique()} códigos de receita únicos")
-    
-    # Carrega planilha de classificação orçamentária
-    df_classificacao = _carregar_classificacao_orcamentaria()
-    
-    if df_classificacao.empty:
-        print("⚠️ Planilha de classificação orçamentária não encontrada ou vazia")
-        # Continua sem os nomes (só com códigos)
-        df_trabalho['NOME_RECEITA'] = 'Nome não encontrado'
-    else:
-        print(f"✅ Classificação orçamentária carregada: {len(df_classificacao)} registros")
-        
-        # Faz merge para buscar os nomes
-        # RECEITA_CODIGO = COCLASSEORC -> pega NOCLASSIFICACAO
-        df_trabalho = df_trabalho.merge(
-            df_classificacao[['COCLASSEORC', 'NOCLASSIFICACAO']], 
-            left_on='RECEITA_CODIGO', 
-            right_on='COCLASSEORC', 
-            how='left'
-        )
-        
-        # Se não encontrou nome, usa um padrão
-        df_trabalho['NOME_RECEITA'] = df_trabalho['NOCLASSIFICACAO'].fillna('Classificação não encontrada')
-    
-    # Agrupa por RECEITA_CODIGO e soma a RECEITA LIQUIDA
-    resultado_agrupado = df_trabalho.groupby(['RECEITA_CODIGO', 'NOME_RECEITA']).agg({
-        'RECEITA LIQUIDA': 'sum'
-    }).reset_index()
-    
+
     # Calcula mês de referência
-    mes_referencia = obter_mes_numero(df_2025)
-    
-    dados_numericos = []
-    dados_para_ia = []
-    
-    # Ordena por valor (maior para menor)
-    resultado_agrupado = resultado_agrupado.sort_values('RECEITA LIQUIDA', ascending=False)
-    
-    total_geral = 0
-    
-    # Processa cada linha do resultado
-    for _, linha in resultado_agrupado.iterrows():
-        codigo_receita = linha['RECEITA_CODIGO']
-        nome_receita = linha['NOME_RECEITA']
-        valor_receita = float(linha['RECEITA LIQUIDA'])
-        
-        total_geral += valor_receita
-        
-        # Só inclui se o valor for maior que zero
-        if valor_receita > 0:
-            linha_dados = {
-                'tipo': 'principal',
-                'receita_codigo': codigo_receita,
-                'nome_receita': nome_receita,
-                'receita_realizada': valor_receita,
-                'receita_codigo_fmt': codigo_receita,
-                'nome_receita_fmt': nome_receita,
-                'receita_realizada_fmt': motor.formatar_numero(valor_receita)
-            }
-            dados_numericos.append(linha_dados)
-            dados_para_ia.append(linha_dados)
-    
+    mes_referencia = obter_mes_numero(df_exercicio)
+
+    indice = obter_indice_receita(df_completo)
+    dados_numericos = _montar_nos(indice, indice.filhos(''), exercicio, noug_selecionada, motor)
+
+    # Lista completa dos códigos com valor positivo, do maior para o menor
+    codigos = [str(codigo).zfill(DIGITOS_CODIGO) for codigo in indice.codigos]
+    valores = indice.totais(codigos, MEDIDA_CONTA_CORRENTE, exercicio, noug_selecionada)
+    ordem = np.argsort(-valores, kind='stable')
+    ordem = ordem[valores[ordem] > 0]
+    nomes = _nomes_receita(indice.codigos[ordem])
+    total_geral = indice.total('', MEDIDA_CONTA_CORRENTE, exercicio, noug_selecionada)
+
+    dados_para_ia = [
+        {'receita_codigo': codigos[i], 'nome_receita': nome, 'receita_realizada': float(valores[i])}
+        for i, nome in zip(ordem, nomes)
+    ]
+
     # Adiciona total geral
     if dados_numericos:
-        linha_total = {
+        dados_numericos.append({
             'tipo': 'total',
+            'prefixo': '',
+            'tem_filhos': False,
             'receita_codigo': 'TOTAL',
             'nome_receita': 'TOTAL GERAL',
             'receita_realizada': total_geral,
             'receita_codigo_fmt': 'TOTAL',
             'nome_receita_fmt': 'TOTAL GERAL',
             'receita_realizada_fmt': motor.formatar_numero(total_geral)
-        }
-        dados_numericos.append(linha_total)
+        })
         dados_para_ia.append({'receita_codigo': 'TOTAL', 'nome_receita': 'TOTAL GERAL', 'receita_realizada': total_geral})
-    
+
     # Dados para PDF
     dados_pdf = {
         "head": [['CÓDIGO RECEITA', 'NOME DA RECEITA', 'RECEITA REALIZADA']],
         "body": [
-            [linha.get('receita_codigo_fmt', ''), linha.get('nome_receita_fmt', ''), linha.get('receita_realizada_fmt', 'R$ 0,00')]
-            for linha in dados_numericos
+            [linha['receita_codigo'], linha['nome_receita'], motor.formatar_numero(linha['receita_realizada'])]
+            for linha in dados_para_ia
         ]
     }
-    
-    print(f"✅ Relatório gerado: {len(dados_numericos)} linhas (incluindo total)")
-    
+
     return dados_numericos, mes_referencia, dados_para_ia, dados_pdf
 
-def _carregar_classificacao_orcamentaria():
+def gerar_filhos_conta_corrente(df_completo, prefixo: str, noug_selecionada: Optional[str] = None) -> List[Dict]:
     """
-    Carrega a planilha de classificação orçamentária
-    
+    Linhas do nível seguinte de um nó da hierarquia (expansão sob demanda)
+
+    Args:
+        df_completo: DataFrame com dados de receita (o mesmo recorte do relatório)
+        prefixo: Prefixo do nó expandido ('1', '11', '111', '111250', ...)
+        noug_selecionada: NOUG selecionada para filtro (opcional)
+
+    Returns:
+        Lista de linhas no formato de dados_numericos, da maior para a menor
+
+    Raises:
+        ValueError: Se o prefixo não for um código de classificação válido
+    """
+    motor = MotorRelatorios(df_completo, tipo_dados='receita')
+    indice = obter_indice_receita(df_completo)
+    exercicio = obter_exercicio_atual(df_completo)
+    return _montar_nos(indice, indice.filhos(prefixo), exercicio, noug_selecionada, motor)
+
+def _montar_nos(indice, prefixos: List[str], exercicio: int, noug_selecionada: Optional[str],
+                motor: MotorRelatorios) -> List[Dict]:
+    """Linhas dos nós informados com valor no filtro, ordenadas pelo valor"""
+    if not prefixos:
+        return []
+    valores = indice.totais(prefixos, MEDIDA_CONTA_CORRENTE, exercicio, noug_selecionada)
+    ordem = np.argsort(-valores, kind='stable')
+    ordem = ordem[valores[ordem] != 0]
+    codigos = np.array([int(p) * 10 ** (DIGITOS_CODIGO - len(p)) for p in prefixos], dtype=np.int64)
+    nomes = _nomes_receita(codigos[ordem])
+
+    linhas = []
+    for i, nome_receita in zip(ordem, nomes):
+        prefixo = prefixos[i]
+        codigo_receita = str(codigos[i]).zfill(DIGITOS_CODIGO)
+        valor_receita = float(valores[i])
+        linhas.append({
+            'tipo': f"level-{DIGITOS_NIVEIS.index(len(prefixo)) + 1}",
+            'prefixo': prefixo,
+            'tem_filhos': len(prefixo) < DIGITOS_CODIGO,
+            'receita_codigo': codigo_receita,
+            'nome_receita': nome_receita,
+            'receita_realizada': valor_receita,
+            'receita_codigo_fmt': codigo_receita,
+            'nome_receita_fmt': nome_receita,
+            'receita_realizada_fmt': motor.formatar_numero(valor_receita)
+        })
+    return linhas
+
+def _nomes_receita(codigos: np.ndarray) -> list:
+    """
+    Resolve os nomes de vários códigos de receita de uma vez
+
+    Args:
+        codigos: Códigos inteiros de 8 dígitos
+
     Returns:
-        DataFrame com COCLASSEORC e NOCLASSIFICACAO
+        Lista de nomes na mesma ordem dos códigos
     """
-    caminho_arquivo = os.path.join('dados', 'CLASSIFICACAO_ORCAMENTARIA.xlsx')
-    
-    if not os.path.exists(caminho_arquivo):
-        print(f"❌ Arquivo não encontrado: {caminho_arquivo}")
-        return pd.DataFrame()
-    
-    try:
-        print(f"🔄 Carregando classificação orçamentária de {caminho_arquivo}")
-        
-        # Carrega apenas as colunas necessárias
-        df = pd.read_excel(
-            caminho_arquivo,
-            usecols=['COCLASSEORC', 'NOCLASSIFICACAO'],
-            dtype={
-                'COCLASSEORC': str,
-                'NOCLASSIFICACAO': str
-            }
-        )
-        
-        # Remove duplicatas e valores nulos
-        df = df.drop_duplicates(subset=['COCLASSEORC'])
-        df = df.dropna(subset=['COCLASSEORC', 'NOCLASSIFICACAO'])
-        
-        print(f"✅ Classificação carregada: {len(df)} registros únicos")
-        
-        # Log dos primeiros registros para debug
-        if len(df) > 0:
-            print("📋 Primeiros registros da classificação:")
-            for i, row in df.head(3).iterrows():
-                print(f"   {row['COCLASSEORC']} -> {row['NOCLASSIFICACAO']}")
-        
-        return df
-        
-    except Exception as e:
-        print(f"❌ Erro ao carregar classificação orçamentária: {e}")
-        return pd.DataFrame()
\ No newline at end of file
+    classificacao = obter_classificacao()
+    if classificacao is None:
+        print("⚠️ Planilha de classificação orçamentária não encontrada ou vazia")
+        return [NOME_SEM_CLASSIFICACAO] * len(codigos)
+    return [str(nome).strip() for nome in classificacao.nomes(codigos)]
@@ -0,0 +1,153 @@
+"""
+Relatório: Receita por Fonte de Recursos
+Cruza a receita (previsão atualizada e realizada) por fonte (posições 9-17 do COCONTACORRENTE)
+e origem (2 primeiros dígitos do código da receita) numa única tabulação codificada
+As fontes são paginadas no servidor (cada fonte com suas origens); o PDF traz todas
+"""
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional
+
+from ..utils import (MotorRelatorios, obter_mes_numero, obter_exercicio_atual, tabela_cruzada, obter_classificacao,
+                     paginar, LINHAS_POR_PAGINA)
+from ..utils.formatacao import formatar_percentual_simples
+
+COLUNA_PREVISAO = 'PREVISAO ATUALIZADA LIQUIDA'
+COLUNA_REALIZADA = 'RECEITA LIQUIDA'
+
+# Código da receita (8 dígitos) -> origem (2 dígitos)
+DIVISOR_ORIGEM = 10 ** 6
+
+def tabular_fonte_origem(df: pd.DataFrame) -> Optional[Dict]:
+    """
+    Tabulação cruzada fonte x origem de previsão e realizada
+
+    Uma agregação codificada sobre (FONTE_CODIGO, origem) preenche duas matrizes densas
+    fonte x origem; não há máscara por fonte.
+
+    Args:
+        df: DataFrame de receita já filtrado (exercício e NOUG)
+
+    Returns:
+        Dict com 'fontes', 'origens' (arrays de códigos), 'previsao' e 'realizada'
+        (matrizes fonte x origem), ou None se faltarem colunas
+    """
+    if 'FONTE_CODIGO' not in df.columns or 'RECEITA_CODIGO' not in df.columns:
+        return None
+
+    origem = pd.Series(df['RECEITA_CODIGO'].to_numpy(dtype=np.int64) // DIVISOR_ORIGEM,
+                       index=df.index, name='ORIGEM_CODIGO')
+    fontes, origens, matrizes = tabela_cruzada(df, 'FONTE_CODIGO', origem, [COLUNA_PREVISAO, COLUNA_REALIZADA])
+    return {
+        'fontes': fontes.to_numpy(dtype=np.int64),
+        'origens': origens.to_numpy(dtype=np.int64),
+        'previsao': matrizes[COLUNA_PREVISAO],
+        'realizada': matrizes[COLUNA_REALIZADA]
+    }
+
+def gerar_relatorio_receita_por_fonte(df_completo, estrutura_hierarquica=None, noug_selecionada=None,
+                                      pagina: int = 1, por_pagina: int = LINHAS_POR_PAGINA):
+    """
+    Gera relatório de receita por fonte de recursos, aberta por origem
+
+    Args:
+        df_completo: DataFrame com dados de receita
+        estrutura_hierarquica: Não utilizado (mantido para compatibilidade)
+        noug_selecionada: NOUG selecionada para filtro (opcional)
+        pagina: Página exibida (ajustada ao intervalo válido)
+        por_pagina: Fontes por página
+
+    Returns:
+        Tuple: (dados_relatorio, mes_referencia, dados_para_ia, dados_pdf)
+        dados_relatorio = {'linhas': [...], 'pagina', 'total_paginas', 'total_fontes', 'por_pagina'};
+        o TOTAL GERAL soma todas as fontes, não só as da página
+    """
+    motor = MotorRelatorios(df_completo, tipo_dados='receita')
+    df_processar = motor.filtrar_por_noug(noug_selecionada, copiar=False)
+
+    vazio = {'linhas': [], 'pagina': 1, 'total_paginas': 1, 'total_fontes': 0,
+             'por_pagina': max(1, int(por_pagina))}
+    exercicio = obter_exercicio_atual(df_completo)
+    df_exercicio = df_processar[df_processar['COEXERCICIO'] == exercicio]
+    if df_exercicio.empty:
+        return vazio, obter_mes_numero(df_processar), [], {}
+
+    tabela = tabular_fonte_origem(df_exercicio)
+    if tabela is None:
+        print("⚠️ Coluna 'COCONTACORRENTE' não encontrada na planilha")
+        return vazio, obter_mes_numero(df_processar), [], {}
+
+    previsao, realizada = tabela['previsao'], tabela['realizada']
+    nomes_origem = rotulos_origem(tabela['origens'])
+
+    # Fontes da maior para a menor realizada; origens de cada fonte na ordem do código
+    total_previsao_fonte = previsao.sum(axis=1)
+    total_realizada_fonte = realizada.sum(axis=1)
+    ordem = np.lexsort((-total_previsao_fonte, -total_realizada_fonte))
+    ordem = ordem[(total_previsao_fonte[ordem] != 0) | (total_realizada_fonte[ordem] != 0)]
+    if len(ordem) == 0:
+        return vazio, obter_mes_numero(df_exercicio), [], {}
+
+    # Linhas de cada fonte (a fonte e suas origens), formatadas uma vez para a página e o PDF
+    linhas_fonte = {}
+    for i in ordem:
+        fonte = str(tabela['fontes'][i]).zfill(9)
+        linhas_fonte[i] = [_linha(motor, 'level-1', f"FONTE {fonte}", total_previsao_fonte[i], total_realizada_fonte[i])]
+        for j in np.flatnonzero((previsao[i] != 0) | (realizada[i] != 0)):
+            linhas_fonte[i].append(_linha(motor, 'level-3', nomes_origem[j], previsao[i, j], realizada[i, j]))
+
+    total_previsao, total_realizada = float(previsao.sum()), float(realizada.sum())
+    total = _linha(motor, 'total', 'TOTAL GERAL', total_previsao, total_realizada)
+
+    paginacao = paginar(len(ordem), pagina, por_pagina)
+    da_pagina = ordem[paginacao['inicio']:paginacao['fim']]
+    linhas = [linha for i in da_pagina for linha in linhas_fonte[i]] + [total]
+
+    dados_para_ia = [
+        {'fonte': str(tabela['fontes'][i]).zfill(9), 'previsao': float(total_previsao_fonte[i]),
+         'realizada': float(total_realizada_fonte[i])}
+        for i in da_pagina
+    ]
+    dados_para_ia.append({'fonte': 'TOTAL', 'previsao': total_previsao, 'realizada': total_realizada})
+
+    # Dados para PDF: todas as fontes na mesma ordem
+    dados_pdf = {
+        "head": [['FONTE / ORIGEM', 'PREVISÃO ATUALIZADA', 'RECEITA REALIZADA', '% REALIZAÇÃO']],
+        "body": [
+            [linha['especificacao'], linha['previsao_fmt'], linha['realizada_fmt'], linha['realizacao_fmt']]
+            for linha in [linha for i in ordem for linha in linhas_fonte[i]] + [total]
+        ]
+    }
+
+    dados_relatorio = {
+        'linhas': linhas,
+        'pagina': paginacao['pagina'],
+        'total_paginas': paginacao['total_paginas'],
+        'total_fontes': len(ordem),
+        'por_pagina': paginacao['por_pagina']
+    }
+    return dados_relatorio, obter_mes_numero(df_exercicio), dados_para_ia, dados_pdf
+
+def rotulos_origem(origens: np.ndarray) -> list:
+    """Rótulos 'código - nome' das origens, com o nome vindo da classificação orçamentária"""
+    classificacao = obter_classificacao()
+    codigos = [str(origem).zfill(2) for origem in origens]
+    if classificacao is None:
+        return codigos
+    nomes = classificacao.nomes(origens * DIVISOR_ORIGEM)
+    return [f"{codigo} - {str(nome).strip()}" for codigo, nome in zip(codigos, nomes)]
+
+def _linha(motor: MotorRelatorios, tipo: str, especificacao: str, previsao: float, realizada: float) -> Dict:
+    """Monta uma linha da tabela com valores e formatos"""
+    previsao, realizada = float(previsao), float(realizada)
+    realizacao = realizada / previsao * 100 if previsao > 0 else 0.0
+    return {
+        'tipo': tipo,
+        'especificacao': especificacao,
+        'previsao': previsao,
+        'realizada': realizada,
+        'realizacao': realizacao,
+        'previsao_fmt': motor.formatar_numero(previsao),
+        'realizada_fmt': motor.formatar_numero(realizada),
+        'realizacao_fmt': formatar_percentual_simples(realizacao)
+    }
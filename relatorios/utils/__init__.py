@@ -3,13 +3,91 @@ Utilitários compartilhados para todos os relatórios
 """
 
 from .formatacao import formatar_numero, formatar_percentual
-from .data_utils import calcular_mes_referencia, obter_mes_numero
+from .data_utils import calcular_mes_referencia, obter_mes_numero, obter_exercicio_atual
 from .base_motor import MotorRelatorios
+from .agregacao import agregar, agregar_codificado, codificar_coluna, tabela_cruzada
+from .backends import definir_backend, obter_backend, BACKENDS
+from .motor_especificacao import (executar_especificacao, agregar_medidas, variacao_percentual,
+                                  razao_percentual, exercicios_disponiveis, resolver_exercicios,
+                                  montar_relatorio)
+from .planejador import PlanejadorConsultas
+from .indice_hierarquico import IndiceHierarquico, obter_indice_receita, obter_hierarquia_receitas
+from .classificacao import IndiceClassificacao, obter_classificacao
+from .busca import IndiceBusca, obter_indice_busca, normalizar_texto
+from .bitmap import (IndiceBitmap, obter_indice_bitmap, filtros_da_consulta, aplicar_filtros,
+                     aplicar_filtros_consulta)
+from .alinhamento import (alinhar_receita_despesa, obter_alinhamento, CHAVES_ALINHAMENTO,
+                          MEDIDAS_ALINHAMENTO)
+from .ranking import IndiceRanking, obter_ranking, DIMENSOES_RANKING, CRITERIOS_RANKING
+from .projecao import ProjecaoAnual, obter_projecao
+from .simulacao import (CuboSimulacao, obter_cubo_simulacao, simular_especificacao, validar_cenario,
+                        repositorio_cenarios, DIMENSOES_SIMULACAO)
+from .cubo_mensal import (CuboMensal, obter_cubo_mensal, recorte_mensal, detalhe_mensal, normalizar_periodo,
+                          contexto_periodo, VISOES_PERIODO)
+from .secoes import executar_secoes
+from .paginacao import paginar, parametros_paginacao, LINHAS_POR_PAGINA, OPCOES_LINHAS_PAGINA
 
 __all__ = [
     'formatar_numero',
     'formatar_percentual',
     'calcular_mes_referencia', 
     'obter_mes_numero',
-    'MotorRelatorios'
+    'obter_exercicio_atual',
+    'MotorRelatorios',
+    'agregar',
+    'agregar_codificado',
+    'definir_backend',
+    'obter_backend',
+    'BACKENDS',
+    'codificar_coluna',
+    'tabela_cruzada',
+    'executar_especificacao',
+    'agregar_medidas',
+    'variacao_percentual',
+    'razao_percentual',
+    'exercicios_disponiveis',
+    'resolver_exercicios',
+    'montar_relatorio',
+    'PlanejadorConsultas',
+    'IndiceHierarquico',
+    'obter_indice_receita',
+    'obter_hierarquia_receitas',
+    'IndiceClassificacao',
+    'obter_classificacao',
+    'IndiceBusca',
+    'obter_indice_busca',
+    'normalizar_texto',
+    'IndiceBitmap',
+    'obter_indice_bitmap',
+    'filtros_da_consulta',
+    'aplicar_filtros',
+    'aplicar_filtros_consulta',
+    'alinhar_receita_despesa',
+    'obter_alinhamento',
+    'CHAVES_ALINHAMENTO',
+    'MEDIDAS_ALINHAMENTO',
+    'IndiceRanking',
+    'obter_ranking',
+    'DIMENSOES_RANKING',
+    'CRITERIOS_RANKING',
+    'ProjecaoAnual',
+    'obter_projecao',
+    'CuboSimulacao',
+    'obter_cubo_simulacao',
+    'simular_especificacao',
+    'validar_cenario',
+    'repositorio_cenarios',
+    'DIMENSOES_SIMULACAO',
+    'CuboMensal',
+    'obter_cubo_mensal',
+    'recorte_mensal',
+    'detalhe_mensal',
+    'normalizar_periodo',
+    'contexto_periodo',
+    'VISOES_PERIODO',
+    'executar_secoes',
+    'paginar',
+    'parametros_paginacao',
+    'LINHAS_POR_PAGINA',
+    'OPCOES_LINHAS_PAGINA'
 ]
\ No newline at end of file
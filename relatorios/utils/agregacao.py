@@ -0,0 +1,251 @@
+"""
+Kernel de agregação sobre dimensões codificadas em inteiros
+Escolhe entre um caminho denso (numpy.bincount sobre a chave combinada) e um caminho
+esparso (hash da chave combinada) conforme a cardinalidade das chaves
+Os relatórios agregam por agregar(), que delega ao backend de cálculo ativo (backends.py);
+sem backend definido, usa este kernel
+"""
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+# Até este número de células da chave combinada o caminho denso é sempre usado
+LIMITE_CELULAS_DENSO = 2_000_000
+
+# Acima do limite, o denso ainda compensa se houver poucas células por linha,
+# respeitando um teto absoluto de memória (8 bytes por célula e por medida)
+CELULAS_POR_LINHA_DENSO = 4
+TETO_CELULAS_DENSO = 16_000_000
+
+# Amplitude máxima para codificar inteiros por deslocamento (sem hash)
+LIMITE_AMPLITUDE_INTEIRO = 100_000
+
+COLUNA_REGISTROS = '__registros'
+
+Chave = Union[str, pd.Series]
+
+# Backend de cálculo ativo (definido por backends.definir_backend); None = kernel deste módulo
+_backend = None
+
+def definir_backend_ativo(backend):
+    """Registra o backend usado por agregar() (ver backends.definir_backend)"""
+    global _backend
+    _backend = backend
+
+def backend_ativo():
+    """Backend usado por agregar() (None = agregar_codificado)"""
+    return _backend
+
+def agregar(df: pd.DataFrame, chaves: List[Chave], colunas_valor: List[str],
+            filtros: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+    """
+    Soma colunas por grupo de chaves no backend de cálculo ativo
+
+    Mesmo contrato de agregar_codificado: índice pelas chaves (só grupos observados, em
+    ordem crescente), uma coluna por medida e a contagem de registros em COLUNA_REGISTROS.
+    Os filtros descem até o backend junto com a consulta (o fragmentado os aplica em cada
+    fragmento), em vez de o chamador recortar o DataFrame antes.
+
+    Args:
+        df: DataFrame de entrada
+        chaves: Nomes de colunas ou Series alinhadas ao DataFrame
+        colunas_valor: Colunas numéricas a somar (nulos contam como zero)
+        filtros: Coluna -> valor (igualdade) ou lista de valores (pertinência), opcional
+
+    Returns:
+        DataFrame indexado pelas chaves
+    """
+    if _backend is None:
+        df, chaves = filtrar_entrada(df, chaves, colunas_valor, filtros)
+        return agregar_codificado(df, chaves, colunas_valor)
+    return _backend.agregar(df, chaves, colunas_valor, filtros)
+
+def mascara_filtros(df: pd.DataFrame, filtros: Dict[str, Any]) -> np.ndarray:
+    """
+    Linhas que atendem a todos os filtros
+
+    Args:
+        df: DataFrame de entrada
+        filtros: Coluna -> valor (igualdade) ou lista/tupla/conjunto de valores (pertinência)
+
+    Returns:
+        Array booleano com uma posição por linha
+    """
+    mascara = np.ones(len(df), dtype=bool)
+    for coluna, valor in filtros.items():
+        if isinstance(valor, (list, tuple, set)):
+            mascara &= df[coluna].isin(list(valor)).to_numpy(dtype=bool)
+        else:
+            mascara &= (df[coluna] == valor).to_numpy(dtype=bool)
+    return mascara
+
+def filtrar_entrada(df: pd.DataFrame, chaves: List[Chave], colunas_valor: List[str],
+                    filtros: Optional[Union[Dict[str, Any], List[Dict[str, Any]]]]) -> Tuple[pd.DataFrame, List[Chave]]:
+    """
+    Recorte das linhas filtradas com só as colunas usadas na agregação
+
+    Args:
+        df: DataFrame de entrada
+        chaves: Nomes de colunas ou Series alinhadas ao DataFrame
+        colunas_valor: Colunas numéricas a somar
+        filtros: Filtros de mascara_filtros, ou lista deles combinados com E
+                 (None ou vazio = sem recorte)
+
+    Returns:
+        Tuple: (DataFrame recortado, chaves com as Series recortadas)
+    """
+    if not filtros:
+        return df, chaves
+    if isinstance(filtros, list):
+        mascara = np.logical_and.reduce([mascara_filtros(df, filtro) for filtro in filtros])
+    else:
+        mascara = mascara_filtros(df, filtros)
+    colunas = list(dict.fromkeys([c for c in chaves if isinstance(c, str)] + list(colunas_valor)))
+    return (df.loc[mascara, colunas],
+            [chave if isinstance(chave, str) else chave[mascara] for chave in chaves])
+
+def codificar_coluna(serie: pd.Series) -> Tuple[np.ndarray, pd.Index]:
+    """
+    Converte uma coluna em códigos inteiros 0..n-1 e a lista de valores correspondente
+
+    Categóricas usam os códigos já existentes; inteiros de pequena amplitude usam
+    deslocamento pelo mínimo; os demais tipos passam por pandas.factorize (hash).
+    Valores nulos recebem o código -1.
+
+    Args:
+        serie: Coluna a ser codificada
+
+    Returns:
+        Tuple: (codigos, valores)
+    """
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie.cat.codes.to_numpy(dtype=np.int64), serie.cat.categories
+
+    if pd.api.types.is_integer_dtype(serie.dtype) and len(serie) > 0:
+        # Inteiros anuláveis (Int64) podem trazer <NA>: entram como zero e recebem o código -1 no fim
+        nulos = serie.isna().to_numpy() if pd.api.types.is_extension_array_dtype(serie.dtype) else None
+        if nulos is not None and nulos.all():
+            return np.full(len(serie), -1, dtype=np.int64), pd.Index([], dtype=serie.dtype)
+        valores = serie.to_numpy(dtype=np.int64, na_value=0) if nulos is not None else serie.to_numpy()
+        validos = valores if nulos is None else valores[~nulos]
+        minimo, maximo = int(validos.min()), int(validos.max())
+        if maximo - minimo < LIMITE_AMPLITUDE_INTEIRO:
+            codigos = (valores - minimo).astype(np.int64)
+            if nulos is not None:
+                codigos[nulos] = -1
+            return codigos, pd.Index(np.arange(minimo, maximo + 1), dtype=serie.dtype)
+
+    codigos, valores = pd.factorize(serie, sort=True)
+    return codigos.astype(np.int64, copy=False), pd.Index(valores)
+
+def agregar_codificado(df: pd.DataFrame, chaves: List[Chave], colunas_valor: List[str],
+                       modo: str = 'auto') -> pd.DataFrame:
+    """
+    Soma colunas por grupo de chaves, equivalente a df.groupby(chaves, observed=True)[colunas].sum()
+    acrescido da contagem de registros em COLUNA_REGISTROS
+
+    Args:
+        df: DataFrame de entrada
+        chaves: Nomes de colunas ou Series alinhadas ao DataFrame
+        colunas_valor: Colunas numéricas a somar (nulos contam como zero)
+        modo: 'auto', 'denso' ou 'esparso'
+
+    Returns:
+        DataFrame indexado pelas chaves (só grupos observados, em ordem crescente de código)
+    """
+    if not chaves:
+        raise ValueError("agregar_codificado exige ao menos uma chave")
+    series = [df[chave] if isinstance(chave, str) else chave for chave in chaves]
+    nomes = [serie.name for serie in series]
+    codificadas = [codificar_coluna(serie) for serie in series]
+    cardinalidades = [max(len(valores), 1) for _, valores in codificadas]
+
+    # Linhas com chave nula ficam fora, como no groupby padrão
+    validos = np.ones(len(df), dtype=bool)
+    for codigos, _ in codificadas:
+        validos &= codigos >= 0
+    todas_validas = bool(validos.all())
+    codigos_chave = [c if todas_validas else c[validos] for c, _ in codificadas]
+
+    celulas = int(np.prod(cardinalidades, dtype=np.float64))
+    if modo == 'auto':
+        modo = 'denso' if _usar_denso(celulas, len(codigos_chave[0])) else 'esparso'
+
+    if modo == 'denso':
+        # Uma célula por combinação possível; só as observadas entram no resultado
+        indices = np.ravel_multi_index(codigos_chave, cardinalidades)
+        tamanho = celulas
+        contagens = np.bincount(indices, minlength=tamanho)
+        observados = np.flatnonzero(contagens)
+        codigos_grupo = np.unravel_index(observados, cardinalidades)
+    else:
+        indices, codigos_grupo, tamanho = _agrupar_esparso(codigos_chave, cardinalidades)
+        contagens = np.bincount(indices, minlength=tamanho)
+        observados = slice(None)
+
+    resultado = {}
+    for coluna in colunas_valor:
+        pesos = df[coluna].to_numpy(dtype=np.float64, na_value=0.0)
+        if not todas_validas:
+            pesos = pesos[validos]
+        resultado[coluna] = np.bincount(indices, weights=pesos, minlength=tamanho)[observados]
+    resultado[COLUNA_REGISTROS] = contagens[observados]
+
+    niveis = [valores for _, valores in codificadas]
+    if len(niveis) == 1:
+        indice = pd.Index(niveis[0].take(codigos_grupo[0]), name=nomes[0])
+    else:
+        indice = pd.MultiIndex(levels=niveis, codes=list(codigos_grupo), names=nomes, verify_integrity=False)
+        indice = indice.remove_unused_levels()
+    return pd.DataFrame(resultado, index=indice)
+
+def tabela_cruzada(df: pd.DataFrame, linha: Chave, coluna: Chave,
+                   colunas_valor: List[str]) -> Tuple[pd.Index, pd.Index, Dict[str, np.ndarray]]:
+    """
+    Tabulação cruzada densa linha x coluna a partir de uma única agregação codificada
+
+    Args:
+        df: DataFrame de entrada
+        linha: Chave das linhas (nome de coluna ou Series alinhada)
+        coluna: Chave das colunas (nome de coluna ou Series alinhada)
+        colunas_valor: Colunas numéricas a somar
+
+    Returns:
+        Tuple: (valores das linhas, valores das colunas, {medida: matriz linhas x colunas});
+        as matrizes incluem COLUNA_REGISTROS
+    """
+    agregado = agregar(df, [linha, coluna], colunas_valor)
+    # Os níveis do MultiIndex podem sair fora de ordem após remove_unused_levels
+    codigos_linha, valores_linha = pd.factorize(agregado.index.get_level_values(0), sort=True)
+    codigos_coluna, valores_coluna = pd.factorize(agregado.index.get_level_values(1), sort=True)
+    matrizes = {}
+    for medida in list(colunas_valor) + [COLUNA_REGISTROS]:
+        matriz = np.zeros((len(valores_linha), len(valores_coluna)), dtype=np.float64)
+        matriz[codigos_linha, codigos_coluna] = agregado[medida].to_numpy(dtype=np.float64)
+        matrizes[medida] = matriz
+    return valores_linha, valores_coluna, matrizes
+
+def _usar_denso(celulas: int, n_linhas: int) -> bool:
+    """Decide o caminho pela cardinalidade da chave combinada em relação ao volume de linhas"""
+    if celulas <= LIMITE_CELULAS_DENSO:
+        return True
+    return celulas <= min(TETO_CELULAS_DENSO, CELULAS_POR_LINHA_DENSO * n_linhas)
+
+def _agrupar_esparso(codigos_chave: List[np.ndarray], cardinalidades: List[int]):
+    """
+    Caminho esparso: combina as chaves por hash, coluna a coluna, mantendo os ids compactos
+
+    Returns:
+        Tuple: (id do grupo por linha, códigos de cada chave por grupo, número de grupos)
+    """
+    ids = np.zeros(len(codigos_chave[0]), dtype=np.int64)
+    n_ids = 1
+    for codigos, cardinalidade in zip(codigos_chave, cardinalidades):
+        ids, unicos = pd.factorize(ids * cardinalidade + codigos, sort=True)
+        n_ids = len(unicos)
+
+    # Todas as linhas de um grupo têm os mesmos códigos: basta uma linha representante
+    representante = np.empty(n_ids, dtype=np.int64)
+    representante[ids] = np.arange(len(ids))
+    codigos_grupo = [codigos[representante] for codigos in codigos_chave]
+    return ids, codigos_grupo, n_ids
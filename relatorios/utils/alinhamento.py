@@ -0,0 +1,108 @@
+"""
+Alinhamento de receita e despesa pelas chaves comuns (NOUG, INTIPOADM, INMES)
+Cada base é agregada uma vez por agregação codificada; as duas tabelas são unidas pelo
+índice (chaves só de um lado recebem zero nas medidas do outro) e memoizadas por par de versões
+"""
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional
+
+from cache_service import cache_service
+from .agregacao import agregar
+from .data_utils import obter_exercicio_atual
+
+CHAVES_ALINHAMENTO = ['NOUG', 'INTIPOADM', 'INMES']
+
+# Medida do alinhamento -> colunas somadas da planilha
+MEDIDAS_RECEITA = {
+    'receita_prevista': ['PREVISAO ATUALIZADA LIQUIDA'],
+    'receita_realizada': ['RECEITA LIQUIDA']
+}
+MEDIDAS_DESPESA = {
+    # Mesma fórmula do balanço da despesa: INICIAL + ADICIONAL + CANCELAMENTO + CANCEL-REMANEJA
+    'dotacao_atualizada': ['DOTACAO INICIAL', 'DOTACAO ADICIONAL', 'CANCELAMENTO DE DOTACAO',
+                           'CANCEL-REMANEJA DOTACAO'],
+    'despesa_empenhada': ['DESPESA EMPENHADA'],
+    'despesa_liquidada': ['DESPESA LIQUIDADA'],
+    'despesa_paga': ['DESPESA PAGA']
+}
+MEDIDAS_ALINHAMENTO = list(MEDIDAS_RECEITA) + list(MEDIDAS_DESPESA)
+
+def _agregar_base(df: pd.DataFrame, exercicio: Optional[int], medidas: Dict[str, List[str]]) -> pd.DataFrame:
+    """
+    Soma as medidas de uma base por CHAVES_ALINHAMENTO no exercício
+
+    Args:
+        df: DataFrame de receita ou despesa
+        exercicio: Exercício considerado (None = todos)
+        medidas: {medida: colunas somadas}
+
+    Returns:
+        DataFrame indexado por (NOUG sem espaços à direita, INTIPOADM, INMES)
+    """
+    colunas = sorted({coluna for lista in medidas.values() for coluna in lista if coluna in df.columns})
+    if df.empty or not colunas or any(chave not in df.columns for chave in CHAVES_ALINHAMENTO):
+        return pd.DataFrame(columns=list(medidas))
+
+    if exercicio is not None and 'COEXERCICIO' in df.columns:
+        df = df[df['COEXERCICIO'] == exercicio]
+    agregado = agregar(df, CHAVES_ALINHAMENTO, colunas)
+
+    tabela = pd.DataFrame({
+        medida: agregado[[c for c in lista if c in agregado.columns]].sum(axis=1).to_numpy(dtype=np.float64)
+        for medida, lista in medidas.items()
+    }, index=agregado.index)
+
+    # As planilhas trazem nomes com espaços à direita; a chave comum é o nome limpo.
+    # Limpar depois de agregar custa uma passada pelos grupos, não pelas linhas
+    nougs = tabela.index.get_level_values('NOUG').astype(str).str.strip()
+    tabela.index = pd.MultiIndex.from_arrays(
+        [nougs, tabela.index.get_level_values('INTIPOADM').astype(np.int64),
+         tabela.index.get_level_values('INMES').astype(np.int64)],
+        names=CHAVES_ALINHAMENTO
+    )
+    return tabela.groupby(level=CHAVES_ALINHAMENTO, sort=True).sum()
+
+def alinhar_receita_despesa(df_receita: pd.DataFrame, df_despesa: pd.DataFrame) -> pd.DataFrame:
+    """
+    Tabela única de receita e despesa no exercício atual, alinhada por NOUG, tipo de administração e mês
+
+    Args:
+        df_receita: DataFrame de receita
+        df_despesa: DataFrame de despesa (pode estar vazio)
+
+    Returns:
+        DataFrame indexado por CHAVES_ALINHAMENTO com as colunas de MEDIDAS_ALINHAMENTO
+        (zero onde a chave só existe numa das bases); atributo attrs['exercicio']
+    """
+    base = df_receita if not df_receita.empty else df_despesa
+    exercicio = obter_exercicio_atual(base) if not base.empty and 'COEXERCICIO' in base.columns else None
+
+    receita = _agregar_base(df_receita, exercicio, MEDIDAS_RECEITA)
+    despesa = _agregar_base(df_despesa, exercicio, MEDIDAS_DESPESA)
+    if receita.empty and despesa.empty:
+        alinhado = pd.DataFrame(columns=MEDIDAS_ALINHAMENTO, dtype=np.float64)
+    else:
+        alinhado = pd.concat([receita, despesa], axis=1).reindex(columns=MEDIDAS_ALINHAMENTO).fillna(0.0)
+        alinhado.index.names = CHAVES_ALINHAMENTO
+    alinhado.attrs['exercicio'] = exercicio
+    alinhado.attrs['tem_despesa'] = not despesa.empty
+    return alinhado
+
+def obter_alinhamento(df_receita: pd.DataFrame, df_despesa: pd.DataFrame) -> pd.DataFrame:
+    """
+    Alinhamento receita x despesa, calculado uma vez por par de versões dos dados
+
+    Args:
+        df_receita: DataFrame de receita carregado pelo cache (ou recorte derivado)
+        df_despesa: DataFrame de despesa carregado pelo cache (ou recorte derivado)
+
+    Returns:
+        DataFrame memoizado de alinhar_receita_despesa (somente leitura)
+    """
+    versao_receita = cache_service.versao_dataframe(df_receita)
+    versao_despesa = cache_service.versao_dataframe(df_despesa) if not df_despesa.empty else 'vazio'
+    if versao_receita is None or versao_despesa is None:
+        return alinhar_receita_despesa(df_receita, df_despesa)
+    return cache_service.memoizar(('alinhamento', versao_receita, versao_despesa),
+                                  lambda: alinhar_receita_despesa(df_receita, df_despesa))
@@ -0,0 +1,134 @@
+"""
+Backends de cálculo das agregações dos relatórios
+Todas as agregações passam por agregacao.agregar, que delega ao backend ativo:
+- 'pandas': kernel agregar_codificado (bincount/hash sobre códigos inteiros), sempre disponível;
+- 'duckdb': motor SQL colunar embutido (opcional, pip install duckdb), que lê o DataFrame
+  em memória sem cópia e faz o GROUP BY com varredura em várias threads;
+- 'fragmentado': o kernel pandas em processos de trabalho, cada um com os dados de parte
+  das NOUGs (ver fragmentacao.py).
+Os três devolvem o mesmo formato (índice pelas chaves em ordem crescente, uma coluna por medida
+e COLUNA_REGISTROS; linhas com chave nula ficam fora), de modo que as especificações e relatórios
+rodam sem alteração (ver tests/test_agregacao.py)
+O backend vem de config_relatorios.BACKEND_AGREGACAO (variável de ambiente BACKEND_AGREGACAO)
+"""
+import os
+import threading
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, List, Optional
+
+from config_relatorios import BACKEND_AGREGACAO
+from . import agregacao
+from .agregacao import agregar_codificado, filtrar_entrada, COLUNA_REGISTROS, Chave
+from .fragmentacao import BackendFragmentado
+
+class BackendPandas:
+    """Kernel numpy/pandas sobre dimensões codificadas"""
+
+    nome = 'pandas'
+
+    def agregar(self, df: pd.DataFrame, chaves: List[Chave], colunas_valor: List[str],
+                filtros: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+        df, chaves = filtrar_entrada(df, chaves, colunas_valor, filtros)
+        return agregar_codificado(df, chaves, colunas_valor)
+
+class BackendDuckDB:
+    """GROUP BY no DuckDB sobre o DataFrame registrado como tabela virtual"""
+
+    nome = 'duckdb'
+
+    def __init__(self, threads: int = None):
+        """
+        Abre uma conexão em memória (ImportError se o duckdb não estiver instalado)
+
+        Args:
+            threads: Threads de varredura (padrão: todos os núcleos)
+        """
+        import duckdb
+        self._conexao = duckdb.connect(':memory:')
+        self._conexao.execute(f"SET threads TO {int(threads or os.cpu_count() or 1)}")
+        self._local = threading.local()
+
+    def _cursor(self):
+        """Um cursor por thread (a conexão não aceita consultas concorrentes)"""
+        cursor = getattr(self._local, 'cursor', None)
+        if cursor is None:
+            cursor = self._local.cursor = self._conexao.cursor()
+        return cursor
+
+    def agregar(self, df: pd.DataFrame, chaves: List[Chave], colunas_valor: List[str],
+                filtros: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+        if not chaves:
+            raise ValueError("agregar exige ao menos uma chave")
+        df, chaves = filtrar_entrada(df, chaves, colunas_valor, filtros)
+        series = [df[chave] if isinstance(chave, str) else chave for chave in chaves]
+        nomes = [serie.name for serie in series]
+
+        # Tabela virtual só com as colunas usadas (apelidos k0.., v0.. evitam nomes com espaço)
+        entrada = pd.DataFrame({f'k{i}': serie.to_numpy() if not isinstance(serie.dtype, pd.CategoricalDtype)
+                                else serie.array for i, serie in enumerate(series)}, copy=False)
+        for j, coluna in enumerate(colunas_valor):
+            entrada[f'v{j}'] = df[coluna].to_numpy()
+
+        grupos = ', '.join(f'k{i}' for i in range(len(series)))
+        somas = ''.join(f', COALESCE(SUM(CAST(v{j} AS DOUBLE)), 0) AS v{j}' for j in range(len(colunas_valor)))
+        filtro = ' AND '.join(f'k{i} IS NOT NULL' for i in range(len(series)))
+        consulta = (f"SELECT {grupos}{somas}, COUNT(*) AS registros FROM entrada "
+                    f"WHERE {filtro} GROUP BY {grupos} ORDER BY {grupos}")
+
+        cursor = self._cursor()
+        cursor.register('entrada', entrada)
+        try:
+            resultado = cursor.execute(consulta).df()
+        finally:
+            cursor.unregister('entrada')
+
+        niveis = []
+        for i, serie in enumerate(series):
+            valores = resultado[f'k{i}']
+            if isinstance(valores.dtype, pd.CategoricalDtype):
+                valores = valores.astype(serie.cat.categories.dtype)
+            niveis.append(valores.to_numpy())
+        if len(niveis) == 1:
+            indice = pd.Index(niveis[0], name=nomes[0])
+        else:
+            indice = pd.MultiIndex.from_arrays(niveis, names=nomes)
+
+        agregado = {coluna: resultado[f'v{j}'].to_numpy(dtype=np.float64) for j, coluna in enumerate(colunas_valor)}
+        agregado[COLUNA_REGISTROS] = resultado['registros'].to_numpy(dtype=np.int64)
+        return pd.DataFrame(agregado, index=indice)
+
+BACKENDS = {
+    BackendPandas.nome: BackendPandas,
+    BackendDuckDB.nome: BackendDuckDB,
+    BackendFragmentado.nome: BackendFragmentado
+}
+
+def definir_backend(nome: str):
+    """
+    Ativa o backend de cálculo de todas as agregações
+
+    Args:
+        nome: Chave de BACKENDS
+
+    Returns:
+        Backend ativo (o pandas, com aviso, se o pedido não puder ser carregado)
+    """
+    if nome not in BACKENDS:
+        raise ValueError(f"Backend de cálculo inválido: {nome} (use {', '.join(BACKENDS)})")
+    try:
+        backend = BACKENDS[nome]()
+    except ImportError:
+        print(f"⚠️ Backend '{nome}' indisponível (dependência não instalada); usando pandas")
+        backend = BackendPandas()
+    anterior = agregacao.backend_ativo()
+    if hasattr(anterior, 'encerrar'):
+        anterior.encerrar()
+    agregacao.definir_backend_ativo(backend)
+    return backend
+
+def obter_backend():
+    """Backend de cálculo ativo"""
+    return agregacao.backend_ativo()
+
+definir_backend(BACKEND_AGREGACAO)
@@ -4,6 +4,7 @@ Contém funcionalidades comuns a todos os relatórios
 """
 import pandas as pd
 from typing import Dict, Optional
+from cache_service import cache_service
 from .formatacao import formatar_numero
 
 class MotorRelatorios:
@@ -27,6 +28,19 @@ class MotorRelatorios:
     def _criar_mapas_de_nomes(self) -> Dict[str, Dict]:
         """
         Cria mapas de códigos para nomes para evitar buscas repetitivas no DataFrame
+        Os mapas são reaproveitados entre requisições enquanto a versão dos dados não mudar
+        
+        Returns:
+            Dicionário com mapeamentos de códigos para nomes
+        """
+        versao = cache_service.versao_dataframe(self.df)
+        if versao is None:
+            return self._montar_mapas_de_nomes()
+        return cache_service.memoizar(('mapas_nomes', versao, self.tipo_dados), self._montar_mapas_de_nomes)
+    
+    def _montar_mapas_de_nomes(self) -> Dict[str, Dict]:
+        """
+        Monta os mapas de códigos para nomes a partir do DataFrame
         
         Returns:
             Dicionário com mapeamentos de códigos para nomes
@@ -53,19 +67,21 @@ class MotorRelatorios:
                 
         return mapas
     
-    def filtrar_por_noug(self, noug_selecionada: Optional[str] = None) -> pd.DataFrame:
+    def filtrar_por_noug(self, noug_selecionada: Optional[str] = None, copiar: bool = True) -> pd.DataFrame:
         """
         Aplica filtro por unidade gestora (NOUG) se uma for selecionada
         
         Args:
             noug_selecionada: NOUG para filtrar ou None para todas
+            copiar: Se False, evita a cópia quando o chamador apenas lê o resultado
             
         Returns:
             DataFrame filtrado
         """
         if noug_selecionada and noug_selecionada != 'todos':
-            return self.df[self.df['NOUG'] == noug_selecionada].copy()
-        return self.df.copy()
+            df_filtrado = self.df[self.df['NOUG'] == noug_selecionada]
+            return df_filtrado.copy() if copiar else df_filtrado
+        return self.df.copy() if copiar else self.df
     
     def obter_nome_categoria(self, codigo: str) -> str:
         """
@@ -0,0 +1,263 @@
+"""
+Índices bitmap para combinar filtros (várias NOUGs, tipos de administração, categorias,
+origens e intervalo de meses) antes da agregação
+Cada valor de cada dimensão guarda um bitset empacotado sem compressão (formato de
+numpy.packbits: 1 bit por linha, n_linhas / 8 bytes por valor, mesmo para valores raros);
+valores da mesma dimensão combinam com OU, dimensões diferentes com E
+"""
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from cache_service import cache_service
+from .agregacao import codificar_coluna
+
+DIMENSOES_BITMAP = ['NOUG', 'INTIPOADM', 'CATEGORIA', 'ORIGEM', 'INMES']
+
+# Parâmetro da URL -> dimensão; o intervalo de meses vem de mes_inicio / mes_fim
+PARAMETROS_FILTRO = {
+    'noug': 'NOUG',
+    'tipo_adm': 'INTIPOADM',
+    'categoria': 'CATEGORIA',
+    'origem': 'ORIGEM'
+}
+
+# Valores de uma dimensão (OU) ou intervalo fechado (inicio, fim) para dimensões numéricas
+Filtro = Union[List, Tuple[int, int]]
+
+def _chave_valor(valor) -> str:
+    """Normaliza um valor para comparação (a planilha traz nomes com espaços à direita)"""
+    return str(valor).strip()
+
+class IndiceBitmap:
+    """
+    Bitsets empacotados por valor das dimensões de filtro
+
+    Resolve combinações E/OU com operações bit a bit sobre arrays uint8
+    (n_linhas / 8 bytes por bitmap) e devolve as posições das linhas selecionadas.
+    """
+
+    def __init__(self, df: pd.DataFrame, dimensoes: Optional[List[str]] = None):
+        """
+        Constrói os bitmaps (uma codificação e uma ordenação por dimensão)
+
+        Args:
+            df: DataFrame de receita ou despesa
+            dimensoes: Colunas indexadas (padrão: DIMENSOES_BITMAP presentes no DataFrame)
+        """
+        self.n_linhas = len(df)
+        self.bitmaps: Dict[str, Dict[str, np.ndarray]] = {}
+        self.valores: Dict[str, Dict[str, object]] = {}
+
+        for dimensao in [d for d in (dimensoes or DIMENSOES_BITMAP) if d in df.columns]:
+            matriz, valores = self._construir_dimensao(df[dimensao])
+            bitmaps, originais = {}, {}
+            for posicao, valor in enumerate(valores):
+                bitmaps[_chave_valor(valor)] = matriz[posicao]
+                originais[_chave_valor(valor)] = valor
+            self.bitmaps[dimensao] = bitmaps
+            self.valores[dimensao] = originais
+
+    def _construir_dimensao(self, serie: pd.Series) -> Tuple[np.ndarray, pd.Index]:
+        """
+        Bitsets de todos os valores presentes de uma coluna
+
+        As posições ordenadas por código ficam agrupadas por (valor, byte); os bits de cada
+        byte são distintos, então a soma por grupo (add.reduceat) é o OU dos bits. Só a matriz
+        de saída (valores x n_linhas / 8 bytes) é alocada, sem um array booleano por valor.
+
+        Args:
+            serie: Coluna indexada
+
+        Returns:
+            Tuple: (matriz uint8 com um bitset por linha, valores presentes na mesma ordem)
+        """
+        codigos, valores = codificar_coluna(serie)
+        validos = np.flatnonzero(codigos >= 0)
+        # Códigos no menor tipo inteiro: a ordenação estável vira radix sort (linear) até 16 bits
+        ordem = validos[np.argsort(codigos[validos].astype(np.min_scalar_type(len(valores))), kind='stable')]
+        codigos_ordenados = codigos[ordem]
+
+        # codificar_coluna pode listar valores ausentes (categorias, faixa de inteiros)
+        presentes = np.bincount(codigos_ordenados, minlength=len(valores)) > 0
+        codigos_ordenados = (np.cumsum(presentes) - 1)[codigos_ordenados]
+        valores = valores[presentes]
+
+        n_bytes = (self.n_linhas + 7) // 8
+        matriz = np.zeros((len(valores), n_bytes), dtype=np.uint8)
+        if len(ordem):
+            celulas = codigos_ordenados * n_bytes + (ordem >> 3)
+            inicios = np.flatnonzero(np.r_[True, celulas[1:] != celulas[:-1]])
+            bits = np.right_shift(0x80, ordem & 7).astype(np.uint8)
+            matriz.reshape(-1)[celulas[inicios]] = np.add.reduceat(bits, inicios)
+        return matriz, valores
+
+    def _vazio(self) -> np.ndarray:
+        return np.zeros((self.n_linhas + 7) // 8, dtype=np.uint8)
+
+    def bitmap(self, dimensao: str, filtro: Filtro) -> np.ndarray:
+        """
+        Bitmap das linhas que atendem ao filtro de uma dimensão
+
+        Args:
+            dimensao: Coluna indexada
+            filtro: Lista de valores (OU) ou tupla (inicio, fim) para intervalo numérico
+
+        Returns:
+            Bitset empacotado (uint8)
+        """
+        if dimensao not in self.bitmaps:
+            raise ValueError(f"Dimensão sem índice bitmap: {dimensao}")
+        por_valor = self.bitmaps[dimensao]
+        selecionados = [por_valor[chave] for chave in self._chaves_filtro(dimensao, filtro)]
+        if not selecionados:
+            return self._vazio()
+        if len(selecionados) == 1:
+            return selecionados[0]
+        return np.bitwise_or.reduce(np.stack(selecionados), axis=0)
+
+    def _chaves_filtro(self, dimensao: str, filtro: Filtro) -> List[str]:
+        """Valores normalizados da dimensão presentes nos dados que atendem ao filtro"""
+        if isinstance(filtro, tuple):
+            inicio, fim = filtro
+            return [chave for chave, valor in self.valores[dimensao].items() if inicio <= valor <= fim]
+        return [chave for chave in dict.fromkeys(_chave_valor(valor) for valor in filtro)
+                if chave in self.bitmaps[dimensao]]
+
+    def valores_filtro(self, filtros: Dict[str, Filtro]) -> Dict[str, List]:
+        """
+        Filtros com os valores exatos dos dados (formato de mascara_filtros)
+
+        Args:
+            filtros: {dimensão: filtro}
+
+        Returns:
+            {dimensão: lista de valores originais}
+        """
+        return {
+            dimensao: [self.valores[dimensao][chave] for chave in self._chaves_filtro(dimensao, filtro)]
+            for dimensao, filtro in filtros.items()
+        }
+
+    def selecionar(self, filtros: Dict[str, Filtro]) -> np.ndarray:
+        """
+        Posições das linhas que atendem a todos os filtros
+
+        Args:
+            filtros: {dimensão: filtro}; dimensões combinadas com E
+
+        Returns:
+            Array int64 com as posições (ordem original das linhas)
+        """
+        resultado = None
+        for dimensao, filtro in filtros.items():
+            bits = self.bitmap(dimensao, filtro)
+            resultado = bits.copy() if resultado is None else np.bitwise_and(resultado, bits, out=resultado)
+        if resultado is None:
+            return np.arange(self.n_linhas, dtype=np.int64)
+        return np.flatnonzero(np.unpackbits(resultado, count=self.n_linhas))
+
+def obter_indice_bitmap(df: pd.DataFrame) -> IndiceBitmap:
+    """
+    Índice bitmap do DataFrame, construído uma vez por versão dos dados
+
+    Args:
+        df: DataFrame carregado pelo cache
+
+    Returns:
+        IndiceBitmap memoizado
+    """
+    versao = cache_service.versao_dataframe(df)
+    if versao is None:
+        return IndiceBitmap(df)
+    return cache_service.memoizar(('indice_bitmap', versao), lambda: IndiceBitmap(df))
+
+def filtros_da_consulta(args) -> Dict[str, Filtro]:
+    """
+    Lê os filtros combináveis dos parâmetros da requisição
+
+    Parâmetros repetidos somam valores (?noug=A&noug=B); 'todos' é ignorado.
+    mes_inicio / mes_fim definem um intervalo de INMES.
+
+    Args:
+        args: request.args (ou qualquer mapeamento com getlist)
+
+    Returns:
+        Dict {dimensão: filtro}
+    """
+    filtros = {}
+    for parametro, dimensao in PARAMETROS_FILTRO.items():
+        valores = [valor for valor in args.getlist(parametro) if valor and valor != 'todos']
+        if valores:
+            filtros[dimensao] = valores
+
+    mes_inicio = args.get('mes_inicio', None, type=int)
+    mes_fim = args.get('mes_fim', None, type=int)
+    if mes_inicio is not None or mes_fim is not None:
+        filtros['INMES'] = (mes_inicio or 1, mes_fim or 12)
+    return filtros
+
+def aplicar_filtros(df: pd.DataFrame, filtros: Dict[str, Filtro]) -> pd.DataFrame:
+    """
+    Seleciona as linhas pelos bitmaps e devolve um recorte versionado
+
+    O recorte recebe versão própria no cache_service, então o seletor de mês e os
+    relatórios executados sobre ele continuam memoizados.
+
+    Args:
+        df: DataFrame carregado pelo cache
+        filtros: {dimensão: filtro}
+
+    Returns:
+        DataFrame filtrado (o próprio df se não houver filtros)
+    """
+    filtros = {d: f for d, f in filtros.items() if d in df.columns}
+    if not filtros or df.empty:
+        return df
+
+    versao = cache_service.versao_dataframe(df)
+    if versao is None:
+        return df.take(IndiceBitmap(df).selecionar(filtros))
+    assinatura = '&'.join(f"{dimensao}={_assinatura_filtro(filtro)}" for dimensao, filtro in sorted(filtros.items()))
+    versao_recorte = f"{versao}|filtros|{assinatura}"
+
+    def calcular():
+        indice = obter_indice_bitmap(df)
+        # O recorte é um filtro de linhas: o backend fragmentado agrega a origem com o filtro
+        cache_service.registrar_origem(versao_recorte, versao, indice.valores_filtro(filtros))
+        return df.take(indice.selecionar(filtros))
+
+    return cache_service.derivar_dataframe(versao_recorte, calcular)
+
+def _assinatura_filtro(filtro: Filtro) -> str:
+    """Representação estável de um filtro para a chave do recorte"""
+    if isinstance(filtro, tuple):
+        return f"{filtro[0]}..{filtro[1]}"
+    return ','.join(sorted(_chave_valor(valor) for valor in filtro))
+
+def aplicar_filtros_consulta(df: pd.DataFrame, args,
+                             dimensoes: Optional[Iterable[str]] = None) -> Tuple[pd.DataFrame, Optional[str]]:
+    """
+    Aplica os filtros da requisição preservando o caminho de NOUG única dos relatórios
+
+    Uma única NOUG continua sendo repassada ao relatório (noug_selecionada), que já
+    usa os índices memoizados por NOUG; várias NOUGs e as demais dimensões passam
+    pelos bitmaps.
+
+    Args:
+        df: DataFrame carregado pelo cache
+        args: request.args
+        dimensoes: Dimensões consideradas (padrão: todas); usado quando a mesma consulta
+            filtra bases com dimensões de significado diferente (ex: CATEGORIA de receita e despesa)
+
+    Returns:
+        Tuple: (DataFrame filtrado, noug_selecionada)
+    """
+    filtros = filtros_da_consulta(args)
+    if dimensoes is not None:
+        filtros = {dimensao: filtro for dimensao, filtro in filtros.items() if dimensao in dimensoes}
+    nougs = filtros.pop('NOUG', [])
+    noug_selecionada = nougs[0] if len(nougs) == 1 else None
+    if len(nougs) > 1:
+        filtros['NOUG'] = nougs
+    return aplicar_filtros(df, filtros), noug_selecionada
@@ -0,0 +1,172 @@
+"""
+Busca textual indexada sobre os nomes da receita
+Índice invertido em memória (termo normalizado -> documentos) com vocabulário ordenado para
+casamento por prefixo; os totais do exercício atual de cada documento são calculados na
+construção, então a consulta não percorre o DataFrame
+"""
+import re
+import unicodedata
+import numpy as np
+import pandas as pd
+from bisect import bisect_left
+from typing import Dict, List
+
+from cache_service import cache_service
+from utils.data_loaders import carregar_classificacao_orcamentaria
+from .classificacao import obter_classificacao
+from .data_utils import obter_exercicio_atual
+from .indice_hierarquico import obter_indice_receita, DIGITOS_CODIGO
+
+MEDIDA_BUSCA = 'RECEITA LIQUIDA'
+LIMITE_RESULTADOS = 20
+
+# Colunas de nome do DataFrame de receita e a coluna de código correspondente
+CAMPOS_BUSCA = {
+    'alinea': ('ALINEA', 'NOALINEA'),
+    'subfonte': ('ESPECIE', 'NOSUBFONTERECEITA'),
+    'noug': ('COUG', 'NOUG')
+}
+
+# Tamanhos de prefixo válidos na classificação (categoria, origem, espécie, desdobramentos, tipo)
+DIGITOS_PREFIXOS_CLASSIFICACAO = (1, 2, 3, 4, 6, 7, 8)
+
+_SEPARADORES = re.compile(r'[^0-9a-z]+')
+
+def normalizar_texto(texto: str) -> List[str]:
+    """
+    Quebra um texto em termos minúsculos e sem acentos
+
+    Args:
+        texto: Texto livre
+
+    Returns:
+        Lista de termos (ex: 'Imposto sobre Transmissão' -> ['imposto', 'sobre', 'transmissao'])
+    """
+    decomposto = unicodedata.normalize('NFKD', str(texto).lower())
+    sem_acentos = ''.join(c for c in decomposto if not unicodedata.combining(c))
+    return [termo for termo in _SEPARADORES.split(sem_acentos) if termo]
+
+class IndiceBusca:
+    """
+    Índice invertido dos nomes da classificação, alíneas, subfontes e unidades gestoras
+
+    Cada documento tem tipo, código, nome e o total da receita no exercício atual.
+    As listas de documentos por termo são arrays ordenados; termos de consulta são
+    tratados como prefixos e combinados com E (interseção).
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        """
+        Constrói o índice
+
+        Args:
+            df: DataFrame de receita
+        """
+        indice = obter_indice_receita(df)
+        self.exercicio = obter_exercicio_atual(df)
+        documentos = []
+
+        # Classificação orçamentária: total da subárvore do código (ou do próprio código)
+        classificacao = obter_classificacao()
+        if classificacao is not None:
+            receita = classificacao.codigos < 10 ** DIGITOS_CODIGO
+            prefixos = [_prefixo_classificacao(codigo, indice.codigos) for codigo in classificacao.codigos[receita]]
+            totais = np.zeros(len(classificacao), dtype=np.float64)
+            totais[receita] = indice.totais(prefixos, MEDIDA_BUSCA, self.exercicio)
+            for codigo, nome, total in zip(classificacao.codigos, classificacao.nomes_por_posicao, totais):
+                documentos.append(('classificacao', str(codigo).zfill(DIGITOS_CODIGO), str(nome).strip(), total))
+
+        for tipo, (coluna_codigo, coluna_nome) in CAMPOS_BUSCA.items():
+            if coluna_codigo not in df.columns or coluna_nome not in df.columns:
+                continue
+            pares = df[[coluna_codigo, coluna_nome]].drop_duplicates().dropna()
+            if tipo == 'noug':
+                totais = [indice.total('', MEDIDA_BUSCA, self.exercicio, noug) for noug in pares[coluna_nome]]
+            else:
+                totais = indice.totais(pares[coluna_codigo].astype(str).tolist(), MEDIDA_BUSCA, self.exercicio)
+            for codigo, nome, total in zip(pares[coluna_codigo], pares[coluna_nome], totais):
+                documentos.append((tipo, str(codigo), str(nome).strip(), total))
+
+        self.tipos = np.array([d[0] for d in documentos], dtype=object)
+        self.codigos = np.array([d[1] for d in documentos], dtype=object)
+        self.nomes = np.array([d[2] for d in documentos], dtype=object)
+        self.totais = np.array([d[3] for d in documentos], dtype=np.float64)
+
+        postings: Dict[str, set] = {}
+        for posicao, (_, codigo, nome, _) in enumerate(documentos):
+            for termo in normalizar_texto(nome) + [codigo]:
+                postings.setdefault(termo, set()).add(posicao)
+        self.vocabulario = sorted(postings)
+        self.postings = [np.array(sorted(postings[termo]), dtype=np.int64) for termo in self.vocabulario]
+
+    def __len__(self) -> int:
+        return len(self.nomes)
+
+    def _documentos_prefixo(self, termo: str) -> np.ndarray:
+        """União das listas de todos os termos do vocabulário que começam por termo"""
+        inicio = bisect_left(self.vocabulario, termo)
+        fim = bisect_left(self.vocabulario, termo + '\uffff', lo=inicio)
+        if inicio == fim:
+            return np.empty(0, dtype=np.int64)
+        if fim - inicio == 1:
+            return self.postings[inicio]
+        return np.unique(np.concatenate(self.postings[inicio:fim]))
+
+    def buscar(self, consulta: str, limite: int = LIMITE_RESULTADOS) -> List[Dict]:
+        """
+        Documentos que contêm todos os termos da consulta (como prefixo)
+
+        Args:
+            consulta: Texto digitado pelo usuário (acentos e maiúsculas são ignorados)
+            limite: Quantidade máxima de resultados
+
+        Returns:
+            Lista de dicts (tipo, codigo, nome, total), do maior para o menor total
+        """
+        termos = normalizar_texto(consulta)
+        if not termos:
+            return []
+
+        # Termos mais longos primeiro: listas menores reduzem as interseções seguintes
+        encontrados = None
+        for termo in sorted(set(termos), key=len, reverse=True):
+            documentos = self._documentos_prefixo(termo)
+            encontrados = documentos if encontrados is None else np.intersect1d(encontrados, documentos, assume_unique=True)
+            if len(encontrados) == 0:
+                return []
+
+        ordem = encontrados[np.argsort(-self.totais[encontrados], kind='stable')][:limite]
+        return [
+            {'tipo': self.tipos[i], 'codigo': self.codigos[i], 'nome': self.nomes[i], 'total': float(self.totais[i])}
+            for i in ordem
+        ]
+
+def _prefixo_classificacao(codigo: int, codigos_receita: np.ndarray) -> str:
+    """
+    Prefixo da subárvore de um código: o próprio código se for uma receita dos dados; senão,
+    sem os zeros finais e completado até o tamanho de nível seguinte (11125000 -> '111250')
+    """
+    texto = str(codigo).zfill(DIGITOS_CODIGO)
+    posicao = np.searchsorted(codigos_receita, codigo)
+    if posicao < len(codigos_receita) and codigos_receita[posicao] == codigo:
+        return texto
+    significativos = len(texto.rstrip('0'))
+    digitos = next(d for d in DIGITOS_PREFIXOS_CLASSIFICACAO if d >= significativos)
+    return texto[:digitos]
+
+def obter_indice_busca(df: pd.DataFrame) -> IndiceBusca:
+    """
+    Índice de busca do DataFrame, construído uma vez por versão dos dados
+
+    Args:
+        df: DataFrame de receita
+
+    Returns:
+        IndiceBusca memoizado
+    """
+    versao = cache_service.versao_dataframe(df)
+    if versao is None:
+        return IndiceBusca(df)
+    # Os nomes da classificação também entram no índice: a versão da planilha compõe a chave
+    versao_classificacao = cache_service.versao_dataframe(carregar_classificacao_orcamentaria())
+    return cache_service.memoizar(('indice_busca', versao, versao_classificacao), lambda: IndiceBusca(df))
@@ -0,0 +1,91 @@
+"""
+Serviço de consulta à classificação orçamentária
+Índice compacto código -> nome (arrays ordenados + busca binária), montado uma vez por versão
+da planilha e compartilhado por todos os relatórios; a tabela já ordenada fica no cache em disco
+"""
+import numpy as np
+import pandas as pd
+from typing import Iterable, Optional
+
+from cache_service import cache_service
+from utils.data_loaders import carregar_classificacao_orcamentaria
+
+NOME_NAO_ENCONTRADO = 'Classificação não encontrada'
+
+class IndiceClassificacao:
+    """
+    Códigos da classificação (int64, ordenados) e nomes alinhados
+
+    Resolve lotes de códigos com uma única busca binária vetorizada (numpy.searchsorted).
+    """
+
+    def __init__(self, df_classificacao: pd.DataFrame):
+        """
+        Monta o índice
+
+        Args:
+            df_classificacao: DataFrame com COCLASSEORC (inteiro) e NOCLASSIFICACAO
+        """
+        codigos = df_classificacao['COCLASSEORC'].to_numpy(dtype=np.int64)
+        ordem = np.argsort(codigos, kind='stable')
+        self.codigos = codigos[ordem]
+        self.nomes_por_posicao = df_classificacao['NOCLASSIFICACAO'].to_numpy(dtype=object)[ordem]
+
+    def __len__(self) -> int:
+        return len(self.codigos)
+
+    def nomes(self, codigos: Iterable, padrao: str = NOME_NAO_ENCONTRADO) -> np.ndarray:
+        """
+        Resolve vários códigos de uma vez
+
+        Args:
+            codigos: Códigos inteiros ou strings numéricas (ex: RECEITA_CODIGO agregado)
+            padrao: Nome usado para códigos ausentes
+
+        Returns:
+            Array de nomes na mesma ordem dos códigos
+        """
+        codigos = _como_inteiros(codigos)
+        if len(self.codigos) == 0:
+            return np.full(len(codigos), padrao, dtype=object)
+
+        posicoes = np.minimum(np.searchsorted(self.codigos, codigos), len(self.codigos) - 1)
+        encontrados = self.codigos[posicoes] == codigos
+        return np.where(encontrados, self.nomes_por_posicao[posicoes], padrao)
+
+    def nome(self, codigo, padrao: str = NOME_NAO_ENCONTRADO) -> str:
+        """
+        Resolve um único código
+
+        Args:
+            codigo: Código inteiro ou string numérica
+            padrao: Nome usado se o código não existir
+
+        Returns:
+            Nome da classificação
+        """
+        return str(self.nomes([codigo], padrao)[0])
+
+def _como_inteiros(codigos: Iterable) -> np.ndarray:
+    """Converte códigos (inteiros ou strings) para int64; inválidos viram -1"""
+    if isinstance(codigos, np.ndarray) and np.issubdtype(codigos.dtype, np.integer):
+        return codigos.astype(np.int64, copy=False)
+    serie = pd.to_numeric(pd.Series(list(codigos), dtype=object), errors='coerce')
+    return serie.fillna(-1).to_numpy(dtype=np.int64)
+
+def obter_classificacao() -> Optional[IndiceClassificacao]:
+    """
+    Índice da classificação orçamentária, montado uma vez por versão da planilha
+
+    Returns:
+        IndiceClassificacao ou None se a planilha não estiver disponível
+    """
+    df_classificacao = carregar_classificacao_orcamentaria()
+    if df_classificacao.empty:
+        return None
+
+    versao = cache_service.versao_dataframe(df_classificacao)
+    if versao is None:
+        return IndiceClassificacao(df_classificacao)
+    return cache_service.memoizar(('indice_classificacao', versao),
+                                  lambda: IndiceClassificacao(df_classificacao))
@@ -0,0 +1,306 @@
+"""
+Cubo mensal acumulado para o seletor de mês dos relatórios
+Agrega os dados por célula (todas as colunas descritivas exceto INMES) e mês uma única vez
+e guarda as somas acumuladas no ano: acumulado até o mês, somente o mês e últimos 12 meses
+passam a ser leituras de uma coluna da matriz, sem nova varredura das linhas
+Sem mês escolhido vale o último mês com dados do exercício atual, de modo que a comparação
+padrão com o exercício anterior é sempre no mesmo período
+"""
+import threading
+import weakref
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Tuple
+
+from cache_service import cache_service
+from .agregacao import agregar, COLUNA_REGISTROS
+from .data_utils import obter_exercicio_atual
+
+MESES_ANO = 12
+
+VISOES_PERIODO = {
+    'acumulado': 'Acumulado no ano',
+    'mes': 'Somente o mês',
+    'doze_meses': 'Últimos 12 meses'
+}
+VISAO_PADRAO = 'acumulado'
+
+# Origem de cada recorte (DataFrame mês a mês, mês, tipo), para os cálculos que precisam do detalhe mensal
+MAX_ORIGENS_RECORTE = 256
+_origens_recorte: "OrderedDict[str, Tuple[weakref.ref, int, str]]" = OrderedDict()
+_lock_origens = threading.Lock()
+
+# Fluxos somam os movimentos do período; estoques (previsões e dotações) valem sempre
+# o acumulado do exercício até o mês selecionado
+MEDIDAS_PERIODO = {
+    'receita': {
+        'fluxo': ['RECEITA BRUTA', 'DEDUCOES RECEITA BRUTA', 'RECEITA LIQUIDA'],
+        'estoque': ['PREVISAO INICIAL', 'DEDUCOES DA PREVISAO INICIAL', 'PREVISAO INICIAL LIQUIDA',
+                    'PREVISAO ATUALIZADA', 'PREVISAO ATUALIZADA LIQUIDA']
+    },
+    'despesa': {
+        'fluxo': ['DESPESA EMPENHADA', 'DESPESA LIQUIDADA', 'DESPESA PAGA'],
+        'estoque': ['DOTACAO INICIAL', 'DOTACAO ADICIONAL', 'CANCELAMENTO DE DOTACAO',
+                    'CANCEL-REMANEJA DOTACAO', 'SALDO DOTACAO']
+    }
+}
+
+class CuboMensal:
+    """
+    Matriz célula x mês com as medidas acumuladas no exercício
+
+    Uma célula é uma combinação distinta das colunas descritivas (inclusive COEXERCICIO).
+    Os recortes devolvem uma tabela de fatos virtual com uma linha por célula e as mesmas
+    colunas do DataFrame original, de modo que os relatórios rodam sobre ela sem alteração.
+    """
+
+    def __init__(self, df: pd.DataFrame, tipo_dados: str = 'receita'):
+        """
+        Constrói o cubo (uma agregação e uma soma acumulada por medida)
+
+        Args:
+            df: DataFrame com coluna INMES
+            tipo_dados: 'receita' ou 'despesa' (define fluxos e estoques)
+        """
+        medidas = MEDIDAS_PERIODO[tipo_dados]
+        self.medidas_fluxo = [c for c in medidas['fluxo'] if c in df.columns]
+        self.medidas_estoque = [c for c in medidas['estoque'] if c in df.columns]
+        medidas = self.medidas_fluxo + self.medidas_estoque
+        self.colunas = list(df.columns)
+        self.dimensoes = [c for c in df.columns if c not in medidas and c != 'INMES']
+        self.tipos = {c: df[c].dtype for c in df.columns}
+        
+        chaves, self._valores_dimensoes = [], {}
+        for coluna in self.dimensoes:
+            codigos, valores = pd.factorize(df[coluna], sort=True, use_na_sentinel=False)
+            chaves.append(pd.Series(codigos, index=df.index, name=coluna))
+            self._valores_dimensoes[coluna] = valores
+        agregado = agregar(df, chaves + ['INMES'], medidas)
+
+        # O agregado sai ordenado pelas chaves com INMES por último: cada célula é um bloco contíguo
+        celulas = agregado.index.droplevel('INMES')
+        codigos = np.column_stack(celulas.codes)
+        nova_celula = np.concatenate(([True], np.any(codigos[1:] != codigos[:-1], axis=1)))
+        celula = np.cumsum(nova_celula) - 1
+        self._celulas = celulas[nova_celula]
+        meses = agregado.index.get_level_values('INMES').to_numpy(dtype=np.int64) - 1
+        if len(meses) and (meses.min() < 0 or meses.max() >= MESES_ANO):
+            raise ValueError("INMES fora do intervalo 1..12")
+
+        self.acumulados: Dict[str, np.ndarray] = {}
+        for coluna in medidas + [COLUNA_REGISTROS]:
+            matriz = np.zeros((len(self._celulas), MESES_ANO), dtype=np.float64)
+            matriz[celula, meses] = agregado[coluna].to_numpy(dtype=np.float64)
+            self.acumulados[coluna] = np.cumsum(matriz, axis=1)
+
+        codigo_exercicio = self._celulas.get_level_values('COEXERCICIO').to_numpy(dtype=np.int64)
+        self._exercicios = np.asarray(self._valores_dimensoes['COEXERCICIO'], dtype=np.int64)[codigo_exercicio]
+
+        # Meses com dados no exercício mais recente (opções do seletor)
+        self.exercicio_atual = int(self._exercicios.max())
+        ultimo = self._exercicios[celula] == self.exercicio_atual
+        self.meses_disponiveis: List[int] = (np.unique(meses[ultimo]) + 1).tolist()
+
+    def recorte(self, mes: int, visao: str = VISAO_PADRAO) -> pd.DataFrame:
+        """
+        Tabela de fatos virtual para o mês e a visão escolhidos
+
+        Args:
+            mes: Mês de referência (1 a 12)
+            visao: 'acumulado' (jan..mes), 'mes' (somente o mês) ou 'doze_meses'
+                   (mes/ano e os 12 - mes meses finais do exercício anterior)
+
+        Returns:
+            DataFrame com as colunas do original e uma linha por célula com movimento
+        """
+        if visao not in VISOES_PERIODO:
+            raise ValueError(f"Visão de período inválida: {visao}")
+        if not 1 <= mes <= MESES_ANO:
+            raise ValueError(f"Mês inválido: {mes}")
+        m = mes - 1
+
+        valores = {c: self.acumulados[c][:, m] for c in self.medidas_estoque}
+        for coluna in self.medidas_fluxo:
+            valores[coluna] = self.acumulados[coluna][:, m]
+            if visao == 'mes' and m > 0:
+                valores[coluna] = valores[coluna] - self.acumulados[coluna][:, m - 1]
+        valores[COLUNA_REGISTROS] = self.acumulados[COLUNA_REGISTROS][:, m]
+        partes = [self._montar_linhas(valores, self._exercicios, mes)]
+
+        if visao == 'doze_meses' and m < MESES_ANO - 1:
+            # Meses mes+1..12 do exercício anterior entram como parte do exercício seguinte
+            exercicios = self._exercicios + 1
+            cauda = {c: np.zeros(len(self._celulas)) for c in self.medidas_estoque}
+            for coluna in self.medidas_fluxo + [COLUNA_REGISTROS]:
+                cauda[coluna] = self.acumulados[coluna][:, -1] - self.acumulados[coluna][:, m]
+            cauda[COLUNA_REGISTROS] *= np.isin(exercicios, self._exercicios)
+            partes.append(self._montar_linhas(cauda, exercicios, mes))
+
+        return pd.concat(partes, ignore_index=True) if len(partes) > 1 else partes[0]
+
+    def _montar_linhas(self, valores: Dict[str, np.ndarray], exercicios: np.ndarray, mes: int) -> pd.DataFrame:
+        """Reconstrói as colunas originais das células com movimento até o mês"""
+        celulas = np.flatnonzero(valores[COLUNA_REGISTROS] > 0)
+        selecionadas = self._celulas.take(celulas)
+        colunas = {}
+        for coluna in self.colunas:
+            if coluna == 'INMES':
+                colunas[coluna] = np.full(len(celulas), mes, dtype=self.tipos[coluna])
+            elif coluna == 'COEXERCICIO':
+                colunas[coluna] = exercicios[celulas].astype(self.tipos[coluna])
+            elif coluna in self._valores_dimensoes:
+                codigos = selecionadas.get_level_values(coluna).to_numpy(dtype=np.int64)
+                serie = pd.Series(self._valores_dimensoes[coluna].take(codigos))
+                colunas[coluna] = serie.astype(self.tipos[coluna])
+            elif pd.api.types.is_integer_dtype(self.tipos[coluna]):
+                colunas[coluna] = np.rint(valores[coluna][celulas]).astype(self.tipos[coluna])
+            else:
+                colunas[coluna] = valores[coluna][celulas]
+        return pd.DataFrame(colunas)
+
+def obter_cubo_mensal(df: pd.DataFrame, tipo_dados: str = 'receita') -> CuboMensal:
+    """
+    Cubo mensal do DataFrame, construído uma vez por versão dos dados
+
+    Args:
+        df: DataFrame com coluna INMES
+        tipo_dados: 'receita' ou 'despesa'
+
+    Returns:
+        CuboMensal memoizado
+    """
+    versao = cache_service.versao_dataframe(df)
+    if versao is None:
+        return CuboMensal(df, tipo_dados)
+    return cache_service.memoizar(('cubo_mensal', versao, tipo_dados), lambda: CuboMensal(df, tipo_dados))
+
+def normalizar_periodo(mes: Optional[int], visao: Optional[str]) -> Tuple[Optional[int], str]:
+    """
+    Mês e visão válidos do seletor: mês fora de 1..12 vira None (último mês disponível)
+    e visão desconhecida vira VISAO_PADRAO
+
+    Args:
+        mes: Mês pedido ou None
+        visao: Visão pedida ou None
+
+    Returns:
+        Tuple: (mes ou None, visao)
+    """
+    if mes is not None and not 1 <= mes <= MESES_ANO:
+        mes = None
+    if visao not in VISOES_PERIODO:
+        visao = VISAO_PADRAO
+    return mes, visao
+
+def recorte_mensal(df: pd.DataFrame, mes: Optional[int] = None, visao: str = VISAO_PADRAO,
+                   tipo_dados: str = 'receita') -> pd.DataFrame:
+    """
+    Aplica o seletor de mês: devolve a tabela de fatos virtual do período escolhido
+
+    Sem mês selecionado (ou com mês/visão inválidos) usa o último mês com dados do exercício
+    atual e a visão padrão, então o exercício anterior entra só até o mesmo mês.
+    O recorte recebe versão própria no cache_service, então os relatórios
+    executados sobre ele continuam memoizados.
+
+    Args:
+        df: DataFrame carregado pelo cache
+        mes: Mês de referência (1 a 12) ou None
+        visao: Chave de VISOES_PERIODO
+        tipo_dados: 'receita' ou 'despesa'
+
+    Returns:
+        DataFrame do período
+    """
+    if df.empty or 'INMES' not in df.columns:
+        return df
+    mes, visao = normalizar_periodo(mes, visao)
+    if mes is None:
+        meses = obter_cubo_mensal(df, tipo_dados).meses_disponiveis
+        if not meses:
+            return df
+        mes = meses[-1]
+
+    versao = cache_service.versao_dataframe(df)
+    if versao is None:
+        return obter_cubo_mensal(df, tipo_dados).recorte(mes, visao)
+    versao_recorte = f"{versao}|{tipo_dados}|mes={mes}|{visao}"
+
+    def calcular():
+        if visao == 'acumulado':
+            # Somas do acumulado = linhas da origem até o mês (o recorte só reescreve INMES),
+            # então o backend fragmentado agrega a origem já distribuída com esse filtro
+            # (contagens passam a contar linhas, o que preserva as condições 'registros > 0')
+            cache_service.registrar_origem(versao_recorte, versao, {'INMES': list(range(1, mes + 1))}, ['INMES'])
+        return obter_cubo_mensal(df, tipo_dados).recorte(mes, visao)
+
+    recorte = cache_service.derivar_dataframe(versao_recorte, calcular)
+    with _lock_origens:
+        _origens_recorte[versao_recorte] = (weakref.ref(df), mes, tipo_dados)
+        _origens_recorte.move_to_end(versao_recorte)
+        while len(_origens_recorte) > MAX_ORIGENS_RECORTE:
+            _origens_recorte.popitem(last=False)
+    return recorte
+
+def detalhe_mensal(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Dados mês a mês por trás de um recorte de recorte_mensal
+
+    Projeção, variações, anomalias e evolução mensal precisam dos meses separados, que o recorte
+    junta no mês selecionado. Devolve o DataFrame de origem do recorte sem os meses do exercício
+    atual posteriores ao mês do recorte (os exercícios anteriores ficam completos); qualquer
+    outro DataFrame é devolvido sem alteração.
+
+    Args:
+        df: Recorte devolvido por recorte_mensal (ou DataFrame mês a mês)
+
+    Returns:
+        DataFrame com coluna INMES detalhada
+    """
+    versao = cache_service.versao_dataframe(df)
+    with _lock_origens:
+        origem = _origens_recorte.get(versao) if versao is not None else None
+    base = origem[0]() if origem else None
+    if base is None:
+        return df
+    _, mes, tipo_dados = origem
+
+    cubo = obter_cubo_mensal(base, tipo_dados)
+    if not cubo.meses_disponiveis or cubo.meses_disponiveis[-1] <= mes:
+        return base
+
+    def calcular():
+        manter = (base['COEXERCICIO'] != cubo.exercicio_atual) | (base['INMES'] <= mes)
+        return base[manter.to_numpy()]
+
+    return cache_service.derivar_dataframe(
+        f"{cache_service.versao_dataframe(base)}|{tipo_dados}|ate_mes={mes}", calcular
+    )
+
+def contexto_periodo(df: pd.DataFrame, mes: Optional[int] = None, visao: Optional[str] = None,
+                     tipo_dados: str = 'receita') -> Dict:
+    """
+    Variáveis de template do seletor de mês (ver bloco filtros de base_relatorio.html)
+
+    Args:
+        df: DataFrame carregado pelo cache (sem recorte)
+        mes: Mês selecionado ou None (inválido: None, último mês disponível)
+        visao: Visão selecionada (inválida: VISAO_PADRAO)
+        tipo_dados: 'receita' ou 'despesa'
+
+    Returns:
+        Dict com lista_meses, mes_selecionado, visao_selecionada, visoes_periodo
+        e exercicio_atual
+    """
+    mes, visao = normalizar_periodo(mes, visao)
+    lista_meses, exercicio_atual = [], obter_exercicio_atual(df)
+    if not df.empty and 'INMES' in df.columns:
+        cubo = obter_cubo_mensal(df, tipo_dados)
+        lista_meses, exercicio_atual = cubo.meses_disponiveis, cubo.exercicio_atual
+    return {
+        'exercicio_atual': exercicio_atual,
+        'lista_meses': lista_meses,
+        'mes_selecionado': mes,
+        'visao_selecionada': visao,
+        'visoes_periodo': VISOES_PERIODO
+    }
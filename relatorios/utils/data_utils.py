@@ -1,25 +1,46 @@
 """
 Funções utilitárias para trabalhar com datas e meses de referência
 """
+from datetime import date
 import pandas as pd
 
+def obter_exercicio_atual(df: pd.DataFrame) -> int:
+    """
+    Retorna o exercício mais recente presente nos dados
+    
+    Args:
+        df: DataFrame com coluna COEXERCICIO
+        
+    Returns:
+        Maior COEXERCICIO ou o ano corrente quando não houver dados
+    """
+    if 'COEXERCICIO' in df.columns and not df.empty:
+        max_ano = df['COEXERCICIO'].max()
+        if pd.notna(max_ano):
+            return int(max_ano)
+    return date.today().year
+
 def calcular_mes_referencia(df: pd.DataFrame) -> str:
     """
-    Calcula o mês de referência com base no maior valor da coluna INMES
+    Calcula o mês de referência com base no maior INMES do exercício mais recente
     Retorna no formato "MM/AAAA"
     
     Args:
-        df: DataFrame com coluna INMES
+        df: DataFrame com colunas INMES e COEXERCICIO
         
     Returns:
         String no formato "MM/AAAA" (ex: "05/2025")
     """
+    ano = obter_exercicio_atual(df)
     if 'INMES' in df.columns and not df.empty:
-        max_mes = df['INMES'].max()
+        meses = df['INMES']
+        if 'COEXERCICIO' in df.columns:
+            meses = meses[df['COEXERCICIO'] == ano]
+        max_mes = meses.max()
         if pd.notna(max_mes) and max_mes > 0:
-            return f"{int(max_mes):02d}/2025"
+            return f"{int(max_mes):02d}/{ano}"
     
-    return "12/2025"  # Valor padrão
+    return f"12/{ano}"  # Valor padrão
 
 def obter_mes_numero(df: pd.DataFrame) -> str:
     """
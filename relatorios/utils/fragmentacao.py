@@ -0,0 +1,304 @@
+"""
+Agregação fragmentada por NOUG em processos de trabalho (backend 'fragmentado')
+
+Cada DataFrame versionado pelo cache_service é particionado por hash da NOUG entre
+FRAGMENTOS_AGREGACAO processos de longa duração, uma vez por versão. Depois disso cada
+agregar() envia aos processos só o plano (versão, chaves, medidas e filtros); cada um agrega
+o seu fragmento com agregar_codificado e o coordenador funde os parciais: somas e contagens
+se somam por grupo e, com NOUG entre as chaves, os grupos de fragmentos diferentes nem se
+sobrepõem. O tempo de um relatório não memoizado cai com o número de núcleos, ao custo de
+cada processo guardar seus fragmentos das últimas VERSOES_POR_PROCESSO versões.
+
+Derivados que equivalem a um filtro de linhas da origem (filtros da consulta e recorte mensal
+acumulado, ver cache_service.registrar_origem) não são distribuídos: o plano leva os filtros
+e roda sobre a origem já distribuída. Os demais recortes mensais contam como versões próprias.
+Consultas de threads diferentes correm em paralelo: cada pedido leva um identificador e só a
+distribuição de versões passa pelo lock do coordenador.
+
+Consultas que não se beneficiam rodam no kernel local: DataFrames sem versão (recortes
+transitórios), chaves Series, tabelas sem NOUG ou menores que LINHAS_MINIMAS_FRAGMENTADO.
+"""
+import atexit
+import itertools
+import multiprocessing
+import threading
+import zlib
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Union
+
+from cache_service import cache_service
+from config_relatorios import FRAGMENTOS_AGREGACAO
+from .agregacao import agregar_codificado, filtrar_entrada, codificar_coluna, Chave
+
+# Abaixo disso a troca de mensagens custa mais do que a agregação local
+LINHAS_MINIMAS_FRAGMENTADO = 100_000
+
+# Versões de dados mantidas em cada processo (LRU, igual no coordenador)
+VERSOES_POR_PROCESSO = 4
+
+def fragmento_por_noug(nougs: pd.Series, n_fragmentos: int) -> np.ndarray:
+    """
+    Fragmento de cada linha pelo crc32 do nome da NOUG (estável entre processos e execuções)
+
+    Args:
+        nougs: Coluna NOUG
+        n_fragmentos: Número de fragmentos
+
+    Returns:
+        Array int64 com o fragmento (0..n-1) de cada linha; NOUG nula vai para o fragmento 0
+    """
+    codigos, valores = codificar_coluna(nougs)
+    mapa = np.array([zlib.crc32(str(valor).strip().encode('utf-8')) % n_fragmentos for valor in valores],
+                    dtype=np.int64)
+    if len(mapa) == 0:
+        return np.zeros(len(nougs), dtype=np.int64)
+    return np.where(codigos >= 0, mapa[np.maximum(codigos, 0)], 0)
+
+def fundir_parciais(parciais: List[pd.DataFrame], nomes: List[str]) -> pd.DataFrame:
+    """
+    Funde os agregados parciais dos fragmentos no formato de agregar_codificado
+
+    Args:
+        parciais: Um agregado por fragmento (mesmas colunas e níveis)
+        nomes: Nomes das chaves
+
+    Returns:
+        DataFrame indexado pelas chaves em ordem crescente
+    """
+    preenchidos = [parcial for parcial in parciais if len(parcial)]
+    if not preenchidos:
+        return parciais[0]
+    if len(preenchidos) == 1:
+        return preenchidos[0]
+    juntos = pd.concat(preenchidos)
+    if 'NOUG' in nomes:
+        # Cada NOUG está em um único fragmento: não há grupos repetidos
+        return juntos.sort_index()
+    return juntos.groupby(level=list(range(juntos.index.nlevels)), sort=True).sum()
+
+def _processo_fragmento(conexao):
+    """Laço de um processo de trabalho: guarda fragmentos por versão e agrega sob demanda"""
+    fragmentos: "OrderedDict[str, pd.DataFrame]" = OrderedDict()
+    while True:
+        mensagem = conexao.recv()
+        if mensagem is None:
+            break
+        pedido, operacao, versao = mensagem[:3]
+        try:
+            if operacao == 'carregar':
+                fragmentos[versao] = mensagem[3]
+                fragmentos.move_to_end(versao)
+                while len(fragmentos) > VERSOES_POR_PROCESSO:
+                    fragmentos.popitem(last=False)
+                conexao.send((pedido, 'ok', None))
+            elif versao not in fragmentos:
+                conexao.send((pedido, 'ausente', None))
+            else:
+                fragmentos.move_to_end(versao)
+                chaves, colunas_valor, filtros = mensagem[3:]
+                df, chaves = filtrar_entrada(fragmentos[versao], chaves, colunas_valor, filtros)
+                conexao.send((pedido, 'ok', agregar_codificado(df, chaves, colunas_valor)))
+        except Exception as e:
+            conexao.send((pedido, 'erro', f"{type(e).__name__}: {e}"))
+    conexao.close()
+
+class _CanalFragmento:
+    """
+    Pipe de um processo de trabalho compartilhado pelas threads do servidor
+
+    Uma thread por vez lê o pipe; respostas de outros pedidos ficam guardadas para as
+    threads que os enviaram, de modo que consultas concorrentes não trocam respostas.
+    """
+
+    def __init__(self, conexao):
+        self.conexao = conexao
+        self._lock_envio = threading.Lock()
+        self._condicao = threading.Condition()
+        self._lendo = False
+        self._respostas: Dict[int, tuple] = {}
+
+    def enviar(self, pedido: int, *mensagem):
+        with self._lock_envio:
+            self.conexao.send((pedido,) + mensagem)
+
+    def receber(self, pedido: int) -> tuple:
+        """(estado, conteúdo) da resposta ao pedido"""
+        with self._condicao:
+            while pedido not in self._respostas:
+                if self._lendo:
+                    self._condicao.wait()
+                    continue
+                self._lendo = True
+                self._condicao.release()
+                try:
+                    identificador, estado, conteudo = self.conexao.recv()
+                finally:
+                    self._condicao.acquire()
+                    self._lendo = False
+                    self._condicao.notify_all()
+                self._respostas[identificador] = (estado, conteudo)
+            return self._respostas.pop(pedido)
+
+class ExecutorFragmentado:
+    """Coordenador dos processos de trabalho: distribui fragmentos e funde parciais"""
+
+    def __init__(self, n_fragmentos: int):
+        """
+        Args:
+            n_fragmentos: Número de processos (e de fragmentos por versão)
+        """
+        self.n_fragmentos = max(1, int(n_fragmentos))
+        self._processos = []
+        self._canais: List[_CanalFragmento] = []
+        # Versões já distribuídas (-> número da distribuição), na mesma ordem LRU dos processos
+        self._distribuidas: "OrderedDict[str, int]" = OrderedDict()
+        self._pedidos = itertools.count()
+        self._distribuicoes = itertools.count()
+        # Só para iniciar processos e distribuir versões; as consultas não passam por ele
+        self._lock = threading.Lock()
+
+    def _iniciar(self):
+        """Inicia os processos na primeira consulta (spawn: seguro com threads do servidor)"""
+        if self._processos:
+            return
+        contexto = multiprocessing.get_context('spawn')
+        for _ in range(self.n_fragmentos):
+            local, remota = contexto.Pipe()
+            processo = contexto.Process(target=_processo_fragmento, args=(remota,), daemon=True)
+            processo.start()
+            remota.close()
+            self._processos.append(processo)
+            self._canais.append(_CanalFragmento(local))
+        atexit.register(self.encerrar)
+        print(f"🧩 {self.n_fragmentos} processos de agregação fragmentada iniciados")
+
+    def encerrar(self):
+        """Encerra os processos (os fragmentos são redistribuídos se o executor voltar a ser usado)"""
+        for canal in self._canais:
+            try:
+                canal.conexao.send(None)
+                canal.conexao.close()
+            except OSError:
+                pass
+        for processo in self._processos:
+            processo.join(timeout=5)
+            if processo.is_alive():
+                processo.terminate()
+        self._processos, self._canais = [], []
+        self._distribuidas.clear()
+
+    def _enviar_todos(self, canais: List[_CanalFragmento], mensagens: List[tuple]) -> List[tuple]:
+        """Envia uma mensagem a cada processo e espera as respostas (scatter/gather)"""
+        pedido = next(self._pedidos)
+        for canal, mensagem in zip(canais, mensagens):
+            canal.enviar(pedido, *mensagem)
+        respostas = [canal.receber(pedido) for canal in canais]
+        for estado, conteudo in respostas:
+            if estado == 'erro':
+                raise RuntimeError(f"Falha em fragmento de agregação: {conteudo}")
+        return respostas
+
+    def _distribuir(self, df: pd.DataFrame, versao: str):
+        """Envia a cada processo o seu fragmento da versão (chamado com o lock)"""
+        fragmentos = fragmento_por_noug(df['NOUG'], self.n_fragmentos)
+        ordem = np.argsort(fragmentos, kind='stable')
+        limites = np.searchsorted(fragmentos[ordem], np.arange(self.n_fragmentos + 1))
+        self._enviar_todos(self._canais, [('carregar', versao, df.iloc[ordem[limites[i]:limites[i + 1]]])
+                                          for i in range(self.n_fragmentos)])
+
+        self._distribuidas[versao] = next(self._distribuicoes)
+        self._distribuidas.move_to_end(versao)
+        while len(self._distribuidas) > VERSOES_POR_PROCESSO:
+            self._distribuidas.popitem(last=False)
+
+    def _garantir_versao(self, df: pd.DataFrame, versao: str, distribuicao_perdida: Optional[int] = None):
+        """
+        Distribui a versão se ainda não foi (ou se a distribuição conhecida foi descartada
+        pelos processos) e devolve os canais e o número da distribuição
+        """
+        with self._lock:
+            self._iniciar()
+            distribuicao = self._distribuidas.get(versao)
+            if distribuicao is None or distribuicao == distribuicao_perdida:
+                self._distribuir(df, versao)
+            else:
+                self._distribuidas.move_to_end(versao)
+            return list(self._canais), self._distribuidas[versao]
+
+    def _consultar(self, canais: List[_CanalFragmento], versao: str, chaves: List[str], colunas_valor: List[str],
+                   filtros) -> Optional[List[pd.DataFrame]]:
+        """Parciais de todos os fragmentos (None se algum processo não tem mais a versão)"""
+        respostas = self._enviar_todos(canais, [('agregar', versao, chaves, colunas_valor, filtros)] * len(canais))
+        if any(estado == 'ausente' for estado, _ in respostas):
+            return None
+        return [conteudo for _, conteudo in respostas]
+
+    def agregar(self, df: pd.DataFrame, versao: str, chaves: List[str], colunas_valor: List[str],
+                filtros: Optional[Union[Dict[str, Any], List[Dict[str, Any]]]] = None) -> Optional[pd.DataFrame]:
+        """
+        Scatter/gather de uma agregação sobre a versão (distribuída na primeira vez)
+
+        Args:
+            df: DataFrame versionado (usado só para distribuir a versão)
+            versao: Versão do DataFrame no cache_service
+            chaves: Nomes das colunas de agrupamento
+            colunas_valor: Colunas a somar
+            filtros: Filtros de igualdade/pertinência (ou lista deles) aplicados em cada fragmento
+
+        Returns:
+            DataFrame no formato de agregar_codificado, ou None se a versão foi descartada
+            pelos processos de novo durante a consulta (o chamador agrega localmente)
+        """
+        canais, distribuicao = self._garantir_versao(df, versao)
+        parciais = self._consultar(canais, versao, chaves, colunas_valor, filtros)
+        if parciais is None:
+            canais, _ = self._garantir_versao(df, versao, distribuicao)
+            parciais = self._consultar(canais, versao, chaves, colunas_valor, filtros)
+        if parciais is None:
+            return None
+        return fundir_parciais(parciais, chaves)
+
+class BackendFragmentado:
+    """Agregações de DataFrames versionados espalhadas por NOUG entre processos de trabalho"""
+
+    nome = 'fragmentado'
+
+    def __init__(self, n_fragmentos: int = None):
+        """
+        Args:
+            n_fragmentos: Processos de trabalho (padrão: FRAGMENTOS_AGREGACAO)
+        """
+        self.executor = ExecutorFragmentado(n_fragmentos or FRAGMENTOS_AGREGACAO)
+
+    def agregar(self, df: pd.DataFrame, chaves: List[Chave], colunas_valor: List[str],
+                filtros: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+        if not chaves:
+            raise ValueError("agregar exige ao menos uma chave")
+        versao = cache_service.versao_dataframe(df)
+        if (versao is None or len(df) < LINHAS_MINIMAS_FRAGMENTADO or 'NOUG' not in df.columns
+                or not all(isinstance(chave, str) for chave in chaves)):
+            df, chaves = filtrar_entrada(df, chaves, colunas_valor, filtros)
+            return agregar_codificado(df, chaves, colunas_valor)
+        # Derivado que é filtro de linhas de uma origem em memória: o plano roda sobre a origem
+        df_plano, versao_plano, filtros_plano = df, versao, filtros
+        origem = cache_service.origem_filtrada(versao)
+        if origem is not None and not origem[3].intersection(chaves):
+            df_plano, versao_plano, filtros_plano, _ = origem
+            filtros_plano = filtros_plano + ([filtros] if filtros else [])
+        try:
+            resultado = self.executor.agregar(df_plano, versao_plano, list(chaves), list(colunas_valor),
+                                              filtros_plano)
+            if resultado is not None:
+                return resultado
+        except (EOFError, OSError) as e:
+            # Processo de trabalho perdido: reinicia na próxima consulta e responde localmente
+            print(f"⚠️ Agregação fragmentada indisponível ({e}); calculando localmente")
+            self.executor.encerrar()
+        df, chaves = filtrar_entrada(df, chaves, colunas_valor, filtros)
+        return agregar_codificado(df, chaves, colunas_valor)
+
+    def encerrar(self):
+        """Encerra os processos de trabalho"""
+        self.executor.encerrar()
@@ -0,0 +1,224 @@
+"""
+Índice hierárquico de somas prefixadas sobre os códigos de classificação da receita
+Os códigos são prefixos aninhados (categoria '1' → origem '11' → espécie '111' → alínea → código
+completo): ordenando um agregado por (exercício, NOUG, código) e guardando as somas acumuladas
+de cada medida, o total de qualquer subárvore sai com duas buscas binárias e uma subtração
+"""
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, List, Optional
+
+from cache_service import cache_service
+from .agregacao import agregar
+
+# COCONTACORRENTE = código da receita (8 dígitos) + código da fonte (9 dígitos)
+DIGITOS_CODIGO = 8
+DIVISOR_CONTA_CORRENTE = 10 ** 9
+
+# Quantidade de dígitos de cada nível: categoria, origem, espécie, alínea, código completo
+DIGITOS_NIVEIS = (1, 2, 3, 6, 8)
+
+MEDIDAS_INDICE = ['PREVISAO INICIAL LIQUIDA', 'PREVISAO ATUALIZADA LIQUIDA', 'RECEITA LIQUIDA']
+
+# Valores monetários são acumulados em centavos inteiros: a diferença entre duas somas
+# prefixadas grandes seria imprecisa em ponto flutuante para subárvores pequenas
+CENTAVOS = 100
+
+def codigo_receita(df: pd.DataFrame) -> np.ndarray:
+    """
+    Extrai o código completo da receita (8 dígitos) de cada linha como inteiro
+
+    Usa RECEITA_CODIGO quando já existe; senão o prefixo do COCONTACORRENTE;
+    na ausência dele, a alínea completada com zeros.
+
+    Args:
+        df: DataFrame de receita
+
+    Returns:
+        Array int64 com o código de cada linha (-1 quando indisponível)
+    """
+    if 'RECEITA_CODIGO' in df.columns:
+        codigos = pd.to_numeric(df['RECEITA_CODIGO'], errors='coerce')
+    elif 'COCONTACORRENTE' in df.columns:
+        codigos = pd.to_numeric(df['COCONTACORRENTE'], errors='coerce') // DIVISOR_CONTA_CORRENTE
+    else:
+        alineas = pd.to_numeric(df['ALINEA'].astype(str), errors='coerce')
+        codigos = alineas * 10 ** (DIGITOS_CODIGO - DIGITOS_NIVEIS[3])
+    return codigos.fillna(-1).to_numpy(dtype=np.int64)
+
+class IndiceHierarquico:
+    """
+    Somas prefixadas por medida sobre o agregado ordenado por (exercício, [NOUG,] código)
+
+    Mantém dois segmentos: um geral, com chave exercicio * 10^8 + codigo, e outro por NOUG,
+    com chave (exercicio * n_nougs + posição da NOUG) * 10^8 + codigo. Uma subárvore de
+    prefixo p ocupa o intervalo contíguo [p * 10^(8-len(p)), (p+1) * 10^(8-len(p))) das chaves.
+    """
+
+    def __init__(self, df: pd.DataFrame, medidas: Optional[List[str]] = None):
+        """
+        Constrói o índice (uma agregação e uma ordenação por segmento)
+
+        Args:
+            df: DataFrame de receita
+            medidas: Colunas a acumular (padrão: MEDIDAS_INDICE presentes no DataFrame)
+        """
+        self.medidas = [m for m in (medidas or MEDIDAS_INDICE) if m in df.columns]
+        codigo = pd.Series(codigo_receita(df), index=df.index, name='CODIGO')
+        codigo = codigo.where(codigo >= 0)
+
+        geral = agregar(df, ['COEXERCICIO', codigo], self.medidas)
+        exercicios = geral.index.get_level_values('COEXERCICIO').to_numpy(dtype=np.int64)
+        codigos = geral.index.get_level_values('CODIGO').to_numpy(dtype=np.int64)
+        self.exercicios = sorted(set(exercicios.tolist()))
+        self.codigos = np.unique(codigos)
+        self._geral = self._montar_segmento(exercicios * 10 ** DIGITOS_CODIGO + codigos, geral)
+
+        por_noug = agregar(df, ['COEXERCICIO', 'NOUG', codigo], self.medidas)
+        nougs = por_noug.index.get_level_values('NOUG')
+        self.nougs = pd.Index(sorted(nougs.unique().astype(str)))
+        posicoes = self.nougs.get_indexer(nougs.astype(str)).astype(np.int64)
+        exercicios = por_noug.index.get_level_values('COEXERCICIO').to_numpy(dtype=np.int64)
+        codigos = por_noug.index.get_level_values('CODIGO').to_numpy(dtype=np.int64)
+        chaves = (exercicios * len(self.nougs) + posicoes) * 10 ** DIGITOS_CODIGO + codigos
+        self._por_noug = self._montar_segmento(chaves, por_noug)
+
+    @staticmethod
+    def _montar_segmento(chaves: np.ndarray, agregado: pd.DataFrame) -> Dict:
+        """Ordena as chaves e acumula cada medida em centavos (com zero à frente para a subtração)"""
+        ordem = np.argsort(chaves, kind='stable')
+        acumulados = {}
+        for coluna in agregado.columns:
+            centavos = np.rint(agregado[coluna].to_numpy(dtype=np.float64)[ordem] * CENTAVOS).astype(np.int64)
+            acumulados[coluna] = np.concatenate(([0], np.cumsum(centavos)))
+        return {'chaves': chaves[ordem], 'acumulados': acumulados}
+
+    def total(self, prefixo: str = '', medida: str = 'RECEITA LIQUIDA',
+              exercicio: Optional[int] = None, noug: Optional[str] = None) -> float:
+        """
+        Total de uma subárvore
+
+        Args:
+            prefixo: Prefixo do código ('' para todos, '1', '11', '111', ...)
+            medida: Coluna acumulada
+            exercicio: Ano (None soma todos os exercícios)
+            noug: NOUG (None ou 'todos' para todas)
+
+        Returns:
+            Soma da medida nas linhas cujo código começa pelo prefixo
+        """
+        return float(self.totais([prefixo], medida, exercicio, noug)[0])
+
+    def totais(self, prefixos: Iterable[str], medida: str = 'RECEITA LIQUIDA',
+               exercicio: Optional[int] = None, noug: Optional[str] = None) -> np.ndarray:
+        """
+        Totais de várias subárvores de uma vez (buscas binárias vetorizadas)
+
+        Args:
+            prefixos: Prefixos dos códigos
+            medida: Coluna acumulada
+            exercicio: Ano (None soma todos os exercícios)
+            noug: NOUG (None ou 'todos' para todas)
+
+        Returns:
+            Array com um total por prefixo, na ordem recebida
+        """
+        inicio, fim = self._intervalos(list(prefixos))
+        resultado = np.zeros(len(inicio), dtype=np.int64)
+        if medida not in self.medidas:
+            return resultado.astype(np.float64)
+
+        exercicios = self.exercicios if exercicio is None else [int(exercicio)]
+        if noug and noug != 'todos':
+            posicao = self.nougs.get_indexer([str(noug)])[0]
+            if posicao < 0:
+                return resultado.astype(np.float64)
+            segmento = self._por_noug
+            bases = [(ano * len(self.nougs) + posicao) * 10 ** DIGITOS_CODIGO for ano in exercicios]
+        else:
+            segmento = self._geral
+            bases = [ano * 10 ** DIGITOS_CODIGO for ano in exercicios]
+
+        chaves = segmento['chaves']
+        acumulado = segmento['acumulados'][medida]
+        for base in bases:
+            i = np.searchsorted(chaves, base + inicio, side='left')
+            j = np.searchsorted(chaves, base + fim, side='left')
+            resultado += acumulado[j] - acumulado[i]
+        return resultado / CENTAVOS
+
+    @staticmethod
+    def _intervalos(prefixos: List[str]):
+        """Converte prefixos em intervalos semiabertos [inicio, fim) de códigos completos"""
+        inicio = np.empty(len(prefixos), dtype=np.int64)
+        fim = np.empty(len(prefixos), dtype=np.int64)
+        for posicao, prefixo in enumerate(prefixos):
+            prefixo = str(prefixo)
+            if len(prefixo) > DIGITOS_CODIGO or (prefixo and not prefixo.isdigit()):
+                raise ValueError(f"Prefixo de classificação inválido: {prefixo!r}")
+            escala = 10 ** (DIGITOS_CODIGO - len(prefixo))
+            valor = int(prefixo) if prefixo else 0
+            inicio[posicao] = valor * escala
+            fim[posicao] = (valor + 1) * escala
+        return inicio, fim
+
+    def filhos(self, prefixo: str = '') -> List[str]:
+        """
+        Prefixos do nível seguinte presentes nos dados
+
+        Args:
+            prefixo: Prefixo do nó ('' para as categorias)
+
+        Returns:
+            Lista ordenada de prefixos filhos
+        """
+        prefixo = str(prefixo)
+        proximos = [d for d in DIGITOS_NIVEIS if d > len(prefixo)]
+        if not proximos:
+            return []
+        digitos = proximos[0]
+        (inicio,), (fim,) = self._intervalos([prefixo])
+        i, j = np.searchsorted(self.codigos, [inicio, fim], side='left')
+        truncados = np.unique(self.codigos[i:j] // 10 ** (DIGITOS_CODIGO - digitos))
+        return [str(codigo).zfill(digitos) for codigo in truncados]
+
+    def hierarquia(self) -> Dict[str, Dict[str, List[str]]]:
+        """
+        Estrutura categoria -> origem -> espécies descoberta nos dados,
+        no mesmo formato de HIERARQUIA_RECEITAS
+
+        Returns:
+            Dict aninhado com os códigos presentes
+        """
+        estrutura = {}
+        for especie in np.unique(self.codigos // 10 ** (DIGITOS_CODIGO - DIGITOS_NIVEIS[2])):
+            especie = str(especie).zfill(DIGITOS_NIVEIS[2])
+            estrutura.setdefault(especie[:1], {}).setdefault(especie[:2], []).append(especie)
+        return estrutura
+
+def obter_indice_receita(df: pd.DataFrame) -> IndiceHierarquico:
+    """
+    Índice hierárquico do DataFrame, construído uma vez por versão dos dados
+
+    Args:
+        df: DataFrame de receita
+
+    Returns:
+        IndiceHierarquico memoizado
+    """
+    versao = cache_service.versao_dataframe(df)
+    if versao is None:
+        return IndiceHierarquico(df)
+    return cache_service.memoizar(('indice_hierarquico', versao), lambda: IndiceHierarquico(df))
+
+def obter_hierarquia_receitas(df: pd.DataFrame) -> Dict[str, Dict[str, List[str]]]:
+    """
+    Hierarquia categoria -> origem -> espécies presente nos dados de receita
+
+    Args:
+        df: DataFrame de receita
+
+    Returns:
+        Dict no formato de HIERARQUIA_RECEITAS
+    """
+    return obter_indice_receita(df).hierarquia()
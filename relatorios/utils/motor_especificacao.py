@@ -0,0 +1,459 @@
+"""
+Motor declarativo de relatórios
+Executa as especificações de config_relatorios.ESPECIFICACOES_RELATORIOS com um único
+caminho de agregação, formatação e cache para todos os relatórios
+"""
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Any
+
+from cache_service import cache_service
+from config_relatorios import ESPECIFICACOES_RELATORIOS
+from .agregacao import agregar, mascara_filtros, COLUNA_REGISTROS
+from .base_motor import MotorRelatorios
+from .data_utils import obter_mes_numero
+from .formatacao import formatar_numero, formatar_percentual, formatar_percentual_simples
+from .projecao import obter_projecao
+
+# Dimensão -> chave do mapa de nomes do MotorRelatorios
+MAPA_NOMES_DIMENSOES = {
+    'CATEGORIA': 'categoria',
+    'ORIGEM': 'origem',
+    'ESPECIE': 'especie',
+    'ALINEA': 'alinea',
+    'GRUPO': 'grupo',
+    'MODALIDADE': 'modalidade',
+    'ELEMENTO': 'elemento'
+}
+
+# Tipo de linha por nível hierárquico
+TIPOS_LINHA = ['principal', 'filha']
+
+FORMATADORES = {
+    'moeda': formatar_numero,
+    'percentual': formatar_percentual_simples,
+    'variacao': formatar_percentual
+}
+
+COLUNA_TODOS = '__todos'
+
+def executar_especificacao(df_completo: pd.DataFrame, nome_especificacao: str,
+                           estrutura_hierarquica: Optional[Dict] = None,
+                           noug_selecionada: Optional[str] = None,
+                           exercicios_comparados: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Executa uma especificação de relatório sobre o DataFrame
+
+    O resultado é memoizado por versão dos dados quando o DataFrame veio do cache_service.
+
+    Args:
+        df_completo: DataFrame com os dados
+        nome_especificacao: Chave em ESPECIFICACOES_RELATORIOS
+        estrutura_hierarquica: Estrutura que define ordem e nós exibidos (opcional)
+        noug_selecionada: NOUG selecionada para filtro (opcional)
+        exercicios_comparados: Exercícios do bloco 'comparativo' (padrão: o da especificação)
+
+    Returns:
+        Dict com dados_numericos, dados_para_ia, dados_pdf e mes_referencia
+        (dados_pdf traz também 'exercicios' quando a especificação é comparativa)
+    """
+    versao = cache_service.versao_dataframe(df_completo)
+
+    def calcular():
+        especificacao = resolver_exercicios(ESPECIFICACOES_RELATORIOS[nome_especificacao],
+                                            exercicios_disponiveis(df_completo), exercicios_comparados)
+        return _executar(df_completo, especificacao, estrutura_hierarquica, noug_selecionada)
+
+    if versao is None:
+        return calcular()
+
+    chave = ('especificacao', versao, nome_especificacao, noug_selecionada or 'todos',
+             repr(estrutura_hierarquica), exercicios_comparados)
+    return cache_service.memoizar(chave, calcular)
+
+def exercicios_disponiveis(df: pd.DataFrame) -> List[int]:
+    """Exercícios presentes nos dados, em ordem crescente"""
+    if 'COEXERCICIO' not in df.columns or df.empty:
+        return []
+    return sorted(int(ano) for ano in pd.unique(df['COEXERCICIO']))
+
+def resolver_exercicios(especificacao: Dict, exercicios: List[int],
+                        exercicios_comparados: Optional[int] = None) -> Dict:
+    """
+    Resolve os exercícios relativos da especificação para os anos presentes nos dados
+
+    Substitui EXERCICIO_ATUAL/EXERCICIO_ANTERIOR nos filtros e expande o bloco
+    'comparativo' em uma medida por exercício mais participação e Δ% consecutivos.
+
+    Args:
+        especificacao: Especificação declarada em ESPECIFICACOES_RELATORIOS
+        exercicios: Exercícios disponíveis (crescente)
+        exercicios_comparados: Quantos exercícios recentes o 'comparativo' expande
+                               (padrão: comparativo['exercicios'] da especificação)
+
+    Returns:
+        Nova especificação com anos concretos (a original não é alterada)
+    """
+    if not exercicios:
+        return especificacao
+    anos = {'atual': exercicios[-1], 'anterior': exercicios[-1] - 1}
+
+    def resolver(filtros: Dict) -> Dict:
+        return {coluna: int(valor.format(**anos)) if isinstance(valor, str) and valor.startswith('{') else valor
+                for coluna, valor in filtros.items()}
+
+    resolvida = dict(especificacao)
+    resolvida['anos'] = anos
+    resolvida['filtros'] = resolver(especificacao.get('filtros', {}))
+    resolvida['medidas'] = {nome: {**medida, 'filtros': resolver(medida.get('filtros', {}))}
+                            for nome, medida in especificacao.get('medidas', {}).items()}
+    if especificacao.get('mes_referencia'):
+        resolvida['mes_referencia'] = resolver(especificacao['mes_referencia'])
+
+    comparativo = especificacao.get('comparativo')
+    if comparativo:
+        quantidade = exercicios_comparados or comparativo.get('exercicios', 2)
+        _expandir_comparativo(resolvida, comparativo, exercicios[-quantidade:])
+    return resolvida
+
+def _expandir_comparativo(especificacao: Dict, comparativo: Dict, anos: List[int]):
+    """Gera medidas, formatos, cabeçalho e colunas do PDF por exercício (in-place)"""
+    medida = comparativo['medida']
+    formatos = dict(especificacao.get('formatos', {}))
+    cabecalho = list(especificacao['cabecalho'])
+    colunas_pdf = list(especificacao.get('colunas_pdf', []))
+
+    for ano in anos:
+        especificacao['medidas'][f'valor_{ano}'] = {**medida,
+                                                    'filtros': {**medida.get('filtros', {}), 'COEXERCICIO': ano}}
+        formatos[f'perc_{ano}'] = 'percentual'
+        cabecalho += [f"{comparativo['rotulo']} {ano}", f'% {ano}']
+        colunas_pdf += [f'valor_{ano}', f'perc_{ano}']
+    for anterior, ano in zip(anos, anos[1:]):
+        formatos[f'delta_{ano}'] = 'variacao'
+        cabecalho.append('Δ%' if len(anos) == 2 else f'Δ% {ano}/{anterior}')
+        colunas_pdf.append(f'delta_{ano}')
+
+    especificacao.update({
+        'formatos': formatos,
+        'cabecalho': cabecalho,
+        'colunas_pdf': colunas_pdf,
+        'manter_se': ' or '.join(f'valor_{ano} != 0' for ano in anos),
+        'exercicios': list(anos)
+    })
+
+def _executar(df_completo, especificacao, estrutura_hierarquica, noug_selecionada):
+    """Executa a especificação sem consultar o cache"""
+    motor = MotorRelatorios(df_completo, tipo_dados=especificacao.get('tipo_dados', 'receita'))
+
+    # NOUG e filtros da especificação descem até agregar(); aqui só se recortam as colunas do mês
+    filtros = dict(especificacao.get('filtros', {}))
+    if noug_selecionada and noug_selecionada != 'todos':
+        filtros['NOUG'] = noug_selecionada
+    colunas_mes = [c for c in dict.fromkeys(['INMES', *especificacao.get('mes_referencia', {})])
+                   if c in df_completo.columns]
+    if filtros:
+        df_mes = df_completo.loc[mascara_filtros(df_completo, filtros), colunas_mes]
+    else:
+        df_mes = df_completo[colunas_mes]
+
+    mes_referencia = _calcular_mes_referencia(df_mes, especificacao)
+    vazio = {'dados_numericos': [], 'dados_para_ia': [], 'dados_pdf': {}, 'mes_referencia': mes_referencia}
+
+    if len(df_mes) == 0:
+        return vazio
+
+    dimensoes = especificacao['dimensoes']
+    medidas = especificacao['medidas']
+    tabela = agregar_medidas(df_completo, dimensoes, medidas, filtros)
+    if 'projecao' in especificacao:
+        _anexar_projecao(tabela, df_completo, especificacao, noug_selecionada)
+
+    return montar_relatorio(tabela, motor, especificacao, estrutura_hierarquica, mes_referencia)
+
+def montar_relatorio(tabela: pd.DataFrame, motor: MotorRelatorios, especificacao: Dict,
+                     estrutura_hierarquica: Optional[Dict], mes_referencia: str) -> Dict[str, Any]:
+    """
+    Linhas, totais e formatos do relatório a partir da tabela de medidas do nível mais fino
+
+    Args:
+        tabela: DataFrame indexado pelas dimensões da especificação (saída de agregar_medidas)
+        motor: MotorRelatorios com os mapas de nomes
+        especificacao: Especificação com exercícios resolvidos
+        estrutura_hierarquica: Estrutura que define ordem e nós exibidos (opcional)
+        mes_referencia: Mês de referência já calculado
+
+    Returns:
+        Dict com dados_numericos, dados_para_ia, dados_pdf e mes_referencia
+    """
+    vazio = {'dados_numericos': [], 'dados_para_ia': [], 'dados_pdf': {}, 'mes_referencia': mes_referencia}
+    if tabela.empty:
+        return vazio
+    dimensoes = especificacao['dimensoes']
+
+    # Tabelas por nível hierárquico com medidas e derivadas calculadas de forma vetorizada
+    niveis = []
+    for profundidade in range(1, len(dimensoes) + 1):
+        nivel = tabela.groupby(level=list(range(profundidade)), sort=False).sum()
+        niveis.append(nivel)
+
+    total_geral = tabela.sum().to_frame().T
+    for nivel in niveis:
+        _aplicar_derivadas(nivel, especificacao, total_geral)
+
+    linhas_por_nivel = [_linhas_mantidas(nivel, especificacao) for nivel in niveis]
+
+    dados_numericos = []
+    exibidos = set()
+    nos = _percorrer_estrutura(estrutura_hierarquica, niveis, len(dimensoes))
+    for caminho in nos:
+        profundidade = len(caminho) - 1
+        chave = caminho[0] if profundidade == 0 else caminho
+        mantidas = linhas_por_nivel[profundidade]
+        if chave not in mantidas:
+            continue
+
+        nome = motor.mapas_nomes.get(MAPA_NOMES_DIMENSOES.get(dimensoes[profundidade], ''), {}).get(caminho[-1], '')
+        if not nome:
+            continue
+
+        # Só desce na hierarquia se o nível superior foi exibido
+        if profundidade > 0 and caminho[:-1] not in exibidos:
+            continue
+        exibidos.add(caminho)
+
+        linha = {
+            'tipo': TIPOS_LINHA[min(profundidade, len(TIPOS_LINHA) - 1)],
+            'especificacao': f"{'  ' * profundidade}{nome}",
+            '_caminho': caminho
+        }
+        linha.update(mantidas[chave])
+        dados_numericos.append(linha)
+
+    if not dados_numericos:
+        return vazio
+
+    # Linha de total
+    if especificacao.get('total', 'linhas') == 'geral':
+        total = total_geral.copy()
+    else:
+        principais = niveis[0].loc[[l['_caminho'][0] for l in dados_numericos if l['tipo'] == 'principal']]
+        total = principais[list(tabela.columns)].sum().to_frame().T
+    _aplicar_derivadas(total, especificacao, total_geral)
+    linha_total = {'tipo': 'total', 'especificacao': 'TOTAL GERAL'}
+    linha_total.update(_valores_linha(total.iloc[0], especificacao))
+    dados_numericos.append(linha_total)
+
+    for linha in dados_numericos:
+        linha.pop('_caminho', None)
+        _formatar_linha(linha, especificacao)
+
+    dados_para_ia = [linha.copy() for linha in dados_numericos]
+
+    cabecalho = [titulo.format(mes=mes_referencia, **especificacao.get('anos', {}))
+                 for titulo in especificacao['cabecalho']]
+    dados_pdf = {
+        "head": [cabecalho],
+        "body": [
+            [linha['especificacao']] + [linha.get(f'{campo}_fmt', 'R$ 0,00') for campo in especificacao['colunas_pdf']]
+            for linha in dados_numericos
+        ]
+    }
+    if 'exercicios' in especificacao:
+        dados_pdf['exercicios'] = especificacao['exercicios']
+
+    return {
+        'dados_numericos': dados_numericos,
+        'dados_para_ia': dados_para_ia,
+        'dados_pdf': dados_pdf,
+        'mes_referencia': mes_referencia
+    }
+
+def agregar_medidas(df: pd.DataFrame, dimensoes: List[str], medidas: Dict[str, Dict],
+                    filtros: Optional[Dict] = None) -> pd.DataFrame:
+    """
+    Agrega todas as medidas em uma única passada sobre o DataFrame
+
+    Agrupa pelas dimensões mais as colunas usadas nos filtros das medidas (via agregar,
+    no backend de cálculo ativo); cada medida é então extraída do resultado agregado (pequeno)
+    em vez de reescanear os dados.
+
+    Args:
+        df: DataFrame de entrada
+        dimensoes: Colunas das linhas do relatório (vazia para um único total)
+        medidas: Definição das medidas (coluna, agregacao, filtros, alternativa)
+        filtros: Filtros aplicados a todas as medidas, repassados a agregar() (opcional)
+
+    Returns:
+        DataFrame indexado pelas dimensões com uma coluna por medida
+    """
+    colunas_filtro = sorted({coluna for medida in medidas.values()
+                             for coluna in medida.get('filtros', {}) if coluna not in dimensoes})
+    if dimensoes:
+        dimensoes = list(dimensoes)
+        chaves = dimensoes + colunas_filtro
+    else:
+        # Totais gerais: agrupa por uma chave constante
+        dimensoes = [COLUNA_TODOS]
+        chaves = [pd.Series(0, index=df.index, name=COLUNA_TODOS)] + colunas_filtro
+
+    colunas_valor = {}
+    for nome, medida in medidas.items():
+        if medida.get('agregacao', 'soma') == 'contagem':
+            colunas_valor[nome] = COLUNA_REGISTROS
+            continue
+        coluna = medida['coluna']
+        if coluna not in df.columns:
+            coluna = medida.get('alternativa') if medida.get('alternativa') in df.columns else None
+        colunas_valor[nome] = coluna
+
+    somar = sorted({c for c in colunas_valor.values() if c and c != COLUNA_REGISTROS})
+    agregado = agregar(df, chaves, somar, filtros)
+
+    resultado = {}
+    for nome, medida in medidas.items():
+        coluna = colunas_valor[nome]
+        selecao = agregado
+        for coluna_filtro, valor in medida.get('filtros', {}).items():
+            selecao = selecao[selecao.index.get_level_values(coluna_filtro) == valor]
+        if coluna is None:
+            serie = pd.Series(0.0, index=selecao.index)
+        else:
+            serie = selecao[coluna].astype('float64')
+        resultado[nome] = serie.groupby(level=list(range(len(dimensoes))), sort=False).sum()
+
+    indice = agregado.groupby(level=list(range(len(dimensoes))), sort=False).size().index
+    return pd.DataFrame(resultado).reindex(indice).fillna(0.0)
+
+def _anexar_projecao(tabela: pd.DataFrame, df_completo: pd.DataFrame, especificacao: Dict,
+                     noug_selecionada: Optional[str]):
+    """
+    Coluna de projeção de fechamento do exercício atual (in-place)
+
+    As séries são ajustadas por NOUG x dimensões uma vez por versão dos dados e somadas até o
+    nível mais fino da tabela; os níveis superiores e o total somam as projeções das folhas
+    """
+    config = especificacao['projecao']
+    projecao = obter_projecao(df_completo, especificacao['dimensoes'], config['coluna'],
+                              especificacao.get('anos', {}).get('atual'))
+    projetado = projecao.por_dimensoes(noug_selecionada)['projetado']
+    tabela[config.get('nome', 'projecao')] = projetado.reindex(tabela.index).fillna(0.0).to_numpy(dtype=np.float64)
+
+def _aplicar_derivadas(nivel: pd.DataFrame, especificacao: Dict, total_geral: pd.DataFrame):
+    """Calcula as colunas derivadas de forma vetorizada (in-place)"""
+    for nome, formula in especificacao.get('derivadas', {}).items():
+        if isinstance(formula, str):
+            nivel[nome] = nivel.eval(formula).astype('float64')
+            continue
+
+        funcao, *argumentos = formula
+        if funcao == 'participacao':
+            base = float(total_geral[argumentos[0]].iloc[0])
+            nivel[nome] = nivel[argumentos[0]] / base * 100 if base > 0 else 0.0
+        elif funcao == 'variacao_percentual':
+            nivel[nome] = variacao_percentual(nivel[argumentos[0]].to_numpy(), nivel[argumentos[1]].to_numpy())
+        else:
+            raise ValueError(f"Função derivada desconhecida: {funcao}")
+
+    if especificacao.get('exercicios'):
+        _aplicar_comparativo(nivel, especificacao['exercicios'], total_geral)
+
+def _aplicar_comparativo(nivel: pd.DataFrame, anos: List[int], total_geral: pd.DataFrame):
+    """Participação e Δ% de todos os exercícios de uma vez, como matriz linhas x anos (in-place)"""
+    colunas = [f'valor_{ano}' for ano in anos]
+    valores = nivel[colunas].to_numpy(dtype='float64')
+    totais = total_geral[colunas].to_numpy(dtype='float64')[0]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        participacao = np.where(totais > 0, valores / totais * 100, 0.0)
+    variacao = variacao_percentual(valores[:, :-1], valores[:, 1:])
+
+    for posicao, ano in enumerate(anos):
+        nivel[f'perc_{ano}'] = participacao[:, posicao]
+    for posicao, ano in enumerate(anos[1:]):
+        nivel[f'delta_{ano}'] = variacao[:, posicao]
+
+def variacao_percentual(base: np.ndarray, atual: np.ndarray) -> np.ndarray:
+    """
+    Variação percentual vetorizada: (atual - base) / base * 100
+    Quando a base não é positiva retorna 100 se houver valor atual positivo, senão 0
+    """
+    base = np.asarray(base, dtype='float64')
+    atual = np.asarray(atual, dtype='float64')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        variacao = (atual - base) / base * 100
+    return np.where(base > 0, variacao, np.where(atual > 0, 100.0, 0.0))
+
+def razao_percentual(numerador, denominador, padrao: float = np.nan) -> np.ndarray:
+    """
+    Razão percentual vetorizada: numerador / denominador * 100
+    Onde o denominador não é positivo retorna padrao (NaN: indicadores sem base de cálculo;
+    0: % de execução exibida e ordenada nos relatórios por unidade)
+    """
+    numerador = np.asarray(numerador, dtype=np.float64)
+    denominador = np.asarray(denominador, dtype=np.float64)
+    resultado = np.full(np.broadcast(numerador, denominador).shape, padrao, dtype=np.float64)
+    np.divide(numerador * 100, denominador, out=resultado, where=denominador > 0)
+    return resultado
+
+def _linhas_mantidas(nivel: pd.DataFrame, especificacao: Dict) -> Dict:
+    """Aplica a condição manter_se e retorna {chave: valores} das linhas mantidas"""
+    condicao = especificacao.get('manter_se')
+    if condicao:
+        nivel = nivel[nivel.eval(condicao).to_numpy(dtype=bool)]
+    return {chave: _valores_linha(valores, especificacao) for chave, valores in nivel.iterrows()}
+
+def _valores_linha(valores: pd.Series, especificacao: Dict) -> Dict[str, float]:
+    """Converte uma linha agregada em dicionário, sem as medidas de contagem"""
+    ocultas = {nome for nome, medida in especificacao['medidas'].items()
+               if medida.get('agregacao', 'soma') == 'contagem'}
+    return {campo: float(valor) for campo, valor in valores.items() if campo not in ocultas}
+
+def _formatar_linha(linha: Dict, especificacao: Dict):
+    """Adiciona os campos *_fmt conforme os formatos da especificação (in-place)"""
+    formatos = especificacao.get('formatos', {})
+    for campo, valor in list(linha.items()):
+        if isinstance(valor, float):
+            linha[f'{campo}_fmt'] = FORMATADORES[formatos.get(campo, 'moeda')](valor)
+
+def _percorrer_estrutura(estrutura_hierarquica, niveis, profundidade_maxima) -> List[tuple]:
+    """
+    Lista os caminhos de nós (em ordem de exibição) até a profundidade das dimensões
+
+    Sem estrutura, usa os códigos presentes nos dados em ordem crescente.
+    """
+    caminhos = []
+
+    def visitar(no, prefixo):
+        if len(prefixo) >= profundidade_maxima or no is None:
+            return
+        codigos = no.keys() if isinstance(no, dict) else no
+        for codigo in codigos:
+            caminho = prefixo + (codigo,)
+            caminhos.append(caminho)
+            visitar(no[codigo] if isinstance(no, dict) else None, caminho)
+
+    if estrutura_hierarquica is None:
+        estrutura_hierarquica = _estrutura_dos_dados(niveis[-1].index, profundidade_maxima)
+    visitar(estrutura_hierarquica, ())
+    return caminhos
+
+def _estrutura_dos_dados(indice: pd.Index, profundidade_maxima: int) -> Dict:
+    """Monta a estrutura hierárquica a partir dos códigos presentes no índice"""
+    estrutura = {}
+    for chave in sorted(indice):
+        chave = chave if isinstance(chave, tuple) else (chave,)
+        no = estrutura
+        for codigo in chave[:profundidade_maxima]:
+            no = no.setdefault(codigo, {})
+    return estrutura
+
+def _calcular_mes_referencia(df: pd.DataFrame, especificacao: Dict) -> str:
+    """Mês de referência no recorte definido pela especificação"""
+    recorte = especificacao.get('mes_referencia')
+    if not recorte:
+        return obter_mes_numero(df)
+
+    df_recorte = df
+    for coluna, valor in recorte.items():
+        df_recorte = df_recorte[df_recorte[coluna] == valor]
+    return obter_mes_numero(df_recorte if not df_recorte.empty else df)
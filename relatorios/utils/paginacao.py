@@ -0,0 +1,49 @@
+"""
+Paginação no servidor dos relatórios com muitas linhas
+O relatório ordena todas as linhas e só formata as da página exibida; o TOTAL GERAL e o PDF
+continuam cobrindo todas as linhas
+"""
+from typing import Dict, Tuple
+
+LINHAS_POR_PAGINA = 50
+OPCOES_LINHAS_PAGINA = [25, 50, 100, 200]
+
+def parametros_paginacao(args) -> Tuple[int, int]:
+    """
+    Página e linhas por página pedidas em ?pagina= e ?por_pagina=
+
+    Args:
+        args: request.args
+
+    Returns:
+        Tuple: (pagina, por_pagina); por_pagina fora de OPCOES_LINHAS_PAGINA vira LINHAS_POR_PAGINA
+    """
+    pagina = args.get('pagina', 1, type=int)
+    por_pagina = args.get('por_pagina', LINHAS_POR_PAGINA, type=int)
+    if por_pagina not in OPCOES_LINHAS_PAGINA:
+        por_pagina = LINHAS_POR_PAGINA
+    return pagina, por_pagina
+
+def paginar(total_itens: int, pagina: int = 1, por_pagina: int = LINHAS_POR_PAGINA) -> Dict:
+    """
+    Intervalo de itens da página, com a página ajustada ao intervalo válido
+
+    Args:
+        total_itens: Itens do relatório (já ordenados)
+        pagina: Página pedida
+        por_pagina: Itens por página
+
+    Returns:
+        Dict com 'pagina', 'total_paginas', 'por_pagina', 'inicio' e 'fim' (fatia inicio:fim)
+    """
+    por_pagina = max(1, int(por_pagina))
+    total_paginas = max(1, -(-total_itens // por_pagina))
+    pagina = min(max(1, int(pagina)), total_paginas)
+    inicio = (pagina - 1) * por_pagina
+    return {
+        'pagina': pagina,
+        'total_paginas': total_paginas,
+        'por_pagina': por_pagina,
+        'inicio': inicio,
+        'fim': min(inicio + por_pagina, total_itens)
+    }
@@ -0,0 +1,170 @@
+"""
+Planejador de consultas para páginas com vários agregados (dashboard, indicadores)
+Agrupa as requisições de uma página por tabela e executa uma única passada em cada uma
+"""
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional
+
+from cache_service import cache_service
+from .motor_especificacao import agregar_medidas
+
+SEPARADOR = '::'
+
+# Marca das chaves nulas na passada fundida (o agrupamento descarta chaves nulas)
+NULO = '__nulo__'
+
+class PlanejadorConsultas:
+    """
+    Recebe um lote de requisições de agregados e as executa com uma varredura por tabela
+
+    Cada requisição informa a tabela, as dimensões de agrupamento, as medidas (mesmo formato
+    das especificações: coluna, agregacao, filtros, alternativa) e filtros próprios. Requisições
+    da mesma tabela são fundidas: o planejador agrupa pela união das dimensões e das colunas de
+    filtro e depois distribui o resultado (pequeno) para cada requisição.
+
+    Chaves nulas nas colunas fundidas não descartam linhas: uma requisição que não agrupa
+    por uma dimensão soma as linhas em que ela é nula, como faria executada sozinha.
+    """
+
+    def __init__(self, tabelas: Dict[str, pd.DataFrame]):
+        """
+        Inicializa o planejador
+
+        Args:
+            tabelas: Nome lógico -> DataFrame (ex: {'receita': df_receita, 'despesa': df_despesa})
+        """
+        self.tabelas = tabelas
+        self.requisicoes: Dict[str, Dict] = {}
+
+    def requisitar(self, nome: str, tabela: str, dimensoes: List[str], medidas: Dict[str, Dict],
+                   filtros: Optional[Dict] = None):
+        """
+        Registra uma requisição de agregado
+
+        Args:
+            nome: Identificador da requisição na página
+            tabela: Nome lógico da tabela
+            dimensoes: Colunas de agrupamento (lista vazia para totais)
+            medidas: Medidas no formato das especificações
+            filtros: Filtros de igualdade aplicados a todas as medidas da requisição
+        """
+        if SEPARADOR in nome:
+            raise ValueError(f"Nome de requisição não pode conter '{SEPARADOR}': {nome}")
+        self.requisicoes[nome] = {
+            'tabela': tabela,
+            'dimensoes': list(dimensoes),
+            'medidas': medidas,
+            'filtros': filtros or {}
+        }
+
+    def plano(self) -> Dict[str, Dict]:
+        """
+        Monta o plano de execução: uma entrada por tabela com dimensões e medidas fundidas
+
+        Returns:
+            Dict tabela -> {'dimensoes': [...], 'medidas': {...}}
+        """
+        plano = {}
+        for nome, requisicao in self.requisicoes.items():
+            entrada = plano.setdefault(requisicao['tabela'], {'dimensoes': [], 'medidas': {}})
+            for dimensao in requisicao['dimensoes']:
+                if dimensao not in entrada['dimensoes']:
+                    entrada['dimensoes'].append(dimensao)
+            for nome_medida, medida in requisicao['medidas'].items():
+                medida_fundida = dict(medida)
+                medida_fundida['filtros'] = {**requisicao['filtros'], **medida.get('filtros', {})}
+                entrada['medidas'][f"{nome}{SEPARADOR}{nome_medida}"] = medida_fundida
+        return plano
+
+    def executar(self) -> Dict[str, pd.DataFrame]:
+        """
+        Executa o plano e distribui os resultados para as requisições
+
+        Returns:
+            Dict nome da requisição -> DataFrame indexado pelas suas dimensões
+            (uma única linha sem índice nomeado quando não há dimensões)
+        """
+        resultados = {}
+        for tabela, entrada in self.plano().items():
+            df = self.tabelas.get(tabela)
+            if df is None or df.empty:
+                agregado = None
+            else:
+                agregado = self._agregar_tabela(df, tabela, entrada)
+
+            for nome, requisicao in self.requisicoes.items():
+                if requisicao['tabela'] != tabela:
+                    continue
+                resultados[nome] = self._distribuir(agregado, nome, requisicao)
+        return resultados
+
+    def _agregar_tabela(self, df: pd.DataFrame, tabela: str, entrada: Dict) -> pd.DataFrame:
+        """Uma passada sobre a tabela, memoizada pela versão dos dados"""
+        dimensoes = entrada['dimensoes']
+
+        def calcular():
+            colunas = dimensoes + [coluna for medida in entrada['medidas'].values()
+                                   for coluna in medida.get('filtros', {})]
+            df_plano, tipos = _marcar_nulos(df, colunas)
+            agregado = agregar_medidas(df_plano, dimensoes, entrada['medidas'])
+            agregado.index = _restaurar_nulos(agregado.index, tipos)
+            return agregado
+
+        versao = cache_service.versao_dataframe(df)
+        if versao is None:
+            return calcular()
+        return cache_service.memoizar(('planejador', versao, tabela, repr(entrada)), calcular)
+
+    @staticmethod
+    def _distribuir(agregado: Optional[pd.DataFrame], nome: str, requisicao: Dict) -> pd.DataFrame:
+        """Extrai as colunas da requisição e reagrupa pelas suas dimensões"""
+        prefixo = f"{nome}{SEPARADOR}"
+        colunas = {f"{prefixo}{medida}": medida for medida in requisicao['medidas']}
+
+        if agregado is None or agregado.empty:
+            if not requisicao['dimensoes']:
+                return pd.DataFrame([[0.0] * len(colunas)], columns=list(colunas.values()))
+            return pd.DataFrame(columns=list(colunas.values()), dtype='float64')
+
+        selecao = agregado[list(colunas)].rename(columns=colunas)
+        if not requisicao['dimensoes']:
+            return selecao.sum().to_frame().T
+        return selecao.groupby(level=requisicao['dimensoes'], observed=True, sort=True).sum()
+
+def _marcar_nulos(df: pd.DataFrame, colunas: List[str]):
+    """
+    Troca os nulos das colunas de agrupamento por NULO (como categoria extra)
+
+    Returns:
+        Tuple: (DataFrame da passada, {coluna marcada: tipo original dos valores})
+    """
+    nulas = [coluna for coluna in dict.fromkeys(colunas) if coluna in df.columns and df[coluna].isna().any()]
+    if not nulas:
+        return df, {}
+    tipos, marcadas = {}, {}
+    for coluna in nulas:
+        serie = df[coluna]
+        if not isinstance(serie.dtype, pd.CategoricalDtype):
+            serie = serie.astype('category')
+        tipos[coluna] = serie.cat.categories.dtype
+        marcadas[coluna] = serie.cat.add_categories([NULO]).fillna(NULO)
+    return df.assign(**marcadas), tipos
+
+def _restaurar_nulos(indice: pd.Index, tipos: Dict) -> pd.Index:
+    """Volta NULO a nulo nos níveis marcados, com o tipo original dos valores"""
+    if not tipos or not any(nome in tipos for nome in indice.names):
+        return indice
+    if not isinstance(indice, pd.MultiIndex):
+        return pd.Index(indice.where(indice != NULO), name=indice.name).astype(tipos[indice.name])
+
+    niveis, codigos = list(indice.levels), [np.asarray(c) for c in indice.codes]
+    for i, nome in enumerate(indice.names):
+        if nome not in tipos:
+            continue
+        if NULO in niveis[i]:
+            posicao = niveis[i].get_loc(NULO)
+            codigos[i] = np.where(codigos[i] == posicao, -1, codigos[i] - (codigos[i] > posicao))
+            niveis[i] = niveis[i].delete(posicao)
+        niveis[i] = niveis[i].astype(tipos[nome])
+    return pd.MultiIndex(levels=niveis, codes=codigos, names=indice.names)
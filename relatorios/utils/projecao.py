@@ -0,0 +1,174 @@
+"""
+Projeção de fechamento do exercício (12/AAAA) da receita realizada
+Todas as séries (NOUG x nó da hierarquia) são ajustadas de uma vez sobre a matriz série x mês:
+- sazonal: realizado do mês ~ β x mesmo mês do exercício anterior (β de cada série em forma fechada),
+  usado nos meses restantes que o exercício anterior tem; os meses que faltam na base anterior
+  (exercício anterior incompleto) vêm do modelo linear;
+- linear: tendência a + b x mês por mínimos quadrados em lote (numpy.linalg.lstsq com uma
+  coluna de resposta por série), usado nas demais; com menos de MINIMO_MESES_TENDENCIA meses
+  observados, ou se a tendência levar algum mês restante abaixo de zero, a série usa a média
+  mensal observada (ritmo atual).
+A projeção é o realizado até o último mês mais os meses restantes estimados, cada um limitado a
+no mínimo zero (a projeção nunca fica abaixo do realizado); o ajuste é refeito só quando a
+versão dos dados muda
+"""
+import numpy as np
+import pandas as pd
+from typing import List, Optional
+
+from cache_service import cache_service
+from .agregacao import agregar
+from .cubo_mensal import detalhe_mensal
+from .data_utils import obter_exercicio_atual
+
+MESES_ANO = 12
+# Abaixo disso a tendência de poucos pontos extrapola demais os meses restantes: usa o ritmo atual
+MINIMO_MESES_TENDENCIA = 6
+COLUNA_PROJECAO = 'RECEITA LIQUIDA'
+
+MODELO_SAZONAL = 'sazonal'
+MODELO_LINEAR = 'linear'
+
+class ProjecaoAnual:
+    """
+    Projeção de fechamento de cada série (NOUG + dimensões) do exercício atual
+    """
+
+    def __init__(self, df: pd.DataFrame, dimensoes: List[str], coluna: str = COLUNA_PROJECAO,
+                 exercicio: Optional[int] = None):
+        """
+        Ajusta os modelos de todas as séries
+
+        Args:
+            df: DataFrame de receita
+            dimensoes: Dimensões da hierarquia (ex: ['CATEGORIA', 'ORIGEM'])
+            coluna: Medida projetada
+            exercicio: Exercício projetado (padrão: o mais recente dos dados)
+        """
+        self.dimensoes = list(dimensoes)
+        self.exercicio = exercicio if exercicio is not None else obter_exercicio_atual(df)
+        self.chaves = pd.MultiIndex.from_tuples([], names=['NOUG'] + self.dimensoes)
+        self.realizado = self.projetado = np.empty(0, dtype=np.float64)
+        self.modelos = np.empty(0, dtype=object)
+        self.ultimo_mes = 0
+
+        if df.empty or coluna not in df.columns:
+            return
+        agregado = agregar(df, ['NOUG'] + self.dimensoes + ['COEXERCICIO', 'INMES'], [coluna],
+                           {'COEXERCICIO': [self.exercicio - 1, self.exercicio]})
+        if agregado.empty:
+            return
+
+        indice = agregado.index
+        serie, chaves = pd.factorize(indice.droplevel(['COEXERCICIO', 'INMES']))
+        self.chaves = pd.MultiIndex.from_tuples(list(chaves), names=['NOUG'] + self.dimensoes)
+        exercicios = indice.get_level_values('COEXERCICIO').to_numpy(dtype=np.int64)
+        meses = indice.get_level_values('INMES').to_numpy(dtype=np.int64) - 1
+
+        # Matrizes série x mês do exercício atual e do anterior
+        atual = np.zeros((len(self.chaves), MESES_ANO), dtype=np.float64)
+        anterior = np.zeros((len(self.chaves), MESES_ANO), dtype=np.float64)
+        # Meses que a base do exercício anterior tem (com lançamentos, mesmo que somem zero)
+        coberto = np.zeros((len(self.chaves), MESES_ANO), dtype=bool)
+        valores = agregado[coluna].to_numpy(dtype=np.float64)
+        eh_atual = exercicios == self.exercicio
+        atual[serie[eh_atual], meses[eh_atual]] = valores[eh_atual]
+        anterior[serie[~eh_atual], meses[~eh_atual]] = valores[~eh_atual]
+        coberto[serie[~eh_atual], meses[~eh_atual]] = True
+
+        self.ultimo_mes = int(meses[eh_atual].max()) + 1 if eh_atual.any() else 0
+        self.realizado = atual[:, :self.ultimo_mes].sum(axis=1)
+        meses_lineares = self._meses_lineares(atual[:, :self.ultimo_mes])
+        meses_sazonais, sazonal = self._meses_sazonais(atual, anterior, coberto)
+
+        # Mês restante sem base no exercício anterior: tendência linear, mesmo em série sazonal
+        coberto_restante = coberto[:, self.ultimo_mes:] & sazonal[:, None]
+        self.modelos = np.where(sazonal, MODELO_SAZONAL, MODELO_LINEAR).astype(object)
+        self.projetado = self.realizado + np.where(coberto_restante, meses_sazonais, meses_lineares).sum(axis=1)
+
+    def _meses_lineares(self, observado: np.ndarray) -> np.ndarray:
+        """
+        Estimativa de cada mês restante pela tendência a + b x mês ajustada em lote
+
+        Com menos de MINIMO_MESES_TENDENCIA meses observados, e nas séries cuja tendência fica
+        negativa em algum mês restante, vale a média dos meses observados; cada mês estimado é
+        limitado a no mínimo zero.
+
+        Returns:
+            Matriz série x mês restante
+        """
+        m = observado.shape[1]
+        if m == 0 or m >= MESES_ANO:
+            return np.zeros((observado.shape[0], MESES_ANO - m), dtype=np.float64)
+        if m < MINIMO_MESES_TENDENCIA:
+            ritmo = np.maximum(observado.mean(axis=1), 0.0)
+            return np.repeat(ritmo[:, None], MESES_ANO - m, axis=1)
+
+        meses = np.arange(1, m + 1, dtype=np.float64)
+        restantes = np.arange(m + 1, MESES_ANO + 1, dtype=np.float64)
+        projeto = np.column_stack([np.ones(m), meses])
+        futuro = np.column_stack([np.ones(len(restantes)), restantes])
+
+        coeficientes, *_ = np.linalg.lstsq(projeto, observado.T, rcond=None)
+        estimativas = futuro @ coeficientes
+        tendencia_negativa = (estimativas < 0).any(axis=0)
+        estimativas = np.where(tendencia_negativa, observado.mean(axis=1), estimativas)
+        return np.maximum(estimativas, 0.0).T
+
+    def _meses_sazonais(self, atual: np.ndarray, anterior: np.ndarray, coberto: np.ndarray):
+        """
+        Estimativa de cada mês restante pelo perfil do exercício anterior: β = Σ(atual x anterior) / Σ anterior²
+        nos meses observados; cada mês estimado é limitado a no mínimo zero
+
+        Returns:
+            Tuple: (matriz série x mês restante, se a série tem base sazonal: β calculável
+            e algum mês restante coberto pelo exercício anterior)
+        """
+        m = self.ultimo_mes
+        observado, base = atual[:, :m], anterior[:, :m]
+        denominador = np.einsum('ij,ij->i', base, base)
+        beta = np.zeros(len(atual), dtype=np.float64)
+        np.divide(np.einsum('ij,ij->i', observado, base), denominador, out=beta, where=denominador > 0)
+        sazonal = (denominador > 0) & (coberto[:, m:] & (anterior[:, m:] != 0)).any(axis=1)
+        return np.maximum(beta[:, None] * anterior[:, m:], 0.0), sazonal
+
+    def por_dimensoes(self, noug_selecionada: Optional[str] = None) -> pd.DataFrame:
+        """
+        Realizado e projetado somados pelas dimensões (todas as NOUGs ou uma)
+
+        Args:
+            noug_selecionada: NOUG (opcional)
+
+        Returns:
+            DataFrame indexado pelas dimensões com colunas 'realizado' e 'projetado'
+        """
+        tabela = pd.DataFrame({'realizado': self.realizado, 'projetado': self.projetado}, index=self.chaves)
+        if noug_selecionada and noug_selecionada != 'todos':
+            nougs = self.chaves.get_level_values('NOUG').astype(str).str.strip()
+            tabela = tabela[nougs == str(noug_selecionada).strip()]
+        if tabela.empty:
+            return tabela.droplevel('NOUG') if isinstance(tabela.index, pd.MultiIndex) else tabela
+        return tabela.groupby(level=self.dimensoes, sort=True).sum()
+
+def obter_projecao(df: pd.DataFrame, dimensoes: List[str], coluna: str = COLUNA_PROJECAO,
+                   exercicio: Optional[int] = None) -> ProjecaoAnual:
+    """
+    Projeção das séries do DataFrame, ajustada uma vez por versão dos dados
+
+    Um recorte do seletor de mês é projetado a partir dos meses até o mês selecionado (detalhe_mensal).
+
+    Args:
+        df: DataFrame carregado pelo cache (ou recorte derivado)
+        dimensoes: Dimensões da hierarquia
+        coluna: Medida projetada
+        exercicio: Exercício projetado (padrão: o mais recente)
+
+    Returns:
+        ProjecaoAnual memoizada
+    """
+    df = detalhe_mensal(df)
+    versao = cache_service.versao_dataframe(df)
+    if versao is None:
+        return ProjecaoAnual(df, dimensoes, coluna, exercicio)
+    return cache_service.memoizar(('projecao', versao, tuple(dimensoes), coluna, exercicio),
+                                  lambda: ProjecaoAnual(df, dimensoes, coluna, exercicio))
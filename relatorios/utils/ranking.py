@@ -0,0 +1,184 @@
+"""
+Rankings (maiores / menores N) de origens, alíneas, NOUGs e elementos de despesa
+Cada dimensão é pré-agregada uma vez por versão dos dados em vetores (realizado no exercício
+atual, mesmo período do exercício anterior e previsto); qualquer N e critério sai de seleção
+parcial (numpy.argpartition) sobre esses vetores, ordenando só os N escolhidos
+"""
+import numpy as np
+import pandas as pd
+from typing import Dict, List
+
+from cache_service import cache_service
+from .agregacao import tabela_cruzada
+from .data_utils import obter_exercicio_atual
+
+# Dimensão -> (coluna de código, coluna de nome)
+DIMENSOES_RANKING = {
+    'receita': {
+        'origem': ('ORIGEM', 'NOFONTERECEITA'),
+        'alinea': ('ALINEA', 'NOALINEA'),
+        'noug': ('NOUG', 'NOUG')
+    },
+    'despesa': {
+        'categoria': ('CATEGORIA', 'NOCATEGORIA'),
+        'elemento': ('ELEMENTO', 'NOELEMENTO'),
+        'noug': ('NOUG', 'NOUG')
+    }
+}
+
+# Medida -> colunas somadas
+MEDIDAS_RANKING = {
+    'receita': {
+        'realizado': ['RECEITA LIQUIDA'],
+        'previsto': ['PREVISAO ATUALIZADA LIQUIDA']
+    },
+    'despesa': {
+        'realizado': ['DESPESA EMPENHADA'],
+        'previsto': ['DOTACAO INICIAL', 'DOTACAO ADICIONAL', 'CANCELAMENTO DE DOTACAO', 'CANCEL-REMANEJA DOTACAO']
+    }
+}
+
+CRITERIOS_RANKING = {
+    'realizado': 'Valor realizado',
+    'crescimento': 'Crescimento sobre o exercício anterior (mesmo período)',
+    'execucao': 'Execução (realizado / previsto)'
+}
+
+class IndiceRanking:
+    """
+    Vetores pré-agregados de uma dimensão para servir rankings por seleção parcial
+    """
+
+    def __init__(self, df: pd.DataFrame, tipo_dados: str, dimensao: str):
+        """
+        Agrega a dimensão (uma tabulação dimensão x exercício)
+
+        Args:
+            df: DataFrame de receita ou despesa
+            tipo_dados: 'receita' ou 'despesa'
+            dimensao: Chave de DIMENSOES_RANKING[tipo_dados]
+        """
+        if dimensao not in DIMENSOES_RANKING.get(tipo_dados, {}):
+            raise ValueError(f"Dimensão de ranking inválida para {tipo_dados}: {dimensao}")
+        coluna_codigo, coluna_nome = DIMENSOES_RANKING[tipo_dados][dimensao]
+        medidas = MEDIDAS_RANKING[tipo_dados]
+        colunas = sorted({c for lista in medidas.values() for c in lista if c in df.columns})
+
+        self.tipo_dados, self.dimensao = tipo_dados, dimensao
+        self.codigos = np.empty(0, dtype=object)
+        self.nomes = np.empty(0, dtype=object)
+        self.vetores = {criterio: np.empty(0, dtype=np.float64) for criterio in CRITERIOS_RANKING}
+        # 'crescimento' só tem base com o exercício anterior nos dados
+        self.tem_exercicio_anterior = False
+        if df.empty or coluna_codigo not in df.columns or not colunas:
+            return
+
+        # Exercício atual e anterior, até o último mês com dados no atual
+        self.exercicio = obter_exercicio_atual(df)
+        atual = df['COEXERCICIO'] == self.exercicio
+        ultimo_mes = int(df.loc[atual, 'INMES'].max()) if 'INMES' in df.columns else 12
+        selecao = (df['COEXERCICIO'] >= self.exercicio - 1)
+        if 'INMES' in df.columns:
+            selecao &= df['INMES'] <= ultimo_mes
+        recorte = df[selecao]
+
+        valores, exercicios, matrizes = tabela_cruzada(recorte, coluna_codigo, 'COEXERCICIO', colunas)
+        exercicios = np.asarray(exercicios)
+        colunas_exercicio = {int(e): j for j, e in enumerate(exercicios)}
+        self.tem_exercicio_anterior = self.exercicio - 1 in colunas_exercicio
+
+        def somar(lista, exercicio):
+            total = np.zeros(len(valores), dtype=np.float64)
+            j = colunas_exercicio.get(exercicio)
+            if j is not None:
+                for coluna in lista:
+                    if coluna in matrizes:
+                        total += matrizes[coluna][:, j]
+            return total
+
+        realizado = somar(medidas['realizado'], self.exercicio)
+        anterior = somar(medidas['realizado'], self.exercicio - 1)
+        previsto = somar(medidas['previsto'], self.exercicio)
+
+        crescimento = np.full(len(valores), np.nan)
+        np.divide((realizado - anterior) * 100, np.abs(anterior), out=crescimento, where=anterior != 0)
+        execucao = np.full(len(valores), np.nan)
+        np.divide(realizado * 100, previsto, out=execucao, where=previsto > 0)
+
+        self.codigos = np.asarray(valores, dtype=object)
+        self.nomes = self._resolver_nomes(recorte, coluna_codigo, coluna_nome)
+        self.vetores = {'realizado': realizado, 'crescimento': crescimento, 'execucao': execucao}
+        self.anterior, self.previsto = anterior, previsto
+
+    def _resolver_nomes(self, df: pd.DataFrame, coluna_codigo: str, coluna_nome: str) -> np.ndarray:
+        """Nome de cada código (primeiro nome encontrado; espaços à direita removidos)"""
+        if coluna_nome == coluna_codigo or coluna_nome not in df.columns:
+            return np.array([str(codigo).strip() for codigo in self.codigos], dtype=object)
+        pares = df[[coluna_codigo, coluna_nome]].drop_duplicates(coluna_codigo)
+        mapa = dict(zip(pares[coluna_codigo], pares[coluna_nome]))
+        return np.array([f"{str(codigo).strip()} - {str(mapa.get(codigo, '')).strip()}" for codigo in self.codigos],
+                        dtype=object)
+
+    def top(self, criterio: str = 'realizado', n: int = 5, maiores: bool = True) -> List[Dict]:
+        """
+        Os N maiores (ou menores) itens pelo critério
+
+        Args:
+            criterio: Chave de CRITERIOS_RANKING
+            n: Quantidade de itens
+            maiores: True para os maiores, False para os menores
+
+        Returns:
+            Lista de dicts (posicao, codigo, nome, valor, realizado, crescimento, execucao)
+
+        Raises:
+            ValueError: critério inválido, ou 'crescimento' sem o exercício anterior nos dados
+        """
+        if criterio not in CRITERIOS_RANKING:
+            raise ValueError(f"Critério de ranking inválido: {criterio}")
+        if criterio == 'crescimento' and not self.tem_exercicio_anterior:
+            raise ValueError(f"Critério 'crescimento' exige ao menos dois exercícios nos dados de {self.tipo_dados}")
+        vetor = self.vetores[criterio]
+        candidatos = np.flatnonzero(~np.isnan(vetor))
+        if len(candidatos) == 0 or n <= 0:
+            return []
+
+        chave = -vetor[candidatos] if maiores else vetor[candidatos]
+        if n < len(candidatos):
+            escolhidos = np.argpartition(chave, n - 1)[:n]
+        else:
+            escolhidos = np.arange(len(candidatos))
+        escolhidos = escolhidos[np.argsort(chave[escolhidos], kind='stable')]
+
+        return [
+            {
+                'posicao': posicao,
+                'codigo': str(self.codigos[i]).strip(),
+                'nome': self.nomes[i],
+                'valor': float(vetor[i]),
+                **{nome: _valor_ou_none(self.vetores[nome][i]) for nome in CRITERIOS_RANKING}
+            }
+            for posicao, i in enumerate(candidatos[escolhidos], start=1)
+        ]
+
+def _valor_ou_none(valor: float):
+    """Converte NaN (critério sem base de cálculo) em None para serialização"""
+    return None if np.isnan(valor) else float(valor)
+
+def obter_ranking(df: pd.DataFrame, tipo_dados: str, dimensao: str) -> IndiceRanking:
+    """
+    Índice de ranking da dimensão, construído uma vez por versão dos dados
+
+    Args:
+        df: DataFrame carregado pelo cache (ou recorte derivado)
+        tipo_dados: 'receita' ou 'despesa'
+        dimensao: Chave de DIMENSOES_RANKING[tipo_dados]
+
+    Returns:
+        IndiceRanking memoizado
+    """
+    versao = cache_service.versao_dataframe(df)
+    if versao is None:
+        return IndiceRanking(df, tipo_dados, dimensao)
+    return cache_service.memoizar(('ranking', versao, tipo_dados, dimensao),
+                                  lambda: IndiceRanking(df, tipo_dados, dimensao))
@@ -0,0 +1,57 @@
+"""
+Cálculo concorrente das seções independentes de uma página (dashboard)
+As seções rodam num pool de threads limitado: as agregações NumPy liberam o GIL, então
+seções sobre bases diferentes avançam em paralelo. Cada seção tem prazo próprio, contado
+a partir do envio; se estoura o prazo ou falha, a página sai com o valor substituto dela
+e a seção é listada como indisponível, sem segurar as demais. A thread de uma seção
+atrasada termina em segundo plano e, como os cálculos são memoizados por versão dos dados,
+a próxima requisição já encontra o resultado pronto.
+As funções das seções não devem enviar tarefas ao mesmo pool (o pool é limitado).
+"""
+import copy
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as TempoEsgotado
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from config_relatorios import THREADS_SECOES, TEMPO_LIMITE_SECAO
+
+_executor = ThreadPoolExecutor(max_workers=THREADS_SECOES, thread_name_prefix='secao')
+
+def executar_secoes(secoes: Dict[str, Callable[[], Any]],
+                    substitutos: Optional[Dict[str, Any]] = None,
+                    tempo_limite: Union[float, Dict[str, float], None] = TEMPO_LIMITE_SECAO
+                    ) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Executa as seções em paralelo e reúne os resultados dentro dos prazos
+
+    Args:
+        secoes: Nome da seção -> função sem argumentos que a calcula
+        substitutos: Nome -> valor usado quando a seção falha ou estoura o prazo (padrão None)
+        tempo_limite: Prazo em segundos (um para todas, ou por seção com TEMPO_LIMITE_SECAO
+            para as omitidas); None espera sem prazo
+
+    Returns:
+        Tuple: (resultados por seção, nomes das seções indisponíveis)
+    """
+    substitutos = substitutos or {}
+    inicio = time.monotonic()
+    futuros = {nome: _executor.submit(calcular) for nome, calcular in secoes.items()}
+
+    resultados, indisponiveis = {}, []
+    for nome, futuro in futuros.items():
+        limite = tempo_limite.get(nome, TEMPO_LIMITE_SECAO) if isinstance(tempo_limite, dict) else tempo_limite
+        restante = None if limite is None else max(0.0, limite - (time.monotonic() - inicio))
+        try:
+            resultados[nome] = futuro.result(timeout=restante)
+            continue
+        except TempoEsgotado:
+            # Se ainda estava na fila, nem chega a rodar
+            futuro.cancel()
+            print(f"⚠️ Seção '{nome}' excedeu {limite:.1f}s; exibida sem dados")
+        except Exception:
+            traceback.print_exc()
+            print(f"❌ Erro na seção '{nome}'; exibida sem dados")
+        resultados[nome] = copy.deepcopy(substitutos.get(nome))
+        indisponiveis.append(nome)
+    return resultados, indisponiveis
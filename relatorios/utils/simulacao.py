@@ -0,0 +1,254 @@
+"""
+Simulação de cenários (what-if) sobre a previsão atualizada
+Um cenário é uma lista de regras "dimensão = valor -> ±percentual" (ex: ORIGEM 11 +5%, NOUG X -10%)
+aplicadas como multiplicadores sobre o cubo pré-agregado NOUG x dimensões da especificação, e não
+sobre as linhas da planilha. O cubo e os totais sem cenário ficam memoizados por versão dos dados;
+cada simulação soma só a diferença das células afetadas aos totais e remonta o relatório
+Os cenários são gravados no servidor como arquivos JSON (fora do diretório de cache, que é limpo
+pela rota de administração)
+"""
+import json
+import os
+import re
+import threading
+import uuid
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from cache_service import cache_service
+from config_relatorios import ESPECIFICACOES_RELATORIOS
+from .base_motor import MotorRelatorios
+from .motor_especificacao import (executar_especificacao, resolver_exercicios, exercicios_disponiveis,
+                                  agregar_medidas, montar_relatorio)
+from .projecao import obter_projecao
+
+# Dimensões que uma regra pode usar (além das dimensões da especificação)
+DIMENSOES_SIMULACAO = ['NOUG', 'CATEGORIA', 'ORIGEM']
+DIRETORIO_CENARIOS = 'cenarios'
+
+class CuboSimulacao:
+    """
+    Medidas de uma especificação agregadas por NOUG x dimensões, prontas para aplicar cenários
+    """
+
+    def __init__(self, df: pd.DataFrame, nome_especificacao: str):
+        """
+        Agrega a especificação no nível mais fino (com a NOUG)
+
+        Args:
+            df: DataFrame de receita
+            nome_especificacao: Chave em ESPECIFICACOES_RELATORIOS com a chave 'simulacao'
+        """
+        if 'simulacao' not in ESPECIFICACOES_RELATORIOS.get(nome_especificacao, {}):
+            raise ValueError(f"Relatório sem suporte a simulação: {nome_especificacao}")
+        self.especificacao = resolver_exercicios(ESPECIFICACOES_RELATORIOS[nome_especificacao],
+                                                 exercicios_disponiveis(df))
+        self.dimensoes = list(self.especificacao['dimensoes'])
+        self.simuladas = list(self.especificacao['simulacao'])
+        self.motor = MotorRelatorios(df, tipo_dados=self.especificacao.get('tipo_dados', 'receita'))
+
+        self.tabela = agregar_medidas(df, ['NOUG'] + self.dimensoes, self.especificacao['medidas'],
+                                      self.especificacao.get('filtros'))
+
+        config = self.especificacao.get('projecao')
+        if config:
+            projecao = obter_projecao(df, self.dimensoes, config['coluna'], self.especificacao['anos']['atual'])
+            projetado = pd.Series(projecao.projetado, index=projecao.chaves)
+            self.tabela[config.get('nome', 'projecao')] = (projetado.reindex(self.tabela.index).fillna(0.0)
+                                                           .to_numpy(dtype=np.float64))
+
+        # Valores (sem espaços) de cada célula por dimensão, para casar as regras
+        self.valores = {
+            nivel: self.tabela.index.get_level_values(nivel).astype(str).str.strip().to_numpy(dtype=object)
+            for nivel in ['NOUG'] + self.dimensoes
+        }
+        # O cubo memoizado é compartilhado entre as threads do servidor
+        self._lock = threading.Lock()
+        self._bases = {None: self.tabela.groupby(level=self.dimensoes, sort=False).sum()}
+
+    def base(self, noug_selecionada: Optional[str] = None) -> pd.DataFrame:
+        """Tabela sem cenário no nível das dimensões (todas as NOUGs ou uma), memoizada no cubo"""
+        chave = str(noug_selecionada).strip() if noug_selecionada and noug_selecionada != 'todos' else None
+        with self._lock:
+            base = self._bases.get(chave)
+        if base is None:
+            tabela = self.tabela[self.valores['NOUG'] == chave]
+            base = tabela.groupby(level=self.dimensoes, sort=False).sum()
+            with self._lock:
+                base = self._bases.setdefault(chave, base)
+        return base
+
+    def multiplicadores(self, regras: List[Dict]) -> np.ndarray:
+        """Multiplicador de cada célula do cubo (regras sobrepostas se compõem)"""
+        fatores = np.ones(len(self.tabela), dtype=np.float64)
+        for regra in regras:
+            fatores[self.valores[regra['dimensao']] == regra['valor']] *= 1 + regra['percentual'] / 100
+        return fatores
+
+    def simular(self, regras: List[Dict], noug_selecionada: Optional[str] = None) -> pd.DataFrame:
+        """
+        Tabela no nível das dimensões com as medidas simuláveis ajustadas pelo cenário
+
+        Args:
+            regras: Regras validadas (validar_cenario)
+            noug_selecionada: NOUG (opcional)
+
+        Returns:
+            DataFrame no formato de agregar_medidas
+        """
+        base = self.base(noug_selecionada)
+        fatores = self.multiplicadores(regras)
+        afetadas = fatores != 1
+        if noug_selecionada and noug_selecionada != 'todos':
+            afetadas &= self.valores['NOUG'] == str(noug_selecionada).strip()
+        if not afetadas.any():
+            return base
+
+        diferenca = (self.tabela.loc[afetadas, self.simuladas]
+                     .mul(fatores[afetadas] - 1, axis=0)
+                     .groupby(level=self.dimensoes, sort=False).sum())
+        tabela = base.copy()
+        tabela.loc[diferenca.index, self.simuladas] += diferenca
+        return tabela
+
+def obter_cubo_simulacao(df: pd.DataFrame, nome_especificacao: str) -> CuboSimulacao:
+    """
+    Cubo de simulação da especificação, construído uma vez por versão dos dados
+
+    Args:
+        df: DataFrame carregado pelo cache (ou recorte derivado)
+        nome_especificacao: Chave em ESPECIFICACOES_RELATORIOS
+
+    Returns:
+        CuboSimulacao memoizado
+    """
+    versao = cache_service.versao_dataframe(df)
+    if versao is None:
+        return CuboSimulacao(df, nome_especificacao)
+    return cache_service.memoizar(('simulacao', versao, nome_especificacao),
+                                  lambda: CuboSimulacao(df, nome_especificacao))
+
+def validar_cenario(cenario: Dict) -> Dict:
+    """
+    Normaliza e valida um cenário
+
+    Args:
+        cenario: {'nome': str, 'regras': [{'dimensao', 'valor', 'percentual'}]}
+
+    Returns:
+        Cenário normalizado (dimensão em maiúsculas, valor sem espaços, percentual float)
+
+    Raises:
+        ValueError: Cenário malformado
+    """
+    if not isinstance(cenario, dict) or not isinstance(cenario.get('regras'), list):
+        raise ValueError("Cenário deve ter a lista 'regras'")
+
+    regras = []
+    for regra in cenario['regras']:
+        if not isinstance(regra, dict):
+            raise ValueError("Regra inválida: esperado objeto com dimensao, valor e percentual")
+        dimensao = str(regra.get('dimensao', '')).strip().upper()
+        if dimensao not in DIMENSOES_SIMULACAO:
+            raise ValueError(f"Dimensão de simulação inválida: {dimensao} (use {', '.join(DIMENSOES_SIMULACAO)})")
+        try:
+            percentual = float(regra.get('percentual'))
+        except (TypeError, ValueError):
+            raise ValueError(f"Percentual inválido na regra de {dimensao}: {regra.get('percentual')}")
+        if not np.isfinite(percentual) or percentual <= -100:
+            raise ValueError(f"Percentual fora do intervalo na regra de {dimensao}: {percentual}")
+        regras.append({'dimensao': dimensao, 'valor': str(regra.get('valor', '')).strip(), 'percentual': percentual})
+
+    return {'nome': str(cenario.get('nome') or 'Cenário sem nome').strip(), 'regras': regras}
+
+def simular_especificacao(df: pd.DataFrame, nome_especificacao: str, cenario: Optional[Dict],
+                          estrutura_hierarquica: Optional[Dict] = None,
+                          noug_selecionada: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Executa a especificação com o cenário aplicado à previsão atualizada
+
+    Sem cenário (ou sem regras) devolve o resultado memoizado de executar_especificacao.
+
+    Args:
+        df: DataFrame de receita
+        nome_especificacao: Chave em ESPECIFICACOES_RELATORIOS com a chave 'simulacao'
+        cenario: Cenário validado (validar_cenario) ou None
+        estrutura_hierarquica: Estrutura que define ordem e nós exibidos (opcional)
+        noug_selecionada: NOUG selecionada para filtro (opcional)
+
+    Returns:
+        Dict com dados_numericos, dados_para_ia, dados_pdf e mes_referencia
+    """
+    base = executar_especificacao(df, nome_especificacao, estrutura_hierarquica, noug_selecionada)
+    if not cenario or not cenario.get('regras'):
+        return base
+
+    cubo = obter_cubo_simulacao(df, nome_especificacao)
+    tabela = cubo.simular(cenario['regras'], noug_selecionada)
+    return montar_relatorio(tabela, cubo.motor, cubo.especificacao, estrutura_hierarquica, base['mes_referencia'])
+
+class RepositorioCenarios:
+    """
+    Cenários gravados no servidor (um arquivo JSON por cenário)
+    """
+
+    def __init__(self, diretorio: str = DIRETORIO_CENARIOS):
+        self.diretorio = diretorio
+        self._lock = threading.Lock()
+
+    def _caminho(self, identificador: str) -> str:
+        if not re.fullmatch(r'[0-9a-f]{12}', identificador or ''):
+            raise KeyError(identificador)
+        return os.path.join(self.diretorio, f"{identificador}.json")
+
+    def salvar(self, cenario: Dict, identificador: Optional[str] = None) -> Dict:
+        """
+        Valida e grava um cenário (novo ou substituindo um existente)
+
+        Returns:
+            Cenário gravado com 'id' e 'atualizado_em'
+        """
+        registro = validar_cenario(cenario)
+        registro['id'] = identificador or uuid.uuid4().hex[:12]
+        registro['atualizado_em'] = datetime.now().isoformat(timespec='seconds')
+        caminho = self._caminho(registro['id'])
+        with self._lock:
+            os.makedirs(self.diretorio, exist_ok=True)
+            temporario = f"{caminho}.tmp"
+            with open(temporario, 'w', encoding='utf-8') as f:
+                json.dump(registro, f, ensure_ascii=False, indent=2)
+            os.replace(temporario, caminho)
+        return registro
+
+    def obter(self, identificador: str) -> Dict:
+        """Cenário gravado (KeyError se não existir)"""
+        caminho = self._caminho(identificador)
+        if not os.path.exists(caminho):
+            raise KeyError(identificador)
+        with open(caminho, encoding='utf-8') as f:
+            return json.load(f)
+
+    def listar(self) -> List[Dict]:
+        """Cenários gravados, do mais recente para o mais antigo"""
+        if not os.path.isdir(self.diretorio):
+            return []
+        cenarios = []
+        for arquivo in os.listdir(self.diretorio):
+            if arquivo.endswith('.json'):
+                try:
+                    cenarios.append(self.obter(arquivo[:-len('.json')]))
+                except (KeyError, ValueError, OSError):
+                    continue
+        return sorted(cenarios, key=lambda c: c.get('atualizado_em', ''), reverse=True)
+
+    def remover(self, identificador: str):
+        """Remove um cenário gravado (KeyError se não existir)"""
+        caminho = self._caminho(identificador)
+        with self._lock:
+            if not os.path.exists(caminho):
+                raise KeyError(identificador)
+            os.remove(caminho)
+
+repositorio_cenarios = RepositorioCenarios()
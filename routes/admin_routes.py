@@ -5,6 +5,8 @@ from flask import Blueprint, jsonify
 
 # Importa o serviço de cache
 from cache_service import cache_service
+from config_relatorios import ARMAZENAMENTO_DADOS
+from utils.data_loaders import armazem
 
 # Cria o blueprint
 admin_bp = Blueprint('admin', __name__)
@@ -15,6 +17,9 @@ admin_bp = Blueprint('admin', __name__)
 def cache_info():
     """Mostra informações do cache"""
     info = cache_service.get_cache_info()
+    info['armazenamento'] = ARMAZENAMENTO_DADOS
+    if ARMAZENAMENTO_DADOS == 'sqlite':
+        info['armazem_sqlite'] = armazem.informacoes()
     return jsonify(info)
 
 @admin_bp.route('/cache/clear')
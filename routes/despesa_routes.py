@@ -6,10 +6,13 @@ from flask import Blueprint, render_template, request
 import traceback
 
 # Importações das configurações
-from utils.data_loaders import carregar_dataframe_despesa
+from utils.data_loaders import carregar_despesa_resumida
+from relatorios.utils import (recorte_mensal, contexto_periodo, aplicar_filtros_consulta, parametros_paginacao,
+                              OPCOES_LINHAS_PAGINA)
 
 # Importações dos módulos de despesa
-from relatorios.despesa import gerar_balanco_despesa
+from relatorios.despesa import (gerar_balanco_despesa, gerar_relatorio_despesa_por_noug, ORDENACOES_DESPESA_NOUG,
+                                ORDENACAO_PADRAO_DESPESA_NOUG)
 
 # Cria o blueprint
 despesa_bp = Blueprint('despesa', __name__)
@@ -21,7 +24,7 @@ def balanco_despesa():
     """Relatório de balanço orçamentário da despesa"""
     try:
         inicio = time.time()
-        df_completo = carregar_dataframe_despesa()
+        df_completo = carregar_despesa_resumida()
 
         if df_completo.empty:
             return render_template('erro.html', 
@@ -37,10 +40,13 @@ def balanco_despesa():
                                  mensagem=f"Colunas faltantes: {', '.join(colunas_faltantes)}")
         
         lista_nougs = sorted(df_completo['NOUG'].dropna().unique().tolist())
-        noug_selecionada = request.args.get('noug', None)
+        df_filtrado, noug_selecionada = aplicar_filtros_consulta(df_completo, request.args)
+        mes_selecionado = request.args.get('mes', None, type=int)
+        visao_selecionada = request.args.get('visao', None)
+        df_periodo = recorte_mensal(df_filtrado, mes_selecionado, visao_selecionada, tipo_dados='despesa')
         
         dados_tabela, mes_referencia, dados_para_ia, dados_pdf = gerar_balanco_despesa(
-            df_completo, None, noug_selecionada
+            df_periodo, None, noug_selecionada
         )
         
         fim = time.time()
@@ -51,13 +57,61 @@ def balanco_despesa():
                                mes_ref=mes_referencia,
                                lista_nougs=lista_nougs,
                                noug_selecionada=noug_selecionada,
-                               dados_pdf=dados_pdf)
+                               dados_pdf=dados_pdf,
+                               **contexto_periodo(df_completo, mes_selecionado, visao_selecionada,
+                                                  tipo_dados='despesa'))
     except Exception as e:
         traceback.print_exc()
         return render_template('erro.html',
                              titulo="Erro no Relatório de Despesa",
                              mensagem=f"Erro ao gerar relatório: {str(e)}")
 
+@despesa_bp.route('/despesa-por-noug')
+def despesa_por_noug():
+    """Ranking da despesa por unidade gestora (ordenação e paginação no servidor)"""
+    try:
+        inicio = time.time()
+        df_completo = carregar_despesa_resumida()
+
+        if df_completo.empty:
+            return render_template('erro.html',
+                                 titulo="Dados de Despesa Não Encontrados",
+                                 mensagem="O arquivo DESPESA.xlsx não foi encontrado ou está vazio.")
+
+        lista_nougs = sorted(df_completo['NOUG'].dropna().unique().tolist())
+        df_filtrado, noug_selecionada = aplicar_filtros_consulta(df_completo, request.args)
+        mes_selecionado = request.args.get('mes', None, type=int)
+        visao_selecionada = request.args.get('visao', None)
+        df_periodo = recorte_mensal(df_filtrado, mes_selecionado, visao_selecionada, tipo_dados='despesa')
+
+        ordenacao = request.args.get('ordem', ORDENACAO_PADRAO_DESPESA_NOUG)
+        decrescente = request.args.get('direcao', 'desc') != 'asc'
+        pagina, por_pagina = parametros_paginacao(request.args)
+
+        dados_relatorio, mes_referencia, dados_para_ia, dados_pdf = gerar_relatorio_despesa_por_noug(
+            df_periodo, ordenacao, decrescente, pagina, por_pagina, noug_selecionada
+        )
+
+        fim = time.time()
+        print(f"⏱️ Relatório de despesa por unidade gestora gerado em {fim - inicio:.2f} segundos")
+
+        return render_template('despesas/despesa_por_noug.html',
+                               dados_relatorio=dados_relatorio,
+                               mes_ref=mes_referencia,
+                               dados_para_ia=dados_para_ia,
+                               dados_pdf=dados_pdf,
+                               lista_nougs=lista_nougs,
+                               noug_selecionada=noug_selecionada,
+                               ordenacoes=ORDENACOES_DESPESA_NOUG,
+                               opcoes_linhas_pagina=OPCOES_LINHAS_PAGINA,
+                               **contexto_periodo(df_completo, mes_selecionado, visao_selecionada,
+                                                  tipo_dados='despesa'))
+    except Exception as e:
+        traceback.print_exc()
+        return render_template('erro.html',
+                             titulo="Erro no Relatório de Despesa por Unidade Gestora",
+                             mensagem=f"Erro ao gerar relatório: {str(e)}")
+
 # ===================== ROTAS EM DESENVOLVIMENTO =====================
 
 @despesa_bp.route('/despesa-por-funcao')
@@ -81,13 +135,6 @@ def despesa_por_modalidade():
                          titulo="Relatório em Desenvolvimento",
                          mensagem="O relatório de despesa por modalidade está sendo desenvolvido. Implementação usando coluna MODALIDADE disponível.")
 
-@despesa_bp.route('/despesa-por-noug')
-def despesa_por_noug():
-    """Relatório de despesa por unidade gestora (em desenvolvimento)"""
-    return render_template('erro.html',
-                         titulo="Relatório em Desenvolvimento",
-                         mensagem="O relatório de despesa por unidade gestora está sendo desenvolvido.")
-
 @despesa_bp.route('/execucao-por-programa')
 def execucao_por_programa():
     """Relatório de execução por programa (em desenvolvimento)"""
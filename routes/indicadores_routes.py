@@ -1,69 +1,154 @@
 """
 Blueprint para rotas de relatórios de indicadores
 """
+import math
 import time
-from flask import Blueprint, render_template, request
+from flask import Blueprint, render_template, request, jsonify
 import traceback
 
-# Importações das configurações
-from config_relatorios import HIERARQUIA_RECEITAS
-from utils.data_loaders import carregar_dataframe_receita, carregar_dataframe_despesa
+# Importações de configuração e dados
+from relatorios.utils import (recorte_mensal, contexto_periodo, aplicar_filtros_consulta,
+                              CHAVES_ALINHAMENTO, filtros_da_consulta, aplicar_filtros, obter_ranking,
+                              DIMENSOES_RANKING, formatar_numero, normalizar_periodo)
+from utils.data_loaders import carregar_receita_resumida, carregar_despesa_resumida
 
 # Importações dos módulos de indicadores
 from relatorios.indicadores import (
-    gerar_dashboard_executivo_placeholder,
-    gerar_indicadores_orcamentarios_placeholder,
-    gerar_analise_variacoes_placeholder,
-    gerar_relatorio_por_noug_placeholder
+    gerar_relatorio_analise_variacoes,
+    TIPOS_ANALISE,
+    NIVEIS_ANALISE,
+    gerar_relatorio_anomalias,
+    obter_anomalias,
+    LIMIAR_Z_ROBUSTO,
+    gerar_dashboard_executivo,
+    gerar_relatorio_indicadores,
+    gerar_relatorio_por_noug
 )
 
 # Cria o blueprint
 indicadores_bp = Blueprint('indicadores', __name__)
 
+def _limiar_valido(limiar) -> bool:
+    """Limiar do z-score robusto informado em ?limiar= (número finito maior que zero)"""
+    return limiar is not None and math.isfinite(limiar) and limiar > 0
+
 # ===================== ROTAS DE INDICADORES E ANÁLISES =====================
 
 @indicadores_bp.route('/dashboard')
 def dashboard():
-    """Dashboard executivo (placeholder)"""
+    """Dashboard executivo (seções calculadas em paralelo)"""
     try:
         inicio = time.time()
-        df_receita = carregar_dataframe_receita()
-        df_despesa = carregar_dataframe_despesa()
-        
-        dados_dashboard, mes_referencia, dados_para_ia, dados_pdf = gerar_dashboard_executivo_placeholder(
-            df_receita, None, None
+        df_receita = carregar_receita_resumida()
+        df_despesa = carregar_despesa_resumida()
+        lista_nougs = sorted(df_receita['NOUG'].dropna().unique().tolist())
+
+        # Só as chaves comuns às duas bases filtram a despesa
+        df_receita_filtrado, noug_selecionada = aplicar_filtros_consulta(df_receita, request.args)
+        df_despesa_filtrado, _ = aplicar_filtros_consulta(df_despesa, request.args, CHAVES_ALINHAMENTO)
+        mes_selecionado = request.args.get('mes', None, type=int)
+        visao_selecionada = request.args.get('visao', None)
+        df_receita_periodo = recorte_mensal(df_receita_filtrado, mes_selecionado, visao_selecionada)
+        df_despesa_periodo = recorte_mensal(df_despesa_filtrado, mes_selecionado, visao_selecionada, 'despesa')
+
+        dados_dashboard, mes_referencia, dados_para_ia, dados_pdf = gerar_dashboard_executivo(
+            df_receita_periodo, df_despesa_periodo, None, noug_selecionada
         )
-        
+
         fim = time.time()
-        print(f"⏱️ Dashboard executivo (placeholder) gerado em {fim - inicio:.2f} segundos")
-        
-        return render_template('erro.html',
-                             titulo="Dashboard Executivo - Em Desenvolvimento",
-                             mensagem="O dashboard executivo está sendo desenvolvido. Estrutura criada e aguardando implementação completa.")
+        print(f"⏱️ Dashboard executivo gerado em {fim - inicio:.2f} segundos")
+
+        return render_template('dashboard_executivo.html',
+                               dados_relatorio=dados_dashboard,
+                               mes_ref=mes_referencia,
+                               dados_para_ia=dados_para_ia,
+                               dados_pdf=dados_pdf,
+                               lista_nougs=lista_nougs,
+                               noug_selecionada=noug_selecionada,
+                               **contexto_periodo(df_receita, mes_selecionado, visao_selecionada))
     except Exception as e:
         traceback.print_exc()
         return render_template('erro.html',
                              titulo="Erro no Dashboard",
                              mensagem=f"Erro ao gerar dashboard: {str(e)}")
 
+@indicadores_bp.route('/ranking')
+def ranking():
+    """Maiores / menores N por dimensão e critério (JSON), no período de ?mes= e ?visao="""
+    try:
+        inicio = time.time()
+        tipo_dados = request.args.get('tipo', 'receita')
+        if tipo_dados not in DIMENSOES_RANKING:
+            return jsonify({'erro': f"Tipo de dados inválido: {tipo_dados}"}), 400
+        dimensao = request.args.get('dimensao', next(iter(DIMENSOES_RANKING[tipo_dados])))
+        criterio = request.args.get('criterio', 'realizado')
+        n = max(1, min(request.args.get('n', 5, type=int), 500))
+        maiores = request.args.get('ordem', 'desc') != 'asc'
+
+        df = carregar_receita_resumida() if tipo_dados == 'receita' else carregar_despesa_resumida()
+        filtros = filtros_da_consulta(request.args)
+        if tipo_dados == 'despesa':
+            filtros = {dimensao_filtro: filtro for dimensao_filtro, filtro in filtros.items()
+                       if dimensao_filtro in CHAVES_ALINHAMENTO}
+
+        mes_selecionado, visao_selecionada = normalizar_periodo(request.args.get('mes', None, type=int),
+                                                                request.args.get('visao', None))
+        df_periodo = recorte_mensal(aplicar_filtros(df, filtros), mes_selecionado, visao_selecionada, tipo_dados)
+
+        try:
+            itens = obter_ranking(df_periodo, tipo_dados, dimensao).top(criterio, n, maiores)
+        except ValueError as e:
+            return jsonify({'erro': str(e)}), 400
+        for item in itens:
+            item['realizado_fmt'] = formatar_numero(item['realizado'])
+
+        return jsonify({
+            'tipo': tipo_dados,
+            'dimensao': dimensao,
+            'criterio': criterio,
+            'ordem': 'desc' if maiores else 'asc',
+            'mes': mes_selecionado,
+            'visao': visao_selecionada,
+            'itens': itens,
+            'tempo_ms': round((time.time() - inicio) * 1000, 2)
+        })
+
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({'erro': f"Erro ao gerar ranking: {str(e)}"}), 500
+
 @indicadores_bp.route('/indicadores')
 def indicadores():
-    """Relatório de indicadores orçamentários (placeholder)"""
+    """Relatório de indicadores orçamentários (receita x despesa)"""
     try:
         inicio = time.time()
-        df_receita = carregar_dataframe_receita()
-        df_despesa = carregar_dataframe_despesa()
-        
-        dados_indicadores, mes_referencia, dados_para_ia, dados_pdf = gerar_indicadores_orcamentarios_placeholder(
-            df_receita, None, None
+        df_receita = carregar_receita_resumida()
+        df_despesa = carregar_despesa_resumida()
+        lista_nougs = sorted(df_receita['NOUG'].dropna().unique().tolist())
+
+        # Só as chaves comuns às duas bases filtram (CATEGORIA/ORIGEM têm outro significado na despesa)
+        df_receita_filtrado, noug_selecionada = aplicar_filtros_consulta(df_receita, request.args, CHAVES_ALINHAMENTO)
+        df_despesa_filtrado, _ = aplicar_filtros_consulta(df_despesa, request.args, CHAVES_ALINHAMENTO)
+        mes_selecionado = request.args.get('mes', None, type=int)
+        visao_selecionada = request.args.get('visao', None)
+        df_receita_periodo = recorte_mensal(df_receita_filtrado, mes_selecionado, visao_selecionada)
+        df_despesa_periodo = recorte_mensal(df_despesa_filtrado, mes_selecionado, visao_selecionada, 'despesa')
+
+        dados_indicadores, mes_referencia, dados_para_ia, dados_pdf = gerar_relatorio_indicadores(
+            df_receita_periodo, df_despesa_periodo, None, noug_selecionada
         )
-        
+
         fim = time.time()
-        print(f"⏱️ Indicadores orçamentários (placeholder) gerado em {fim - inicio:.2f} segundos")
-        
-        return render_template('erro.html',
-                             titulo="Indicadores Orçamentários - Em Desenvolvimento",
-                             mensagem="Os indicadores orçamentários estão sendo desenvolvidos. Estrutura criada e aguardando implementação completa.")
+        print(f"⏱️ Indicadores orçamentários gerados em {fim - inicio:.2f} segundos")
+
+        return render_template('relatorio_indicadores.html',
+                               dados_relatorio=dados_indicadores,
+                               mes_ref=mes_referencia,
+                               dados_para_ia=dados_para_ia,
+                               dados_pdf=dados_pdf,
+                               lista_nougs=lista_nougs,
+                               noug_selecionada=noug_selecionada,
+                               **contexto_periodo(df_receita, mes_selecionado, visao_selecionada))
     except Exception as e:
         traceback.print_exc()
         return render_template('erro.html',
@@ -72,46 +157,150 @@ def indicadores():
 
 @indicadores_bp.route('/analise-variacoes')
 def analise_variacoes():
-    """Relatório de análise de variações (placeholder)"""
+    """Relatório de análise de variações (mês a mês, entre exercícios e previsto x realizado)"""
     try:
         inicio = time.time()
-        df_receita = carregar_dataframe_receita()
-        
-        dados_analise, mes_referencia, dados_para_ia, dados_pdf = gerar_analise_variacoes_placeholder(
-            df_receita, HIERARQUIA_RECEITAS, None
+        df_receita = carregar_receita_resumida()
+        lista_nougs = sorted(df_receita['NOUG'].dropna().unique().tolist())
+        df_filtrado, noug_selecionada = aplicar_filtros_consulta(df_receita, request.args)
+        mes_selecionado = request.args.get('mes', None, type=int)
+        visao_selecionada = request.args.get('visao', None)
+        df_periodo = recorte_mensal(df_filtrado, mes_selecionado, visao_selecionada)
+
+        tipo_selecionado = request.args.get('tipo', 'mensal')
+        nivel_selecionado = request.args.get('nivel', 'categoria')
+        if tipo_selecionado not in TIPOS_ANALISE:
+            tipo_selecionado = 'mensal'
+        if nivel_selecionado not in NIVEIS_ANALISE:
+            nivel_selecionado = 'categoria'
+
+        dados_analise, mes_referencia, dados_para_ia, dados_pdf = gerar_relatorio_analise_variacoes(
+            df_periodo, None, noug_selecionada, tipo_selecionado, nivel_selecionado
         )
-        
+
         fim = time.time()
-        print(f"⏱️ Análise de variações (placeholder) gerado em {fim - inicio:.2f} segundos")
-        
-        return render_template('erro.html',
-                             titulo="Análise de Variações - Em Desenvolvimento",
-                             mensagem="A análise de variações está sendo desenvolvida. Estrutura criada e aguardando implementação completa.")
+        print(f"⏱️ Análise de variações gerada em {fim - inicio:.2f} segundos")
+
+        return render_template('relatorio_analise_variacoes.html',
+                               dados_relatorio=dados_analise,
+                               mes_ref=mes_referencia,
+                               dados_para_ia=dados_para_ia,
+                               dados_pdf=dados_pdf,
+                               lista_nougs=lista_nougs,
+                               noug_selecionada=noug_selecionada,
+                               tipos_analise=TIPOS_ANALISE,
+                               tipo_selecionado=tipo_selecionado,
+                               niveis_analise={chave: rotulo for chave, (rotulo, _) in NIVEIS_ANALISE.items()},
+                               nivel_selecionado=nivel_selecionado,
+                               **contexto_periodo(df_receita, mes_selecionado, visao_selecionada))
     except Exception as e:
         traceback.print_exc()
         return render_template('erro.html',
                              titulo="Erro na Análise de Variações",
                              mensagem=f"Erro ao gerar análise: {str(e)}")
 
+@indicadores_bp.route('/anomalias')
+def anomalias():
+    """Relatório de meses atípicos por unidade gestora e origem (z-score robusto)"""
+    try:
+        inicio = time.time()
+        df_receita = carregar_receita_resumida()
+        lista_nougs = sorted(df_receita['NOUG'].dropna().unique().tolist())
+        df_filtrado, noug_selecionada = aplicar_filtros_consulta(df_receita, request.args)
+        mes_selecionado = request.args.get('mes', None, type=int)
+        visao_selecionada = request.args.get('visao', None)
+        df_periodo = recorte_mensal(df_filtrado, mes_selecionado, visao_selecionada)
+        limiar = request.args.get('limiar', LIMIAR_Z_ROBUSTO, type=float)
+        if not _limiar_valido(limiar):
+            limiar = LIMIAR_Z_ROBUSTO
+
+        dados_anomalias, mes_referencia, dados_para_ia, dados_pdf = gerar_relatorio_anomalias(
+            df_periodo, None, noug_selecionada, limiar
+        )
+
+        fim = time.time()
+        print(f"⏱️ Detecção de anomalias gerada em {fim - inicio:.2f} segundos")
+
+        return render_template('relatorio_anomalias.html',
+                               dados_relatorio=dados_anomalias,
+                               mes_ref=mes_referencia,
+                               dados_para_ia=dados_para_ia,
+                               dados_pdf=dados_pdf,
+                               lista_nougs=lista_nougs,
+                               noug_selecionada=noug_selecionada,
+                               limiar=limiar,
+                               **contexto_periodo(df_receita, mes_selecionado, visao_selecionada))
+    except Exception as e:
+        traceback.print_exc()
+        return render_template('erro.html',
+                             titulo="Erro na Detecção de Anomalias",
+                             mensagem=f"Erro ao gerar relatório: {str(e)}")
+
+@indicadores_bp.route('/anomalias/dados')
+def anomalias_dados():
+    """Meses atípicos por unidade gestora e origem (JSON)"""
+    try:
+        inicio = time.time()
+        df_receita = carregar_receita_resumida()
+        df_filtrado, noug_selecionada = aplicar_filtros_consulta(df_receita, request.args)
+        mes_selecionado, visao_selecionada = normalizar_periodo(request.args.get('mes', None, type=int),
+                                                                request.args.get('visao', None))
+        df_periodo = recorte_mensal(df_filtrado, mes_selecionado, visao_selecionada)
+        # Limiar informado mas não numérico também é rejeitado (a página HTML usa o padrão)
+        limiar = request.args.get('limiar', None, type=float) if 'limiar' in request.args else LIMIAR_Z_ROBUSTO
+        if not _limiar_valido(limiar):
+            return jsonify({'erro': f"Limiar inválido: {request.args.get('limiar')} (use um número maior que zero)"}), 400
+
+        resultados = obter_anomalias(df_periodo, limiar)
+        if noug_selecionada:
+            resultados = [anomalia for anomalia in resultados if anomalia['noug'] == noug_selecionada.strip()]
+
+        return jsonify({
+            'limiar': limiar,
+            'mes': mes_selecionado,
+            'visao': visao_selecionada,
+            'total': len(resultados),
+            'anomalias': resultados,
+            'tempo_ms': round((time.time() - inicio) * 1000, 2)
+        })
+
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({'erro': f"Erro na detecção de anomalias: {str(e)}"}), 500
+
 @indicadores_bp.route('/por-noug')
 def por_noug():
-    """Relatório por unidade gestora (placeholder)"""
+    """Relatório consolidado receita x despesa por unidade gestora"""
     try:
         inicio = time.time()
-        df_receita = carregar_dataframe_receita()
-        
-        dados_noug, mes_referencia, dados_para_ia, dados_pdf = gerar_relatorio_por_noug_placeholder(
-            df_receita, HIERARQUIA_RECEITAS, None
+        df_receita = carregar_receita_resumida()
+        df_despesa = carregar_despesa_resumida()
+        lista_nougs = sorted(df_receita['NOUG'].dropna().unique().tolist())
+
+        df_receita_filtrado, noug_selecionada = aplicar_filtros_consulta(df_receita, request.args, CHAVES_ALINHAMENTO)
+        df_despesa_filtrado, _ = aplicar_filtros_consulta(df_despesa, request.args, CHAVES_ALINHAMENTO)
+        mes_selecionado = request.args.get('mes', None, type=int)
+        visao_selecionada = request.args.get('visao', None)
+        df_receita_periodo = recorte_mensal(df_receita_filtrado, mes_selecionado, visao_selecionada)
+        df_despesa_periodo = recorte_mensal(df_despesa_filtrado, mes_selecionado, visao_selecionada, 'despesa')
+
+        dados_noug, mes_referencia, dados_para_ia, dados_pdf = gerar_relatorio_por_noug(
+            df_receita_periodo, df_despesa_periodo, None, noug_selecionada
         )
-        
+
         fim = time.time()
-        print(f"⏱️ Relatório por NOUG (placeholder) gerado em {fim - inicio:.2f} segundos")
-        
-        return render_template('erro.html',
-                             titulo="Relatório por Unidade Gestora - Em Desenvolvimento",
-                             mensagem="O relatório por unidade gestora está sendo desenvolvido. Estrutura criada e aguardando implementação completa.")
+        print(f"⏱️ Relatório por NOUG gerado em {fim - inicio:.2f} segundos")
+
+        return render_template('relatorio_por_noug.html',
+                               dados_relatorio=dados_noug,
+                               mes_ref=mes_referencia,
+                               dados_para_ia=dados_para_ia,
+                               dados_pdf=dados_pdf,
+                               lista_nougs=lista_nougs,
+                               noug_selecionada=noug_selecionada,
+                               **contexto_periodo(df_receita, mes_selecionado, visao_selecionada))
     except Exception as e:
         traceback.print_exc()
         return render_template('erro.html',
                              titulo="Erro no Relatório por NOUG",
-                             mensagem=f"Erro ao gerar relatório: {str(e)}")
\ No newline at end of file
+                             mensagem=f"Erro ao gerar relatório: {str(e)}")
@@ -2,12 +2,15 @@
 Blueprint para rotas de relatórios de receita
 """
 import time
-from flask import Blueprint, render_template, request
+from flask import Blueprint, render_template, request, jsonify
 import traceback
 
-# Importações das configurações
-from config_relatorios import HIERARQUIA_RECEITAS
-from utils.data_loaders import carregar_dataframe_receita
+# Importações de configuração e dados
+from relatorios.utils import (obter_hierarquia_receitas, recorte_mensal, contexto_periodo, obter_indice_busca,
+                              formatar_numero, aplicar_filtros_consulta, filtros_da_consulta, aplicar_filtros,
+                              simular_especificacao, validar_cenario, repositorio_cenarios, exercicios_disponiveis,
+                              parametros_paginacao, OPCOES_LINHAS_PAGINA)
+from utils.data_loaders import carregar_dataframe_receita, carregar_receita_resumida
 
 # Importações dos módulos de receita
 from relatorios.receita import (
@@ -16,12 +19,37 @@ from relatorios.receita import (
     gerar_relatorio_por_adm,
     gerar_relatorio_receita_atualizada_vs_inicial,
     gerar_grafico_receita_liquida,
-    gerar_relatorio_receita_conta_corrente
+    gerar_relatorio_receita_conta_corrente,
+    gerar_filhos_conta_corrente,
+    gerar_relatorio_receita_por_fonte,
+    gerar_comparativo_nougs,
+    ORDENACOES_COMPARATIVO,
+    ORDENACAO_PADRAO_COMPARATIVO,
+    OPCOES_TOP
 )
 
 # Cria o blueprint
 receita_bp = Blueprint('receita', __name__)
 
+# Relatórios com simulação de cenários: rota -> especificação
+RELATORIOS_SIMULACAO = {
+    'balanco-orcamentario': 'balanco_orcamentario',
+    'receita-atualizada-vs-inicial': 'receita_atualizada_vs_inicial'
+}
+
+def _cenario_da_consulta(args):
+    """Cenário gravado indicado por ?cenario=<id> (None se ausente; KeyError se não existe)"""
+    identificador = args.get('cenario')
+    if not identificador:
+        return None
+    return repositorio_cenarios.obter(identificador)
+
+def _cenario_nao_encontrado(args):
+    """Página de erro 404 para ?cenario=<id> inexistente (a API JSON também responde 404)"""
+    return render_template('erro.html',
+                           titulo="Cenário não encontrado",
+                           mensagem=f"Cenário não encontrado: {args.get('cenario')}"), 404
+
 # ===================== ROTAS DE RECEITA =====================
 
 @receita_bp.route('/balanco-orcamentario')
@@ -29,12 +57,20 @@ def balanco_orcamentario():
     """Relatório de balanço orçamentário da receita"""
     try:
         inicio = time.time()
-        df_completo = carregar_dataframe_receita()
+        df_completo = carregar_receita_resumida()
         lista_nougs = sorted(df_completo['NOUG'].dropna().unique().tolist())
-        noug_selecionada = request.args.get('noug', None)
+        df_filtrado, noug_selecionada = aplicar_filtros_consulta(df_completo, request.args)
+        mes_selecionado = request.args.get('mes', None, type=int)
+        visao_selecionada = request.args.get('visao', None)
+        df_periodo = recorte_mensal(df_filtrado, mes_selecionado, visao_selecionada)
+
+        try:
+            cenario = _cenario_da_consulta(request.args)
+        except KeyError:
+            return _cenario_nao_encontrado(request.args)
 
         dados_tabela, mes_referencia, dados_para_ia, dados_pdf = gerar_balanco_orcamentario(
-            df_completo, HIERARQUIA_RECEITAS, noug_selecionada
+            df_periodo, obter_hierarquia_receitas(df_completo), noug_selecionada, cenario
         )
 
         fim = time.time()
@@ -45,7 +81,10 @@ def balanco_orcamentario():
                                mes_ref=mes_referencia,
                                lista_nougs=lista_nougs,
                                noug_selecionada=noug_selecionada,
-                               dados_pdf=dados_pdf)
+                               dados_pdf=dados_pdf,
+                               cenarios=repositorio_cenarios.listar(),
+                               cenario_selecionado=cenario,
+                               **contexto_periodo(df_completo, mes_selecionado, visao_selecionada))
     except Exception as e:
         traceback.print_exc()
         return render_template('erro.html',
@@ -57,12 +96,21 @@ def receita_estimada():
     """Relatório de receita estimada comparativo entre anos"""
     try:
         inicio = time.time()
-        df_completo = carregar_dataframe_receita()
+        df_completo = carregar_receita_resumida()
         lista_nougs = sorted(df_completo['NOUG'].dropna().unique().tolist())
-        noug_selecionada = request.args.get('noug', None)
+        df_filtrado, noug_selecionada = aplicar_filtros_consulta(df_completo, request.args)
+        mes_selecionado = request.args.get('mes', None, type=int)
+        visao_selecionada = request.args.get('visao', None)
+        df_periodo = recorte_mensal(df_filtrado, mes_selecionado, visao_selecionada)
+
+        # Quantidade de exercícios comparados: de 1 até os exercícios presentes (inválida: padrão da especificação)
+        opcoes_exercicios = list(range(1, len(exercicios_disponiveis(df_completo)) + 1))
+        exercicios_selecionados = request.args.get('exercicios', None, type=int)
+        if exercicios_selecionados not in opcoes_exercicios:
+            exercicios_selecionados = None
 
         dados_relatorio, dados_para_ia, dados_pdf = gerar_relatorio_receita_estimada(
-            df_completo, HIERARQUIA_RECEITAS, noug_selecionada
+            df_periodo, obter_hierarquia_receitas(df_completo), noug_selecionada, exercicios_selecionados
         )
         
         fim = time.time()
@@ -70,10 +118,13 @@ def receita_estimada():
 
         return render_template('relatorio_estimada.html',
                                dados_relatorio=dados_relatorio,
+                               exercicios=dados_pdf.get('exercicios', []),
+                               opcoes_exercicios=opcoes_exercicios,
                                dados_para_ia=dados_para_ia,
                                dados_pdf=dados_pdf,
                                lista_nougs=lista_nougs,
-                               noug_selecionada=noug_selecionada)
+                               noug_selecionada=noug_selecionada,
+                               **contexto_periodo(df_completo, mes_selecionado, visao_selecionada))
 
     except Exception as e:
         traceback.print_exc()
@@ -86,12 +137,20 @@ def receita_atualizada_vs_inicial():
     """Relatório: Receita Atualizada X Inicial"""
     try:
         inicio = time.time()
-        df_completo = carregar_dataframe_receita()
+        df_completo = carregar_receita_resumida()
         lista_nougs = sorted(df_completo['NOUG'].dropna().unique().tolist())
-        noug_selecionada = request.args.get('noug', None)
+        df_filtrado, noug_selecionada = aplicar_filtros_consulta(df_completo, request.args)
+        mes_selecionado = request.args.get('mes', None, type=int)
+        visao_selecionada = request.args.get('visao', None)
+        df_periodo = recorte_mensal(df_filtrado, mes_selecionado, visao_selecionada)
+
+        try:
+            cenario = _cenario_da_consulta(request.args)
+        except KeyError:
+            return _cenario_nao_encontrado(request.args)
 
         dados_relatorio, dados_para_ia, dados_pdf = gerar_relatorio_receita_atualizada_vs_inicial(
-            df_completo, HIERARQUIA_RECEITAS, noug_selecionada
+            df_periodo, obter_hierarquia_receitas(df_completo), noug_selecionada, cenario
         )
         
         fim = time.time()
@@ -102,7 +161,10 @@ def receita_atualizada_vs_inicial():
                                dados_para_ia=dados_para_ia,
                                dados_pdf=dados_pdf,
                                lista_nougs=lista_nougs,
-                               noug_selecionada=noug_selecionada)
+                               noug_selecionada=noug_selecionada,
+                               cenarios=repositorio_cenarios.listar(),
+                               cenario_selecionado=cenario,
+                               **contexto_periodo(df_completo, mes_selecionado, visao_selecionada))
 
     except Exception as e:
         traceback.print_exc()
@@ -115,12 +177,15 @@ def grafico_receita_liquida():
     """Relatório: Gráfico de Receita Líquida (Receita Corrente)"""
     try:
         inicio = time.time()
-        df_completo = carregar_dataframe_receita()
+        df_completo = carregar_receita_resumida()
         lista_nougs = sorted(df_completo['NOUG'].dropna().unique().tolist())
-        noug_selecionada = request.args.get('noug', None)
+        df_filtrado, noug_selecionada = aplicar_filtros_consulta(df_completo, request.args)
+        mes_selecionado = request.args.get('mes', None, type=int)
+        visao_selecionada = request.args.get('visao', None)
+        df_periodo = recorte_mensal(df_filtrado, mes_selecionado, visao_selecionada)
 
         dados_tabela, mes_referencia, dados_grafico, dados_chart = gerar_grafico_receita_liquida(
-            df_completo, HIERARQUIA_RECEITAS, noug_selecionada
+            df_periodo, obter_hierarquia_receitas(df_completo), noug_selecionada
         )
         
         fim = time.time()
@@ -132,7 +197,8 @@ def grafico_receita_liquida():
                                dados_chart=dados_chart,
                                mes_ref=mes_referencia,
                                lista_nougs=lista_nougs,
-                               noug_selecionada=noug_selecionada)
+                               noug_selecionada=noug_selecionada,
+                               **contexto_periodo(df_completo, mes_selecionado, visao_selecionada))
 
     except Exception as e:
         traceback.print_exc()
@@ -145,12 +211,15 @@ def receita_por_adm():
     """Relatório de receita por administração"""
     try:
         inicio = time.time()
-        df_completo = carregar_dataframe_receita()
+        df_completo = carregar_receita_resumida()
         lista_nougs = sorted(df_completo['NOUG'].dropna().unique().tolist())
-        noug_selecionada = request.args.get('noug', None)
+        df_filtrado, noug_selecionada = aplicar_filtros_consulta(df_completo, request.args)
+        mes_selecionado = request.args.get('mes', None, type=int)
+        visao_selecionada = request.args.get('visao', None)
+        df_periodo = recorte_mensal(df_filtrado, mes_selecionado, visao_selecionada)
 
         dados_tabela, dados_para_ia, dados_pdf = gerar_relatorio_por_adm(
-            df_completo, HIERARQUIA_RECEITAS, noug_selecionada
+            df_periodo, obter_hierarquia_receitas(df_completo), noug_selecionada
         )
         
         fim = time.time()
@@ -161,7 +230,8 @@ def receita_por_adm():
                                dados_para_ia=dados_para_ia,
                                dados_pdf=dados_pdf,
                                lista_nougs=lista_nougs,
-                               noug_selecionada=noug_selecionada)
+                               noug_selecionada=noug_selecionada,
+                               **contexto_periodo(df_completo, mes_selecionado, visao_selecionada))
                                
     except Exception as e:
         traceback.print_exc()
@@ -174,12 +244,16 @@ def receita_conta_corrente():
     """Relatório de receita por conta corrente (NOVO)"""
     try:
         inicio = time.time()
+        # Página de DataFrame completo: precisa de COCONTACORRENTE, fora do resumo do modo SQLite
         df_completo = carregar_dataframe_receita()
         lista_nougs = sorted(df_completo['NOUG'].dropna().unique().tolist())
-        noug_selecionada = request.args.get('noug', None)
+        df_filtrado, noug_selecionada = aplicar_filtros_consulta(df_completo, request.args)
+        mes_selecionado = request.args.get('mes', None, type=int)
+        visao_selecionada = request.args.get('visao', None)
+        df_periodo = recorte_mensal(df_filtrado, mes_selecionado, visao_selecionada)
 
         dados_tabela, mes_referencia, dados_para_ia, dados_pdf = gerar_relatorio_receita_conta_corrente(
-            df_completo, HIERARQUIA_RECEITAS, noug_selecionada
+            df_periodo, obter_hierarquia_receitas(df_completo), noug_selecionada
         )
         
         fim = time.time()
@@ -191,10 +265,222 @@ def receita_conta_corrente():
                                dados_para_ia=dados_para_ia,
                                dados_pdf=dados_pdf,
                                lista_nougs=lista_nougs,
-                               noug_selecionada=noug_selecionada)
+                               noug_selecionada=noug_selecionada,
+                               **contexto_periodo(df_completo, mes_selecionado, visao_selecionada))
                                
     except Exception as e:
         traceback.print_exc()
         return render_template('erro.html',
                              titulo="Erro no Relatório por Conta Corrente",
-                             mensagem=f"Erro ao gerar relatório: {str(e)}")
\ No newline at end of file
+                             mensagem=f"Erro ao gerar relatório: {str(e)}")
+
+@receita_bp.route('/receita-conta-corrente/filhos')
+def receita_conta_corrente_filhos():
+    """Filhos de um nó da hierarquia de conta corrente (JSON, expansão sob demanda)"""
+    try:
+        # Página de DataFrame completo: precisa de COCONTACORRENTE, fora do resumo do modo SQLite
+        df_completo = carregar_dataframe_receita()
+        prefixo = request.args.get('prefixo', '')
+        df_filtrado, noug_selecionada = aplicar_filtros_consulta(df_completo, request.args)
+        mes_selecionado = request.args.get('mes', None, type=int)
+        visao_selecionada = request.args.get('visao', None)
+        df_periodo = recorte_mensal(df_filtrado, mes_selecionado, visao_selecionada)
+
+        filhos = gerar_filhos_conta_corrente(df_periodo, prefixo, noug_selecionada)
+        return jsonify({'prefixo': prefixo, 'filhos': filhos})
+
+    except ValueError as e:
+        return jsonify({'erro': str(e)}), 400
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({'erro': f"Erro ao carregar nível: {str(e)}"}), 500
+
+@receita_bp.route('/busca-receita')
+def busca_receita():
+    """Busca por nome (classificação, alínea, subfonte e NOUG) com os totais do exercício atual (JSON)"""
+    try:
+        inicio = time.time()
+        consulta = request.args.get('q', '')
+        limite = request.args.get('limite', 20, type=int)
+        # Página de DataFrame completo: o índice de busca usa colunas fora do resumo do modo SQLite
+        indice = obter_indice_busca(carregar_dataframe_receita())
+
+        resultados = indice.buscar(consulta, max(1, min(limite, 200)))
+        for resultado in resultados:
+            resultado['total_fmt'] = formatar_numero(resultado['total'])
+
+        return jsonify({
+            'consulta': consulta,
+            'exercicio': indice.exercicio,
+            'resultados': resultados,
+            'tempo_ms': round((time.time() - inicio) * 1000, 2)
+        })
+
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({'erro': f"Erro na busca: {str(e)}"}), 500
+
+@receita_bp.route('/receita-por-fonte')
+def receita_por_fonte():
+    """Relatório de receita por fonte de recursos, aberta por origem"""
+    try:
+        inicio = time.time()
+        # Página de DataFrame completo: a fonte vem de COCONTACORRENTE, fora do resumo do modo SQLite
+        df_completo = carregar_dataframe_receita()
+        lista_nougs = sorted(df_completo['NOUG'].dropna().unique().tolist())
+        df_filtrado, noug_selecionada = aplicar_filtros_consulta(df_completo, request.args)
+        mes_selecionado = request.args.get('mes', None, type=int)
+        visao_selecionada = request.args.get('visao', None)
+        df_periodo = recorte_mensal(df_filtrado, mes_selecionado, visao_selecionada)
+        pagina, por_pagina = parametros_paginacao(request.args)
+
+        dados_tabela, mes_referencia, dados_para_ia, dados_pdf = gerar_relatorio_receita_por_fonte(
+            df_periodo, obter_hierarquia_receitas(df_completo), noug_selecionada, pagina, por_pagina
+        )
+
+        fim = time.time()
+        print(f"⏱️ Relatório de receita por fonte gerado em {fim - inicio:.2f} segundos")
+
+        return render_template('relatorio_receita_por_fonte.html',
+                               dados_relatorio=dados_tabela,
+                               mes_ref=mes_referencia,
+                               dados_para_ia=dados_para_ia,
+                               dados_pdf=dados_pdf,
+                               lista_nougs=lista_nougs,
+                               noug_selecionada=noug_selecionada,
+                               opcoes_linhas_pagina=OPCOES_LINHAS_PAGINA,
+                               **contexto_periodo(df_completo, mes_selecionado, visao_selecionada))
+
+    except Exception as e:
+        traceback.print_exc()
+        return render_template('erro.html',
+                             titulo="Erro no Relatório de Receita por Fonte",
+                             mensagem=f"Erro ao gerar relatório: {str(e)}")
+
+@receita_bp.route('/comparativo-nougs')
+def comparativo_nougs():
+    """Comparativo entre várias unidades gestoras (NOUG x origem)"""
+    try:
+        inicio = time.time()
+        df_completo = carregar_receita_resumida()
+        lista_nougs = sorted(df_completo['NOUG'].dropna().unique().tolist())
+        nougs_selecionadas = [noug for noug in request.args.getlist('noug') if noug and noug != 'todos']
+        ordenacao = request.args.get('ordem', ORDENACAO_PADRAO_COMPARATIVO)
+        if ordenacao not in ORDENACOES_COMPARATIVO:
+            ordenacao = ORDENACAO_PADRAO_COMPARATIVO
+        top_n = request.args.get('top', None, type=int)
+        if top_n is not None and top_n <= 0:
+            top_n = None
+        mes_selecionado = request.args.get('mes', None, type=int)
+        visao_selecionada = request.args.get('visao', None)
+
+        # Todas as NOUGs escolhidas (uma ou várias) passam pelos índices bitmap
+        df_filtrado = aplicar_filtros(df_completo, filtros_da_consulta(request.args))
+        df_periodo = recorte_mensal(df_filtrado, mes_selecionado, visao_selecionada)
+
+        dados_relatorio, mes_referencia, dados_para_ia, dados_pdf = gerar_comparativo_nougs(
+            df_periodo, ordenacao, top_n
+        )
+
+        fim = time.time()
+        print(f"⏱️ Comparativo entre unidades gestoras gerado em {fim - inicio:.2f} segundos")
+
+        return render_template('relatorio_comparativo_nougs.html',
+                               dados_relatorio=dados_relatorio,
+                               mes_ref=mes_referencia,
+                               dados_para_ia=dados_para_ia,
+                               dados_pdf=dados_pdf,
+                               lista_nougs_comparativo=lista_nougs,
+                               nougs_selecionadas=nougs_selecionadas,
+                               ordenacoes=ORDENACOES_COMPARATIVO,
+                               ordenacao_selecionada=ordenacao,
+                               opcoes_top=OPCOES_TOP,
+                               top_selecionado=top_n,
+                               **contexto_periodo(df_completo, mes_selecionado, visao_selecionada))
+
+    except Exception as e:
+        traceback.print_exc()
+        return render_template('erro.html',
+                             titulo="Erro no Comparativo entre Unidades Gestoras",
+                             mensagem=f"Erro ao gerar relatório: {str(e)}")
+
+# ===================== SIMULAÇÃO DE CENÁRIOS =====================
+
+@receita_bp.route('/simulacao/cenarios', methods=['GET', 'POST'])
+def cenarios_simulacao():
+    """Lista (GET) ou grava (POST, JSON {nome, regras}) cenários de simulação"""
+    try:
+        if request.method == 'GET':
+            return jsonify({'cenarios': repositorio_cenarios.listar()})
+        cenario = repositorio_cenarios.salvar(request.get_json(silent=True) or {})
+        return jsonify(cenario), 201
+
+    except ValueError as e:
+        return jsonify({'erro': str(e)}), 400
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({'erro': f"Erro nos cenários: {str(e)}"}), 500
+
+@receita_bp.route('/simulacao/cenarios/<identificador>', methods=['GET', 'PUT', 'DELETE'])
+def cenario_simulacao(identificador):
+    """Consulta (GET), substitui (PUT, JSON {nome, regras}) ou remove (DELETE) um cenário gravado"""
+    try:
+        if request.method == 'GET':
+            return jsonify(repositorio_cenarios.obter(identificador))
+        if request.method == 'PUT':
+            repositorio_cenarios.obter(identificador)
+            return jsonify(repositorio_cenarios.salvar(request.get_json(silent=True) or {}, identificador))
+        repositorio_cenarios.remover(identificador)
+        return jsonify({'status': 'Cenário removido', 'id': identificador})
+
+    except KeyError:
+        return jsonify({'erro': f"Cenário não encontrado: {identificador}"}), 404
+    except ValueError as e:
+        return jsonify({'erro': str(e)}), 400
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({'erro': f"Erro nos cenários: {str(e)}"}), 500
+
+@receita_bp.route('/simulacao/<relatorio>', methods=['POST'])
+def simular_relatorio(relatorio):
+    """
+    Relatório com um cenário aplicado (JSON)
+    Corpo: {"regras": [...]} para um cenário avulso ou {"cenario": "<id>"} para um gravado;
+    NOUG, mês e período vêm da query string, como nas páginas dos relatórios
+    """
+    try:
+        inicio = time.time()
+        if relatorio not in RELATORIOS_SIMULACAO:
+            return jsonify({'erro': f"Relatório sem simulação: {relatorio}"}), 404
+
+        corpo = request.get_json(silent=True) or {}
+        if corpo.get('cenario'):
+            try:
+                cenario = repositorio_cenarios.obter(str(corpo['cenario']))
+            except KeyError:
+                return jsonify({'erro': f"Cenário não encontrado: {corpo['cenario']}"}), 404
+        else:
+            cenario = validar_cenario(corpo)
+
+        df_completo = carregar_receita_resumida()
+        df_filtrado, noug_selecionada = aplicar_filtros_consulta(df_completo, request.args)
+        mes_selecionado = request.args.get('mes', None, type=int)
+        visao_selecionada = request.args.get('visao', None)
+        df_periodo = recorte_mensal(df_filtrado, mes_selecionado, visao_selecionada)
+
+        resultado = simular_especificacao(df_periodo, RELATORIOS_SIMULACAO[relatorio], cenario,
+                                          obter_hierarquia_receitas(df_completo), noug_selecionada)
+
+        return jsonify({
+            'relatorio': relatorio,
+            'cenario': cenario,
+            'mes_referencia': resultado['mes_referencia'],
+            'dados': resultado['dados_numericos'],
+            'tempo_ms': round((time.time() - inicio) * 1000, 2)
+        })
+
+    except ValueError as e:
+        return jsonify({'erro': str(e)}), 400
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({'erro': f"Erro na simulação: {str(e)}"}), 500
@@ -38,19 +38,38 @@ const NIVEL_CORES = {
     'total': { fill: [0, 51, 102], text: [255, 255, 255], bold: true }
 };
 
-// Função para aplicar filtro de NOUG
+// Função para aplicar os filtros de NOUG e de período
+// Os demais filtros combináveis da URL (tipo_adm, categoria, origem, mes_inicio, mes_fim) são mantidos
 function aplicarFiltro() {
-    const select = document.getElementById('filtro-noug');
-    if (!select) return;
+    const parametros = new URLSearchParams(window.location.search);
+    ['mes', 'visao'].forEach(chave => parametros.delete(chave));
     
-    const nougSelecionada = select.value;
-    const urlAtual = window.location.pathname;
+    const selectNoug = document.getElementById('filtro-noug');
+    if (selectNoug) {
+        parametros.delete('noug');
+        if (selectNoug.value !== 'todos') {
+            parametros.set('noug', selectNoug.value);
+        }
+    }
     
-    if (nougSelecionada === 'todos') {
-        window.location.href = urlAtual;
-    } else {
-        window.location.href = `${urlAtual}?noug=${encodeURIComponent(nougSelecionada)}`;
+    // Seletor de mês: sem mês escolhido o relatório usa o último mês carregado;
+    // uma visão diferente da acumulada sem mês aplica-se ao último mês da lista
+    const selectMes = document.getElementById('filtro-mes');
+    const selectVisao = document.getElementById('filtro-visao');
+    if (selectMes) {
+        const visao = selectVisao ? selectVisao.value : 'acumulado';
+        const ultimoMes = selectMes.options[selectMes.options.length - 1].value;
+        const mes = selectMes.value || (visao !== 'acumulado' ? ultimoMes : '');
+        if (mes) {
+            parametros.set('mes', mes);
+            if (visao !== 'acumulado') {
+                parametros.set('visao', visao);
+            }
+        }
     }
+    
+    const consulta = parametros.toString();
+    window.location.href = consulta ? `${window.location.pathname}?${consulta}` : window.location.pathname;
 }
 
 // Função para atualizar dados
@@ -0,0 +1,60 @@
+"""
+Configuração dos testes: importa os módulos a partir da raiz do projeto e monta as bases
+sintéticas de receita e despesa usadas pelos testes dos relatórios
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
+
+from benchmarks.dados_sinteticos import gerar_receita_sintetica, TIPOS_ADM  # noqa: E402
+from relatorios.utils.indice_hierarquico import DIVISOR_CONTA_CORRENTE  # noqa: E402
+
+# NOUGs só da despesa (com os espaços à direita da planilha) e NOUGs da receita sem despesa
+NOUGS_SO_DESPESA = ['UNIDADE SO DESPESA  ']
+NOUGS_COM_DESPESA = 5
+
+@pytest.fixture(scope='session')
+def receita():
+    """Receita sintética de dois exercícios, com RECEITA_CODIGO como na ingestão"""
+    df = gerar_receita_sintetica(4000, n_nougs=8, n_alineas=40, semente=7)
+    df['RECEITA_CODIGO'] = df['COCONTACORRENTE'] // DIVISOR_CONTA_CORRENTE
+    return df
+
+@pytest.fixture(scope='session')
+def despesa(receita):
+    """Despesa sintética: parte das NOUGs da receita (com espaços à direita) e uma só da despesa"""
+    rng = np.random.default_rng(8)
+    n = 3000
+    nougs = [f"{noug}  " for noug in sorted(receita['NOUG'].unique())[:NOUGS_COM_DESPESA]] + NOUGS_SO_DESPESA
+    categorias = rng.choice(['3', '4'], n)
+    grupos = np.char.add(categorias, rng.choice(['1', '3', '4'], n))
+    elementos = np.char.add(grupos, rng.choice(['9011', '9030', '9039'], n))
+    return pd.DataFrame({
+        'CATEGORIA': pd.Categorical(categorias),
+        'NOCATEGORIA': pd.Categorical(np.char.add('Categoria ', categorias)),
+        'GRUPO': pd.Categorical(grupos),
+        'NOGRUPO': pd.Categorical(np.char.add('Grupo ', grupos)),
+        'MODALIDADE': '90',
+        'NOMODALIDADE': 'Aplicações Diretas',
+        'ELEMENTO': elementos,
+        'NOELEMENTO': np.char.add('Elemento ', elementos),
+        'COEXERCICIO': rng.choice([2024, 2025], n).astype('int32'),
+        'INMES': rng.integers(1, 13, n).astype('int32'),
+        'INTIPOADM': rng.choice(np.array(TIPOS_ADM, dtype=np.int32), n),
+        'NOUG': pd.Categorical(rng.choice(nougs, n)),
+        'DOTACAO INICIAL': rng.uniform(0, 1e6, n),
+        'DOTACAO ADICIONAL': rng.uniform(0, 1e5, n),
+        'CANCELAMENTO DE DOTACAO': -rng.uniform(0, 5e4, n),
+        'CANCEL-REMANEJA DOTACAO': -rng.uniform(0, 5e4, n),
+        'DESPESA EMPENHADA': rng.uniform(0, 8e5, n),
+        'DESPESA LIQUIDADA': rng.uniform(0, 6e5, n),
+        'DESPESA PAGA': rng.uniform(0, 5e5, n),
+        'SALDO DOTACAO': rng.uniform(0, 2e5, n)
+    })
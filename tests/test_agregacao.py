@@ -0,0 +1,109 @@
+"""
+Testes do kernel de agregação e dos backends: todos devem dar os mesmos grupos e totais
+que um groupby().sum() do pandas, inclusive com chaves nulas e tipos anuláveis
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from cache_service import cache_service
+from relatorios.utils import agregacao, fragmentacao
+from relatorios.utils.agregacao import agregar_codificado, codificar_coluna, COLUNA_REGISTROS
+from relatorios.utils.backends import BackendPandas, BackendDuckDB
+from relatorios.utils.fragmentacao import BackendFragmentado
+
+COLUNAS_VALOR = ['RECEITA LIQUIDA', 'PREVISAO INICIAL']
+
+CHAVES = [
+    ['NOUG'],
+    ['INMES'],
+    ['CATEGORIA'],
+    ['ORIGEM'],
+    ['NOUG', 'INMES'],
+    ['NOUG', 'CATEGORIA', 'ORIGEM'],
+    ['INTIPOADM', 'INMES', 'CATEGORIA']
+]
+
+@pytest.fixture(scope='module')
+def df():
+    rng = np.random.default_rng(28)
+    n = 2000
+    nougs = np.array(['UG 1', 'UG 2  ', 'UG 3', None], dtype=object)
+    meses = pd.array(rng.integers(1, 13, n), dtype='Int64')
+    meses[rng.random(n) < 0.1] = pd.NA
+    origens = rng.choice([11.0, 12.0, 17.0, np.nan], n)
+    categorias = pd.Categorical(rng.choice(['1', '2', '7', None], n), categories=['1', '2', '7'])
+    receita = rng.normal(1000, 300, n)
+    receita[rng.random(n) < 0.05] = np.nan
+    return pd.DataFrame({
+        'NOUG': rng.choice(nougs, n),
+        'INMES': meses,
+        'INTIPOADM': rng.integers(1, 4, n),
+        'CATEGORIA': categorias,
+        'ORIGEM': origens,
+        'RECEITA LIQUIDA': receita,
+        'PREVISAO INICIAL': pd.array(rng.integers(0, 500, n), dtype='Int64')
+    })
+
+def _esperado(df, chaves):
+    agrupado = df.groupby(chaves, observed=True, sort=True)
+    esperado = agrupado[COLUNAS_VALOR].sum().astype(np.float64)
+    esperado[COLUNA_REGISTROS] = agrupado.size()
+    return esperado
+
+def _comparar(resultado, esperado):
+    assert list(resultado.index) == list(esperado.index)
+    assert list(resultado.index.names) == list(esperado.index.names)
+    for coluna in COLUNAS_VALOR + [COLUNA_REGISTROS]:
+        np.testing.assert_allclose(resultado[coluna].to_numpy(dtype=np.float64),
+                                   esperado[coluna].to_numpy(dtype=np.float64), rtol=1e-9)
+
+def test_codificar_inteiro_anulavel():
+    codigos, valores = codificar_coluna(pd.Series(pd.array([3, None, 5, 3], dtype='Int64')))
+    assert codigos.tolist() == [0, -1, 2, 0]
+    assert valores.tolist() == [3, 4, 5]
+
+def test_codificar_inteiro_anulavel_so_nulos():
+    codigos, valores = codificar_coluna(pd.Series(pd.array([None, None], dtype='Int64')))
+    assert codigos.tolist() == [-1, -1]
+    assert len(valores) == 0
+
+@pytest.mark.parametrize('modo', ['denso', 'esparso'])
+@pytest.mark.parametrize('chaves', CHAVES, ids='-'.join)
+def test_kernel_igual_ao_groupby(df, chaves, modo):
+    _comparar(agregar_codificado(df, chaves, COLUNAS_VALOR, modo=modo), _esperado(df, chaves))
+
+@pytest.mark.parametrize('chaves', CHAVES, ids='-'.join)
+def test_backend_pandas_igual_ao_groupby(df, chaves):
+    _comparar(BackendPandas().agregar(df, chaves, COLUNAS_VALOR), _esperado(df, chaves))
+
+@pytest.mark.parametrize('chaves', CHAVES, ids='-'.join)
+def test_backend_duckdb_igual_ao_groupby(df, chaves):
+    pytest.importorskip('duckdb')
+    _comparar(BackendDuckDB(threads=2).agregar(df, chaves, COLUNAS_VALOR), _esperado(df, chaves))
+
+@pytest.fixture(scope='module')
+def backend_fragmentado(df):
+    # Tabela pequena versionada pelo cache para que a consulta vá de fato aos processos
+    limite = fragmentacao.LINHAS_MINIMAS_FRAGMENTADO
+    fragmentacao.LINHAS_MINIMAS_FRAGMENTADO = 0
+    cache_service.fixar_dataframe('teste_agregacao', 'teste_agregacao_v1', lambda: df)
+    backend = BackendFragmentado(2)
+    yield backend
+    backend.encerrar()
+    cache_service.liberar_dataframe('teste_agregacao')
+    fragmentacao.LINHAS_MINIMAS_FRAGMENTADO = limite
+
+@pytest.mark.parametrize('chaves', CHAVES, ids='-'.join)
+def test_backend_fragmentado_igual_ao_groupby(df, backend_fragmentado, chaves):
+    _comparar(backend_fragmentado.agregar(df, chaves, COLUNAS_VALOR), _esperado(df, chaves))
+    assert 'teste_agregacao_v1' in backend_fragmentado.executor._distribuidas
+
+def test_agregar_com_filtros_igual_ao_groupby(df):
+    anterior = agregacao.backend_ativo()
+    agregacao.definir_backend_ativo(None)
+    try:
+        resultado = agregacao.agregar(df, ['NOUG', 'INMES'], COLUNAS_VALOR, {'INTIPOADM': [1, 2]})
+    finally:
+        agregacao.definir_backend_ativo(anterior)
+    _comparar(resultado, _esperado(df[df['INTIPOADM'].isin([1, 2])], ['NOUG', 'INMES']))
@@ -0,0 +1,58 @@
+"""
+Testes do alinhamento receita x despesa: mesmas somas de um groupby do pandas por
+(NOUG sem espaços, INTIPOADM, INMES), com zero onde a chave só existe numa das bases
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from relatorios.utils.alinhamento import (alinhar_receita_despesa, CHAVES_ALINHAMENTO, MEDIDAS_ALINHAMENTO,
+                                          MEDIDAS_DESPESA)
+
+def _somar(df, medidas):
+    df = df[df['COEXERCICIO'] == 2025].assign(NOUG=df['NOUG'].astype(str).str.strip())
+    agrupado = df.groupby(CHAVES_ALINHAMENTO, observed=True)
+    return pd.DataFrame({medida: agrupado[colunas].sum().sum(axis=1) for medida, colunas in medidas.items()})
+
+@pytest.fixture(scope='module')
+def esperado(receita, despesa):
+    receita = _somar(receita, {'receita_prevista': ['PREVISAO ATUALIZADA LIQUIDA'],
+                               'receita_realizada': ['RECEITA LIQUIDA']})
+    despesa = _somar(despesa, MEDIDAS_DESPESA)
+    return receita.join(despesa, how='outer').fillna(0.0)[MEDIDAS_ALINHAMENTO]
+
+def test_alinhamento_igual_ao_groupby(receita, despesa, esperado):
+    alinhado = alinhar_receita_despesa(receita, despesa)
+    assert alinhado.attrs['exercicio'] == 2025
+    assert alinhado.attrs['tem_despesa']
+    assert list(alinhado.index.names) == CHAVES_ALINHAMENTO
+    assert list(alinhado.columns) == MEDIDAS_ALINHAMENTO
+    resultado = alinhado.sort_index()
+    np.testing.assert_array_equal(resultado.index.get_level_values('NOUG'), esperado.index.get_level_values('NOUG'))
+    np.testing.assert_allclose(resultado.to_numpy(), esperado.to_numpy(), rtol=1e-9)
+
+def test_chaves_de_um_lado_so_recebem_zero(receita, despesa):
+    alinhado = alinhar_receita_despesa(receita, despesa)
+    nougs = alinhado.index.get_level_values('NOUG')
+    so_despesa = alinhado[nougs == 'UNIDADE SO DESPESA']
+    assert len(so_despesa) > 0
+    assert (so_despesa[['receita_prevista', 'receita_realizada']] == 0).all().all()
+    assert (so_despesa['despesa_empenhada'] > 0).all()
+
+    sem_despesa = sorted(set(receita['NOUG'].astype(str)) - {n.strip() for n in despesa['NOUG'].astype(str)})
+    assert sem_despesa
+    so_receita = alinhado[nougs.isin(sem_despesa)]
+    assert (so_receita[list(MEDIDAS_DESPESA)] == 0).all().all()
+    assert (so_receita['receita_realizada'] != 0).any()
+
+def test_despesa_vazia(receita):
+    alinhado = alinhar_receita_despesa(receita, pd.DataFrame())
+    assert not alinhado.attrs['tem_despesa']
+    assert (alinhado[list(MEDIDAS_DESPESA)] == 0).all().all()
+    assert alinhado['receita_realizada'].sum() == pytest.approx(
+        receita.loc[receita['COEXERCICIO'] == 2025, 'RECEITA LIQUIDA'].sum())
+
+def test_bases_vazias():
+    alinhado = alinhar_receita_despesa(pd.DataFrame(), pd.DataFrame())
+    assert alinhado.empty
+    assert list(alinhado.columns) == MEDIDAS_ALINHAMENTO
@@ -0,0 +1,67 @@
+"""
+Testes da análise de variações: valores base e atual de cada nó e o total conferidos com
+as somas do pandas nas três análises, em todos os níveis da hierarquia e por NOUG
+"""
+import pytest
+
+from relatorios.indicadores import gerar_relatorio_analise_variacoes, NIVEIS_ANALISE
+from relatorios.utils.indice_hierarquico import DIGITOS_CODIGO
+
+NOUG = 'UNIDADE GESTORA 003'
+
+def _esperado(receita, tipo_analise, digitos, noug=None):
+    if noug is not None:
+        receita = receita[receita['NOUG'] == noug]
+    receita = receita.assign(NO=receita['RECEITA_CODIGO'] // 10 ** (DIGITOS_CODIGO - digitos))
+    atual = receita[receita['COEXERCICIO'] == 2025]
+    ultimo_mes = atual['INMES'].max()
+    if tipo_analise == 'mensal':
+        base = atual[atual['INMES'] == ultimo_mes - 1].groupby('NO')['RECEITA LIQUIDA'].sum()
+        atual = atual[atual['INMES'] == ultimo_mes].groupby('NO')['RECEITA LIQUIDA'].sum()
+    elif tipo_analise == 'anual':
+        acumulado = receita[receita['INMES'] <= ultimo_mes]
+        base = acumulado[acumulado['COEXERCICIO'] == 2024].groupby('NO')['RECEITA LIQUIDA'].sum()
+        atual = acumulado[acumulado['COEXERCICIO'] == 2025].groupby('NO')['RECEITA LIQUIDA'].sum()
+    else:
+        base = atual.groupby('NO')['PREVISAO INICIAL LIQUIDA'].sum()
+        atual = atual.groupby('NO')['RECEITA LIQUIDA'].sum()
+    return base.align(atual, fill_value=0.0)
+
+@pytest.mark.parametrize('noug', [None, NOUG])
+@pytest.mark.parametrize('nivel', list(NIVEIS_ANALISE))
+@pytest.mark.parametrize('tipo_analise', ['mensal', 'anual', 'previsao'])
+def test_variacoes_iguais_ao_pandas(receita, tipo_analise, nivel, noug):
+    linhas, _, dados_para_ia, dados_pdf = gerar_relatorio_analise_variacoes(receita, None, noug, tipo_analise, nivel)
+    base, atual = _esperado(receita, tipo_analise, NIVEIS_ANALISE[nivel][1], noug)
+
+    *nos, total = linhas
+    assert total['tipo'] == 'total'
+    assert total['valor_base'] == pytest.approx(base.sum())
+    assert total['valor_atual'] == pytest.approx(atual.sum())
+    assert total['variacao_abs'] == pytest.approx(atual.sum() - base.sum())
+
+    # Rótulos 'código - nome' quando há classificação; o código identifica o nó
+    por_no = {int(linha['especificacao'].split(' - ')[0]): linha for linha in nos}
+    assert sorted(por_no) == sorted(base.index[(base != 0) | (atual != 0)])
+    for no, linha in por_no.items():
+        assert linha['valor_base'] == pytest.approx(base[no])
+        assert linha['valor_atual'] == pytest.approx(atual[no])
+        if base[no] != 0:
+            assert linha['variacao_perc'] == pytest.approx((atual[no] - base[no]) / abs(base[no]) * 100)
+    assert len(dados_para_ia) == len(dados_pdf['body']) == len(linhas)
+
+def test_mensal_traz_a_serie_do_exercicio(receita):
+    linhas = gerar_relatorio_analise_variacoes(receita, None, NOUG, 'mensal', 'categoria')[0]
+    atual = receita[(receita['COEXERCICIO'] == 2025) & (receita['NOUG'] == NOUG)]
+    serie = atual.groupby('INMES')['RECEITA LIQUIDA'].sum()
+    total = linhas[-1]
+    assert [mes['valor'] for mes in total['meses']] == pytest.approx(serie.to_list())
+    assert total['meses'][-1]['acumulado'] == pytest.approx(serie.sum())
+
+def test_noug_sem_dados(receita):
+    assert gerar_relatorio_analise_variacoes(receita, None, 'UG INEXISTENTE') == ([], "12", [], {})
+
+@pytest.mark.parametrize('tipo_analise, nivel', [('trimestral', 'categoria'), ('mensal', 'subalinea')])
+def test_parametros_invalidos(receita, tipo_analise, nivel):
+    with pytest.raises(ValueError):
+        gerar_relatorio_analise_variacoes(receita, None, None, tipo_analise, nivel)
@@ -0,0 +1,58 @@
+"""
+Testes do índice bitmap: cada seleção deve dar as mesmas linhas que a máscara booleana
+equivalente do pandas (OU dentro de uma dimensão, E entre dimensões)
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from relatorios.utils.bitmap import IndiceBitmap
+
+@pytest.fixture(scope='module')
+def df():
+    rng = np.random.default_rng(37)
+    n = 1003  # não múltiplo de 8: o último byte dos bitsets fica incompleto
+    meses = pd.array(rng.integers(1, 13, n), dtype='Int64')
+    meses[rng.random(n) < 0.05] = pd.NA
+    return pd.DataFrame({
+        'NOUG': rng.choice(np.array(['UG 1', 'UG 2  ', 'UG 3', None], dtype=object), n),
+        'INTIPOADM': rng.integers(1, 4, n),
+        'CATEGORIA': pd.Categorical(rng.choice(['1', '2', None], n), categories=['1', '2', '7']),
+        'ORIGEM': rng.choice([11.0, 12.0, 17.0, np.nan], n),
+        'INMES': meses
+    })
+
+@pytest.fixture(scope='module')
+def indice(df):
+    return IndiceBitmap(df)
+
+def _posicoes(mascara):
+    return np.flatnonzero(np.asarray(mascara, dtype=bool))
+
+def test_um_bitmap_por_valor_presente(df, indice):
+    assert set(indice.bitmaps['NOUG']) == {'UG 1', 'UG 2', 'UG 3'}
+    # Categoria sem linhas não vira bitmap
+    assert set(indice.bitmaps['CATEGORIA']) == {'1', '2'}
+    for valor, bits in indice.bitmaps['INTIPOADM'].items():
+        esperado = (df['INTIPOADM'] == int(valor)).to_numpy()
+        assert np.array_equal(np.unpackbits(bits, count=len(df)).astype(bool), esperado)
+
+@pytest.mark.parametrize('filtros, mascara', [
+    ({'NOUG': ['UG 1', 'UG 3']}, lambda df: df['NOUG'].isin(['UG 1', 'UG 3'])),
+    ({'NOUG': ['UG 2']}, lambda df: df['NOUG'] == 'UG 2  '),
+    ({'INTIPOADM': [1], 'CATEGORIA': ['2']}, lambda df: (df['INTIPOADM'] == 1) & (df['CATEGORIA'] == '2')),
+    ({'ORIGEM': ['11.0', '17.0'], 'INMES': (3, 7)},
+     lambda df: df['ORIGEM'].isin([11.0, 17.0]) & df['INMES'].between(3, 7).fillna(False)),
+    ({'NOUG': ['UG 1', 'UG 2'], 'INTIPOADM': [2, 3], 'INMES': (1, 12), 'CATEGORIA': ['1']},
+     lambda df: df['NOUG'].isin(['UG 1', 'UG 2  ']) & df['INTIPOADM'].isin([2, 3])
+     & df['INMES'].notna() & (df['CATEGORIA'] == '1')),
+    ({'NOUG': ['UG inexistente']}, lambda df: pd.Series(False, index=df.index)),
+    ({}, lambda df: pd.Series(True, index=df.index))
+])
+def test_selecionar_igual_a_mascara(df, indice, filtros, mascara):
+    assert np.array_equal(indice.selecionar(filtros), _posicoes(mascara(df)))
+
+def test_dataframe_vazio():
+    indice = IndiceBitmap(pd.DataFrame({'NOUG': pd.Series([], dtype=object)}))
+    assert indice.bitmaps['NOUG'] == {}
+    assert len(indice.selecionar({'NOUG': ['UG 1']})) == 0
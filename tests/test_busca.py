@@ -0,0 +1,86 @@
+"""
+Testes da busca indexada: cada consulta deve devolver os mesmos documentos que uma
+varredura ingênua (todos os termos da consulta como prefixo de algum termo do nome)
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from relatorios.utils import busca
+from relatorios.utils.busca import IndiceBusca, normalizar_texto
+from relatorios.utils.indice_hierarquico import DIVISOR_CONTA_CORRENTE
+
+# Código da receita -> (nome da alínea, nome da espécie)
+RECEITAS = {
+    11120101: ('Imposto sobre a Propriedade Territorial Rural', 'Impostos'),
+    11130311: ('Imposto sobre a Renda - Retido na Fonte', 'Impostos'),
+    11180141: ('Imposto sobre Transmissão Causa Mortis', 'Impostos'),
+    12100000: ('Contribuições Sociais', 'Contribuições'),
+    17180101: ('Cota-Parte do Fundo de Participação dos Estados', 'Transferências Correntes'),
+    19110000: ('Multas Administrativas', 'Multas e Juros de Mora')
+}
+NOUGS = {'110101': 'SECRETARIA DE ESTADO DE ECONOMIA  ', '170101': 'FUNDO DE SAÚDE DO DF', '190101': 'FUNDO DO TRABALHO'}
+
+@pytest.fixture(scope='module')
+def df():
+    rng = np.random.default_rng(36)
+    n = 1500
+    codigos = rng.choice(list(RECEITAS), n)
+    cougs = rng.choice(list(NOUGS), n)
+    return pd.DataFrame({
+        'COEXERCICIO': rng.choice([2024, 2025], n),
+        'COCONTACORRENTE': codigos * DIVISOR_CONTA_CORRENTE + 100_000_000,
+        'ALINEA': [str(c)[:6] for c in codigos],
+        'NOALINEA': [RECEITAS[c][0] for c in codigos],
+        'ESPECIE': [str(c)[:3] for c in codigos],
+        'NOSUBFONTERECEITA': [RECEITAS[c][1] for c in codigos],
+        'COUG': cougs,
+        'NOUG': [NOUGS[c] for c in cougs],
+        'RECEITA LIQUIDA': np.round(rng.uniform(0, 1e5, n), 2)
+    })
+
+@pytest.fixture(scope='module')
+def indice(df):
+    # Sem a planilha de classificação: só alíneas, subfontes e unidades gestoras
+    original = busca.obter_classificacao
+    busca.obter_classificacao = lambda: None
+    try:
+        yield IndiceBusca(df)
+    finally:
+        busca.obter_classificacao = original
+
+def _esperado(indice, consulta):
+    termos = normalizar_texto(consulta)
+    encontrados = []
+    for posicao, (nome, codigo) in enumerate(zip(indice.nomes, indice.codigos)):
+        termos_documento = normalizar_texto(nome) + [codigo]
+        if all(any(t.startswith(termo) for t in termos_documento) for termo in termos):
+            encontrados.append(posicao)
+    return encontrados
+
+def test_documentos_e_totais(df, indice):
+    atual = df[df['COEXERCICIO'] == 2025]
+    assert len(indice) == df['ALINEA'].nunique() + df['ESPECIE'].nunique() + df['COUG'].nunique()
+    for tipo, codigo, nome, total in zip(indice.tipos, indice.codigos, indice.nomes, indice.totais):
+        if tipo == 'noug':
+            mascara = atual['COUG'] == codigo
+        else:
+            coluna = 'ALINEA' if tipo == 'alinea' else 'ESPECIE'
+            mascara = atual[coluna].str.startswith(codigo)
+        assert total == pytest.approx(atual.loc[mascara, 'RECEITA LIQUIDA'].sum(), abs=0.01), nome
+
+@pytest.mark.parametrize('consulta', [
+    'imposto', 'IMPOSTO SOBRE', 'imp trans', 'transmissao', 'Transmissão', 'contribui',
+    'fundo', 'fundo saude', 'saúde df', 'multa mora', '1113', '17', 'cota parte', 'inexistente', 'fundo imposto'
+])
+def test_prefixos_iguais_a_varredura(indice, consulta):
+    resultado = indice.buscar(consulta, limite=len(indice))
+    esperado = _esperado(indice, consulta)
+    assert sorted((r['tipo'], r['codigo']) for r in resultado) == \
+        sorted((indice.tipos[i], indice.codigos[i]) for i in esperado)
+    totais = [r['total'] for r in resultado]
+    assert totais == sorted(totais, reverse=True)
+
+def test_limite_e_consulta_vazia(indice):
+    assert len(indice.buscar('imposto', limite=2)) == 2
+    assert indice.buscar('  --  ') == []
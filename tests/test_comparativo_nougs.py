@@ -0,0 +1,70 @@
+"""
+Testes do comparativo entre NOUGs: células NOUG x origem, totais, top-N com a linha de
+demais unidades e ordenações conferidos com as somas do pandas no exercício atual
+"""
+import numpy as np
+import pytest
+
+from relatorios.receita import gerar_comparativo_nougs
+from relatorios.receita.receita_por_fonte import DIVISOR_ORIGEM
+from relatorios.utils import aplicar_filtros
+
+@pytest.fixture(scope='module')
+def esperado(receita):
+    atual = receita[receita['COEXERCICIO'] == 2025]
+    atual = atual.assign(ORIGEM_CODIGO=atual['RECEITA_CODIGO'] // DIVISOR_ORIGEM,
+                         NOUG=atual['NOUG'].astype(str).str.strip())
+    return atual.groupby(['NOUG', 'ORIGEM_CODIGO'])[['PREVISAO ATUALIZADA LIQUIDA', 'RECEITA LIQUIDA']].sum()
+
+def _por_unidade(linhas):
+    return {linha['unidade']: linha for linha in linhas if linha['tipo'] == 'principal'}
+
+def test_celulas_e_totais(receita, esperado):
+    dados, _, dados_para_ia, dados_pdf = gerar_comparativo_nougs(receita)
+    origens = sorted(esperado.index.get_level_values('ORIGEM_CODIGO').unique())
+    assert len(dados['origens']) == len(origens)
+
+    unidades = _por_unidade(dados['linhas'])
+    assert sorted(unidades) == sorted(esperado.index.get_level_values('NOUG').unique())
+    for noug, linha in unidades.items():
+        celulas = esperado.loc[noug].reindex(origens, fill_value=0.0)
+        np.testing.assert_allclose([c['realizada'] for c in linha['celulas']], celulas['RECEITA LIQUIDA'])
+        np.testing.assert_allclose([c['previsao'] for c in linha['celulas']], celulas['PREVISAO ATUALIZADA LIQUIDA'])
+        assert linha['execucao'] == pytest.approx(linha['realizada'] / linha['previsao'] * 100)
+
+    total = dados['linhas'][-1]
+    assert total['tipo'] == 'total'
+    assert total['realizada'] == pytest.approx(esperado['RECEITA LIQUIDA'].sum())
+    assert total['previsao'] == pytest.approx(esperado['PREVISAO ATUALIZADA LIQUIDA'].sum())
+    assert len(dados_para_ia) == len(dados_pdf['body']) == len(dados['linhas'])
+
+@pytest.mark.parametrize('ordenacao, chave', [('realizada', 'realizada'), ('previsao', 'previsao'),
+                                              ('execucao', 'execucao')])
+def test_ordenacao(receita, ordenacao, chave):
+    linhas = gerar_comparativo_nougs(receita, ordenacao)[0]['linhas'][:-1]
+    valores = [linha[chave] for linha in linhas]
+    assert valores == sorted(valores, reverse=True)
+
+def test_ordenacao_por_nome(receita):
+    nomes = [linha['unidade'] for linha in gerar_comparativo_nougs(receita, 'noug')[0]['linhas'][:-1]]
+    assert nomes == sorted(nomes)
+
+def test_top_n_soma_as_demais(receita, esperado):
+    linhas = gerar_comparativo_nougs(receita, 'realizada', top_n=3)[0]['linhas']
+    principais, demais, total = linhas[:3], linhas[3], linhas[4]
+    por_noug = esperado.groupby(level='NOUG')['RECEITA LIQUIDA'].sum().sort_values(ascending=False)
+    assert [linha['unidade'] for linha in principais] == list(por_noug.index[:3])
+    assert demais['tipo'] == 'filha' and demais['unidade'] == f"DEMAIS UNIDADES ({len(por_noug) - 3})"
+    assert demais['realizada'] == pytest.approx(por_noug.iloc[3:].sum())
+    assert total['realizada'] == pytest.approx(por_noug.sum())
+
+def test_filtro_de_nougs(receita, esperado):
+    escolhidas = ['UNIDADE GESTORA 002', 'UNIDADE GESTORA 005']
+    dados = gerar_comparativo_nougs(aplicar_filtros(receita, {'NOUG': escolhidas}))[0]
+    assert sorted(_por_unidade(dados['linhas'])) == escolhidas
+    assert dados['linhas'][-1]['realizada'] == pytest.approx(esperado.loc[escolhidas, 'RECEITA LIQUIDA'].sum())
+
+def test_base_vazia(receita):
+    dados, _, dados_para_ia, dados_pdf = gerar_comparativo_nougs(receita.iloc[0:0])
+    assert dados == {'origens': [], 'linhas': []}
+    assert dados_para_ia == [] and dados_pdf == {}
@@ -0,0 +1,76 @@
+"""
+Testes do cubo mensal: cada visão do seletor de mês deve somar o mesmo que o filtro
+equivalente por INMES no pandas (fluxos no período, estoques acumulados até o mês)
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from relatorios.utils.cubo_mensal import CuboMensal
+
+CHAVES = ['COEXERCICIO', 'NOUG', 'CATEGORIA']
+FLUXO, ESTOQUE = 'RECEITA LIQUIDA', 'PREVISAO ATUALIZADA LIQUIDA'
+
+@pytest.fixture(scope='module')
+def df():
+    rng = np.random.default_rng(30)
+    n = 4000
+    exercicios = rng.choice([2024, 2025], n)
+    # O exercício atual só tem dados até julho
+    meses = np.where(exercicios == 2025, rng.integers(1, 8, n), rng.integers(1, 13, n))
+    return pd.DataFrame({
+        'COEXERCICIO': exercicios,
+        'INMES': meses,
+        'NOUG': rng.choice(['UG 1', 'UG 2', 'UG 3', 'UG 4'], n),
+        'CATEGORIA': pd.Categorical(rng.choice(['1', '2', '7'], n)),
+        FLUXO: rng.normal(1000, 300, n),
+        ESTOQUE: rng.uniform(0, 500, n)
+    })
+
+@pytest.fixture(scope='module')
+def cubo(df):
+    return CuboMensal(df)
+
+def _somar(df):
+    return df.groupby(CHAVES, observed=True)[[FLUXO, ESTOQUE]].sum()
+
+def _comparar(recorte, esperado, mes):
+    assert (recorte['INMES'] == mes).all()
+    resultado, esperado = _somar(recorte).align(esperado, fill_value=0.0)
+    np.testing.assert_allclose(resultado.to_numpy(), esperado.to_numpy(), rtol=1e-9, atol=1e-6)
+
+def test_meses_disponiveis(cubo):
+    assert cubo.exercicio_atual == 2025
+    assert cubo.meses_disponiveis == list(range(1, 8))
+
+@pytest.mark.parametrize('mes', [1, 4, 7, 12])
+def test_acumulado(df, cubo, mes):
+    recorte = cubo.recorte(mes, 'acumulado')
+    esperado = _somar(df[df['INMES'] <= mes])
+    _comparar(recorte, esperado, mes)
+    # Uma linha por célula com movimento até o mês
+    assert len(recorte) == len(df[df['INMES'] <= mes].groupby(CHAVES, observed=True))
+
+@pytest.mark.parametrize('mes', [1, 4, 7])
+def test_somente_o_mes(df, cubo, mes):
+    esperado = _somar(df[df['INMES'] <= mes])
+    esperado[FLUXO] = _somar(df[df['INMES'] == mes])[FLUXO].reindex(esperado.index, fill_value=0.0)
+    _comparar(cubo.recorte(mes, 'mes'), esperado, mes)
+
+@pytest.mark.parametrize('mes', [1, 4, 7, 12])
+def test_doze_meses(df, cubo, mes):
+    esperado = _somar(df[df['INMES'] <= mes])
+    # Meses mes+1..12 do exercício anterior entram no exercício seguinte, só no fluxo
+    cauda = df[(df['INMES'] > mes) & (df['COEXERCICIO'] == 2024)].assign(COEXERCICIO=2025)
+    esperado[FLUXO] = esperado[FLUXO].add(_somar(cauda)[FLUXO], fill_value=0.0)
+    _comparar(cubo.recorte(mes, 'doze_meses'), esperado.fillna(0.0), mes)
+
+def test_recorte_preserva_tipos(df, cubo):
+    recorte = cubo.recorte(3, 'acumulado')
+    assert list(recorte.columns) == list(df.columns)
+    assert recorte.dtypes.equals(df.dtypes)
+
+@pytest.mark.parametrize('mes, visao', [(0, 'acumulado'), (13, 'mes'), (3, 'trimestre')])
+def test_periodo_invalido(cubo, mes, visao):
+    with pytest.raises(ValueError):
+        cubo.recorte(mes, visao)
@@ -0,0 +1,74 @@
+"""
+Testes do dashboard executivo: resumo financeiro e evolução mensal conferidos com as somas
+do pandas no exercício atual, sem base de despesa e com uma seção indisponível
+"""
+import numpy as np
+import pytest
+
+from relatorios.indicadores import gerar_dashboard_executivo, dashboard_executivo
+from relatorios.indicadores.dashboard_executivo import COLUNAS_DOTACAO_ATUALIZADA
+from relatorios.utils import aplicar_filtros
+
+NOUG = 'UNIDADE GESTORA 001'
+
+def _resumo(receita, despesa):
+    receita = receita[receita['COEXERCICIO'] == 2025]
+    despesa = despesa[despesa['COEXERCICIO'] == 2025]
+    return {
+        'receita_prevista': receita['PREVISAO ATUALIZADA LIQUIDA'].sum(),
+        'receita_realizada': receita['RECEITA LIQUIDA'].sum(),
+        'despesa_orcada': despesa[COLUNAS_DOTACAO_ATUALIZADA].to_numpy().sum(),
+        'despesa_executada': despesa['DESPESA EMPENHADA'].sum(),
+        'despesa_paga': despesa['DESPESA PAGA'].sum(),
+        'saldo_orcamentario': receita['RECEITA LIQUIDA'].sum() - despesa['DESPESA EMPENHADA'].sum()
+    }
+
+@pytest.mark.parametrize('noug', [None, NOUG])
+def test_resumo_igual_ao_pandas(receita, despesa, noug):
+    if noug is not None:
+        receita = aplicar_filtros(receita, {'NOUG': [noug]})
+        despesa = aplicar_filtros(despesa, {'NOUG': [noug]})
+        assert len(despesa) > 0
+    dados, _, dados_para_ia, dados_pdf = gerar_dashboard_executivo(receita, despesa)
+    esperado = _resumo(receita, despesa)
+    for chave, valor in esperado.items():
+        assert dados['resumo_financeiro'][chave] == pytest.approx(valor), chave
+
+    assert dados['tem_despesa'] and dados['secoes_indisponiveis'] == []
+    arrecadacao, execucao, saldo = dados['indicadores']
+    assert arrecadacao['valor'] == pytest.approx(esperado['receita_realizada'] / esperado['receita_prevista'] * 100)
+    assert execucao['valor'] == pytest.approx(esperado['despesa_executada'] / esperado['despesa_orcada'] * 100)
+    assert saldo['valor'] == pytest.approx(esperado['saldo_orcamentario'])
+    assert len(dados_para_ia) == len(dados_pdf['body']) == 3
+
+def test_evolucao_mensal(receita, despesa):
+    evolucao = gerar_dashboard_executivo(receita, despesa)[0]['evolucao_mensal']
+    receitas = receita[receita['COEXERCICIO'] == 2025].groupby('INMES')['RECEITA LIQUIDA'].sum()
+    despesas = despesa[despesa['COEXERCICIO'] == 2025].groupby('INMES')['DESPESA EMPENHADA'].sum()
+    receitas, despesas = receitas.align(despesas, fill_value=0.0)
+    assert evolucao['meses'] == [f"{mes:02d}/2025" for mes in receitas.index]
+    np.testing.assert_allclose(evolucao['receitas'], receitas.to_numpy())
+    np.testing.assert_allclose(evolucao['despesas'], despesas.to_numpy())
+
+def test_sem_despesa(receita, despesa):
+    dados = gerar_dashboard_executivo(receita, despesa.iloc[0:0])[0]
+    assert not dados['tem_despesa']
+    assert dados['resumo_financeiro']['receita_realizada'] == pytest.approx(
+        receita.loc[receita['COEXERCICIO'] == 2025, 'RECEITA LIQUIDA'].sum())
+    assert [linha['status'] for linha in dados['indicadores'][1:]] == ['Sem dados de despesa'] * 2
+    assert dados['top_despesas'] == []
+    assert not any(dados['evolucao_mensal']['despesas'])
+
+def test_secao_com_erro_fica_indisponivel(receita, despesa, monkeypatch):
+    def falhar(*args):
+        raise RuntimeError('seção com erro')
+    monkeypatch.setattr(dashboard_executivo, '_totais_despesa', falhar)
+    dados = gerar_dashboard_executivo(receita, despesa)[0]
+    assert dados['secoes_indisponiveis'] == ['despesa']
+    resumo = dados['resumo_financeiro']
+    assert resumo['despesa_orcada'] is None and resumo['saldo_orcamentario'] is None
+    assert resumo['despesa_orcada_fmt'] == 'Indisponível'
+    assert resumo['receita_realizada'] is not None
+    assert [linha['status'] for linha in dados['indicadores'][1:]] == ['Indisponível'] * 2
+    # As demais seções saem normalmente
+    assert dados['top_despesas']
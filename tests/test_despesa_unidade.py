@@ -0,0 +1,87 @@
+"""
+Testes da despesa por unidade gestora: valores por NOUG e TOTAL GERAL conferidos com as
+somas do pandas no exercício atual, com paginação, ordenações e empates pelo nome
+"""
+import pandas as pd
+import pytest
+
+from relatorios.despesa import gerar_relatorio_despesa_por_noug, ORDENACOES_DESPESA_NOUG
+from relatorios.despesa.despesa_unidade import COLUNAS_DOTACAO_ATUALIZADA
+
+@pytest.fixture(scope='module')
+def esperado(despesa):
+    atual = despesa[despesa['COEXERCICIO'] == 2025]
+    atual = atual.assign(NOUG=atual['NOUG'].astype(str).str.strip(),
+                         DOTACAO=atual[COLUNAS_DOTACAO_ATUALIZADA].sum(axis=1))
+    unidades = atual.groupby('NOUG')[['DOTACAO', 'DESPESA EMPENHADA', 'DESPESA LIQUIDADA', 'DESPESA PAGA']].sum()
+    unidades.columns = ['dotacao_atualizada', 'despesa_empenhada', 'despesa_liquidada', 'despesa_paga']
+    unidades['saldo_dotacao'] = unidades['dotacao_atualizada'] - unidades['despesa_empenhada']
+    unidades['execucao'] = unidades['despesa_empenhada'] / unidades['dotacao_atualizada'] * 100
+    return unidades
+
+def _todas_as_paginas(df, **parametros):
+    linhas, pagina, total = [], 1, None
+    while True:
+        dados = gerar_relatorio_despesa_por_noug(df, pagina=pagina, por_pagina=2, **parametros)[0]
+        *unidades, total = dados['linhas']
+        linhas += unidades
+        if pagina == dados['total_paginas']:
+            return linhas, total, dados
+        pagina += 1
+
+def test_unidades_e_total_iguais_ao_pandas(despesa, esperado):
+    linhas, total, dados = _todas_as_paginas(despesa)
+    assert dados['total_unidades'] == len(esperado)
+    assert dados['total_paginas'] == -(-len(esperado) // 2)
+    assert [linha['posicao'] for linha in linhas] == list(range(1, len(esperado) + 1))
+    for linha in linhas:
+        for chave, valor in esperado.loc[linha['noug']].items():
+            assert linha[chave] == pytest.approx(valor), (linha['noug'], chave)
+
+    assert total['tipo'] == 'total' and total['noug'] == 'TOTAL GERAL'
+    for chave in ('dotacao_atualizada', 'despesa_empenhada', 'despesa_liquidada', 'despesa_paga', 'saldo_dotacao'):
+        assert total[chave] == pytest.approx(esperado[chave].sum())
+
+def test_total_e_pdf_cobrem_todas_as_paginas(despesa, esperado):
+    dados, _, dados_para_ia, dados_pdf = gerar_relatorio_despesa_por_noug(despesa, pagina=2, por_pagina=2)
+    assert dados['pagina'] == 2 and len(dados['linhas']) == 3
+    assert dados['linhas'][-1]['dotacao_atualizada'] == pytest.approx(esperado['dotacao_atualizada'].sum())
+    assert len(dados_pdf['body']) == len(esperado) + 1
+    assert len(dados_para_ia) == len(dados['linhas'])
+
+@pytest.mark.parametrize('decrescente', [True, False])
+@pytest.mark.parametrize('ordenacao', [o for o in ORDENACOES_DESPESA_NOUG if o != 'noug'])
+def test_ordenacao(despesa, esperado, ordenacao, decrescente):
+    linhas = _todas_as_paginas(despesa, ordenacao=ordenacao, decrescente=decrescente)[0]
+    ordem = esperado[ordenacao].sort_values(ascending=not decrescente, kind='stable')
+    assert [linha['noug'] for linha in linhas] == list(ordem.index)
+
+def test_ordenacao_por_nome(despesa, esperado):
+    assert [linha['noug'] for linha in _todas_as_paginas(despesa, ordenacao='noug', decrescente=False)[0]] == \
+        sorted(esperado.index)
+    assert [linha['noug'] for linha in _todas_as_paginas(despesa, ordenacao='noug')[0]] == \
+        sorted(esperado.index, reverse=True)
+
+def test_empates_pelo_nome():
+    df = pd.DataFrame({
+        'COEXERCICIO': 2025, 'INMES': 1,
+        'NOUG': pd.Categorical(['UG C', 'UG A  ', 'UG B', 'UG D']),
+        **{coluna: 0.0 for coluna in COLUNAS_DOTACAO_ATUALIZADA},
+        'DESPESA EMPENHADA': [10.0, 10.0, 10.0, 20.0], 'DESPESA LIQUIDADA': 0.0, 'DESPESA PAGA': 0.0
+    }).assign(**{'DOTACAO INICIAL': 100.0})
+    for decrescente, esperado in [(True, ['UG D', 'UG A', 'UG B', 'UG C']), (False, ['UG A', 'UG B', 'UG C', 'UG D'])]:
+        linhas = gerar_relatorio_despesa_por_noug(df, 'despesa_empenhada', decrescente)[0]['linhas'][:-1]
+        assert [linha['noug'] for linha in linhas] == esperado
+
+def test_noug_selecionada(despesa, esperado):
+    dados = gerar_relatorio_despesa_por_noug(despesa, noug_selecionada='UNIDADE GESTORA 001  ')[0]
+    unidade, total = dados['linhas']
+    assert unidade['noug'] == 'UNIDADE GESTORA 001' and unidade['noug_valor'] == 'UNIDADE GESTORA 001  '
+    assert total['despesa_paga'] == pytest.approx(esperado.loc['UNIDADE GESTORA 001', 'despesa_paga'])
+
+@pytest.mark.parametrize('noug', [None, 'UG INEXISTENTE'])
+def test_sem_unidades(despesa, noug):
+    df = despesa.iloc[0:0] if noug is None else despesa
+    dados, _, dados_para_ia, dados_pdf = gerar_relatorio_despesa_por_noug(df, noug_selecionada=noug)
+    assert dados['linhas'] == [] and dados['total_unidades'] == 0
+    assert dados_para_ia == [] and dados_pdf == {}
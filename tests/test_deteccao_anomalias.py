@@ -0,0 +1,75 @@
+"""
+Testes da detecção de anomalias: os meses sinalizados e o z-score robusto de cada um
+conferidos com a mediana e o MAD de cada série NOUG x origem calculados no pandas
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from relatorios.indicadores import gerar_relatorio_anomalias
+from relatorios.indicadores.deteccao_anomalias import (detectar_anomalias, LIMIAR_Z_ROBUSTO,
+                                                       CONSTANTE_MAD, MINIMO_PERIODOS)
+from relatorios.receita.receita_por_fonte import DIVISOR_ORIGEM
+
+NOUG_ATIPICA = 'UNIDADE GESTORA 002'
+
+@pytest.fixture(scope='module')
+def df(receita):
+    # Um mês muito acima do padrão numa das séries
+    linha = receita[(receita['NOUG'] == NOUG_ATIPICA) & (receita['COEXERCICIO'] == 2025)
+                    & (receita['INMES'] == 6)].iloc[[0]]
+    atipica = linha.assign(**{'RECEITA LIQUIDA': receita['RECEITA LIQUIDA'].abs().max() * 50})
+    return pd.concat([receita, atipica], ignore_index=True), atipica.iloc[0]
+
+def _esperado(df, limiar):
+    df = df.assign(ORIGEM_CODIGO=df['RECEITA_CODIGO'] // DIVISOR_ORIGEM,
+                   PERIODO=df['COEXERCICIO'] * 100 + df['INMES'],
+                   NOUG=df['NOUG'].astype(str).str.strip())
+    series = df.pivot_table(index=['NOUG', 'ORIGEM_CODIGO'], columns='PERIODO', values='RECEITA LIQUIDA',
+                            aggfunc='sum', fill_value=0.0)
+    esperado = {}
+    for (noug, origem), serie in series.iterrows():
+        inicio = np.flatnonzero(serie.to_numpy() != 0)
+        if len(inicio) == 0:
+            continue
+        serie = serie.iloc[inicio[0]:]
+        mediana = serie.median()
+        mad = (serie - mediana).abs().median()
+        if len(serie) < MINIMO_PERIODOS or mad == 0:
+            continue
+        z = CONSTANTE_MAD * (serie - mediana) / mad
+        for periodo, valor in z[z.abs() > limiar].items():
+            esperado[(noug, origem, periodo // 100, periodo % 100)] = (valor, mediana)
+    return esperado
+
+@pytest.mark.parametrize('limiar', [1.5, LIMIAR_Z_ROBUSTO])
+def test_sinalizados_iguais_ao_pandas(df, limiar):
+    df, _ = df
+    anomalias = detectar_anomalias(df, limiar)
+    esperado = _esperado(df, limiar)
+    assert len(anomalias) == len(esperado)
+    for anomalia in anomalias:
+        z, mediana = esperado[(anomalia['noug'], anomalia['origem'], anomalia['exercicio'], anomalia['mes'])]
+        assert anomalia['z_robusto'] == pytest.approx(z)
+        assert anomalia['mediana'] == pytest.approx(mediana)
+    modulos = [abs(anomalia['z_robusto']) for anomalia in anomalias]
+    assert modulos == sorted(modulos, reverse=True)
+
+def test_mes_atipico_sinalizado(df):
+    df, atipica = df
+    celula = (NOUG_ATIPICA, atipica['RECEITA_CODIGO'] // DIVISOR_ORIGEM, 2025, 6)
+    sinalizadas = {(a['noug'], a['origem'], a['exercicio'], a['mes']): a for a in detectar_anomalias(df)}
+    assert sinalizadas[celula]['z_robusto'] > LIMIAR_Z_ROBUSTO
+    assert sinalizadas[celula]['valor'] >= atipica['RECEITA LIQUIDA']
+
+def test_relatorio_filtra_a_noug(df):
+    df, _ = df
+    todas = gerar_relatorio_anomalias(df)[0]
+    linhas, _, dados_para_ia, dados_pdf = gerar_relatorio_anomalias(df, None, NOUG_ATIPICA)
+    assert linhas and all(linha['noug'] == NOUG_ATIPICA for linha in linhas)
+    assert len(linhas) == sum(linha['noug'] == NOUG_ATIPICA for linha in todas)
+    assert len(dados_para_ia) == len(dados_pdf['body']) == len(linhas)
+
+def test_base_vazia(receita):
+    assert detectar_anomalias(receita.iloc[0:0]) == []
+    assert gerar_relatorio_anomalias(receita.iloc[0:0]) == ([], "12", [], {})
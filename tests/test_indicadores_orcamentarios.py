@@ -0,0 +1,74 @@
+"""
+Testes do relatório de indicadores: total, por tipo de administração e por NOUG conferidos
+com as somas do pandas no exercício atual; sem despesa os indicadores dela ficam indisponíveis
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from config_relatorios import COLUNAS_TIPO_ADMINISTRACAO
+from relatorios.indicadores import gerar_relatorio_indicadores
+from relatorios.indicadores.indicadores_orcamentarios import INDICADORES, INDICADORES_DESPESA
+from relatorios.utils.alinhamento import MEDIDAS_DESPESA
+
+def _totais(receita, despesa, noug=None, tipo_adm=None):
+    receita = receita[receita['COEXERCICIO'] == 2025]
+    despesa = despesa[despesa['COEXERCICIO'] == 2025]
+    if noug is not None:
+        receita = receita[receita['NOUG'].astype(str).str.strip() == noug]
+        despesa = despesa[despesa['NOUG'].astype(str).str.strip() == noug]
+    if tipo_adm is not None:
+        receita = receita[receita['INTIPOADM'] == tipo_adm]
+        despesa = despesa[despesa['INTIPOADM'] == tipo_adm]
+    prevista, realizada = receita['PREVISAO ATUALIZADA LIQUIDA'].sum(), receita['RECEITA LIQUIDA'].sum()
+    dotacao = despesa[MEDIDAS_DESPESA['dotacao_atualizada']].to_numpy().sum()
+    empenhada = despesa['DESPESA EMPENHADA'].sum()
+    return {
+        'execucao_receita': realizada / prevista * 100,
+        'execucao_despesa': empenhada / dotacao * 100,
+        'resultado_orcamentario': realizada - empenhada,
+        'liquidez_orcamentaria': realizada / empenhada * 100
+    }
+
+@pytest.mark.parametrize('noug', [None, 'UNIDADE GESTORA 001'])
+def test_indicadores_iguais_ao_pandas(receita, despesa, noug):
+    dados, _, dados_para_ia, dados_pdf = gerar_relatorio_indicadores(receita, despesa, noug_selecionada=noug)
+    esperado = _totais(receita, despesa, noug)
+    assert [linha['chave'] for linha in dados['indicadores']] == list(INDICADORES)
+    for linha in dados['indicadores']:
+        assert linha['valor_atual'] == pytest.approx(esperado[linha['chave']], rel=1e-9)
+        assert linha['valor_meta'] == INDICADORES[linha['chave']][2]
+    assert len(dados_para_ia) == len(dados_pdf['body']) == len(INDICADORES)
+
+    nomes = {codigo: nome for nome, codigo in COLUNAS_TIPO_ADMINISTRACAO.items()}
+    for linha in dados['por_tipo_adm']:
+        codigo = next(c for c, nome in nomes.items() if nome == linha['especificacao'])
+        esperado_tipo = _totais(receita, despesa, noug, codigo)
+        for chave in INDICADORES:
+            assert linha[chave] == pytest.approx(esperado_tipo[chave], rel=1e-9)
+
+def test_noug_so_da_receita(receita, despesa):
+    dados, _, _, _ = gerar_relatorio_indicadores(receita, despesa, noug_selecionada='UNIDADE GESTORA 007')
+    valores = {linha['chave']: linha for linha in dados['indicadores']}
+    # Sem dotação nem empenho na NOUG: execução e liquidez sem base de cálculo
+    assert np.isnan(valores['execucao_despesa']['valor_atual'])
+    assert valores['execucao_despesa']['avaliacao'] == 'Sem base de cálculo'
+    assert valores['resultado_orcamentario']['valor_atual'] == pytest.approx(
+        receita.loc[(receita['COEXERCICIO'] == 2025) & (receita['NOUG'] == 'UNIDADE GESTORA 007'),
+                    'RECEITA LIQUIDA'].sum())
+
+def test_sem_despesa(receita, despesa):
+    dados, _, _, _ = gerar_relatorio_indicadores(receita, pd.DataFrame())
+    with np.errstate(all='ignore'):
+        esperado = _totais(receita, despesa.iloc[0:0])
+    for linha in dados['indicadores']:
+        if linha['chave'] in INDICADORES_DESPESA:
+            assert linha['valor_atual_fmt'] == 'Sem dados de despesa'
+            assert linha['avaliacao'] == 'Sem dados de despesa'
+        else:
+            assert linha['valor_atual'] == pytest.approx(esperado[linha['chave']])
+
+def test_noug_inexistente(receita, despesa):
+    dados, _, dados_para_ia, dados_pdf = gerar_relatorio_indicadores(receita, despesa, noug_selecionada='NADA')
+    assert dados == {'indicadores': [], 'por_tipo_adm': []}
+    assert dados_para_ia == [] and dados_pdf == {}
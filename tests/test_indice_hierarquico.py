@@ -0,0 +1,68 @@
+"""
+Testes do índice hierárquico: o total de cada subárvore deve ser a soma, no pandas, das
+linhas cujo código começa pelo prefixo (por exercício e por NOUG)
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from relatorios.utils.indice_hierarquico import IndiceHierarquico, DIVISOR_CONTA_CORRENTE
+
+CODIGOS = [11120101, 11120102, 11130311, 12100000, 17180101, 17199901, 19110000, 21100101, 71100000]
+PREFIXOS = ['', '1', '11', '111', '112', '17', '171', '171801', '17180101', '7', '9', '19911111']
+
+@pytest.fixture(scope='module')
+def df():
+    rng = np.random.default_rng(29)
+    n = 3000
+    codigos = rng.choice(CODIGOS, n).astype(np.int64)
+    fontes = rng.integers(100_000_000, 100_000_010, n)
+    return pd.DataFrame({
+        'COEXERCICIO': rng.choice([2024, 2025], n),
+        'NOUG': rng.choice(['UG 1', 'UG 2  ', 'UG 3'], n),
+        'COCONTACORRENTE': codigos * DIVISOR_CONTA_CORRENTE + fontes,
+        'RECEITA LIQUIDA': np.round(rng.normal(1e6, 4e5, n), 2),
+        'PREVISAO ATUALIZADA LIQUIDA': np.round(rng.uniform(0, 5e6, n), 2)
+    })
+
+@pytest.fixture(scope='module')
+def indice(df):
+    return IndiceHierarquico(df)
+
+def _esperado(df, prefixo, medida, exercicio=None, noug=None):
+    codigos = (df['COCONTACORRENTE'] // DIVISOR_CONTA_CORRENTE).astype(str).str.zfill(8)
+    mascara = codigos.str.startswith(prefixo)
+    if exercicio is not None:
+        mascara &= df['COEXERCICIO'] == exercicio
+    if noug is not None:
+        mascara &= df['NOUG'].str.strip() == noug.strip()
+    return df.loc[mascara, medida].sum()
+
+@pytest.mark.parametrize('medida', ['RECEITA LIQUIDA', 'PREVISAO ATUALIZADA LIQUIDA'])
+@pytest.mark.parametrize('exercicio', [None, 2024, 2025])
+def test_totais_iguais_ao_pandas(df, indice, medida, exercicio):
+    resultado = indice.totais(PREFIXOS, medida, exercicio)
+    esperado = [_esperado(df, prefixo, medida, exercicio) for prefixo in PREFIXOS]
+    np.testing.assert_allclose(resultado, esperado, rtol=0, atol=0.01)
+
+@pytest.mark.parametrize('noug', ['UG 1', 'UG 2  ', 'UG 3'])
+def test_totais_por_noug_iguais_ao_pandas(df, indice, noug):
+    resultado = indice.totais(PREFIXOS, 'RECEITA LIQUIDA', 2025, noug)
+    esperado = [_esperado(df, prefixo, 'RECEITA LIQUIDA', 2025, noug) for prefixo in PREFIXOS]
+    np.testing.assert_allclose(resultado, esperado, rtol=0, atol=0.01)
+
+def test_noug_ou_medida_ausente_somam_zero(indice):
+    assert indice.total('1', noug='UG inexistente') == 0.0
+    assert indice.total('1', medida='RECEITA BRUTA') == 0.0
+
+def test_filhos_e_hierarquia(indice):
+    assert indice.filhos() == ['1', '2', '7']
+    assert indice.filhos('1') == ['11', '12', '17', '19']
+    assert indice.filhos('111') == ['111201', '111303']
+    assert indice.filhos('11120101') == []
+    assert indice.hierarquia()['1']['11'] == ['111']
+
+@pytest.mark.parametrize('prefixo', ['1a', '123456789'])
+def test_prefixo_invalido(indice, prefixo):
+    with pytest.raises(ValueError):
+        indice.total(prefixo)
@@ -0,0 +1,50 @@
+"""
+Testes do planejador de consultas: a passada fundida deve dar os mesmos totais
+que cada requisição executada sozinha, inclusive com chaves nulas
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from relatorios.utils import PlanejadorConsultas
+
+MEDIDAS = {'valor': {'coluna': 'VALOR'}}
+
+REQUISICOES = {
+    'por_noug': ['NOUG'],
+    'por_origem': ['ORIGEM'],
+    'por_categoria': ['CATEGORIA'],
+    'noug_origem': ['NOUG', 'ORIGEM'],
+    'total': []
+}
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({
+        'NOUG': ['UG 1', 'UG 2', None, 'UG 1', 'UG 2', 'UG 3'],
+        'ORIGEM': [11.0, np.nan, 17.0, np.nan, 11.0, 17.0],
+        'CATEGORIA': pd.Categorical(['1', None, '2', '1', '2', None]),
+        'VALOR': [1.0, 2.0, 4.0, 8.0, 16.0, 32.0]
+    })
+
+def _executar(df, requisicoes):
+    planejador = PlanejadorConsultas({'receita': df})
+    for nome, dimensoes in requisicoes.items():
+        planejador.requisitar(nome, 'receita', dimensoes, MEDIDAS)
+    return planejador.executar()
+
+def test_totais_fundidos_iguais_aos_separados_com_chave_nula(df):
+    fundidos = _executar(df, REQUISICOES)
+    for nome, dimensoes in REQUISICOES.items():
+        separado = _executar(df, {nome: dimensoes})[nome]
+        pd.testing.assert_frame_equal(fundidos[nome], separado)
+
+def test_totais_fundidos_iguais_ao_groupby(df):
+    fundidos = _executar(df, REQUISICOES)
+    assert fundidos['total']['valor'].iloc[0] == pytest.approx(df['VALOR'].sum())
+    for nome in ['por_noug', 'por_origem', 'noug_origem']:
+        esperado = df.groupby(REQUISICOES[nome])['VALOR'].sum()
+        np.testing.assert_allclose(fundidos[nome]['valor'].to_numpy(), esperado.to_numpy())
+        assert list(fundidos[nome].index) == list(esperado.index)
+    esperado = df.groupby('CATEGORIA', observed=True)['VALOR'].sum()
+    np.testing.assert_allclose(fundidos['por_categoria']['valor'].to_numpy(), esperado.to_numpy())
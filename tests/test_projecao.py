@@ -0,0 +1,87 @@
+"""
+Testes da projeção de fechamento: cada modelo deve dar o total calculado à mão com pandas,
+inclusive quando o exercício anterior não tem todos os meses restantes
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from relatorios.utils.projecao import ProjecaoAnual, MODELO_SAZONAL, MODELO_LINEAR
+
+def _base(series):
+    """DataFrame de receita a partir de {(noug, exercicio): [valor do mês 1, 2, ...]}"""
+    linhas = [
+        {'NOUG': noug, 'CATEGORIA': '1', 'COEXERCICIO': exercicio, 'INMES': mes, 'RECEITA LIQUIDA': valor}
+        for (noug, exercicio), valores in series.items()
+        for mes, valor in enumerate(valores, start=1)
+    ]
+    return pd.DataFrame(linhas)
+
+def _projetado(df, noug):
+    projecao = ProjecaoAnual(df, ['CATEGORIA'], exercicio=2025)
+    posicao = list(projecao.chaves.get_level_values('NOUG')).index(noug)
+    return projecao.projetado[posicao], projecao.modelos[posicao]
+
+def test_sazonal_com_exercicio_anterior_completo():
+    anterior = [10.0, 20.0, 30.0, 40.0, 50.0, 60.0, 70.0, 80.0, 90.0, 100.0, 110.0, 120.0]
+    atual = [11.0, 22.0, 33.0]
+    df = _base({('UG', 2024): anterior, ('UG', 2025): atual})
+
+    base = pd.Series(anterior[:3])
+    beta = (pd.Series(atual) * base).sum() / (base ** 2).sum()
+    esperado = sum(atual) + beta * sum(anterior[3:])
+
+    projetado, modelo = _projetado(df, 'UG')
+    assert modelo == MODELO_SAZONAL
+    assert projetado == pytest.approx(esperado)
+
+def test_sazonal_com_exercicio_anterior_parcial():
+    # Exercício anterior só até junho: julho a dezembro vêm do ritmo atual, não de zero
+    anterior = [10.0, 20.0, 30.0, 40.0, 50.0, 60.0]
+    atual = [12.0, 18.0, 33.0]
+    df = _base({('UG', 2024): anterior, ('UG', 2025): atual})
+
+    base = pd.Series(anterior[:3])
+    beta = (pd.Series(atual) * base).sum() / (base ** 2).sum()
+    ritmo = pd.Series(atual).mean()
+    esperado = sum(atual) + beta * sum(anterior[3:6]) + ritmo * 6
+
+    projetado, modelo = _projetado(df, 'UG')
+    assert modelo == MODELO_SAZONAL
+    assert projetado == pytest.approx(esperado)
+
+def test_ritmo_atual_com_poucos_meses():
+    atual = [5.0, 10.0, 15.0]
+    df = _base({('UG', 2025): atual})
+
+    projetado, modelo = _projetado(df, 'UG')
+    assert modelo == MODELO_LINEAR
+    assert projetado == pytest.approx(sum(atual) + pd.Series(atual).mean() * 9)
+
+def test_linear_com_tendencia():
+    atual = [10.0, 12.0, 11.0, 15.0, 16.0, 18.0, 17.0]
+    df = _base({('UG', 2025): atual})
+
+    inclinacao, intercepto = np.polyfit(np.arange(1, 8), atual, 1)
+    esperado = sum(atual) + sum(intercepto + inclinacao * mes for mes in range(8, 13))
+
+    projetado, modelo = _projetado(df, 'UG')
+    assert modelo == MODELO_LINEAR
+    assert projetado == pytest.approx(esperado)
+
+def test_tendencia_negativa_usa_ritmo_e_nunca_fica_abaixo_do_realizado():
+    atual = [100.0, 80.0, 60.0, 40.0, 20.0, 5.0, 1.0]
+    df = _base({('UG', 2025): atual, ('OUTRA', 2025): [-5.0] * 7})
+
+    projetado, _ = _projetado(df, 'UG')
+    assert projetado == pytest.approx(sum(atual) + pd.Series(atual).mean() * 5)
+    projetado_negativo, _ = _projetado(df, 'OUTRA')
+    assert projetado_negativo == pytest.approx(-35.0)
+
+def test_por_dimensoes_soma_as_nougs():
+    df = _base({('UG 1', 2025): [1.0, 2.0], ('UG 2', 2025): [3.0, 4.0]})
+    projecao = ProjecaoAnual(df, ['CATEGORIA'], exercicio=2025)
+    tabela = projecao.por_dimensoes()
+    assert tabela.loc['1', 'realizado'] == pytest.approx(10.0)
+    assert tabela.loc['1', 'projetado'] == pytest.approx(10.0 + (1.5 + 3.5) * 10)
+    assert projecao.por_dimensoes('UG 2').loc['1', 'projetado'] == pytest.approx(7.0 + 3.5 * 10)
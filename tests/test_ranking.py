@@ -0,0 +1,69 @@
+"""
+Testes do ranking: a seleção parcial (argpartition) deve devolver os mesmos valores, na
+mesma ordem, que a ordenação completa, com empates e critérios sem base (NaN) fora
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from relatorios.utils.ranking import IndiceRanking, CRITERIOS_RANKING
+
+@pytest.fixture(scope='module')
+def df():
+    rng = np.random.default_rng(43)
+    n_nougs = 60
+    nougs = [f"UG {i:02d}" for i in range(n_nougs)]
+    # Poucos valores distintos: muitos empates em todos os critérios
+    realizado = rng.choice([0.0, 100.0, 250.0, 250.0, 400.0, 1000.0], n_nougs)
+    anterior = rng.choice([0.0, 100.0, 200.0], n_nougs)
+    previsto = rng.choice([0.0, 500.0, 1000.0], n_nougs)
+    atual = pd.DataFrame({'COEXERCICIO': 2025, 'INMES': 3, 'NOUG': nougs,
+                          'RECEITA LIQUIDA': realizado, 'PREVISAO ATUALIZADA LIQUIDA': previsto})
+    # Meses do exercício anterior depois do último mês do atual não entram
+    base = pd.DataFrame({'COEXERCICIO': 2024, 'INMES': 2, 'NOUG': nougs,
+                         'RECEITA LIQUIDA': anterior, 'PREVISAO ATUALIZADA LIQUIDA': 0.0})
+    fora = base.assign(INMES=4, **{'RECEITA LIQUIDA': 1e6})
+    return pd.concat([atual, base, fora], ignore_index=True)
+
+@pytest.fixture(scope='module')
+def indice(df):
+    return IndiceRanking(df, 'receita', 'noug')
+
+def _referencia(df):
+    atual = df[df['COEXERCICIO'] == 2025].set_index('NOUG')
+    anterior = df[(df['COEXERCICIO'] == 2024) & (df['INMES'] <= 3)].set_index('NOUG')['RECEITA LIQUIDA']
+    realizado = atual['RECEITA LIQUIDA']
+    previsto = atual['PREVISAO ATUALIZADA LIQUIDA']
+    return {
+        'realizado': realizado,
+        'crescimento': ((realizado - anterior) * 100 / anterior.abs()).where(anterior != 0),
+        'execucao': (realizado * 100 / previsto).where(previsto > 0)
+    }
+
+@pytest.mark.parametrize('n', [1, 3, 7, 20, 200])
+@pytest.mark.parametrize('maiores', [True, False])
+@pytest.mark.parametrize('criterio', list(CRITERIOS_RANKING))
+def test_top_igual_a_ordenacao_completa(df, indice, criterio, n, maiores):
+    serie = _referencia(df)[criterio].dropna()
+    ordenada = serie.sort_values(ascending=not maiores, kind='stable')
+    itens = indice.top(criterio, n, maiores)
+
+    assert [item['posicao'] for item in itens] == list(range(1, len(itens) + 1))
+    np.testing.assert_allclose([item['valor'] for item in itens], ordenada.to_numpy()[:n])
+    # Com empate na fronteira qualquer NOUG empatada serve, mas o valor de cada uma confere
+    for item in itens:
+        assert item['valor'] == pytest.approx(serie[item['codigo']])
+        assert item[criterio] == pytest.approx(item['valor'])
+
+def test_criterio_sem_base_fica_none(df, indice):
+    sem_previsao = set(df.loc[(df['COEXERCICIO'] == 2025) & (df['PREVISAO ATUALIZADA LIQUIDA'] == 0), 'NOUG'])
+    itens = indice.top('realizado', len(sem_previsao) + 60)
+    assert {item['codigo'] for item in itens if item['execucao'] is None} == sem_previsao
+
+def test_criterio_invalido_e_sem_exercicio_anterior(df, indice):
+    with pytest.raises(ValueError):
+        indice.top('inexistente')
+    so_atual = IndiceRanking(df[df['COEXERCICIO'] == 2025], 'receita', 'noug')
+    with pytest.raises(ValueError):
+        so_atual.top('crescimento')
+    assert len(so_atual.top('realizado', 5)) == 5
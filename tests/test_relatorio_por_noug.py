@@ -0,0 +1,56 @@
+"""
+Testes do relatório receita x despesa por NOUG: linhas e TOTAL GERAL conferidos com as
+somas do pandas no exercício atual, inclusive NOUGs presentes numa só das bases
+"""
+import pandas as pd
+import pytest
+
+from relatorios.indicadores import gerar_relatorio_por_noug
+
+def _por_noug(df, colunas):
+    atual = df[df['COEXERCICIO'] == 2025]
+    return atual.groupby(atual['NOUG'].astype(str).str.strip())[colunas].sum()
+
+@pytest.fixture(scope='module')
+def esperado(receita, despesa):
+    tabela = _por_noug(receita, ['RECEITA LIQUIDA']).join(
+        _por_noug(despesa, ['DESPESA EMPENHADA', 'DESPESA PAGA']), how='outer').fillna(0.0)
+    tabela.columns = ['receita', 'despesa_empenhada', 'despesa_paga']
+    tabela['resultado'] = tabela['receita'] - tabela['despesa_empenhada']
+    return tabela
+
+def test_linhas_e_total(receita, despesa, esperado):
+    linhas, _, dados_para_ia, dados_pdf = gerar_relatorio_por_noug(receita, despesa)
+    *unidades, total = linhas
+    assert total['tipo'] == 'total' and total['especificacao'] == 'TOTAL GERAL'
+    assert sorted(linha['especificacao'] for linha in unidades) == sorted(esperado.index)
+    for linha in unidades:
+        for coluna in esperado.columns:
+            assert linha[coluna] == pytest.approx(esperado.loc[linha['especificacao'], coluna], rel=1e-9)
+        assert linha['situacao'] == ('Superávit' if linha['resultado'] >= 0 else 'Déficit')
+    for coluna in esperado.columns:
+        assert total[coluna] == pytest.approx(esperado[coluna].sum(), rel=1e-9)
+
+    # Maior movimentação (receita + despesa empenhada) primeiro
+    movimento = [abs(linha['receita']) + abs(linha['despesa_empenhada']) for linha in unidades]
+    assert movimento == sorted(movimento, reverse=True)
+    assert len(dados_para_ia) == len(dados_pdf['body']) == len(linhas)
+
+def test_noug_so_da_despesa(receita, despesa, esperado):
+    linhas, _, _, _ = gerar_relatorio_por_noug(receita, despesa, noug_selecionada='UNIDADE SO DESPESA  ')
+    unidade, total = linhas
+    assert unidade['especificacao'] == 'UNIDADE SO DESPESA'
+    assert unidade['receita'] == 0.0
+    assert unidade['despesa_empenhada'] == pytest.approx(esperado.loc['UNIDADE SO DESPESA', 'despesa_empenhada'])
+    assert total['resultado'] == pytest.approx(unidade['resultado'])
+
+def test_sem_despesa(receita):
+    linhas, _, _, _ = gerar_relatorio_por_noug(receita, pd.DataFrame())
+    *unidades, total = linhas
+    assert total['receita'] == pytest.approx(receita.loc[receita['COEXERCICIO'] == 2025, 'RECEITA LIQUIDA'].sum())
+    assert all(linha['despesa_empenhada'] == 0 for linha in linhas)
+    assert all(linha['despesa_empenhada_fmt'] == 'Sem dados de despesa' and linha['situacao'] == ''
+               for linha in linhas)
+
+def test_noug_inexistente(receita, despesa):
+    assert gerar_relatorio_por_noug(receita, despesa, noug_selecionada='NADA')[0] == []
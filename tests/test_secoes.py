@@ -0,0 +1,66 @@
+"""
+Testes das seções concorrentes: uma seção que falha ou estoura o prazo sai com uma cópia
+do substituto e é listada como indisponível, sem segurar as demais
+"""
+import threading
+import time
+
+import pytest
+
+from relatorios.utils import executar_secoes
+
+SUBSTITUTOS = {'lenta': {'itens': []}, 'falha': {'itens': []}}
+
+@pytest.fixture
+def liberar():
+    """Evento que solta as seções lentas ao fim do teste (o pool de seções é limitado)"""
+    evento = threading.Event()
+    yield evento
+    evento.set()
+
+def _falhar():
+    raise RuntimeError('seção com erro')
+
+def test_todas_concluidas():
+    resultados, indisponiveis = executar_secoes({'a': lambda: 1, 'b': lambda: [2]}, SUBSTITUTOS)
+    assert resultados == {'a': 1, 'b': [2]}
+    assert indisponiveis == []
+
+def test_secao_com_erro_usa_o_substituto():
+    resultados, indisponiveis = executar_secoes({'ok': lambda: 1, 'falha': _falhar}, SUBSTITUTOS)
+    assert resultados == {'ok': 1, 'falha': {'itens': []}}
+    assert indisponiveis == ['falha']
+    # O substituto é copiado: alterar o resultado não muda o valor das próximas páginas
+    resultados['falha']['itens'].append(1)
+    assert SUBSTITUTOS['falha'] == {'itens': []}
+
+def test_secao_sem_substituto_fica_none():
+    resultados, indisponiveis = executar_secoes({'falha': _falhar})
+    assert resultados == {'falha': None}
+    assert indisponiveis == ['falha']
+
+def test_secao_lenta_nao_segura_as_demais(liberar):
+    secoes = {'lenta': lambda: liberar.wait(5) and 'tarde', 'rapida': lambda: 'ok'}
+    inicio = time.monotonic()
+    resultados, indisponiveis = executar_secoes(secoes, SUBSTITUTOS, tempo_limite=0.1)
+    assert time.monotonic() - inicio < 2
+    assert resultados == {'lenta': {'itens': []}, 'rapida': 'ok'}
+    assert indisponiveis == ['lenta']
+
+def test_prazo_por_secao(liberar):
+    # A seção sem prazo próprio usa TEMPO_LIMITE_SECAO e espera a mais lenta terminar
+    def media():
+        time.sleep(0.3)
+        return 'media'
+    secoes = {'lenta': lambda: liberar.wait(5) and 'tarde', 'media': media}
+    resultados, indisponiveis = executar_secoes(secoes, SUBSTITUTOS, tempo_limite={'lenta': 0.1})
+    assert resultados == {'lenta': {'itens': []}, 'media': 'media'}
+    assert indisponiveis == ['lenta']
+
+def test_sem_prazo_espera_todas():
+    def lenta():
+        time.sleep(0.2)
+        return 'tarde'
+    resultados, indisponiveis = executar_secoes({'lenta': lenta}, SUBSTITUTOS, tempo_limite=None)
+    assert resultados == {'lenta': 'tarde'}
+    assert indisponiveis == []
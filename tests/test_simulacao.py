@@ -0,0 +1,101 @@
+"""
+Testes da simulação de cenários: o cubo com as regras aplicadas deve somar o mesmo que
+multiplicar as linhas da planilha e agregar de novo no pandas
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from relatorios.utils.simulacao import CuboSimulacao, validar_cenario
+
+ESPECIFICACAO = 'balanco_orcamentario'
+DIMENSOES = ['CATEGORIA', 'ORIGEM']
+COLUNA_SIMULADA = 'PREVISAO ATUALIZADA LIQUIDA'
+
+CENARIOS = [
+    [],
+    [{'dimensao': 'ORIGEM', 'valor': '11', 'percentual': 5}],
+    [{'dimensao': 'NOUG', 'valor': 'UG 2', 'percentual': -10}],
+    # Regras sobrepostas se compõem: ORIGEM 17 na UG 1 fica com 1,2 x 0,5
+    [{'dimensao': 'ORIGEM', 'valor': '17', 'percentual': 20}, {'dimensao': 'NOUG', 'valor': 'UG 1', 'percentual': -50}],
+    [{'dimensao': 'CATEGORIA', 'valor': '1', 'percentual': 100}, {'dimensao': 'CATEGORIA', 'valor': '1', 'percentual': 10}],
+    [{'dimensao': 'NOUG', 'valor': 'UG inexistente', 'percentual': 30}]
+]
+
+@pytest.fixture(scope='module')
+def df():
+    rng = np.random.default_rng(45)
+    n = 2000
+    origens = rng.choice(['11', '12', '17', '21'], n)
+    especies = np.char.add(origens, '1')
+    return pd.DataFrame({
+        'COEXERCICIO': rng.choice([2024, 2025], n),
+        'INMES': rng.integers(1, 6, n),
+        'NOUG': rng.choice(['UG 1', 'UG 2  ', 'UG 3'], n),
+        'CATEGORIA': [origem[0] for origem in origens],
+        'ORIGEM': origens,
+        'ESPECIE': especies,
+        'ALINEA': np.char.add(especies, '101'),
+        'NOCATEGORIARECEITA': np.char.add('Categoria ', [origem[0] for origem in origens]),
+        'NOFONTERECEITA': np.char.add('Origem ', origens),
+        'NOSUBFONTERECEITA': np.char.add('Espécie ', especies),
+        'NOALINEA': np.char.add('Alínea ', especies),
+        'PREVISAO INICIAL LIQUIDA': rng.uniform(0, 1e5, n),
+        COLUNA_SIMULADA: rng.uniform(0, 1e5, n),
+        'RECEITA LIQUIDA': rng.uniform(0, 1e5, n)
+    })
+
+@pytest.fixture(scope='module')
+def cubo(df):
+    return CuboSimulacao(df, ESPECIFICACAO)
+
+def _esperado(df, regras, noug=None):
+    fatores = np.ones(len(df))
+    for regra in regras:
+        fatores[df[regra['dimensao']].str.strip().to_numpy() == regra['valor']] *= 1 + regra['percentual'] / 100
+    atual = df.assign(**{COLUNA_SIMULADA: df[COLUNA_SIMULADA] * fatores})
+    atual = atual[atual['COEXERCICIO'] == 2025]
+    if noug is not None:
+        atual = atual[atual['NOUG'].str.strip() == noug]
+    return atual.groupby(DIMENSOES)[COLUNA_SIMULADA].sum()
+
+@pytest.mark.parametrize('noug', [None, 'UG 1', 'UG 2'])
+@pytest.mark.parametrize('regras', CENARIOS)
+def test_simular_igual_a_reagregar(df, cubo, regras, noug):
+    regras = validar_cenario({'regras': regras})['regras']
+    tabela = cubo.simular(regras, noug)
+    esperado = _esperado(df, regras, noug)
+    resultado = tabela['pa_atual'].groupby(level=DIMENSOES).sum()
+    resultado, esperado = resultado.align(esperado, fill_value=0.0)
+    np.testing.assert_allclose(resultado.to_numpy(), esperado.to_numpy(), rtol=1e-9)
+
+    # As medidas fora de 'simulacao' ficam como na base sem cenário
+    base = cubo.base(noug)
+    outras = [c for c in base.columns if c != 'pa_atual']
+    pd.testing.assert_frame_equal(tabela[outras], base[outras])
+
+def test_simular_nao_altera_a_base(df, cubo):
+    antes = cubo.base().copy()
+    cubo.simular(validar_cenario({'regras': CENARIOS[1]})['regras'])
+    pd.testing.assert_frame_equal(cubo.base(), antes)
+
+@pytest.mark.parametrize('cenario', [
+    None,
+    {'regras': 'ORIGEM 11'},
+    {'regras': [{'dimensao': 'ALINEA', 'valor': '1', 'percentual': 5}]},
+    {'regras': [{'dimensao': 'NOUG', 'valor': 'UG 1', 'percentual': 'cinco'}]},
+    {'regras': [{'dimensao': 'NOUG', 'valor': 'UG 1', 'percentual': -100}]},
+    {'regras': [{'dimensao': 'NOUG', 'valor': 'UG 1', 'percentual': float('inf')}]}
+])
+def test_cenario_invalido(cenario):
+    with pytest.raises(ValueError):
+        validar_cenario(cenario)
+
+def test_cenario_normalizado():
+    cenario = validar_cenario({'regras': [{'dimensao': ' noug ', 'valor': ' UG 2  ', 'percentual': '7.5'}]})
+    assert cenario == {'nome': 'Cenário sem nome',
+                       'regras': [{'dimensao': 'NOUG', 'valor': 'UG 2', 'percentual': 7.5}]}
+
+def test_especificacao_sem_simulacao(df):
+    with pytest.raises(ValueError):
+        CuboSimulacao(df, 'receita_estimada')
@@ -2,9 +2,16 @@
 Módulo de utilitários para carregamento de dados e helpers
 """
 
-from .data_loaders import carregar_dataframe_receita, carregar_dataframe_despesa
+from .data_loaders import (carregar_dataframe_receita, carregar_dataframe_despesa,
+                           carregar_classificacao_orcamentaria, carregar_receita_resumida,
+                           carregar_despesa_resumida)
+from .armazem_sqlite import ArmazemSQLite
 
 __all__ = [
     'carregar_dataframe_receita',
-    'carregar_dataframe_despesa'
+    'carregar_dataframe_despesa',
+    'carregar_classificacao_orcamentaria',
+    'carregar_receita_resumida',
+    'carregar_despesa_resumida',
+    'ArmazemSQLite'
 ]
\ No newline at end of file
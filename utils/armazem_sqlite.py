@@ -0,0 +1,166 @@
+"""
+Armazenamento em disco das tabelas de fatos (modo ARMAZENAMENTO_DADOS='sqlite')
+
+A ingestão monta o DataFrame completo uma vez por versão do arquivo, grava receita e
+despesa num arquivo SQLite indexado por (COEXERCICIO, NOUG, CATEGORIA, ORIGEM) e o libera. Os
+relatórios pedem ao SQLite uma tabela de fatos resumida: o GROUP BY pelas colunas que os
+relatórios usam (dimensões e mês) roda dentro do banco (resumir() aceita limitar os exercícios), e o
+processo recebe uma linha por combinação distinta em vez de uma linha por lançamento.
+Essa tabela tem as mesmas colunas e tipos do DataFrame original, então filtros, seletor
+de mês, motor declarativo, projeção e simulação rodam sobre ela sem alteração.
+
+Compromisso latência x memória:
+- memória: o processo guarda só a tabela resumida, cujo tamanho depende da cardinalidade
+  das dimensões (NOUG x alínea x tipo de administração x mês) e não do número de linhas;
+  o cache de páginas do SQLite é limitado por LIMITE_CACHE_SQLITE_KB e as ordenações
+  temporárias vão para disco;
+- latência: a primeira consulta de cada versão dos dados paga a varredura e a ordenação
+  do GROUP BY no SQLite (segundos por milhão de linhas, contra décimos de segundo do kernel
+  em memória, ver benchmarks/bench_armazem.py); as seguintes são memoizadas como no modo
+  em memória. A ingestão de uma nova planilha grava o arquivo uma vez por versão.
+Relatórios que precisam de colunas fora do resumo (conta corrente, fonte, busca) continuam
+carregando o DataFrame completo (ver carregar_receita_resumida em utils/data_loaders.py).
+"""
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+import pandas as pd
+from typing import Dict, List, Optional
+
+COLUNAS_INDICE_ARMAZEM = ['COEXERCICIO', 'NOUG', 'CATEGORIA', 'ORIGEM']
+
+# Cache de páginas por conexão (KB) e linhas por lote na gravação
+LIMITE_CACHE_SQLITE_KB = 16_384
+LINHAS_POR_LOTE = 50_000
+
+TABELA_METADADOS = 'metadados'
+
+class ArmazemSQLite:
+    """
+    Tabelas de fatos num arquivo SQLite, com a versão dos dados de origem de cada tabela
+    """
+
+    def __init__(self, caminho: str):
+        """
+        Args:
+            caminho: Arquivo SQLite (criado na primeira gravação)
+        """
+        self.caminho = caminho
+        self._lock = threading.Lock()
+
+    def _conectar(self) -> sqlite3.Connection:
+        """
+        Conexão com cache de páginas limitado e temporários em disco
+
+        O chamador fecha a conexão (contextlib.closing): o 'with' da própria conexão só
+        encerra a transação
+        """
+        conexao = sqlite3.connect(self.caminho)
+        conexao.execute(f"PRAGMA cache_size = -{LIMITE_CACHE_SQLITE_KB}")
+        conexao.execute("PRAGMA temp_store = FILE")
+        conexao.execute("PRAGMA mmap_size = 0")
+        return conexao
+
+    def versao(self, tabela: str) -> Optional[str]:
+        """Versão dos dados gravados na tabela (None se o arquivo ou a tabela não existem)"""
+        if not os.path.exists(self.caminho):
+            return None
+        with closing(self._conectar()) as conexao:
+            existe = conexao.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                                     (TABELA_METADADOS,)).fetchone()
+            if not existe:
+                return None
+            linha = conexao.execute(f"SELECT versao FROM {TABELA_METADADOS} WHERE tabela = ?", (tabela,)).fetchone()
+        return linha[0] if linha else None
+
+    def colunas(self, tabela: str) -> List[str]:
+        """Colunas gravadas na tabela"""
+        with closing(self._conectar()) as conexao:
+            return [linha[1] for linha in conexao.execute(f'PRAGMA table_info("{tabela}")')]
+
+    def gravar(self, df: pd.DataFrame, tabela: str, versao: str):
+        """
+        Substitui a tabela pelo DataFrame, cria os índices e registra a versão
+
+        Args:
+            df: Tabela de fatos
+            tabela: Nome da tabela ('receita' ou 'despesa')
+            versao: Versão dos dados de origem
+        """
+        inicio = time.time()
+        categoricas = [c for c in df.columns if isinstance(df[c].dtype, pd.CategoricalDtype)]
+        indice = [c for c in COLUNAS_INDICE_ARMAZEM if c in df.columns]
+
+        with self._lock:
+            os.makedirs(os.path.dirname(self.caminho) or '.', exist_ok=True)
+            with closing(self._conectar()) as conexao, conexao:
+                conexao.execute(f'DROP TABLE IF EXISTS "{tabela}"')
+                for inicio_lote in range(0, len(df), LINHAS_POR_LOTE):
+                    lote = df.iloc[inicio_lote:inicio_lote + LINHAS_POR_LOTE]
+                    if categoricas:
+                        lote = lote.astype({c: object for c in categoricas})
+                    lote.to_sql(tabela, conexao, if_exists='append', index=False)
+                if indice:
+                    colunas_indice = ', '.join(f'"{c}"' for c in indice)
+                    conexao.execute(f'CREATE INDEX "idx_{tabela}_chaves" ON "{tabela}" ({colunas_indice})')
+                conexao.execute(f"CREATE TABLE IF NOT EXISTS {TABELA_METADADOS} "
+                                "(tabela TEXT PRIMARY KEY, versao TEXT, linhas INTEGER)")
+                conexao.execute(f"INSERT OR REPLACE INTO {TABELA_METADADOS} VALUES (?, ?, ?)",
+                                (tabela, versao, len(df)))
+                conexao.execute("ANALYZE")
+
+        print(f"💾 {len(df):,} linhas de {tabela} gravadas em {self.caminho} em {time.time() - inicio:.2f} segundos")
+
+    def resumir(self, tabela: str, dimensoes: List[str], medidas: List[str],
+                exercicios: Optional[int] = None, categoricas: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Tabela de fatos resumida: soma das medidas por combinação distinta das dimensões
+
+        Args:
+            tabela: Nome da tabela
+            dimensoes: Colunas de agrupamento (as ausentes na tabela são ignoradas)
+            medidas: Colunas somadas (as ausentes são ignoradas)
+            exercicios: Só os N exercícios mais recentes (None = todos)
+            categoricas: Colunas devolvidas como categóricas, como na ingestão
+
+        Returns:
+            DataFrame com as colunas de dimensão e medida
+        """
+        existentes = set(self.colunas(tabela))
+        dimensoes = [c for c in dimensoes if c in existentes]
+        medidas = [c for c in medidas if c in existentes]
+        colunas = ', '.join(f'"{c}"' for c in dimensoes)
+        # Agrupamento começando pelas colunas do índice: a ordenação temporária parte da ordem do índice
+        ordem = [c for c in COLUNAS_INDICE_ARMAZEM if c in dimensoes] + \
+                [c for c in dimensoes if c not in COLUNAS_INDICE_ARMAZEM]
+        grupos = ', '.join(f'"{c}"' for c in ordem)
+        somas = ', '.join(f'COALESCE(SUM("{c}"), 0) AS "{c}"' for c in medidas)
+
+        filtro, parametros = '', ()
+        if exercicios and 'COEXERCICIO' in existentes:
+            # O limite vem do próprio índice (MAX sobre a primeira coluna é uma busca)
+            filtro = f'WHERE "COEXERCICIO" > (SELECT MAX("COEXERCICIO") FROM "{tabela}") - ?'
+            parametros = (int(exercicios),)
+
+        consulta = f'SELECT {colunas}, {somas} FROM "{tabela}" {filtro} GROUP BY {grupos}'
+        with closing(self._conectar()) as conexao:
+            df = pd.read_sql_query(consulta, conexao, params=parametros)
+
+        for coluna in categoricas or []:
+            if coluna in df.columns:
+                df[coluna] = df[coluna].astype('category')
+        return df
+
+    def informacoes(self) -> Dict[str, Dict]:
+        """Tabelas gravadas com versão e número de linhas (para a rota de administração)"""
+        if not os.path.exists(self.caminho):
+            return {}
+        with closing(self._conectar()) as conexao:
+            existe = conexao.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                                     (TABELA_METADADOS,)).fetchone()
+            if not existe:
+                return {}
+            linhas = conexao.execute(f"SELECT tabela, versao, linhas FROM {TABELA_METADADOS}").fetchall()
+        return {tabela: {'versao': versao, 'linhas': n} for tabela, versao, n in linhas}
@@ -1,18 +1,72 @@
 """
 Funções centralizadas para carregamento de dados
 Extraídas do app.py para reutilização em diferentes blueprints
+
+No modo SQLite (ARMAZENAMENTO_DADOS='sqlite') só as páginas compatíveis com o resumo
+(carregar_receita_resumida / carregar_despesa_resumida) ficam apoiadas em disco: a ingestão
+ainda monta o DataFrame completo uma vez por versão do arquivo, e conta corrente, receita por
+fonte e busca de receitas continuam carregando o DataFrame completo em memória.
 """
 import os
 import time
+import threading
 import pandas as pd
 from cache_service import cache_service
+from config_relatorios import ARMAZENAMENTO_DADOS, CAMINHO_ARMAZEM_SQLITE
+from .armazem_sqlite import ArmazemSQLite
+
+# Chave de cache da receita: muda quando o pré-processamento da ingestão muda
+CHAVE_CACHE_RECEITA = 'receita_v3'
+
+# COCONTACORRENTE (17 dígitos) = código da receita (8 dígitos) + código da fonte (9 dígitos)
+DIVISOR_CONTA_CORRENTE = 10 ** 9
+
+# Dimensões da receita armazenadas como categóricas (códigos inteiros para agregação)
+COLUNAS_CATEGORICAS_RECEITA = [
+    'CATEGORIA', 'NOCATEGORIARECEITA', 'ORIGEM', 'NOFONTERECEITA',
+    'ESPECIE', 'NOSUBFONTERECEITA', 'ALINEA', 'NOALINEA', 'NOUG'
+]
+
+COLUNAS_CATEGORICAS_DESPESA = ['CATEGORIA', 'NOCATEGORIA', 'GRUPO', 'NOGRUPO', 'NOUG']
+
+# Modo SQLite: colunas mantidas no resumo (todas as que os relatórios declarativos, filtros
+# e índice hierárquico usam) e medidas somadas por combinação distinta delas
+DIMENSOES_RESUMO_RECEITA = [
+    'COEXERCICIO', 'INMES', 'INTIPOADM', 'NOUG', 'RECEITA_CODIGO',
+    'CATEGORIA', 'NOCATEGORIARECEITA', 'ORIGEM', 'NOFONTERECEITA',
+    'ESPECIE', 'NOSUBFONTERECEITA', 'ALINEA', 'NOALINEA'
+]
+MEDIDAS_RESUMO_RECEITA = [
+    'PREVISAO INICIAL', 'DEDUCOES DA PREVISAO INICIAL', 'PREVISAO INICIAL LIQUIDA',
+    'PREVISAO ATUALIZADA', 'PREVISAO ATUALIZADA LIQUIDA',
+    'RECEITA BRUTA', 'DEDUCOES RECEITA BRUTA', 'RECEITA LIQUIDA'
+]
+DIMENSOES_RESUMO_DESPESA = [
+    'COEXERCICIO', 'INMES', 'INTIPOADM', 'NOUG',
+    'CATEGORIA', 'NOCATEGORIA', 'GRUPO', 'NOGRUPO',
+    'MODALIDADE', 'NOMODALIDADE', 'ELEMENTO', 'NOELEMENTO'
+]
+MEDIDAS_RESUMO_DESPESA = [
+    'DOTACAO INICIAL', 'DOTACAO ADICIONAL', 'CANCELAMENTO DE DOTACAO', 'CANCEL-REMANEJA DOTACAO',
+    'DESPESA EMPENHADA', 'DESPESA LIQUIDADA', 'DESPESA PAGA', 'SALDO DOTACAO'
+]
+
+# Exercícios mantidos no resumo (None = todos): a receita estimada oferece ?exercicios= até o
+# total de exercícios disponíveis, como no modo em memória
+EXERCICIOS_RESUMO = None
+
+armazem = ArmazemSQLite(CAMINHO_ARMAZEM_SQLITE)
+_lock_ingestao = threading.Lock()
+
+if ARMAZENAMENTO_DADOS not in ('memoria', 'sqlite'):
+    print(f"⚠️ ARMAZENAMENTO_DADOS inválido: {ARMAZENAMENTO_DADOS}; usando memória")
 
 def carregar_dataframe_receita():
     """Carrega dados de receita com cache"""
     caminho_arquivo = os.path.join('dados', 'RECEITA.xlsx')
 
     # Tenta carregar do cache primeiro
-    df_cached = cache_service.get_cached_dataframe(caminho_arquivo, 'receita')
+    df_cached = cache_service.get_cached_dataframe(caminho_arquivo, CHAVE_CACHE_RECEITA)
     if df_cached is not None:
         return df_cached
 
@@ -48,14 +102,61 @@ def carregar_dataframe_receita():
         max_mes = df['INMES'].max()
         print(f"📅 Mês de referência: {max_mes}")
 
+    for col in COLUNAS_CATEGORICAS_RECEITA:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+
+    _separar_conta_corrente(df)
+
     # Salva no cache
-    cache_service.cache_dataframe(df, caminho_arquivo, 'receita')
+    cache_service.cache_dataframe(df, caminho_arquivo, CHAVE_CACHE_RECEITA)
 
     fim = time.time()
     print(f"⏱️ Dados de receita carregados em {fim - inicio:.2f} segundos")
 
     return df
 
+def _separar_conta_corrente(df):
+    """Grava RECEITA_CODIGO e FONTE_CODIGO como inteiros a partir do COCONTACORRENTE (in-place)"""
+    if 'COCONTACORRENTE' not in df.columns:
+        return
+    conta = pd.to_numeric(df['COCONTACORRENTE'], errors='coerce').fillna(0).astype('int64')
+    df['RECEITA_CODIGO'] = conta // DIVISOR_CONTA_CORRENTE
+    df['FONTE_CODIGO'] = conta % DIVISOR_CONTA_CORRENTE
+
+def carregar_classificacao_orcamentaria():
+    """Carrega a classificação orçamentária (COCLASSEORC inteiro -> NOCLASSIFICACAO) com cache"""
+    caminho_arquivo = os.path.join('dados', 'CLASSIFICACAO_ORCAMENTARIA.xlsx')
+
+    if not os.path.exists(caminho_arquivo):
+        print(f"❌ Arquivo não encontrado: {caminho_arquivo}")
+        return pd.DataFrame()
+
+    df_cached = cache_service.get_cached_dataframe(caminho_arquivo, 'classificacao')
+    if df_cached is not None:
+        return df_cached
+
+    try:
+        print(f"🔄 Carregando classificação orçamentária de {caminho_arquivo}")
+        df = pd.read_excel(caminho_arquivo, usecols=['COCLASSEORC', 'NOCLASSIFICACAO'])
+
+        # Remove duplicatas e valores nulos; códigos ficam inteiros como na receita
+        df = df.drop_duplicates(subset=['COCLASSEORC'])
+        df = df.dropna(subset=['COCLASSEORC', 'NOCLASSIFICACAO'])
+        df['COCLASSEORC'] = pd.to_numeric(df['COCLASSEORC'], errors='coerce')
+        df = df.dropna(subset=['COCLASSEORC']).astype({'COCLASSEORC': 'int64', 'NOCLASSIFICACAO': str})
+
+        # Persistida já ordenada por código: o índice de consulta é montado sem reordenar
+        df = df.sort_values('COCLASSEORC', kind='stable').reset_index(drop=True)
+
+        cache_service.cache_dataframe(df, caminho_arquivo, 'classificacao')
+        print(f"✅ Classificação carregada: {len(df)} registros únicos")
+        return df
+
+    except Exception as e:
+        print(f"❌ Erro ao carregar classificação orçamentária: {e}")
+        return pd.DataFrame()
+
 def carregar_dataframe_despesa():
     """Carrega dados de despesa com cache e precisão monetária corrigida"""
     caminho_arquivo = os.path.join('dados', 'DESPESA.xlsx')
@@ -109,7 +210,7 @@ def carregar_dataframe_despesa():
         
         df = df[df['COEXERCICIO'] == 2025].copy()
 
-        for col in ['CATEGORIA', 'NOCATEGORIA', 'GRUPO', 'NOGRUPO', 'NOUG']:
+        for col in COLUNAS_CATEGORICAS_DESPESA:
             if col in df.columns:
                 df[col] = df[col].astype('category')
 
@@ -124,4 +225,57 @@ def carregar_dataframe_despesa():
 
     except Exception as e:
         print(f"❌ Erro ao carregar dados: {e}")
-        return pd.DataFrame()
\ No newline at end of file
+        return pd.DataFrame()
+
+def _carregar_resumo(tabela, caminho_arquivo, cache_key, carregar, dimensoes, medidas, categoricas):
+    """
+    Resumo da tabela de fatos agregado no SQLite, ingerindo o arquivo quando o armazém está desatualizado
+
+    O DataFrame completo só existe durante a ingestão (uma vez por versão do arquivo) e é
+    liberado em seguida; o resumo recebe versão própria no cache_service, de modo que os
+    cálculos memoizados dos relatórios continuam valendo, e fica fixado em memória (fora do
+    LRU dos derivados) para que o GROUP BY no SQLite só rode de novo quando o arquivo mudar.
+    """
+    versao = cache_service.versao_arquivo(caminho_arquivo, cache_key)
+
+    def resumir():
+        with _lock_ingestao:
+            if armazem.versao(tabela) != versao:
+                df = carregar()
+                if df.empty:
+                    return df.iloc[0:0]
+                armazem.gravar(df, tabela, versao)
+                del df
+                cache_service.liberar_dataframe(cache_key)
+        inicio = time.time()
+        resumo = armazem.resumir(tabela, dimensoes, medidas, EXERCICIOS_RESUMO, categoricas)
+        print(f"🗄️ Resumo de {tabela} lido do SQLite: {len(resumo):,} linhas em {time.time() - inicio:.2f} segundos")
+        return resumo
+
+    return cache_service.fixar_dataframe(f"resumo_{tabela}", f"sqlite|{tabela}|{versao}", resumir)
+
+def carregar_receita_resumida():
+    """
+    Receita para os relatórios que só usam dimensões de classificação, mês e tipo de administração
+
+    No modo em memória é o próprio carregar_dataframe_receita(); no modo SQLite é a soma das
+    medidas por combinação distinta de DIMENSOES_RESUMO_RECEITA em todos os exercícios
+    (contagens passam a contar combinações, o que preserva as condições 'registros > 0').
+
+    Usada por todas as páginas, exceto as que precisam de colunas fora do resumo e por isso
+    sempre carregam o DataFrame completo: conta corrente (COCONTACORRENTE), receita por fonte
+    e busca de receitas.
+    """
+    if ARMAZENAMENTO_DADOS != 'sqlite':
+        return carregar_dataframe_receita()
+    return _carregar_resumo('receita', os.path.join('dados', 'RECEITA.xlsx'), CHAVE_CACHE_RECEITA,
+                            carregar_dataframe_receita, DIMENSOES_RESUMO_RECEITA, MEDIDAS_RESUMO_RECEITA,
+                            COLUNAS_CATEGORICAS_RECEITA)
+
+def carregar_despesa_resumida():
+    """Despesa resumida por DIMENSOES_RESUMO_DESPESA (ver carregar_receita_resumida)"""
+    caminho_arquivo = os.path.join('dados', 'DESPESA.xlsx')
+    if ARMAZENAMENTO_DADOS != 'sqlite' or not os.path.exists(caminho_arquivo):
+        return carregar_dataframe_despesa()
+    return _carregar_resumo('despesa', caminho_arquivo, 'despesa', carregar_dataframe_despesa,
+                            DIMENSOES_RESUMO_DESPESA, MEDIDAS_RESUMO_DESPESA, COLUNAS_CATEGORICAS_DESPESA)